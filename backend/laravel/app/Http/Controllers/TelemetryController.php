@@ -347,6 +347,187 @@ public function aggregates(Request $request)
         }
     }
 
+    /**
+     * Квантили, std и среднее GOOD-семплов за произвольное окно — из mergeable-сводок
+     * (value_sketch / value_sum / value_sumsq) агрегатов, без скана telemetry_samples.
+     * Полные часы позади watermark 1h (aggregator_state) берутся из telemetry_agg_1h,
+     * края окна и ещё не агрегированные часы — из telemetry_agg_1m; границы окна
+     * округляются вниз до минуты. Точность квантилей — ~1% относительная.
+     *
+     * @return \Illuminate\Http\JsonResponse
+     */
+    public function quantiles(Request $request)
+    {
+        // Проверяем авторизацию
+        if (! Auth::check()) {
+            return $this->localizedError('unauthenticated', null, 401);
+        }
+
+        $validated = $request->validate([
+            'zone_id' => ['required', 'integer', 'exists:zones,id'],
+            'metric' => ['required', 'string'],
+            'from' => ['required', 'date'],
+            'to' => ['required', 'date', 'after:from'],
+            'quantiles' => ['nullable', 'array', 'max:20'],
+            'quantiles.*' => ['numeric', 'between:0,1'],
+        ]);
+
+        $zoneId = $validated['zone_id'];
+
+        // Проверяем доступ к зоне
+        if (! ZoneAccessHelper::canAccessZone(Auth::user(), $zoneId)) {
+            Log::warning('TelemetryController: Unauthorized access attempt to zone quantiles', [
+                'user_id' => Auth::id(),
+                'zone_id' => $zoneId,
+            ]);
+
+            return $this->localizedError('forbidden', null, 403);
+        }
+        $metric = strtoupper($validated['metric']);
+
+        $allowedMetrics = ['PH', 'EC', 'TEMPERATURE', 'HUMIDITY', 'WATER_LEVEL', 'FLOW_RATE', 'PUMP_CURRENT'];
+        if (! in_array($metric, $allowedMetrics)) {
+            return response()->json([
+                'status' => 'error',
+                'message' => 'Invalid metric. Allowed: '.implode(', ', array_map('strtolower', $allowedMetrics)),
+            ], 400);
+        }
+
+        $quantiles = array_values(array_map('floatval', $validated['quantiles'] ?? [0.1, 0.5, 0.9]));
+        $from = \Carbon\Carbon::parse($validated['from'])->utc()->startOfMinute();
+        $to = \Carbon\Carbon::parse($validated['to'])->utc()->startOfMinute();
+
+        $metricAliases = $this->zoneFrontendTelemetry->metricAliases($metric);
+        if ($metricAliases === []) {
+            $metricAliases = [$metric];
+        }
+        $preferredChannels = $this->zoneFrontendTelemetry->getPreferredChannels($zoneId, $metric, true);
+        $hourWatermark = $this->hourlyAggregateWatermark();
+
+        $rows = $this->selectSketchQuantiles($zoneId, $metricAliases, $preferredChannels, $from, $to, $hourWatermark, $quantiles);
+        if (($rows === [] || $rows[0]->total_count === null) && $preferredChannels !== []) {
+            $rows = $this->selectSketchQuantiles($zoneId, $metricAliases, [], $from, $to, $hourWatermark, $quantiles);
+        }
+
+        $first = $rows[0] ?? null;
+        $count = (int) ($first->total_count ?? 0);
+        $mean = $count > 0 ? (float) $first->total_sum / $count : null;
+        $std = null;
+        if ($count > 1) {
+            $variance = ((float) $first->total_sumsq - (float) $first->total_sum * (float) $first->total_sum / $count) / ($count - 1);
+            $std = sqrt(max($variance, 0.0));
+        }
+
+        $values = array_map(fn ($row) => [
+            'q' => (float) $row->q,
+            'value' => $row->value !== null ? (float) $row->value : null,
+        ], $rows);
+
+        return response()->json([
+            'status' => 'ok',
+            'data' => [
+                'from' => $from->toIso8601String(),
+                'to' => $to->toIso8601String(),
+                'count' => $count,
+                'mean' => $mean,
+                'std' => $std,
+                'quantiles' => $values,
+            ],
+        ]);
+    }
+
+    /**
+     * Начало первого часа, который telemetry_agg_1h может ещё не содержать целиком:
+     * 1h отстаёт от watermark 1m, а час, в который попадает aggregator_state.last_ts,
+     * бывает агрегирован частично. null — агрегатор 1h ещё не запускался.
+     */
+    private function hourlyAggregateWatermark(): ?\Carbon\Carbon
+    {
+        $lastTs = DB::table('aggregator_state')
+            ->where('aggregation_type', '1h')
+            ->value('last_ts');
+
+        return $lastTs !== null ? \Carbon\Carbon::parse($lastTs, 'UTC')->startOfHour() : null;
+    }
+
+    private function selectSketchQuantiles(
+        int $zoneId,
+        array $metricAliases,
+        array $preferredChannels,
+        \Carbon\Carbon $from,
+        \Carbon\Carbon $to,
+        ?\Carbon\Carbon $hourWatermark,
+        array $quantiles
+    ): array {
+        // Полные часы позади watermark 1h — из 1h, остаток по краям и часы,
+        // которые агрегатор 1h ещё не закрыл, — из 1m.
+        $hourStart = $from->copy()->minute === 0 ? $from->copy() : $from->copy()->startOfHour()->addHour();
+        $hourEnd = $to->copy()->startOfHour();
+        if ($hourWatermark === null) {
+            $hourEnd = $hourStart->copy();
+        } elseif ($hourWatermark < $hourEnd) {
+            $hourEnd = $hourWatermark->copy();
+        }
+        if ($hourStart >= $hourEnd) {
+            $hourStart = $to->copy();
+            $hourEnd = $to->copy();
+        }
+
+        $metricPlaceholders = implode(', ', array_fill(0, count($metricAliases), '?'));
+        $filter = "zone_id = ? AND metric_type IN ({$metricPlaceholders})";
+        $filterBindings = array_merge([$zoneId], $metricAliases);
+        if ($preferredChannels !== []) {
+            $channelPlaceholders = implode(', ', array_fill(0, count($preferredChannels), '?'));
+            $filter .= " AND channel IN ({$channelPlaceholders})";
+            $filterBindings = array_merge($filterBindings, $preferredChannels);
+        }
+
+        $query = "
+            WITH parts AS (
+                SELECT value_sketch, value_sum, value_sumsq, valid_count
+                FROM telemetry_agg_1h
+                WHERE {$filter}
+                    AND ts >= ? AND ts < ?
+                UNION ALL
+                SELECT value_sketch, value_sum, value_sumsq, valid_count
+                FROM telemetry_agg_1m
+                WHERE {$filter}
+                    AND ((ts >= ? AND ts < ?) OR (ts >= ? AND ts < ?))
+            ),
+            merged AS (
+                SELECT
+                    telemetry_sketch_merge(value_sketch) AS sketch,
+                    SUM(value_sum) AS total_sum,
+                    SUM(value_sumsq) AS total_sumsq,
+                    SUM(valid_count) FILTER (WHERE value_sum IS NOT NULL) AS total_count
+                FROM parts
+            )
+            SELECT
+                q.q,
+                telemetry_sketch_quantile(merged.sketch, q.q) AS value,
+                merged.total_sum,
+                merged.total_sumsq,
+                merged.total_count
+            FROM merged
+            CROSS JOIN unnest(?::double precision[]) WITH ORDINALITY AS q(q, ord)
+            ORDER BY q.ord
+        ";
+
+        $format = 'Y-m-d H:i:s';
+        $bindings = array_merge(
+            $filterBindings,
+            [$hourStart->format($format), $hourEnd->format($format)],
+            $filterBindings,
+            [
+                $from->format($format), $hourStart->format($format),
+                $hourEnd->format($format), $to->format($format),
+            ],
+            ['{'.implode(',', $quantiles).'}'],
+        );
+
+        return DB::select($query, $bindings);
+    }
+
     private function selectAggregateRows(
         string $table,
         int $zoneId,
@@ -14,6 +14,49 @@ public function authorize(): bool
         return true;
     }
 
+    /**
+     * Привести компактные форматы history-logger к построчному `updates`.
+     *
+     * Тело может быть сжато gzip (Content-Encoding: gzip) и/или прийти в колоночном
+     * виде {"format": "columnar", "columns": {"zone_id": [...], ...}}. Дальше
+     * валидация и контроллер работают с обычным списком updates.
+     */
+    protected function prepareForValidation(): void
+    {
+        if (strtolower((string) $this->header('Content-Encoding')) === 'gzip') {
+            $maxDecoded = (int) config('realtime.telemetry_batch_max_decoded_bytes');
+            $decoded = @gzdecode((string) $this->getContent(), max(0, $maxDecoded));
+            $data = is_string($decoded) ? json_decode($decoded, true) : null;
+            $this->json()->replace(is_array($data) ? $data : []);
+        }
+
+        if ($this->input('format') !== 'columnar') {
+            return;
+        }
+
+        $columns = $this->input('columns');
+        $fields = ['zone_id', 'node_id', 'channel', 'metric_type', 'value', 'timestamp'];
+        if (! is_array($columns) || ! is_array($columns['value'] ?? null)) {
+            return;
+        }
+        $count = count($columns['value']);
+        foreach ($fields as $field) {
+            if (! is_array($columns[$field] ?? null) || count($columns[$field]) !== $count) {
+                return;
+            }
+        }
+
+        $updates = [];
+        for ($i = 0; $i < $count; $i++) {
+            $update = [];
+            foreach ($fields as $field) {
+                $update[$field] = $columns[$field][$i];
+            }
+            $updates[] = $update;
+        }
+        $this->merge(['updates' => $updates]);
+    }
+
     /**
      * Get the validation rules that apply to the request.
      *
@@ -3,4 +3,6 @@
 return [
     'telemetry_batch_max_updates' => (int) env('REALTIME_BATCH_MAX_UPDATES', 200),
     'telemetry_batch_max_bytes' => (int) env('REALTIME_BATCH_MAX_BYTES', 262144),
+    // Предел распакованного gzip-тела (защита от zip-бомб); 0 — без ограничения.
+    'telemetry_batch_max_decoded_bytes' => (int) env('REALTIME_BATCH_MAX_DECODED_BYTES', 4194304),
 ];
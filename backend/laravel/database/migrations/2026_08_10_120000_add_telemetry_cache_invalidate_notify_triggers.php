@@ -0,0 +1,77 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Support\Facades\DB;
+
+/**
+ * NOTIFY telemetry_cache_invalidate при изменении привязки узлов к зонам и зон к теплицам.
+ * history-logger инвалидирует по нему кеши резолва zone/node (AsyncTTLCache).
+ */
+return new class extends Migration
+{
+    public function up(): void
+    {
+        if (DB::getDriverName() !== 'pgsql') {
+            return;
+        }
+
+        DB::unprepared(<<<'SQL'
+            CREATE OR REPLACE FUNCTION notify_telemetry_cache_invalidate()
+            RETURNS trigger LANGUAGE plpgsql AS $$
+            DECLARE
+                rec RECORD;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    rec := OLD;
+                ELSE
+                    rec := NEW;
+                END IF;
+                PERFORM pg_notify(
+                    'telemetry_cache_invalidate',
+                    json_build_object(
+                        'entity', CASE TG_TABLE_NAME WHEN 'nodes' THEN 'node' ELSE 'zone' END,
+                        'id',     rec.id,
+                        'uid',    rec.uid,
+                        'op',     TG_OP
+                    )::text
+                );
+                IF TG_OP = 'UPDATE' AND OLD.uid IS DISTINCT FROM NEW.uid THEN
+                    PERFORM pg_notify(
+                        'telemetry_cache_invalidate',
+                        json_build_object(
+                            'entity', CASE TG_TABLE_NAME WHEN 'nodes' THEN 'node' ELSE 'zone' END,
+                            'id',     OLD.id,
+                            'uid',    OLD.uid,
+                            'op',     TG_OP
+                        )::text
+                    );
+                END IF;
+                RETURN NULL;
+            END;
+            $$;
+
+            DROP TRIGGER IF EXISTS trg_nodes_telemetry_cache_invalidate ON nodes;
+            CREATE TRIGGER trg_nodes_telemetry_cache_invalidate
+            AFTER INSERT OR DELETE OR UPDATE OF uid, zone_id, pending_zone_id ON nodes
+            FOR EACH ROW EXECUTE FUNCTION notify_telemetry_cache_invalidate();
+
+            DROP TRIGGER IF EXISTS trg_zones_telemetry_cache_invalidate ON zones;
+            CREATE TRIGGER trg_zones_telemetry_cache_invalidate
+            AFTER INSERT OR DELETE OR UPDATE OF uid, greenhouse_id ON zones
+            FOR EACH ROW EXECUTE FUNCTION notify_telemetry_cache_invalidate();
+        SQL);
+    }
+
+    public function down(): void
+    {
+        if (DB::getDriverName() !== 'pgsql') {
+            return;
+        }
+
+        DB::unprepared(<<<'SQL'
+            DROP TRIGGER IF EXISTS trg_nodes_telemetry_cache_invalidate ON nodes;
+            DROP TRIGGER IF EXISTS trg_zones_telemetry_cache_invalidate ON zones;
+            DROP FUNCTION IF EXISTS notify_telemetry_cache_invalidate();
+        SQL);
+    }
+};
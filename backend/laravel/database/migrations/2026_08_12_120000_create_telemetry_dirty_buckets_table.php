@@ -0,0 +1,32 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+/**
+ * Минутные bucket'ы telemetry_samples, получившие запись позади watermark агрегатора
+ * (aggregator_state '1m'): опоздавшие семплы, requeue, replay dead-list.
+ * history-logger отмечает bucket, telemetry-aggregator пересчитывает 1m → 1h → daily
+ * только для отмеченных (zone, node, bucket) и удаляет отметку.
+ */
+return new class extends Migration
+{
+    public function up(): void
+    {
+        Schema::create('telemetry_dirty_buckets', function (Blueprint $table) {
+            $table->unsignedBigInteger('sensor_id');
+            $table->timestamp('bucket'); // начало минуты (UTC, как telemetry_samples.ts)
+            $table->unsignedBigInteger('zone_id')->nullable();
+            $table->timestamp('marked_at')->useCurrent(); // повторная отметка обновляет значение
+
+            $table->primary(['sensor_id', 'bucket']);
+            $table->index('bucket');
+        });
+    }
+
+    public function down(): void
+    {
+        Schema::dropIfExists('telemetry_dirty_buckets');
+    }
+};
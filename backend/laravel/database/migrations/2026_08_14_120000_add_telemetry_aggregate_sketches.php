@@ -0,0 +1,139 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Mergeable-сводки для агрегатов телеметрии: value_sum / value_sumsq и
+     * value_sketch (log-bucket гистограмма в стиле DDSketch, относительная
+     * точность 1%) по GOOD-семплам. 1h и daily сливают сводки дочерних bucket'ов,
+     * поэтому p10/p90/std считаются по raw-семплам без повторного скана telemetry_samples.
+     *
+     * Sketch — jsonb {"<index>": count}: index = sign(v) * (ceil(ln|v| / ln γ) + 2048),
+     * 0 — для |v| < 1e-9; γ = 1.01 / 0.99. Порядок индексов совпадает с порядком значений.
+     */
+    public function up(): void
+    {
+        $columns = [
+            'value_sum' => 'double precision',
+            'value_sumsq' => 'double precision',
+            'value_sketch' => 'jsonb',
+        ];
+        $dailyColumns = [
+            'value_std' => 'double precision',
+            'value_p10' => 'double precision',
+            'value_p90' => 'double precision',
+            'valid_count' => 'integer DEFAULT 0',
+        ];
+
+        foreach (['telemetry_agg_1m', 'telemetry_agg_1h', 'telemetry_daily'] as $table) {
+            if (! Schema::hasTable($table)) {
+                continue;
+            }
+            $tableColumns = $table === 'telemetry_daily' ? $dailyColumns + $columns : $columns;
+            foreach ($tableColumns as $name => $type) {
+                if (! Schema::hasColumn($table, $name)) {
+                    DB::statement("ALTER TABLE {$table} ADD COLUMN {$name} {$type}");
+                }
+            }
+        }
+
+        if (DB::getDriverName() !== 'pgsql') {
+            return;
+        }
+
+        DB::unprepared(<<<'SQL'
+CREATE OR REPLACE FUNCTION telemetry_sketch_from_values(vals double precision[])
+RETURNS jsonb
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT jsonb_object_agg(idx::text, cnt)
+    FROM (
+        SELECT
+            CASE
+                WHEN abs(v) < 1e-9 THEN 0
+                ELSE sign(v)::int * (ceil(ln(abs(v)) / ln(1.01 / 0.99))::int + 2048)
+            END AS idx,
+            count(*) AS cnt
+        FROM unnest(vals) AS v
+        WHERE v IS NOT NULL AND v <> 'NaN'::double precision
+        GROUP BY 1
+    ) buckets
+$$;
+
+CREATE OR REPLACE FUNCTION telemetry_sketch_add(state jsonb, sketch jsonb)
+RETURNS jsonb
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE
+        WHEN state IS NULL THEN sketch
+        WHEN sketch IS NULL THEN state
+        ELSE (
+            SELECT jsonb_object_agg(key, total)
+            FROM (
+                SELECT key, sum(value::bigint) AS total
+                FROM (
+                    SELECT key, value FROM jsonb_each_text(state)
+                    UNION ALL
+                    SELECT key, value FROM jsonb_each_text(sketch)
+                ) parts
+                GROUP BY key
+            ) merged
+        )
+    END
+$$;
+
+DROP AGGREGATE IF EXISTS telemetry_sketch_merge(jsonb);
+CREATE AGGREGATE telemetry_sketch_merge(jsonb) (
+    SFUNC = telemetry_sketch_add,
+    STYPE = jsonb,
+    COMBINEFUNC = telemetry_sketch_add,
+    PARALLEL = SAFE
+);
+
+CREATE OR REPLACE FUNCTION telemetry_sketch_quantile(sketch jsonb, q double precision)
+RETURNS double precision
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE
+        WHEN idx = 0 THEN 0.0
+        ELSE sign(idx) * 2 * power(1.01 / 0.99, abs(idx) - 2048) / (1.01 / 0.99 + 1)
+    END
+    FROM (
+        SELECT
+            key::int AS idx,
+            sum(value::bigint) OVER (ORDER BY key::int) AS cum,
+            sum(value::bigint) OVER () AS total
+        FROM jsonb_each_text(sketch)
+    ) buckets
+    WHERE cum > greatest(0.0, least(1.0, q)) * (total - 1)
+    ORDER BY idx
+    LIMIT 1
+$$;
+SQL);
+    }
+
+    public function down(): void
+    {
+        if (DB::getDriverName() === 'pgsql') {
+            DB::unprepared(<<<'SQL'
+DROP FUNCTION IF EXISTS telemetry_sketch_quantile(jsonb, double precision);
+DROP AGGREGATE IF EXISTS telemetry_sketch_merge(jsonb);
+DROP FUNCTION IF EXISTS telemetry_sketch_add(jsonb, jsonb);
+DROP FUNCTION IF EXISTS telemetry_sketch_from_values(double precision[]);
+SQL);
+        }
+
+        foreach (['telemetry_agg_1m', 'telemetry_agg_1h', 'telemetry_daily'] as $table) {
+            if (! Schema::hasTable($table)) {
+                continue;
+            }
+            foreach (['value_sketch', 'value_sumsq', 'value_sum', 'valid_count', 'value_p90', 'value_p10', 'value_std'] as $col) {
+                if (($table === 'telemetry_daily' || in_array($col, ['value_sketch', 'value_sumsq', 'value_sum'], true))
+                    && Schema::hasColumn($table, $col)) {
+                    DB::statement("ALTER TABLE {$table} DROP COLUMN {$col}");
+                }
+            }
+        }
+    }
+};
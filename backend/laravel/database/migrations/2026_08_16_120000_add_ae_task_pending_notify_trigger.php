@@ -0,0 +1,60 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Support\Facades\DB;
+
+/**
+ * NOTIFY ae_task_pending при появлении pending-задачи AE3 (INSERT, requeue, перенос due_at).
+ * automation-engine по нему будит drain-цикл worker'а вместо ожидания опроса.
+ */
+return new class extends Migration
+{
+    public function up(): void
+    {
+        if (DB::getDriverName() !== 'pgsql') {
+            return;
+        }
+
+        DB::unprepared(<<<'SQL'
+            CREATE OR REPLACE FUNCTION public.ae_notify_task_pending()
+            RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF NEW.status <> 'pending' THEN
+                    RETURN NULL;
+                END IF;
+                IF TG_OP = 'UPDATE'
+                   AND OLD.status = 'pending'
+                   AND OLD.due_at IS NOT DISTINCT FROM NEW.due_at THEN
+                    RETURN NULL;
+                END IF;
+                PERFORM pg_notify(
+                    'ae_task_pending',
+                    json_build_object(
+                        'task_id', NEW.id,
+                        'zone_id', NEW.zone_id,
+                        'due_at',  NEW.due_at
+                    )::text
+                );
+                RETURN NULL;
+            END;
+            $$;
+
+            DROP TRIGGER IF EXISTS trg_ae_task_pending_notify ON ae_tasks;
+            CREATE TRIGGER trg_ae_task_pending_notify
+            AFTER INSERT OR UPDATE OF status, due_at ON ae_tasks
+            FOR EACH ROW EXECUTE FUNCTION public.ae_notify_task_pending();
+        SQL);
+    }
+
+    public function down(): void
+    {
+        if (DB::getDriverName() !== 'pgsql') {
+            return;
+        }
+
+        DB::unprepared(<<<'SQL'
+            DROP TRIGGER IF EXISTS trg_ae_task_pending_notify ON ae_tasks;
+            DROP FUNCTION IF EXISTS public.ae_notify_task_pending();
+        SQL);
+    }
+};
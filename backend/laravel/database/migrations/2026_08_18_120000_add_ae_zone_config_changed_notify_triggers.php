@@ -0,0 +1,121 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Support\Facades\DB;
+
+/**
+ * NOTIFY ae_zone_config_changed при изменении статичной части snapshot'а зоны AE3:
+ * effective bundle, ноды/каналы зоны, channel bindings, калибровки насосов.
+ * automation-engine по нему инвалидирует кеш статичной части ZoneSnapshot;
+ * zone_id = NULL — сбросить кеш всех зон. UPDATE, переносящий строку в другую
+ * зону (nodes.zone_id, node_channels.node_id, *.node_channel_id), уведомляет и
+ * старую зону — её snapshot тоже ссылается на перенесённый канал.
+ */
+return new class extends Migration
+{
+    public function up(): void
+    {
+        if (DB::getDriverName() !== 'pgsql') {
+            return;
+        }
+
+        DB::unprepared(<<<'SQL'
+            CREATE OR REPLACE FUNCTION public.ae_notify_zone_config_changed()
+            RETURNS trigger LANGUAGE plpgsql AS $$
+            DECLARE
+                rec RECORD;
+                old_zone_id bigint;
+                new_zone_id bigint;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    rec := OLD;
+                ELSE
+                    rec := NEW;
+                END IF;
+
+                IF TG_TABLE_NAME = 'automation_effective_bundles' THEN
+                    IF rec.scope_type = 'zone' THEN
+                        new_zone_id := rec.scope_id;
+                    ELSIF rec.scope_type = 'grow_cycle' THEN
+                        SELECT gc.zone_id INTO new_zone_id FROM grow_cycles gc WHERE gc.id = rec.scope_id;
+                    END IF;
+                ELSIF TG_TABLE_NAME = 'nodes' THEN
+                    new_zone_id := rec.zone_id;
+                    IF TG_OP = 'UPDATE' THEN
+                        old_zone_id := OLD.zone_id;
+                    END IF;
+                ELSIF TG_TABLE_NAME = 'node_channels' THEN
+                    SELECT n.zone_id INTO new_zone_id FROM nodes n WHERE n.id = rec.node_id;
+                    IF TG_OP = 'UPDATE' AND OLD.node_id IS DISTINCT FROM NEW.node_id THEN
+                        SELECT n.zone_id INTO old_zone_id FROM nodes n WHERE n.id = OLD.node_id;
+                    END IF;
+                ELSE
+                    SELECT n.zone_id INTO new_zone_id
+                    FROM node_channels nc
+                    JOIN nodes n ON n.id = nc.node_id
+                    WHERE nc.id = rec.node_channel_id;
+                    IF TG_OP = 'UPDATE' AND OLD.node_channel_id IS DISTINCT FROM NEW.node_channel_id THEN
+                        SELECT n.zone_id INTO old_zone_id
+                        FROM node_channels nc
+                        JOIN nodes n ON n.id = nc.node_id
+                        WHERE nc.id = OLD.node_channel_id;
+                    END IF;
+                END IF;
+
+                PERFORM pg_notify(
+                    'ae_zone_config_changed',
+                    json_build_object('zone_id', new_zone_id, 'source', TG_TABLE_NAME, 'op', TG_OP)::text
+                );
+                IF old_zone_id IS NOT NULL AND old_zone_id IS DISTINCT FROM new_zone_id THEN
+                    PERFORM pg_notify(
+                        'ae_zone_config_changed',
+                        json_build_object('zone_id', old_zone_id, 'source', TG_TABLE_NAME, 'op', TG_OP)::text
+                    );
+                END IF;
+                RETURN NULL;
+            END;
+            $$;
+
+            DROP TRIGGER IF EXISTS trg_ae_zone_config_changed_bundles ON automation_effective_bundles;
+            CREATE TRIGGER trg_ae_zone_config_changed_bundles
+            AFTER INSERT OR DELETE OR UPDATE OF bundle_revision, config ON automation_effective_bundles
+            FOR EACH ROW EXECUTE FUNCTION public.ae_notify_zone_config_changed();
+
+            DROP TRIGGER IF EXISTS trg_ae_zone_config_changed_nodes ON nodes;
+            CREATE TRIGGER trg_ae_zone_config_changed_nodes
+            AFTER INSERT OR DELETE OR UPDATE OF zone_id, uid, type ON nodes
+            FOR EACH ROW EXECUTE FUNCTION public.ae_notify_zone_config_changed();
+
+            DROP TRIGGER IF EXISTS trg_ae_zone_config_changed_node_channels ON node_channels;
+            CREATE TRIGGER trg_ae_zone_config_changed_node_channels
+            AFTER INSERT OR DELETE OR UPDATE OF node_id, channel, type, config, is_active ON node_channels
+            FOR EACH ROW EXECUTE FUNCTION public.ae_notify_zone_config_changed();
+
+            DROP TRIGGER IF EXISTS trg_ae_zone_config_changed_channel_bindings ON channel_bindings;
+            CREATE TRIGGER trg_ae_zone_config_changed_channel_bindings
+            AFTER INSERT OR DELETE OR UPDATE ON channel_bindings
+            FOR EACH ROW EXECUTE FUNCTION public.ae_notify_zone_config_changed();
+
+            DROP TRIGGER IF EXISTS trg_ae_zone_config_changed_pump_calibrations ON pump_calibrations;
+            CREATE TRIGGER trg_ae_zone_config_changed_pump_calibrations
+            AFTER INSERT OR DELETE OR UPDATE ON pump_calibrations
+            FOR EACH ROW EXECUTE FUNCTION public.ae_notify_zone_config_changed();
+        SQL);
+    }
+
+    public function down(): void
+    {
+        if (DB::getDriverName() !== 'pgsql') {
+            return;
+        }
+
+        DB::unprepared(<<<'SQL'
+            DROP TRIGGER IF EXISTS trg_ae_zone_config_changed_bundles ON automation_effective_bundles;
+            DROP TRIGGER IF EXISTS trg_ae_zone_config_changed_nodes ON nodes;
+            DROP TRIGGER IF EXISTS trg_ae_zone_config_changed_node_channels ON node_channels;
+            DROP TRIGGER IF EXISTS trg_ae_zone_config_changed_channel_bindings ON channel_bindings;
+            DROP TRIGGER IF EXISTS trg_ae_zone_config_changed_pump_calibrations ON pump_calibrations;
+            DROP FUNCTION IF EXISTS public.ae_notify_zone_config_changed();
+        SQL);
+    }
+};
@@ -368,6 +368,7 @@
     Route::get('nodes/{id}/telemetry/last', [TelemetryController::class, 'nodeLast']);
     Route::get('nodes/{id}/telemetry/history', [TelemetryController::class, 'nodeHistory']);
     Route::get('telemetry/aggregates', [TelemetryController::class, 'aggregates']);
+    Route::get('telemetry/quantiles', [TelemetryController::class, 'quantiles']);
 
     // Sync endpoints for WebSocket reconnection (viewer+)
     Route::get('sync/telemetry', [\App\Http\Controllers\SyncController::class, 'telemetry']);
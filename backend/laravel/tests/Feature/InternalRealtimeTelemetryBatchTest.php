@@ -92,4 +92,71 @@ public function test_rejects_payloads_exceeding_size_limit(): void
         $response->assertStatus(413);
         Event::assertNotDispatched(TelemetryBatchUpdated::class);
     }
+
+    public function test_accepts_gzipped_columnar_payload(): void
+    {
+        Event::fake();
+
+        config(['services.python_bridge.token' => 'test-token']);
+
+        $zone = Zone::factory()->create();
+        $node = DeviceNode::factory()->create(['zone_id' => $zone->id]);
+
+        $body = gzencode(json_encode([
+            'format' => 'columnar',
+            'columns' => [
+                'zone_id' => [$zone->id, $zone->id],
+                'node_id' => [$node->id, $node->id],
+                'channel' => ['ph_sensor', 'ec_sensor'],
+                'metric_type' => ['PH', 'EC'],
+                'value' => [6.2, 1.5],
+                'timestamp' => [1700000000000, 1700000000001],
+            ],
+        ]));
+
+        $response = $this->call(
+            'POST',
+            '/api/internal/realtime/telemetry-batch',
+            [],
+            [],
+            [],
+            [
+                'HTTP_AUTHORIZATION' => 'Bearer test-token',
+                'CONTENT_TYPE' => 'application/json',
+                'HTTP_ACCEPT' => 'application/json',
+                'HTTP_CONTENT_ENCODING' => 'gzip',
+            ],
+            $body,
+        );
+
+        $response->assertOk()->assertJsonPath('updates', 2);
+        Event::assertDispatched(TelemetryBatchUpdated::class, function ($event) use ($zone) {
+            return $event->zoneId === $zone->id
+                && count($event->updates) === 2
+                && $event->updates[1]['metric_type'] === 'EC';
+        });
+    }
+
+    public function test_rejects_columnar_payload_with_mismatched_columns(): void
+    {
+        Event::fake();
+
+        config(['services.python_bridge.token' => 'test-token']);
+
+        $response = $this->withHeader('Authorization', 'Bearer test-token')
+            ->postJson('/api/internal/realtime/telemetry-batch', [
+                'format' => 'columnar',
+                'columns' => [
+                    'zone_id' => [1, 1],
+                    'node_id' => [1],
+                    'channel' => [null, null],
+                    'metric_type' => ['PH', 'EC'],
+                    'value' => [6.2, 1.5],
+                    'timestamp' => [1700000000000, 1700000000001],
+                ],
+            ]);
+
+        $response->assertStatus(422);
+        Event::assertNotDispatched(TelemetryBatchUpdated::class);
+    }
 }
@@ -402,4 +402,116 @@ public function test_telemetry_aggregates_prefer_air_temperature_channel_over_so
         $this->assertSame(25.0, (float) $first['max']);
         $this->assertSame(24.0, (float) $first['median']);
     }
+
+    public function test_telemetry_quantiles_requires_auth(): void
+    {
+        $this->getJson('/api/telemetry/quantiles?zone_id=1&metric=ph&from=2026-01-01T00:00:00Z&to=2026-01-01T01:00:00Z')
+            ->assertStatus(401);
+    }
+
+    public function test_telemetry_quantiles_merge_minute_sketches(): void
+    {
+        $user = User::factory()->create(['role' => 'viewer']);
+        $this->actingAs($user);
+        $token = $user->createToken('test')->plainTextToken;
+
+        $zone = Zone::factory()->create();
+        $node = DeviceNode::factory()->create(['zone_id' => $zone->id]);
+        $user->zones()->syncWithoutDetaching([$zone->id]);
+
+        $start = now()->utc()->subDay()->startOfHour()->addMinutes(10);
+        $minutes = [[5.0, 6.0], [7.0, 8.0, 9.0]];
+        foreach ($minutes as $offset => $values) {
+            $array = 'ARRAY['.implode(',', $values).']::double precision[]';
+            DB::table('telemetry_agg_1m')->insert([
+                'zone_id' => $zone->id,
+                'node_id' => $node->id,
+                'channel' => 'ph_sensor',
+                'metric_type' => 'PH',
+                'value_avg' => array_sum($values) / count($values),
+                'value_min' => min($values),
+                'value_max' => max($values),
+                'value_median' => array_sum($values) / count($values),
+                'sample_count' => count($values),
+                'valid_count' => count($values),
+                'value_sum' => array_sum($values),
+                'value_sumsq' => array_sum(array_map(fn ($v) => $v * $v, $values)),
+                'value_sketch' => DB::raw("telemetry_sketch_from_values({$array})"),
+                'ts' => $start->copy()->addMinutes($offset),
+                'created_at' => now(),
+            ]);
+        }
+
+        $from = $start->copy()->toIso8601String();
+        $to = $start->copy()->addMinutes(5)->toIso8601String();
+        $response = $this->withHeader('Authorization', 'Bearer '.$token)
+            ->getJson('/api/telemetry/quantiles?'.http_build_query([
+                'zone_id' => $zone->id,
+                'metric' => 'ph',
+                'from' => $from,
+                'to' => $to,
+                'quantiles' => [0.0, 0.5, 1.0],
+            ]));
+
+        $response->assertOk()
+            ->assertJsonPath('status', 'ok')
+            ->assertJsonPath('data.count', 5);
+
+        $this->assertEqualsWithDelta(7.0, $response->json('data.mean'), 1e-9);
+        $this->assertEqualsWithDelta(sqrt(2.5), $response->json('data.std'), 1e-9);
+        $quantiles = $response->json('data.quantiles');
+        $this->assertCount(3, $quantiles);
+        $this->assertEqualsWithDelta(5.0, $quantiles[0]['value'], 0.05);
+        $this->assertEqualsWithDelta(7.0, $quantiles[1]['value'], 0.07);
+        $this->assertEqualsWithDelta(9.0, $quantiles[2]['value'], 0.09);
+    }
+
+    public function test_telemetry_quantiles_read_hours_ahead_of_hourly_watermark_from_minutes(): void
+    {
+        $user = User::factory()->create(['role' => 'viewer']);
+        $this->actingAs($user);
+        $token = $user->createToken('test')->plainTextToken;
+
+        $zone = Zone::factory()->create();
+        $node = DeviceNode::factory()->create(['zone_id' => $zone->id]);
+        $user->zones()->syncWithoutDetaching([$zone->id]);
+
+        $hour = now()->utc()->subHours(3)->startOfHour();
+        $row = fn (float $value) => [
+            'zone_id' => $zone->id,
+            'node_id' => $node->id,
+            'channel' => 'ph_sensor',
+            'metric_type' => 'PH',
+            'value_avg' => $value,
+            'value_min' => $value,
+            'value_max' => $value,
+            'value_median' => $value,
+            'sample_count' => 1,
+            'valid_count' => 1,
+            'value_sum' => $value,
+            'value_sumsq' => $value * $value,
+            'value_sketch' => DB::raw("telemetry_sketch_from_values(ARRAY[{$value}]::double precision[])"),
+            'created_at' => now(),
+        ];
+        // Час агрегирован частично: 1h видел только первую минуту, watermark 1h внутри часа.
+        DB::table('telemetry_agg_1h')->insert($row(5.0) + ['ts' => $hour]);
+        DB::table('telemetry_agg_1m')->insert($row(5.0) + ['ts' => $hour]);
+        DB::table('telemetry_agg_1m')->insert($row(9.0) + ['ts' => $hour->copy()->addMinutes(30)]);
+        DB::table('aggregator_state')->updateOrInsert(
+            ['aggregation_type' => '1h'],
+            ['last_ts' => $hour->copy()->addMinutes(5), 'updated_at' => now()],
+        );
+
+        $response = $this->withHeader('Authorization', 'Bearer '.$token)
+            ->getJson('/api/telemetry/quantiles?'.http_build_query([
+                'zone_id' => $zone->id,
+                'metric' => 'ph',
+                'from' => $hour->toIso8601String(),
+                'to' => $hour->copy()->addHour()->toIso8601String(),
+            ]));
+
+        $response->assertOk()
+            ->assertJsonPath('data.count', 2);
+        $this->assertEqualsWithDelta(7.0, $response->json('data.mean'), 1e-9);
+    }
 }
@@ -28,8 +28,10 @@ from ae3lite.infrastructure.metrics import (
     FAIL_SAFE_TRANSITION,
     IRR_PROBE_DEFERRED,
     IRR_PROBE_STREAK_EXHAUSTED,
+    IRR_STATE_PROBE_READS,
     NODE_REBOOT_DETECTED,
 )
+from ae3lite.infrastructure.irr_state_watch import IrrStateWatch
 from common.biz_alerts import send_biz_alert
 from common.db import create_zone_event
 from common.service_logs import send_service_log
@@ -307,7 +309,11 @@ class BaseStageHandler:
             )
             from ae3lite.domain.services.cycle_start_planner import CycleStartPlanner
 
-            snapshot = await PgZoneSnapshotReadModel().load(zone_id=zone_id)
+            # Общий read-model runtime monitor'а заполняет кеш статичной части snapshot'а.
+            read_model = getattr(self._runtime_monitor, "zone_snapshot_read_model", None)
+            if not isinstance(read_model, PgZoneSnapshotReadModel):
+                read_model = PgZoneSnapshotReadModel()
+            snapshot = await read_model.load(zone_id=zone_id)
             new_plan = CycleStartPlanner().build(task=task, snapshot=snapshot)
             new_runtime = getattr(new_plan, "runtime", None)
             if new_runtime is None:
@@ -1079,21 +1085,12 @@ class BaseStageHandler:
         timeout_sec = max(0.0, wait_timeout if wait_timeout is not None else 5.0)  # config-literal: fallback probe wait budget
         interval_sec = max(0.05, poll_interval if poll_interval is not None else 0.5)
 
-        state = await self._runtime_monitor.read_latest_irr_state(
-            zone_id=task.zone_id,
-            max_age_sec=max_age_sec,
-            expected_cmd_id=expected_cmd_id,
-        )
-        if not self._probe_state_needs_retry(
-            state=state,
-            expected=expected,
-            expected_cmd_id=expected_cmd_id,
-        ) or timeout_sec <= 0.0:
-            return state
-
-        deadline = monotonic() + timeout_sec
-        while monotonic() < deadline:
-            await asyncio.sleep(min(interval_sec, max(0.0, deadline - monotonic())))
+        # Подписка до первого чтения: snapshot, записанный между чтением и ожиданием, не теряется.
+        watch = getattr(self._runtime_monitor, "irr_state_watch", None)
+        if not isinstance(watch, IrrStateWatch):
+            watch = None
+        watch_event = watch.watch(task.zone_id, expected_cmd_id) if watch is not None else None
+        try:
             state = await self._runtime_monitor.read_latest_irr_state(
                 zone_id=task.zone_id,
                 max_age_sec=max_age_sec,
@@ -1103,9 +1100,33 @@ class BaseStageHandler:
                 state=state,
                 expected=expected,
                 expected_cmd_id=expected_cmd_id,
-            ):
+            ) or timeout_sec <= 0.0:
                 return state
-        return state
+
+            deadline = monotonic() + timeout_sec
+            while monotonic() < deadline:
+                remaining = max(0.0, deadline - monotonic())
+                if watch_event is not None and watch.connected:
+                    woken = await watch.wait(watch_event, timeout=min(watch.safety_poll_sec, remaining))
+                else:
+                    await asyncio.sleep(min(interval_sec, remaining))
+                    woken = False
+                IRR_STATE_PROBE_READS.labels(source="notify" if woken else "poll").inc()
+                state = await self._runtime_monitor.read_latest_irr_state(
+                    zone_id=task.zone_id,
+                    max_age_sec=max_age_sec,
+                    expected_cmd_id=expected_cmd_id,
+                )
+                if not self._probe_state_needs_retry(
+                    state=state,
+                    expected=expected,
+                    expected_cmd_id=expected_cmd_id,
+                ):
+                    return state
+            return state
+        finally:
+            if watch_event is not None:
+                watch.unwatch(task.zone_id, expected_cmd_id, watch_event)
 
     def _probe_state_needs_retry(
         self,
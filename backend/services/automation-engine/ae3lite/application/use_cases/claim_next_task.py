@@ -5,10 +5,11 @@ from __future__ import annotations
 import asyncio
 import logging
 from datetime import datetime
-from typing import Optional, Protocol, Tuple
+from typing import List, Optional, Protocol, Tuple
 
 from ae3lite.domain.entities import AutomationTask, ZoneLease
 from ae3lite.domain.errors import TaskClaimRollbackError
+from ae3lite.infrastructure.metrics import CLAIM_ROLLBACK_FAILED
 from common.infra_alerts import send_infra_alert
 
 logger = logging.getLogger(__name__)
@@ -24,6 +25,16 @@ class AutomationTaskRepository(Protocol):
     async def next_pending_due_at(self) -> Optional[datetime]:
         ...
 
+    async def claim_pending_batch(
+        self,
+        *,
+        owner: str,
+        now: datetime,
+        limit: int,
+        lease_ttl_sec: int,
+    ) -> List[Tuple[AutomationTask, ZoneLease]]:
+        ...
+
     async def release_claim(self, *, task_id: int, owner: str, now: datetime) -> bool:
         ...
 
@@ -168,5 +179,48 @@ class ClaimNextTaskUseCase:
         )
         return None
 
+    async def run_batch(
+        self,
+        *,
+        owner: str,
+        now: datetime,
+        limit: int,
+    ) -> List[Tuple[AutomationTask, ZoneLease]]:
+        """Забирает до ``limit`` задач с zone lease; для свободных слотов drain-цикла.
+
+        Репозиторий с ``claim_pending_batch`` делает это одним запросом;
+        иначе — последовательные ``run`` до первой пустой выдачи.
+        """
+        limit = max(1, int(limit))
+        claim_batch = getattr(self._task_repository, "claim_pending_batch", None)
+        if callable(claim_batch):
+            return list(
+                await claim_batch(
+                    owner=owner,
+                    now=now,
+                    limit=limit,
+                    lease_ttl_sec=self._lease_ttl_sec,
+                )
+            )
+        claimed: List[Tuple[AutomationTask, ZoneLease]] = []
+        while len(claimed) < limit:
+            try:
+                item = await self.run(owner=owner, now=now)
+            except TaskClaimRollbackError:
+                if not claimed:
+                    raise
+                # Уже взятые задачи с lease нельзя потерять: отдаём их, сбой отката эскалирован в run().
+                CLAIM_ROLLBACK_FAILED.inc()
+                logger.error(
+                    "Claim batch остановлен после провала отката claim: owner=%s claimed=%s",
+                    owner,
+                    len(claimed),
+                )
+                break
+            if item is None:
+                break
+            claimed.append(item)
+        return claimed
+
     async def next_pending_due_at(self) -> Optional[datetime]:
         return await self._task_repository.next_pending_due_at()
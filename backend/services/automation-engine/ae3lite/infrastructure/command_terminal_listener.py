@@ -0,0 +1,176 @@
+"""PostgreSQL NOTIFY-listener для канала ae_command_status и реестр ожидающих команд.
+
+Триггер ``trg_ae_command_status_notify`` на ``commands`` шлёт NOTIFY при каждой
+смене статуса; уведомление доставляется после commit, то есть строка уже
+terminal, когда AE3 её перечитает. На terminal-статус ``CommandTerminalWaiters``
+будит корутину gateway, ждущую этот ``cmd_id``, и она сразу читает ``commands``
+вместо очередного шага polling'а. Уведомление — только подсказка: источник
+истины остаётся в БД, а опрос продолжает работать как редкий safety net.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import asyncpg
+
+from ae3lite.infrastructure.metrics import LISTENER_INVALID_PAYLOAD
+from ae3lite.infrastructure.pg_notify_listener import PgNotifyListener
+
+logger = logging.getLogger(__name__)
+
+_CHANNEL = "ae_command_status"
+_LISTENER_NAME = "command_status"
+_TERMINAL_STATUSES = frozenset({"DONE", "ERROR", "INVALID", "BUSY", "NO_EFFECT", "TIMEOUT", "SEND_FAILED"})
+_RECENT_TTL_SEC = 60.0
+_RECENT_MAX_SIZE = 4096
+
+
+class CommandTerminalWaiters:
+    """Реестр ожидающих terminal-статус корутин по cmd_id.
+
+    NOTIFY может прийти раньше, чем gateway успел зарегистрировать ожидание
+    (быстрая команда), поэтому уведомления без ожидающих запоминаются на
+    ``recent_ttl_sec``: последующий ``register`` получает уже взведённое событие.
+    """
+
+    def __init__(
+        self,
+        *,
+        recent_ttl_sec: float = _RECENT_TTL_SEC,
+        recent_max_size: int = _RECENT_MAX_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._waiters: dict[str, set[asyncio.Event]] = {}
+        self._recent: "OrderedDict[str, float]" = OrderedDict()
+        self._recent_ttl_sec = max(0.0, float(recent_ttl_sec))
+        self._recent_max_size = max(1, int(recent_max_size))
+        self._clock = clock
+        # Пока listener не подключён, gateway опрашивает БД в обычном темпе.
+        self.connected = False
+
+    def register(self, cmd_id: str) -> asyncio.Event:
+        event = asyncio.Event()
+        key = str(cmd_id)
+        self._waiters.setdefault(key, set()).add(event)
+        notified_at = self._recent.pop(key, None)
+        if notified_at is not None and self._clock() - notified_at <= self._recent_ttl_sec:
+            event.set()
+        return event
+
+    def unregister(self, cmd_id: str, event: asyncio.Event) -> None:
+        key = str(cmd_id)
+        events = self._waiters.get(key)
+        if events is None:
+            return
+        events.discard(event)
+        if not events:
+            self._waiters.pop(key, None)
+
+    def notify(self, cmd_id: str) -> int:
+        """Будит ожидающих ``cmd_id``; возвращает число разбуженных."""
+        key = str(cmd_id)
+        events = self._waiters.get(key)
+        if not events:
+            self._remember(key)
+            return 0
+        for event in events:
+            event.set()
+        return len(events)
+
+    def wake_all(self) -> int:
+        """Будит всех: после разрыва LISTEN уведомления могли потеряться."""
+        woken = 0
+        for events in self._waiters.values():
+            for event in events:
+                event.set()
+                woken += 1
+        return woken
+
+    async def wait(self, event: asyncio.Event, *, timeout: float) -> bool:
+        """Ждёт уведомления не дольше ``timeout``; True — разбужено NOTIFY."""
+        try:
+            await asyncio.wait_for(event.wait(), timeout=max(0.0, float(timeout)))
+        except asyncio.TimeoutError:
+            return False
+        event.clear()
+        return True
+
+    def _remember(self, key: str) -> None:
+        now = self._clock()
+        self._recent[key] = now
+        self._recent.move_to_end(key)
+        while self._recent:
+            oldest_key, oldest_at = next(iter(self._recent.items()))
+            if len(self._recent) <= self._recent_max_size and now - oldest_at <= self._recent_ttl_sec:
+                break
+            self._recent.pop(oldest_key, None)
+
+
+class CommandTerminalListener(PgNotifyListener):
+    """Слушает NOTIFY ae_command_status и будит ``CommandTerminalWaiters`` на terminal-статусах."""
+
+    def __init__(self, dsn: str, waiters: CommandTerminalWaiters) -> None:
+        super().__init__(dsn, channel=_CHANNEL, listener_name=_LISTENER_NAME)
+        self._waiters = waiters
+
+    async def _on_connected(self) -> None:
+        self._waiters.connected = True
+        # Уведомления за время разрыва потеряны: ожидающие перечитывают БД.
+        self._waiters.wake_all()
+
+    def _on_disconnected(self) -> None:
+        self._waiters.connected = False
+        # Ожидающие с длинным safety-интервалом возвращаются к обычному опросу.
+        self._waiters.wake_all()
+
+    def _notify_handler(
+        self,
+        conn: asyncpg.Connection,  # noqa: ARG002
+        pid: int,  # noqa: ARG002
+        channel: str,
+        payload: str,
+    ) -> None:
+        data = self._parse_payload(channel=channel, payload=payload)
+        if data is None:
+            return
+        if str(data.get("status") or "").strip().upper() not in _TERMINAL_STATUSES:
+            return
+        woken = self._waiters.notify(str(data["cmd_id"]))
+        logger.debug(
+            "CommandTerminalListener: terminal notify cmd_id=%s status=%s woken=%s",
+            data.get("cmd_id"),
+            data.get("status"),
+            woken,
+        )
+
+    def _parse_payload(self, *, channel: str, payload: str) -> Optional[dict[str, Any]]:
+        try:
+            data: dict[str, Any] = json.loads(payload)
+        except json.JSONDecodeError:
+            LISTENER_INVALID_PAYLOAD.labels(listener=_LISTENER_NAME).inc()
+            logger.warning(
+                "CommandTerminalListener: получен некорректный JSON payload в channel=%s payload=%r",
+                channel,
+                payload,
+            )
+            return None
+
+        if not isinstance(data, dict) or not str(data.get("cmd_id") or "").strip():
+            LISTENER_INVALID_PAYLOAD.labels(listener=_LISTENER_NAME).inc()
+            logger.warning(
+                "CommandTerminalListener: payload без cmd_id в channel=%s payload=%r",
+                channel,
+                payload,
+            )
+            return None
+
+        return data
+
+
+__all__ = ["CommandTerminalListener", "CommandTerminalWaiters"]
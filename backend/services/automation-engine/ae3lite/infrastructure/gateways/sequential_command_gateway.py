@@ -24,6 +24,7 @@ from ae3lite.infrastructure.metrics import (
     COMMAND_POLL_ITERATIONS,
     COMMAND_ROUNDTRIP_DURATION,
     COMMAND_TERMINAL,
+    COMMAND_TERMINAL_WAKEUPS,
     inc_observability_write_failed,
 )
 from common.db import create_zone_event
@@ -100,6 +101,8 @@ class SequentialCommandGateway:
         poll_max_interval_sec: float = 5.0,
         command_poll_default_sec: float = 120.0,
         command_poll_margin_sec: float = 30.0,
+        terminal_waiters: Any = None,
+        terminal_safety_poll_sec: float = 5.0,
     ) -> None:
         self._task_repository = task_repository
         self._command_repository = command_repository
@@ -113,6 +116,10 @@ class SequentialCommandGateway:
         self._poll_max_interval_sec = max(self._poll_interval_sec, float(poll_max_interval_sec))
         self._command_poll_default_sec = max(1.0, float(command_poll_default_sec))
         self._command_poll_margin_sec = max(0.0, float(command_poll_margin_sec))
+        # NOTIFY ae_command_status будит ожидание сразу; опрос при подключённом
+        # listener'е — только safety net раз в terminal_safety_poll_sec.
+        self._terminal_waiters = terminal_waiters
+        self._terminal_safety_poll_sec = max(self._poll_interval_sec, float(terminal_safety_poll_sec))
 
     def _cleanup_race_batch_result(self, *, task: Any, message: str) -> dict[str, Any]:
         return {
@@ -662,74 +669,82 @@ class SequentialCommandGateway:
             roundtrip_started_at = time.monotonic()
             poll_interval_sec = self._poll_interval_sec
             poll_iterations = 0
-            while True:
-                await asyncio.sleep(poll_interval_sec)
-                reconcile_now = _utcnow().replace(microsecond=0)
-                result = await self.recover_waiting_command(task=waiting_task, now=reconcile_now)
-                poll_iterations += 1
-                if result["state"] == "waiting_command":
-                    if reconcile_now > effective_deadline:
-                        deadline_kind = (
-                            "stage"
-                            if stage_deadline is not None and stage_deadline <= poll_deadline
-                            else "poll"
-                        )
-                        await self._emit_poll_deadline_exceeded_event(
-                            task=task,
-                            command=planned,
-                            cmd_id=str(result.get("cmd_id") or status_entry.get("legacy_cmd_id") or ""),
-                            external_id=str(result.get("external_id") or status_entry.get("external_id") or ""),
-                            checked_at=reconcile_now,
-                            deadline=effective_deadline,
-                            poll_iterations=poll_iterations,
-                            deadline_kind=deadline_kind,
+            wait_handle = self._register_terminal_wait(published=published)
+            try:
+                while True:
+                    wake_source = await self._await_terminal_signal(
+                        wait_handle=wait_handle,
+                        poll_interval_sec=poll_interval_sec,
+                    )
+                    reconcile_now = _utcnow().replace(microsecond=0)
+                    result = await self.recover_waiting_command(task=waiting_task, now=reconcile_now)
+                    poll_iterations += 1
+                    if result["state"] == "waiting_command":
+                        if reconcile_now > effective_deadline:
+                            deadline_kind = (
+                                "stage"
+                                if stage_deadline is not None and stage_deadline <= poll_deadline
+                                else "poll"
+                            )
+                            await self._emit_poll_deadline_exceeded_event(
+                                task=task,
+                                command=planned,
+                                cmd_id=str(result.get("cmd_id") or status_entry.get("legacy_cmd_id") or ""),
+                                external_id=str(result.get("external_id") or status_entry.get("external_id") or ""),
+                                checked_at=reconcile_now,
+                                deadline=effective_deadline,
+                                poll_iterations=poll_iterations,
+                                deadline_kind=deadline_kind,
+                            )
+                            return {
+                                "success": False,
+                                "task": waiting_task,
+                                "command_statuses": [status_entry],
+                                "error_code": "ae3_command_poll_deadline_exceeded",
+                                "error_message": (
+                                    f"Опрос команды превысил дедлайн для задачи {task.id} "
+                                    f"stage={getattr(task, 'current_stage', None)}"
+                                ),
+                                "deadline_kind": deadline_kind,
+                            }
+                        poll_interval_sec = min(self._poll_max_interval_sec, poll_interval_sec * self._poll_backoff_factor)
+                        continue
+                    self._observe_roundtrip_metrics(
+                        channel=planned.channel,
+                        terminal_status=result.get("legacy_status"),
+                        roundtrip_started_at=roundtrip_started_at,
+                        poll_iterations=poll_iterations,
+                        wake_source=wake_source,
+                    )
+                    task_state = result["task"]
+                    task_status = str(getattr(task_state, "status", "") or "").strip().lower()
+                    if task_state is not None and task_status in {"cancelled", "completed", "failed"}:
+                        raise TaskTerminalStateReached(
+                            task=task_state,
+                            message=f"Во время command roundtrip задача {task.id} перешла в состояние {task_status}",
                         )
+                    status_entry = {
+                        **status_entry,
+                        "external_id": result.get("external_id"),
+                        "legacy_cmd_id": result.get("cmd_id"),
+                        "terminal_status": result.get("legacy_status"),
+                        "response_details": result.get("response_details") or {},
+                    }
+                    if result["state"] == "done":
                         return {
-                            "success": False,
-                            "task": waiting_task,
+                            "success": True,
+                            "task": task_state,
                             "command_statuses": [status_entry],
-                            "error_code": "ae3_command_poll_deadline_exceeded",
-                            "error_message": (
-                                f"Опрос команды превысил дедлайн для задачи {task.id} "
-                                f"stage={getattr(task, 'current_stage', None)}"
-                            ),
-                            "deadline_kind": deadline_kind,
                         }
-                    poll_interval_sec = min(self._poll_max_interval_sec, poll_interval_sec * self._poll_backoff_factor)
-                    continue
-                self._observe_roundtrip_metrics(
-                    channel=planned.channel,
-                    terminal_status=result.get("legacy_status"),
-                    roundtrip_started_at=roundtrip_started_at,
-                    poll_iterations=poll_iterations,
-                )
-                task_state = result["task"]
-                task_status = str(getattr(task_state, "status", "") or "").strip().lower()
-                if task_state is not None and task_status in {"cancelled", "completed", "failed"}:
-                    raise TaskTerminalStateReached(
-                        task=task_state,
-                        message=f"Во время command roundtrip задача {task.id} перешла в состояние {task_status}",
-                    )
-                status_entry = {
-                    **status_entry,
-                    "external_id": result.get("external_id"),
-                    "legacy_cmd_id": result.get("cmd_id"),
-                    "terminal_status": result.get("legacy_status"),
-                    "response_details": result.get("response_details") or {},
-                }
-                if result["state"] == "done":
                     return {
-                        "success": True,
+                        "success": False,
                         "task": task_state,
                         "command_statuses": [status_entry],
+                        "error_code": result["error_code"],
+                        "error_message": result["error_message"],
                     }
-                return {
-                    "success": False,
-                    "task": task_state,
-                    "command_statuses": [status_entry],
-                    "error_code": result["error_code"],
-                    "error_message": result["error_message"],
-                }
+            finally:
+                self._release_terminal_wait(published=published, wait_handle=wait_handle)
 
     async def _handle_publish_failure(
         self,
@@ -853,6 +868,7 @@ class SequentialCommandGateway:
         terminal_status: Any,
         roundtrip_started_at: float,
         poll_iterations: int,
+        wake_source: str = "poll",
     ) -> None:
         channel_label = str(channel or "").strip() or "unknown"
         terminal_label = str(terminal_status or "").strip().upper() or "UNKNOWN"
@@ -862,6 +878,34 @@ class SequentialCommandGateway:
         COMMAND_POLL_ITERATIONS.labels(channel=channel_label, terminal_status=terminal_label).inc(
             max(0, poll_iterations)
         )
+        COMMAND_TERMINAL_WAKEUPS.labels(source=wake_source).inc()
+
+    @staticmethod
+    def _terminal_wait_cmd_id(published: Any) -> str:
+        # NOTIFY несёт commands.cmd_id — тот, что history-logger отправил на ноду.
+        return str(getattr(published, "published_cmd_id", "") or getattr(published, "cmd_id", "") or "").strip()
+
+    def _register_terminal_wait(self, *, published: Any) -> asyncio.Event | None:
+        cmd_id = self._terminal_wait_cmd_id(published)
+        if self._terminal_waiters is None or not cmd_id:
+            return None
+        return self._terminal_waiters.register(cmd_id)
+
+    def _release_terminal_wait(self, *, published: Any, wait_handle: asyncio.Event | None) -> None:
+        if wait_handle is not None:
+            self._terminal_waiters.unregister(self._terminal_wait_cmd_id(published), wait_handle)
+
+    async def _await_terminal_signal(self, *, wait_handle: asyncio.Event | None, poll_interval_sec: float) -> str:
+        """Ждёт NOTIFY terminal-статуса или очередного шага опроса; возвращает источник пробуждения."""
+        waiters = self._terminal_waiters
+        if wait_handle is None or waiters is None or not waiters.connected:
+            await asyncio.sleep(poll_interval_sec)
+            return "poll"
+        woke = await waiters.wait(
+            wait_handle,
+            timeout=max(poll_interval_sec, self._terminal_safety_poll_sec),
+        )
+        return "notify" if woke else "poll"
 
     def _planned_command_from_ae_command(self, ae_command: Mapping[str, Any]) -> PlannedCommand | None:
         node_uid = str(ae_command.get("node_uid") or "").strip()
@@ -1085,106 +1129,113 @@ class SequentialCommandGateway:
         roundtrip_started_at = time.monotonic()
         poll_interval_sec = self._poll_interval_sec
         poll_iterations = 0
+        wait_handle = self._register_terminal_wait(published=published)
+        try:
+            while True:
+                wake_source = await self._await_terminal_signal(
+                    wait_handle=wait_handle,
+                    poll_interval_sec=poll_interval_sec,
+                )
+                reconcile_now = _utcnow().replace(microsecond=0)
+                poll_iterations += 1
+                legacy_row, external_id, cmd_id = await self._resolve_legacy_command(task=task, ae_command=ae_command)
+                if legacy_row is None:
+                    if reconcile_now > poll_deadline:
+                        return {
+                            "success": False,
+                            "task": task,
+                            "command_statuses": [status_entry],
+                            "error_code": "ae3_command_poll_deadline_exceeded",
+                            "error_message": (
+                                f"Опрос команды превысил дедлайн для задачи {task.id} "
+                                f"(publish-only, stage={getattr(task, 'current_stage', None)})"
+                            ),
+                        }
+                    poll_interval_sec = min(self._poll_max_interval_sec, poll_interval_sec * self._poll_backoff_factor)
+                    continue
 
-        while True:
-            await asyncio.sleep(poll_interval_sec)
-            reconcile_now = _utcnow().replace(microsecond=0)
-            poll_iterations += 1
-            legacy_row, external_id, cmd_id = await self._resolve_legacy_command(task=task, ae_command=ae_command)
-            if legacy_row is None:
-                if reconcile_now > poll_deadline:
+                legacy_status = str(legacy_row.get("status") or "").strip().upper()
+                if legacy_status in _PROTOCOL_VIOLATION_STATUSES:
+                    return {
+                        "success": False,
+                        "task": task,
+                        "command_statuses": [{**status_entry, "terminal_status": legacy_status}],
+                        "error_code": "command_protocol_violation",
+                        "error_message": f"Legacy status {legacy_status} не является terminal outcome протокола 2.0",
+                    }
+                if legacy_status not in _NON_TERMINAL_STATUSES | _TERMINAL_STATUSES:
                     return {
                         "success": False,
                         "task": task,
                         "command_statuses": [status_entry],
-                        "error_code": "ae3_command_poll_deadline_exceeded",
-                        "error_message": (
-                            f"Опрос команды превысил дедлайн для задачи {task.id} "
-                            f"(publish-only, stage={getattr(task, 'current_stage', None)})"
-                        ),
+                        "error_code": "ae3_unsupported_legacy_status",
+                        "error_message": f"Неподдерживаемый legacy status={legacy_status or 'empty'}",
                     }
-                poll_interval_sec = min(self._poll_max_interval_sec, poll_interval_sec * self._poll_backoff_factor)
-                continue
 
-            legacy_status = str(legacy_row.get("status") or "").strip().upper()
-            if legacy_status in _PROTOCOL_VIOLATION_STATUSES:
-                return {
-                    "success": False,
-                    "task": task,
-                    "command_statuses": [{**status_entry, "terminal_status": legacy_status}],
-                    "error_code": "command_protocol_violation",
-                    "error_message": f"Legacy status {legacy_status} не является terminal outcome протокола 2.0",
-                }
-            if legacy_status not in _NON_TERMINAL_STATUSES | _TERMINAL_STATUSES:
-                return {
-                    "success": False,
-                    "task": task,
-                    "command_statuses": [status_entry],
-                    "error_code": "ae3_unsupported_legacy_status",
-                    "error_message": f"Неподдерживаемый legacy status={legacy_status or 'empty'}",
-                }
+                await self._command_repository.update_from_legacy(
+                    ae_command_id=int(ae_command["id"]),
+                    external_id=str(legacy_row.get("id") or external_id or ""),
+                    ack_received_at=legacy_row.get("ack_at"),
+                    terminal_status=legacy_status if legacy_status in _TERMINAL_STATUSES else None,
+                    terminal_at=(
+                        legacy_row.get("failed_at")
+                        or legacy_row.get("ack_at")
+                        or legacy_row.get("updated_at")
+                        or legacy_row.get("sent_at")
+                        or legacy_row.get("created_at")
+                    ),
+                    last_error=None if legacy_status in {None, "DONE"} else str(legacy_row.get("error_message") or legacy_status),
+                    now=reconcile_now,
+                )
+                ae_command["external_id"] = str(legacy_row.get("id") or external_id or "")
 
-            await self._command_repository.update_from_legacy(
-                ae_command_id=int(ae_command["id"]),
-                external_id=str(legacy_row.get("id") or external_id or ""),
-                ack_received_at=legacy_row.get("ack_at"),
-                terminal_status=legacy_status if legacy_status in _TERMINAL_STATUSES else None,
-                terminal_at=(
-                    legacy_row.get("failed_at")
-                    or legacy_row.get("ack_at")
-                    or legacy_row.get("updated_at")
-                    or legacy_row.get("sent_at")
-                    or legacy_row.get("created_at")
-                ),
-                last_error=None if legacy_status in {None, "DONE"} else str(legacy_row.get("error_message") or legacy_status),
-                now=reconcile_now,
-            )
-            ae_command["external_id"] = str(legacy_row.get("id") or external_id or "")
+                if legacy_status in _NON_TERMINAL_STATUSES:
+                    if reconcile_now > poll_deadline:
+                        return {
+                            "success": False,
+                            "task": task,
+                            "command_statuses": [{**status_entry, "terminal_status": None}],
+                            "error_code": "ae3_command_poll_deadline_exceeded",
+                            "error_message": (
+                                f"Опрос команды превысил дедлайн для задачи {task.id} "
+                                f"(publish-only, stage={getattr(task, 'current_stage', None)})"
+                            ),
+                        }
+                    poll_interval_sec = min(self._poll_max_interval_sec, poll_interval_sec * self._poll_backoff_factor)
+                    continue
 
-            if legacy_status in _NON_TERMINAL_STATUSES:
-                if reconcile_now > poll_deadline:
+                self._observe_roundtrip_metrics(
+                    channel=planned.channel,
+                    terminal_status=legacy_status,
+                    roundtrip_started_at=roundtrip_started_at,
+                    poll_iterations=poll_iterations,
+                    wake_source=wake_source,
+                )
+                terminal_entry = {
+                    **status_entry,
+                    "external_id": str(legacy_row.get("id") or external_id or ""),
+                    "legacy_cmd_id": cmd_id,
+                    "terminal_status": legacy_status,
+                    "response_details": _response_details_from_legacy_row(legacy_row),
+                }
+                if legacy_status == "DONE":
+                    COMMAND_TERMINAL.labels(terminal_status="DONE").inc()
                     return {
-                        "success": False,
+                        "success": True,
                         "task": task,
-                        "command_statuses": [{**status_entry, "terminal_status": None}],
-                        "error_code": "ae3_command_poll_deadline_exceeded",
-                        "error_message": (
-                            f"Опрос команды превысил дедлайн для задачи {task.id} "
-                            f"(publish-only, stage={getattr(task, 'current_stage', None)})"
-                        ),
+                        "command_statuses": [terminal_entry],
                     }
-                poll_interval_sec = min(self._poll_max_interval_sec, poll_interval_sec * self._poll_backoff_factor)
-                continue
-
-            self._observe_roundtrip_metrics(
-                channel=planned.channel,
-                terminal_status=legacy_status,
-                roundtrip_started_at=roundtrip_started_at,
-                poll_iterations=poll_iterations,
-            )
-            terminal_entry = {
-                **status_entry,
-                "external_id": str(legacy_row.get("id") or external_id or ""),
-                "legacy_cmd_id": cmd_id,
-                "terminal_status": legacy_status,
-                "response_details": _response_details_from_legacy_row(legacy_row),
-            }
-            if legacy_status == "DONE":
-                COMMAND_TERMINAL.labels(terminal_status="DONE").inc()
+
+                COMMAND_TERMINAL.labels(terminal_status=legacy_status).inc()
                 return {
-                    "success": True,
+                    "success": False,
                     "task": task,
                     "command_statuses": [terminal_entry],
+                    "error_code": f"command_{legacy_status.strip().lower()}",
+                    "error_message": str(legacy_row.get("error_message") or f"Команда завершилась с терминальным статусом {legacy_status}"),
                 }
-
-            COMMAND_TERMINAL.labels(terminal_status=legacy_status).inc()
-            return {
-                "success": False,
-                "task": task,
-                "command_statuses": [terminal_entry],
-                "error_code": f"command_{legacy_status.strip().lower()}",
-                "error_message": str(legacy_row.get("error_message") or f"Команда завершилась с терминальным статусом {legacy_status}"),
-            }
+        finally:
+            self._release_terminal_wait(published=published, wait_handle=wait_handle)
 
     async def _publish_without_terminal(
         self,
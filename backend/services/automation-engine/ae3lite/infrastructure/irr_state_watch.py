@@ -0,0 +1,63 @@
+"""Подписки probe IRR state на push-уведомления ``IRR_STATE_SNAPSHOT``.
+
+history-logger после записи ``IRR_STATE_SNAPSHOT`` в ``zone_events`` шлёт
+NOTIFY ``ae_zone_event`` с ``zone_id`` и ``cmd_id`` probe-команды.
+``ZoneEventListener`` передаёт его в ``IrrStateWatch``, и
+``BaseStageHandler._read_probe_state_with_retry`` перечитывает snapshot сразу,
+а не через ``irr_state_wait_poll_interval_sec``. Источник истины — по-прежнему
+``zone_events``: уведомление только будит чтение, редкий опрос раз в
+``safety_poll_sec`` страхует от потерянного NOTIFY.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from ae3lite.infrastructure.command_terminal_listener import CommandTerminalWaiters
+
+IRR_STATE_SNAPSHOT_EVENT_TYPE = "IRR_STATE_SNAPSHOT"
+_ANY_CMD = "*"
+
+
+class IrrStateWatch:
+    """Ожидающие probe по ``(zone_id, cmd_id)``; ``cmd_id=None`` — любой snapshot зоны."""
+
+    def __init__(self, *, safety_poll_sec: float = 2.0) -> None:
+        self.safety_poll_sec = max(0.1, float(safety_poll_sec))
+        self._waiters = CommandTerminalWaiters()
+
+    @property
+    def connected(self) -> bool:
+        """Подключён ли LISTEN ae_zone_event; без него probe опрашивает в обычном темпе."""
+        return self._waiters.connected
+
+    @connected.setter
+    def connected(self, value: bool) -> None:
+        self._waiters.connected = bool(value)
+
+    @staticmethod
+    def _key(zone_id: int, cmd_id: Optional[str]) -> str:
+        return f"{int(zone_id)}:{str(cmd_id or '').strip() or _ANY_CMD}"
+
+    def watch(self, zone_id: int, cmd_id: Optional[str]) -> asyncio.Event:
+        return self._waiters.register(self._key(zone_id, cmd_id))
+
+    def unwatch(self, zone_id: int, cmd_id: Optional[str], event: asyncio.Event) -> None:
+        self._waiters.unregister(self._key(zone_id, cmd_id), event)
+
+    def snapshot_ingested(self, zone_id: int, cmd_id: Optional[str]) -> int:
+        """Будит probe этого ``cmd_id`` и probe без ``cmd_id`` в зоне."""
+        woken = self._waiters.notify(self._key(zone_id, None))
+        if str(cmd_id or "").strip():
+            woken += self._waiters.notify(self._key(zone_id, cmd_id))
+        return woken
+
+    def wake_all(self) -> int:
+        return self._waiters.wake_all()
+
+    async def wait(self, event: asyncio.Event, *, timeout: float) -> bool:
+        return await self._waiters.wait(event, timeout=timeout)
+
+
+__all__ = ["IRR_STATE_SNAPSHOT_EVENT_TYPE", "IrrStateWatch"]
@@ -185,6 +185,43 @@ COMMAND_POLL_ITERATIONS = Counter(
     ["channel", "terminal_status"],
 )
 
+COMMAND_TERMINAL_WAKEUPS = Counter(
+    "ae3_command_terminal_wakeups_total",
+    "Чем разбужена проверка, увидевшая terminal legacy command status (notify — NOTIFY ae_command_status, poll — таймаут опроса)",
+    ["source"],
+)
+
+IRR_STATE_PROBE_READS = Counter(
+    "ae3_irr_state_probe_reads_total",
+    "Повторные чтения IRR_STATE_SNAPSHOT при ожидании probe (notify — push ae_zone_event, poll — таймаут опроса)",
+    ["source"],
+)
+
+TELEMETRY_WINDOW_READS = Counter(
+    "ae3_telemetry_window_reads_total",
+    "Источник окна телеметрии для решений коррекции (memory — кольцевой буфер NOTIFY telemetry_samples_committed, sql — telemetry_samples)",
+    ["source"],
+)
+
+TELEMETRY_WINDOW_BUFFER_MISSES = Counter(
+    "ae3_telemetry_window_buffer_misses_total",
+    "Почему окно телеметрии прочитано из SQL, а не из in-memory буфера",
+    ["reason"],
+)
+
+ZONE_SNAPSHOT_STATIC_CACHE = Counter(
+    "ae3_zone_snapshot_static_cache_total",
+    "Чтения статичной части ZoneSnapshot (hit — из кеша, иначе причина промаха: disconnected|untracked|expired|revision)",
+    ["result"],
+)
+
+ZONE_SNAPSHOT_LOAD_DURATION = Histogram(
+    "ae3_zone_snapshot_load_seconds",
+    "Время загрузки ZoneSnapshot (static_source: cache — статичная часть из кеша, db — из PostgreSQL)",
+    ["static_source"],
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
+)
+
 COMMAND_PUBLISH_REDRIVEN = Counter(
     "ae3_command_publish_redriven_total",
     "Publish pipeline continued via reconcile after HL publish without confirmed external_id",
@@ -522,6 +559,18 @@ CLAIM_ROLLBACK_FAILED = Counter(
     "Total claim rollbacks that failed after zone lease conflict",
 )
 
+CLAIM_BATCH_SIZE = Histogram(
+    "ae3_claim_batch_size",
+    "Задач, взятых одним claim batch на свободные слоты drain-цикла",
+    buckets=[0, 1, 2, 4, 8, 16, 32],
+)
+
+DRAIN_WAKEUPS = Counter(
+    "ae3_drain_wakeups_total",
+    "Пробуждения drain-цикла при задачах в работе (task_done — завершилась задача, kick — kick/NOTIFY/таймер due_at)",
+    ["reason"],
+)
+
 TASK_RUNNING_TRANSITION_MISSED = Counter(
     "ae3_task_running_transition_missed_total",
     "Total mark_running CAS misses handled fail-closed",
@@ -592,6 +641,20 @@ def initialize_counter_series() -> None:
     for error_type in ("LeaseLost", "TimeoutError"):
         TICK_ERRORS.labels(error_type=error_type)
 
+    for source in ("notify", "poll"):
+        COMMAND_TERMINAL_WAKEUPS.labels(source=source)
+
+    for source in ("notify", "poll"):
+        IRR_STATE_PROBE_READS.labels(source=source)
+    for reason in ("task_done", "kick"):
+        DRAIN_WAKEUPS.labels(reason=reason)
+    for source in ("memory", "sql"):
+        TELEMETRY_WINDOW_READS.labels(source=source)
+    for reason in ("disconnected", "untracked", "expired", "gap", "not_covered"):
+        TELEMETRY_WINDOW_BUFFER_MISSES.labels(reason=reason)
+    for result in ("hit", "disconnected", "untracked", "expired", "revision"):
+        ZONE_SNAPSHOT_STATIC_CACHE.labels(result=result)
+
     for topology in ("two_tank_drip_substrate_trays", "two_tank", "generic_cycle_start"):
         IRRIGATION_SOLUTION_MIN.labels(topology=topology)
         for component in ("A", "B", "micro"):
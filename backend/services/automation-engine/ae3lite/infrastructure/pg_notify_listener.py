@@ -0,0 +1,117 @@
+"""Общий цикл PostgreSQL NOTIFY-listener'ов AE3.
+
+``PgNotifyListener`` держит выделенное соединение (не из пула): connect,
+``add_listener``, keepalive ``SELECT 1`` и переподключение с backoff 1..60 с,
+плюс метрики ``LISTENER_CONNECTED``/``LISTENER_RECONNECT_TOTAL``. Наследник
+реализует только ``_notify_handler`` (разбор payload) и, при необходимости,
+хуки ``_on_connected``/``_on_disconnected``: уведомления за время разрыва
+потеряны, и подписчик должен пересинхронизироваться с БД.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import asyncpg
+
+from ae3lite.infrastructure.metrics import LISTENER_CONNECTED, LISTENER_RECONNECT_TOTAL
+
+logger = logging.getLogger(__name__)
+
+_KEEPALIVE_INTERVAL_SEC = 30
+_INITIAL_BACKOFF_SEC = 1.0
+_MAX_BACKOFF_SEC = 60.0
+
+
+class PgNotifyListener:
+    """LISTEN на ``channel`` до ``stop()``; ``listener_name`` — label метрик."""
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        channel: str,
+        listener_name: str,
+        keepalive_interval_sec: float = _KEEPALIVE_INTERVAL_SEC,
+    ) -> None:
+        self._dsn = dsn
+        self._channel = channel
+        self._listener_name = listener_name
+        self._keepalive_interval_sec = float(keepalive_interval_sec)
+        self._stop_event: asyncio.Event = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    async def run(self) -> None:
+        name = type(self).__name__
+        backoff = _INITIAL_BACKOFF_SEC
+        while not self._stop_event.is_set():
+            try:
+                await self._run_once()
+                backoff = _INITIAL_BACKOFF_SEC
+            except asyncio.CancelledError:
+                logger.info("%s: получена отмена, listener завершает работу", name)
+                return
+            except Exception as exc:
+                LISTENER_CONNECTED.labels(listener=self._listener_name).set(0)
+                LISTENER_RECONNECT_TOTAL.labels(listener=self._listener_name).inc()
+                logger.warning(
+                    "%s: ошибка соединения, переподключение через %.1f с: %s",
+                    name,
+                    backoff,
+                    exc,
+                    exc_info=True,
+                )
+                try:
+                    await asyncio.sleep(backoff)
+                except asyncio.CancelledError:
+                    return
+                backoff = min(backoff * 2, _MAX_BACKOFF_SEC)
+
+    async def _run_once(self) -> None:
+        name = type(self).__name__
+        conn: asyncpg.Connection = await asyncpg.connect(self._dsn)
+        LISTENER_CONNECTED.labels(listener=self._listener_name).set(1)
+        logger.info("%s: соединение установлено, прослушивается channel=%s", name, self._channel)
+        try:
+            await conn.add_listener(self._channel, self._notify_handler)
+            await self._on_connected()
+            while not self._stop_event.is_set():
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self._keepalive_interval_sec)
+                except asyncio.TimeoutError:
+                    await conn.execute("SELECT 1")
+        finally:
+            self._on_disconnected()
+            try:
+                await conn.remove_listener(self._channel, self._notify_handler)
+            except Exception:
+                logger.warning(
+                    "%s: не удалось снять listener с channel=%s",
+                    name,
+                    self._channel,
+                    exc_info=True,
+                )
+            await conn.close()
+            LISTENER_CONNECTED.labels(listener=self._listener_name).set(0)
+            logger.info("%s: соединение закрыто", name)
+
+    async def _on_connected(self) -> None:
+        """Вызывается после каждого (пере)подключения, когда LISTEN уже активен."""
+
+    def _on_disconnected(self) -> None:
+        """Вызывается при потере или закрытии соединения, до снятия listener'а."""
+
+    def _notify_handler(
+        self,
+        conn: asyncpg.Connection,
+        pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        raise NotImplementedError
+
+
+__all__ = ["PgNotifyListener"]
@@ -631,10 +631,14 @@ ALL_TABLES: tuple[Table, ...] = (
     GREENHOUSE_MANUAL_OVERRIDES,
 )
 
-# LISTEN-каналы, которые AE3 подписывается на получение (NOTIFY шлёт Laravel/trigger).
+# LISTEN-каналы, которые AE3 подписывается на получение (NOTIFY шлёт Laravel/trigger/history-logger).
 NOTIFY_CHANNELS: frozenset[str] = frozenset({
     "scheduler_intent_terminal",
     "ae_zone_event",
+    "ae_command_status",
+    "telemetry_samples_committed",
+    "ae_task_pending",
+    "ae_zone_config_changed",
 })
 
 
@@ -10,12 +10,50 @@ from common.db import get_pool
 
 from ae3lite.domain.level_switch_semantics import level_switch_is_triggered
 from ae3lite.domain.services.metric_window_validator import is_stub_telemetry
+from ae3lite.infrastructure.irr_state_watch import IrrStateWatch
+from ae3lite.infrastructure.metrics import TELEMETRY_WINDOW_BUFFER_MISSES, TELEMETRY_WINDOW_READS
+from ae3lite.infrastructure.read_models.zone_snapshot_read_model import PgZoneSnapshotReadModel
+from ae3lite.infrastructure.telemetry_sample_listener import TelemetrySampleBuffers
 
 logger = logging.getLogger(__name__)
 
 
+_WINDOW_SAMPLES_SQL = """
+    SELECT ts, value, quality, metadata
+    FROM (
+        SELECT ts, value, quality, metadata, id
+        FROM telemetry_samples
+        WHERE sensor_id = $1
+          AND ts >= $2
+          AND COALESCE(quality, 'GOOD') <> 'STUB'
+          AND COALESCE(metadata->>'stub', 'false') NOT IN ('true', '1')
+        ORDER BY ts DESC, id DESC
+        LIMIT $3
+    ) recent
+    ORDER BY ts ASC, id ASC
+"""
+
+
 class PgZoneRuntimeMonitor:
-    """Читает свежую телеметрию и snapshot'ы irr-state во время выполнения AE3."""
+    """Читает свежую телеметрию и snapshot'ы irr-state во время выполнения AE3.
+
+    С ``sample_buffers`` окна коррекции отдаются из in-memory буферов
+    (NOTIFY telemetry_samples_committed), SQL остаётся fallback'ом и заполняет их.
+    ``irr_state_watch`` — push-подписка probe на ``IRR_STATE_SNAPSHOT``.
+    ``zone_snapshot_read_model`` — общий read-model snapshot'а (с кешем статичной
+    части) для перечитывания конфига в checkpoint'ах handler'ов.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_buffers: TelemetrySampleBuffers | None = None,
+        irr_state_watch: IrrStateWatch | None = None,
+        zone_snapshot_read_model: PgZoneSnapshotReadModel | None = None,
+    ) -> None:
+        self._sample_buffers = sample_buffers
+        self.irr_state_watch = irr_state_watch
+        self.zone_snapshot_read_model = zone_snapshot_read_model
 
     def _normalize_timestamp(self, value: Optional[datetime]) -> Optional[datetime]:
         if value is None:
@@ -218,6 +256,81 @@ class PgZoneRuntimeMonitor:
                 sensor_type,
             )
 
+    async def _read_window_samples(
+        self,
+        *,
+        sensor_row: Mapping[str, Any],
+        since_ts: Optional[datetime],
+        limit: int,
+        conn: Any = None,
+    ) -> tuple[tuple[dict[str, Any], ...], Optional[datetime]]:
+        """Последние ``limit`` не-stub семплов сенсора с ``ts >= since_ts`` и ts последнего из них."""
+        sensor_id = int(sensor_row["sensor_id"])
+        limit = max(1, int(limit))
+        buffers = self._sample_buffers if since_ts is not None else None
+        fill = None
+        if buffers is not None:
+            window, reason = buffers.lookup(
+                sensor_id,
+                since_ts=since_ts,
+                limit=limit,
+                last_ts=sensor_row.get("sample_ts"),
+            )
+            if window is not None:
+                TELEMETRY_WINDOW_READS.labels(source="memory").inc()
+                latest_ts = window[-1][0] if window else None
+                return tuple({"ts": ts, "value": value} for ts, value in window), latest_ts
+            TELEMETRY_WINDOW_BUFFER_MISSES.labels(reason=reason).inc()
+            fill = buffers.begin_fill(sensor_id)
+        TELEMETRY_WINDOW_READS.labels(source="sql").inc()
+
+        # Заполнение буфера берёт больше окна, чтобы следующие окна покрывались из памяти.
+        fetch_limit = max(limit, buffers.capacity) if fill is not None else limit
+        try:
+            if conn is None:
+                pool = await get_pool()
+                async with pool.acquire() as pool_conn:
+                    rows = await pool_conn.fetch(_WINDOW_SAMPLES_SQL, sensor_id, since_ts, fetch_limit)
+            else:
+                rows = await conn.fetch(_WINDOW_SAMPLES_SQL, sensor_id, since_ts, fetch_limit)
+        except BaseException:
+            if buffers is not None:
+                buffers.abort_fill(sensor_id, fill)
+            raise
+
+        parsed: list[tuple[Optional[datetime], Optional[float], bool]] = []
+        for row in rows:
+            raw_value = row.get("value")
+            try:
+                value = float(raw_value) if raw_value is not None else None
+            except (TypeError, ValueError):
+                value = None
+            is_stub = is_stub_telemetry(quality=row.get("quality"), metadata=row.get("metadata"))
+            parsed.append((row.get("ts"), value, is_stub))
+
+        if buffers is not None:
+            buffers.complete_fill(
+                sensor_id,
+                fill,
+                samples=[
+                    (self._normalize_timestamp(ts), value)
+                    for ts, value, is_stub in parsed
+                    if ts is not None and value is not None and not is_stub
+                ],
+                since_ts=since_ts,
+                truncated=len(rows) >= fetch_limit,
+                last_ts=sensor_row.get("sample_ts"),
+            )
+
+        samples: list[dict[str, Any]] = []
+        latest_ts: Optional[datetime] = None
+        for ts, value, is_stub in parsed[-limit:]:
+            latest_ts = ts if ts is not None else latest_ts
+            if is_stub or value is None:
+                continue
+            samples.append({"ts": ts, "value": value})
+        return tuple(samples), latest_ts
+
     async def read_level_switch(
         self,
         *,
@@ -389,44 +502,11 @@ class PgZoneRuntimeMonitor:
                 "sample_age_sec": self._age_sec(sensor_row.get("sample_ts")),
             }
 
-        pool = await get_pool()
-        async with pool.acquire() as conn:
-            rows = await conn.fetch(
-                """
-                SELECT ts, value, quality, metadata
-                FROM (
-                    SELECT ts, value, quality, metadata, id
-                    FROM telemetry_samples
-                    WHERE sensor_id = $1
-                      AND ts >= $2
-                      AND COALESCE(quality, 'GOOD') <> 'STUB'
-                      AND COALESCE(metadata->>'stub', 'false') NOT IN ('true', '1')
-                    ORDER BY ts DESC, id DESC
-                    LIMIT $3
-                ) recent
-                ORDER BY ts ASC, id ASC
-                """,
-                int(sensor_row["sensor_id"]),
-                normalized_since_ts,
-                max(1, int(limit)),
-            )
-
-        samples: list[dict[str, Any]] = []
-        latest_sample_ts: Optional[datetime] = None
-        for row in rows:
-            raw_value = row.get("value")
-            try:
-                value = float(raw_value) if raw_value is not None else None
-            except (TypeError, ValueError):
-                value = None
-            ts = row.get("ts")
-            latest_sample_ts = ts if ts is not None else latest_sample_ts
-            if is_stub_telemetry(quality=row.get("quality"), metadata=row.get("metadata")):
-                continue
-            if value is None:
-                continue
-            samples.append({"ts": ts, "value": value})
-
+        samples, latest_sample_ts = await self._read_window_samples(
+            sensor_row=sensor_row,
+            since_ts=normalized_since_ts,
+            limit=limit,
+        )
         if latest_sample_ts is None:
             latest_sample_ts = sensor_row.get("sample_ts")
         age_sec = self._age_sec(latest_sample_ts)
@@ -437,7 +517,7 @@ class PgZoneRuntimeMonitor:
             "is_stale": is_stale,
             "sensor_id": sensor_row.get("sensor_id"),
             "sensor_label": sensor_row.get("sensor_label"),
-            "samples": tuple(samples),
+            "samples": samples,
             "latest_sample_ts": latest_sample_ts,
             "sample_age_sec": age_sec,
         }
@@ -487,41 +567,13 @@ class PgZoneRuntimeMonitor:
                         }
                     )
                     continue
-                rows = await conn.fetch(
-                    """
-                    SELECT ts, value, quality, metadata
-                    FROM (
-                        SELECT ts, value, quality, metadata, id
-                        FROM telemetry_samples
-                        WHERE sensor_id = $1
-                          AND ts >= $2
-                          AND COALESCE(quality, 'GOOD') <> 'STUB'
-                          AND COALESCE(metadata->>'stub', 'false') NOT IN ('true', '1')
-                        ORDER BY ts DESC, id DESC
-                        LIMIT $3
-                    ) recent
-                    ORDER BY ts ASC, id ASC
-                    """,
-                    int(sensor_row["sensor_id"]),
-                    normalized_since_ts,
-                    max(1, int(limit_per_sensor)),
+                samples, window_latest_ts = await self._read_window_samples(
+                    sensor_row=sensor_row,
+                    since_ts=normalized_since_ts,
+                    limit=limit_per_sensor,
+                    conn=conn,
                 )
-                samples: list[dict[str, Any]] = []
-                sensor_latest_ts = sensor_row.get("sample_ts")
-                for row in rows:
-                    if is_stub_telemetry(quality=row.get("quality"), metadata=row.get("metadata")):
-                        continue
-                    raw_value = row.get("value")
-                    try:
-                        value = float(raw_value) if raw_value is not None else None
-                    except (TypeError, ValueError):
-                        value = None
-                    ts = row.get("ts")
-                    if ts is not None:
-                        sensor_latest_ts = ts
-                    if value is None:
-                        continue
-                    samples.append({"ts": ts, "value": value})
+                sensor_latest_ts = window_latest_ts if window_latest_ts is not None else sensor_row.get("sample_ts")
 
                 if sensor_latest_ts is not None and (latest_sample_ts is None or sensor_latest_ts > latest_sample_ts):
                     latest_sample_ts = sensor_latest_ts
@@ -531,7 +583,7 @@ class PgZoneRuntimeMonitor:
                     {
                         "sensor_id": sensor_row.get("sensor_id"),
                         "sensor_label": sensor_row.get("sensor_label"),
-                        "samples": tuple(samples),
+                        "samples": samples,
                         "latest_sample_ts": sensor_latest_ts,
                         "sample_age_sec": sensor_age_sec,
                         "is_stale": bool(
@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
+import copy
+from dataclasses import dataclass
 from datetime import datetime, timezone
 import json
 import os
-from typing import Any, Dict, List, Mapping, Optional
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from ae3lite.application.dto import ZoneActuatorRef, ZoneSnapshot
 from ae3lite.domain.errors import ErrorCodes, SnapshotBuildError
 from ae3lite.domain.services.phase_utils import normalize_phase_key
+from ae3lite.infrastructure.metrics import ZONE_SNAPSHOT_LOAD_DURATION, ZONE_SNAPSHOT_STATIC_CACHE
+from ae3lite.infrastructure.zone_config_listener import ZoneSnapshotStaticCache
 from common.db import get_pool
 from .active_grow_cycle_order_sql import SQL_ACTIVE_GROW_CYCLE_ORDER_BY
 from .effective_targets_sql_utils import (
@@ -45,8 +50,30 @@ def _node_persistent_dead_sec() -> int:
         return 600
 
 
+@dataclass(frozen=True)
+class _ZoneStaticPart:
+    """Часть snapshot'а, зависящая только от bundle и каналов зоны (кешируется по зоне)."""
+
+    bundle_revision: str
+    profile_row: Mapping[str, Any]
+    override_rows: List[Dict[str, Any]]
+    pid_configs: Dict[str, Any]
+    correction_config: Optional[Dict[str, Any]]
+    process_calibrations: Dict[str, Any]
+    # (node_id, канал) по всем активным ACTUATOR/SERVICE каналам зоны, без фильтра liveness.
+    actuators: Tuple[Tuple[int, ZoneActuatorRef], ...]
+
+
 class PgZoneSnapshotReadModel:
-    """Загружает согласованный неизменяемый `ZoneSnapshot` из PostgreSQL."""
+    """Загружает согласованный неизменяемый `ZoneSnapshot` из PostgreSQL.
+
+    Со ``static_cache`` bundle, каналы и калибровки берутся из кеша, пока их не
+    инвалидирует NOTIFY ``ae_zone_config_changed``; строка зоны, телеметрия,
+    pid_state и liveness нод читаются из БД при каждой загрузке.
+    """
+
+    def __init__(self, *, static_cache: ZoneSnapshotStaticCache | None = None) -> None:
+        self._static_cache = static_cache
 
     @staticmethod
     def _normalize_timestamp(value: Any) -> Any:
@@ -55,6 +82,9 @@ class PgZoneSnapshotReadModel:
         return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
 
     async def load(self, *, zone_id: int) -> ZoneSnapshot:
+        started_at = time.monotonic()
+        static_source = "db"
+        static_cache = self._static_cache
         pool = await get_pool()
         async with pool.acquire() as conn:
             async with conn.transaction():
@@ -127,79 +157,49 @@ class PgZoneSnapshotReadModel:
                         code=ErrorCodes.AE3_SNAPSHOT_MISSING_CURRENT_PHASE,
                     )
 
-                bundle_row = await conn.fetchrow(
-                    """
-                    SELECT scope_type, scope_id, bundle_revision, config
-                    FROM automation_effective_bundles
-                    WHERE scope_type = 'grow_cycle'
-                      AND scope_id = $1
-                    LIMIT 1
-                    """,
-                    grow_cycle_id,
-                )
-                if bundle_row is None:
-                    raise SnapshotBuildError(
-                        f"У grow cycle {grow_cycle_id} отсутствует automation_effective_bundle",
-                        code=ErrorCodes.AE3_SNAPSHOT_BUNDLE_MISSING,
-                    )
-
                 cycle_settings = zone_row.get("cycle_settings")
                 cycle_settings = cycle_settings if isinstance(cycle_settings, Mapping) else {}
                 expected_bundle_revision = str(cycle_settings.get("bundle_revision") or "").strip()
-                actual_bundle_revision = str(bundle_row.get("bundle_revision") or "").strip()
-                if expected_bundle_revision and expected_bundle_revision != actual_bundle_revision:
-                    raise SnapshotBuildError(
-                        (
-                            f"У grow cycle {grow_cycle_id} не совпадает bundle revision: "
-                            f"expected={expected_bundle_revision} actual={actual_bundle_revision or 'empty'}"
-                        ),
-                        code=ErrorCodes.AE3_SNAPSHOT_BUNDLE_INVALID,
-                    )
-
-                bundle_config = bundle_row.get("config")
-                if not isinstance(bundle_config, Mapping):
-                    raise SnapshotBuildError(
-                        f"У grow cycle {grow_cycle_id} некорректный automation bundle config",
-                        code=ErrorCodes.AE3_SNAPSHOT_BUNDLE_INVALID,
-                    )
-
-                system_bundle = bundle_config.get("system")
-                pump_calibration_policy = (
-                    system_bundle.get("pump_calibration_policy")
-                    if isinstance(system_bundle, Mapping)
-                    else None
+                cache_key = (
+                    int(grow_cycle_id),
+                    int(zone_row["zone_config_revision"]) if zone_row.get("zone_config_revision") is not None else None,
                 )
 
-                zone_bundle = bundle_config.get("zone")
-                if not isinstance(zone_bundle, Mapping):
-                    raise SnapshotBuildError(
-                        f"У grow cycle {grow_cycle_id} отсутствует zone bundle",
-                        code=ErrorCodes.AE3_SNAPSHOT_ZONE_BUNDLE_MISSING,
-                    )
-
-                logic_profile = zone_bundle.get("logic_profile")
-                if not isinstance(logic_profile, Mapping):
-                    raise SnapshotBuildError(
-                        f"У зоны {zone_id} отсутствует active logic profile bundle",
-                        code=ErrorCodes.AE3_SNAPSHOT_LOGIC_PROFILE_BUNDLE_MISSING,
-                    )
-
-                active_profile = logic_profile.get("active_profile")
-                if not isinstance(active_profile, Mapping):
-                    raise SnapshotBuildError(
-                        f"У зоны {zone_id} отсутствует active automation logic profile",
-                        code=ErrorCodes.AE3_SNAPSHOT_ACTIVE_LOGIC_PROFILE_MISSING,
+                static_part: Optional[_ZoneStaticPart] = None
+                if static_cache is not None:
+                    static_part, cache_result = static_cache.lookup(
+                        zone_id,
+                        key=cache_key,
+                        expected_bundle_revision=expected_bundle_revision,
                     )
-
-                profile_row = {
-                    "mode": logic_profile.get("active_mode"),
-                    "updated_at": active_profile.get("updated_at"),
-                    "command_plans": active_profile.get("command_plans"),
-                    "subsystems": active_profile.get("subsystems"),
-                }
-
-                cycle_bundle = bundle_config.get("cycle")
-                override_rows = self._bundle_override_rows(cycle_bundle)
+                    ZONE_SNAPSHOT_STATIC_CACHE.labels(result=cache_result).inc()
+                if static_part is not None:
+                    static_source = "cache"
+                else:
+                    fill = static_cache.begin_fill(zone_id) if static_cache is not None else None
+                    try:
+                        static_part, max_age_sec = await self._load_static_part(
+                            conn,
+                            zone_id=zone_id,
+                            grow_cycle_id=grow_cycle_id,
+                            expected_bundle_revision=expected_bundle_revision,
+                        )
+                    except BaseException:
+                        if static_cache is not None:
+                            static_cache.abort_fill(zone_id, fill)
+                        raise
+                    if static_cache is not None:
+                        static_cache.complete_fill(
+                            zone_id,
+                            fill,
+                            key=cache_key,
+                            bundle_revision=static_part.bundle_revision,
+                            value=copy.deepcopy(static_part),
+                            max_age_sec=max_age_sec,
+                        )
+                if static_cache is not None and static_source == "cache":
+                    # Snapshot не должен делить изменяемые dict'ы с записью кеша.
+                    static_part = copy.deepcopy(static_part)
 
                 telemetry_rows = await conn.fetch(
                     """
@@ -247,66 +247,28 @@ class PgZoneSnapshotReadModel:
                     zone_id,
                 )
 
-                pid_config_rows = self._bundle_pid_config_rows(zone_bundle)
-                correction_config_row = self._bundle_correction_config_row(zone_bundle)
-                process_calibration_rows = self._bundle_process_calibration_rows(zone_bundle)
-
                 freshness_sec = _node_freshness_fallback_sec()
-                actuator_rows = await conn.fetch(
+                live_node_rows = await conn.fetch(
                     """
-                    SELECT
-                        nc.id AS node_channel_id,
-                        n.uid AS node_uid,
-                        LOWER(COALESCE(n.type, '')) AS node_type,
-                        LOWER(COALESCE(nc.channel, 'default')) AS channel,
-                        UPPER(COALESCE(nc.type, 'ACTUATOR')) AS channel_type,
-                        LOWER(COALESCE(cb.role, '')) AS role,
-                        nc.config AS channel_config,
-                        pc.ml_per_sec AS calibration_ml_per_sec,
-                        pc.k_ms_per_ml_l AS calibration_k_ms_per_ml_l,
-                        pc.component AS calibration_component,
-                        pc.source AS calibration_source,
-                        pc.quality_score AS calibration_quality_score,
-                        pc.sample_count AS calibration_sample_count,
-                        pc.valid_from AS calibration_valid_from
+                    SELECT n.id AS node_id
                     FROM nodes n
-                    JOIN node_channels nc
-                        ON nc.node_id = n.id
-                    LEFT JOIN channel_bindings cb
-                        ON cb.node_channel_id = nc.id
-                    LEFT JOIN LATERAL (
-                        SELECT
-                            p.ml_per_sec,
-                            p.k_ms_per_ml_l,
-                            p.component,
-                            p.source,
-                            p.quality_score,
-                            p.sample_count,
-                            p.valid_from
-                        FROM pump_calibrations p
-                        WHERE p.node_channel_id = nc.id
-                          AND p.is_active = TRUE
-                          AND p.valid_from <= NOW()
-                          AND (p.valid_to IS NULL OR p.valid_to > NOW())
-                        ORDER BY p.valid_from DESC, p.id DESC
-                        LIMIT 1
-                    ) pc ON TRUE
                     WHERE n.zone_id = $1
                       AND (
                           LOWER(TRIM(COALESCE(n.status, ''))) = 'online'
                           OR COALESCE(n.last_seen_at, n.last_heartbeat_at, n.updated_at)
                                  >= NOW() - ($2 * INTERVAL '1 second')
                       )
-                      AND UPPER(TRIM(COALESCE(nc.type, ''))) IN ('ACTUATOR', 'SERVICE')
-                      AND COALESCE(nc.is_active, TRUE) = TRUE
-                    ORDER BY n.id ASC, nc.id ASC
                     """,
                     zone_id,
                     freshness_sec,
                 )
+                live_node_ids = {int(row["node_id"]) for row in live_node_rows}
+                actuators = tuple(
+                    actuator for node_id, actuator in static_part.actuators if node_id in live_node_ids
+                )
 
                 zone_nodes_diag_rows: List[Mapping[str, Any]] = []
-                if not actuator_rows:
+                if not actuators:
                     zone_nodes_diag_rows = await conn.fetch(
                         """
                         SELECT
@@ -336,6 +298,7 @@ class PgZoneSnapshotReadModel:
                         zone_id,
                     )
 
+        profile_row = static_part.profile_row
         command_plans = profile_row.get("command_plans")
         if not isinstance(command_plans, Mapping) or not command_plans:
             raise SnapshotBuildError(
@@ -343,7 +306,7 @@ class PgZoneSnapshotReadModel:
                 code=ErrorCodes.AE3_SNAPSHOT_EMPTY_COMMAND_PLANS,
             )
 
-        normalized_overrides = self._normalize_override_rows(override_rows)
+        normalized_overrides = static_part.override_rows
         phase_targets = self._build_phase_targets(zone_row=zone_row)
         targets = self._build_targets(
             zone_row=zone_row,
@@ -357,30 +320,6 @@ class PgZoneSnapshotReadModel:
         )
         telemetry_last = self._build_telemetry_last(telemetry_rows)
         pid_state = self._build_pid_state(pid_state_rows)
-        pid_configs = self._build_pid_configs(pid_config_rows)
-        correction_config = self._build_correction_config(correction_config_row)
-        if isinstance(correction_config, Mapping):
-            correction_config = self._merge_pump_calibration_policy(
-                correction_config,
-                pump_calibration_policy,
-            )
-        process_calibrations = self._build_process_calibrations(process_calibration_rows)
-        actuators = tuple(
-            ZoneActuatorRef(
-                node_uid=str(row.get("node_uid") or "").strip(),
-                node_type=str(row.get("node_type") or "").strip().lower(),
-                channel=str(row.get("channel") or "default").strip().lower() or "default",
-                node_channel_id=int(row["node_channel_id"]),
-                channel_type=str(row.get("channel_type") or "ACTUATOR").strip().upper() or "ACTUATOR",
-                role=str(row.get("role") or "").strip().lower() or None,
-                pump_calibration=self._extract_pump_calibration(
-                    row,
-                    pump_calibration_policy=pump_calibration_policy,
-                ),
-            )
-            for row in actuator_rows
-            if str(row.get("node_uid") or "").strip()
-        )
         if not actuators:
             raise SnapshotBuildError(
                 f"У зоны {zone_id} отсутствуют online actuator channels",
@@ -391,11 +330,11 @@ class PgZoneSnapshotReadModel:
                 ),
             )
 
-        return ZoneSnapshot(
+        snapshot = ZoneSnapshot(
             zone_id=int(zone_row["zone_id"]),
             greenhouse_id=int(zone_row["greenhouse_id"]) if zone_row.get("greenhouse_id") is not None else None,
             automation_runtime=str(zone_row.get("automation_runtime") or "").strip().lower(),
-            bundle_revision=actual_bundle_revision or None,
+            bundle_revision=static_part.bundle_revision or None,
             grow_cycle_id=int(grow_cycle_id),
             current_phase_id=int(zone_row["current_phase_id"]),
             phase_name=str(zone_row["phase_name"]) if zone_row.get("phase_name") is not None else None,
@@ -407,15 +346,204 @@ class PgZoneSnapshotReadModel:
             command_plans=command_plans,
             telemetry_last=telemetry_last,
             pid_state=pid_state,
-            pid_configs=pid_configs,
+            pid_configs=static_part.pid_configs,
             actuators=actuators,
-            process_calibrations=process_calibrations,
+            process_calibrations=static_part.process_calibrations,
+            correction_config=static_part.correction_config,
+            config_revision=cache_key[1],
+        )
+        ZONE_SNAPSHOT_LOAD_DURATION.labels(static_source=static_source).observe(time.monotonic() - started_at)
+        return snapshot
+
+    async def _load_static_part(
+        self,
+        conn: Any,
+        *,
+        zone_id: int,
+        grow_cycle_id: Any,
+        expected_bundle_revision: str,
+    ) -> Tuple[_ZoneStaticPart, Optional[float]]:
+        """Читает bundle, каналы актуаторов и калибровки зоны.
+
+        Второй элемент — секунд до ближайшей границы ``valid_from``/``valid_to``
+        активных калибровок насосов зоны (None, если границ впереди нет).
+        """
+        bundle_row = await conn.fetchrow(
+            """
+            SELECT scope_type, scope_id, bundle_revision, config
+            FROM automation_effective_bundles
+            WHERE scope_type = 'grow_cycle'
+              AND scope_id = $1
+            LIMIT 1
+            """,
+            grow_cycle_id,
+        )
+        if bundle_row is None:
+            raise SnapshotBuildError(
+                f"У grow cycle {grow_cycle_id} отсутствует automation_effective_bundle",
+                code=ErrorCodes.AE3_SNAPSHOT_BUNDLE_MISSING,
+            )
+
+        actual_bundle_revision = str(bundle_row.get("bundle_revision") or "").strip()
+        if expected_bundle_revision and expected_bundle_revision != actual_bundle_revision:
+            raise SnapshotBuildError(
+                (
+                    f"У grow cycle {grow_cycle_id} не совпадает bundle revision: "
+                    f"expected={expected_bundle_revision} actual={actual_bundle_revision or 'empty'}"
+                ),
+                code=ErrorCodes.AE3_SNAPSHOT_BUNDLE_INVALID,
+            )
+
+        bundle_config = bundle_row.get("config")
+        if not isinstance(bundle_config, Mapping):
+            raise SnapshotBuildError(
+                f"У grow cycle {grow_cycle_id} некорректный automation bundle config",
+                code=ErrorCodes.AE3_SNAPSHOT_BUNDLE_INVALID,
+            )
+
+        system_bundle = bundle_config.get("system")
+        pump_calibration_policy = (
+            system_bundle.get("pump_calibration_policy")
+            if isinstance(system_bundle, Mapping)
+            else None
+        )
+
+        zone_bundle = bundle_config.get("zone")
+        if not isinstance(zone_bundle, Mapping):
+            raise SnapshotBuildError(
+                f"У grow cycle {grow_cycle_id} отсутствует zone bundle",
+                code=ErrorCodes.AE3_SNAPSHOT_ZONE_BUNDLE_MISSING,
+            )
+
+        logic_profile = zone_bundle.get("logic_profile")
+        if not isinstance(logic_profile, Mapping):
+            raise SnapshotBuildError(
+                f"У зоны {zone_id} отсутствует active logic profile bundle",
+                code=ErrorCodes.AE3_SNAPSHOT_LOGIC_PROFILE_BUNDLE_MISSING,
+            )
+
+        active_profile = logic_profile.get("active_profile")
+        if not isinstance(active_profile, Mapping):
+            raise SnapshotBuildError(
+                f"У зоны {zone_id} отсутствует active automation logic profile",
+                code=ErrorCodes.AE3_SNAPSHOT_ACTIVE_LOGIC_PROFILE_MISSING,
+            )
+
+        profile_row = {
+            "mode": logic_profile.get("active_mode"),
+            "updated_at": active_profile.get("updated_at"),
+            "command_plans": active_profile.get("command_plans"),
+            "subsystems": active_profile.get("subsystems"),
+        }
+
+        cycle_bundle = bundle_config.get("cycle")
+        override_rows = self._bundle_override_rows(cycle_bundle)
+        pid_config_rows = self._bundle_pid_config_rows(zone_bundle)
+        correction_config_row = self._bundle_correction_config_row(zone_bundle)
+        process_calibration_rows = self._bundle_process_calibration_rows(zone_bundle)
+
+        actuator_rows = await conn.fetch(
+            """
+            SELECT
+                n.id AS node_id,
+                nc.id AS node_channel_id,
+                n.uid AS node_uid,
+                LOWER(COALESCE(n.type, '')) AS node_type,
+                LOWER(COALESCE(nc.channel, 'default')) AS channel,
+                UPPER(COALESCE(nc.type, 'ACTUATOR')) AS channel_type,
+                LOWER(COALESCE(cb.role, '')) AS role,
+                nc.config AS channel_config,
+                pc.ml_per_sec AS calibration_ml_per_sec,
+                pc.k_ms_per_ml_l AS calibration_k_ms_per_ml_l,
+                pc.component AS calibration_component,
+                pc.source AS calibration_source,
+                pc.quality_score AS calibration_quality_score,
+                pc.sample_count AS calibration_sample_count,
+                pc.valid_from AS calibration_valid_from
+            FROM nodes n
+            JOIN node_channels nc
+                ON nc.node_id = n.id
+            LEFT JOIN channel_bindings cb
+                ON cb.node_channel_id = nc.id
+            LEFT JOIN LATERAL (
+                SELECT
+                    p.ml_per_sec,
+                    p.k_ms_per_ml_l,
+                    p.component,
+                    p.source,
+                    p.quality_score,
+                    p.sample_count,
+                    p.valid_from
+                FROM pump_calibrations p
+                WHERE p.node_channel_id = nc.id
+                  AND p.is_active = TRUE
+                  AND p.valid_from <= NOW()
+                  AND (p.valid_to IS NULL OR p.valid_to > NOW())
+                ORDER BY p.valid_from DESC, p.id DESC
+                LIMIT 1
+            ) pc ON TRUE
+            WHERE n.zone_id = $1
+              AND UPPER(TRIM(COALESCE(nc.type, ''))) IN ('ACTUATOR', 'SERVICE')
+              AND COALESCE(nc.is_active, TRUE) = TRUE
+            ORDER BY n.id ASC, nc.id ASC
+            """,
+            zone_id,
+        )
+        calibration_change_in_sec = await conn.fetchval(
+            """
+            SELECT EXTRACT(EPOCH FROM (
+                LEAST(
+                    MIN(p.valid_from) FILTER (WHERE p.valid_from > NOW()),
+                    MIN(p.valid_to) FILTER (WHERE p.valid_to > NOW())
+                ) - NOW()
+            ))::DOUBLE PRECISION
+            FROM nodes n
+            JOIN node_channels nc
+                ON nc.node_id = n.id
+            JOIN pump_calibrations p
+                ON p.node_channel_id = nc.id
+            WHERE n.zone_id = $1
+              AND p.is_active = TRUE
+            """,
+            zone_id,
+        )
+
+        correction_config = self._build_correction_config(correction_config_row)
+        if isinstance(correction_config, Mapping):
+            correction_config = self._merge_pump_calibration_policy(
+                correction_config,
+                pump_calibration_policy,
+            )
+        actuators = tuple(
+            (
+                int(row["node_id"]),
+                ZoneActuatorRef(
+                    node_uid=str(row.get("node_uid") or "").strip(),
+                    node_type=str(row.get("node_type") or "").strip().lower(),
+                    channel=str(row.get("channel") or "default").strip().lower() or "default",
+                    node_channel_id=int(row["node_channel_id"]),
+                    channel_type=str(row.get("channel_type") or "ACTUATOR").strip().upper() or "ACTUATOR",
+                    role=str(row.get("role") or "").strip().lower() or None,
+                    pump_calibration=self._extract_pump_calibration(
+                        row,
+                        pump_calibration_policy=pump_calibration_policy,
+                    ),
+                ),
+            )
+            for row in actuator_rows
+            if str(row.get("node_uid") or "").strip()
+        )
+        static_part = _ZoneStaticPart(
+            bundle_revision=actual_bundle_revision,
+            profile_row=profile_row,
+            override_rows=self._normalize_override_rows(override_rows),
+            pid_configs=self._build_pid_configs(pid_config_rows),
             correction_config=correction_config,
-            config_revision=(
-                int(zone_row["zone_config_revision"])
-                if zone_row.get("zone_config_revision") is not None
-                else None
-            ),
+            process_calibrations=self._build_process_calibrations(process_calibration_rows),
+            actuators=actuators,
+        )
+        return static_part, (
+            float(calibration_change_in_sec) if calibration_change_in_sec is not None else None
         )
 
     @staticmethod
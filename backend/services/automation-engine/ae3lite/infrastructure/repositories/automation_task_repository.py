@@ -4,12 +4,12 @@ from __future__ import annotations
 
 import logging
 from contextlib import asynccontextmanager
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any, AsyncIterator, Mapping
 
 import asyncpg
 
-from ae3lite.domain.entities import AutomationTask
+from ae3lite.domain.entities import AutomationTask, ZoneLease
 from ae3lite.domain.entities.workflow_state import CorrectionState, WorkflowState
 from ae3lite.infrastructure.metrics import (
     OLDEST_ACTIVE_TASK_AGE_SECONDS,
@@ -571,6 +571,92 @@ class PgAutomationTaskRepository:
             )
         return task
 
+    async def claim_pending_batch(
+        self,
+        *,
+        owner: str,
+        now: datetime,
+        limit: int,
+        lease_ttl_sec: int,
+    ) -> list[tuple[AutomationTask, ZoneLease]]:
+        """Забирает до ``limit`` due pending-задач вместе с zone lease одним запросом.
+
+        Зоны с живым lease другого owner пропускаются ещё при выборе кандидатов.
+        Если lease перехвачен между выбором и upsert, задача этой зоны просто не
+        переводится в ``claimed`` и остаётся pending — откат claim не нужен.
+        ``ae_tasks_active_zone_unique`` гарантирует не больше одной pending-задачи на зону.
+        """
+        normalized_now = self._normalize_timestamp(now)
+        leased_until = normalized_now + timedelta(seconds=max(1, int(lease_ttl_sec)))
+        async with self._connection() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch(
+                    """
+                    WITH candidate AS (
+                        SELECT tasks.id, tasks.zone_id
+                        FROM ae_tasks tasks
+                        WHERE tasks.status = 'pending'
+                          AND tasks.due_at <= $1
+                          AND NOT EXISTS (
+                              SELECT 1
+                              FROM ae_zone_leases leases
+                              WHERE leases.zone_id = tasks.zone_id
+                                AND leases.owner <> $2
+                                AND leases.leased_until > $1
+                          )
+                        ORDER BY tasks.due_at ASC, tasks.created_at ASC, tasks.id ASC
+                        FOR UPDATE OF tasks SKIP LOCKED
+                        LIMIT $3
+                    ),
+                    leased AS (
+                        INSERT INTO ae_zone_leases (zone_id, owner, leased_until, updated_at)
+                        SELECT candidate.zone_id, $2, $4, $1
+                        FROM candidate
+                        ON CONFLICT (zone_id) DO UPDATE
+                        SET owner = EXCLUDED.owner,
+                            leased_until = EXCLUDED.leased_until,
+                            updated_at = EXCLUDED.updated_at
+                        WHERE ae_zone_leases.owner = EXCLUDED.owner
+                           OR ae_zone_leases.leased_until <= EXCLUDED.updated_at
+                        RETURNING zone_id, owner, leased_until, updated_at
+                    )
+                    UPDATE ae_tasks tasks
+                    SET status = 'claimed',
+                        claimed_by = $2,
+                        claimed_at = $1,
+                        updated_at = $1
+                    FROM candidate
+                    JOIN leased ON leased.zone_id = candidate.zone_id
+                    WHERE tasks.id = candidate.id
+                    RETURNING tasks.*,
+                              leased.owner AS lease_owner,
+                              leased.leased_until AS lease_leased_until,
+                              leased.updated_at AS lease_updated_at
+                    """,
+                    normalized_now,
+                    owner,
+                    max(1, int(limit)),
+                    leased_until,
+                )
+        claimed: list[tuple[AutomationTask, ZoneLease]] = []
+        for row in sorted(rows, key=lambda item: (item["due_at"], item["created_at"], item["id"])):
+            task = AutomationTask.from_row(row)
+            lease = ZoneLease(
+                zone_id=task.zone_id,
+                owner=str(row["lease_owner"] or ""),
+                leased_until=row["lease_leased_until"],
+                updated_at=row["lease_updated_at"],
+            )
+            self._log_fsm_success(
+                action="claim",
+                task=task,
+                from_status="pending",
+                to_status="claimed",
+                owner=owner,
+            )
+            claimed.append((task, lease))
+        return claimed
+
     async def refresh_pending_queue_metrics(self, *, now: datetime) -> None:
         """Обновляет gauge метрики очереди pending одним SQL-запросом."""
         normalized_now = self._normalize_timestamp(now)
@@ -0,0 +1,96 @@
+"""PostgreSQL NOTIFY-listener для канала ae_task_pending.
+
+Триггер ``trg_ae_task_pending_notify`` на ``ae_tasks`` шлёт NOTIFY, когда задача
+становится pending (INSERT, requeue, перенос ``due_at``), в том числе если её
+создал другой экземпляр AE3. Listener будит drain-цикл worker'а; источник
+истины — claim по ``ae_tasks``, уведомление только сокращает задержку.
+После (пере)подключения callback вызывается один раз с ``reconnected=True``:
+задачи, появившиеся во время разрыва LISTEN, забираются этим kick'ом.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Coroutine, Optional
+
+import asyncpg
+
+from ae3lite.infrastructure.metrics import LISTENER_INVALID_PAYLOAD
+from ae3lite.infrastructure.pg_notify_listener import PgNotifyListener
+
+logger = logging.getLogger(__name__)
+
+_CHANNEL = "ae_task_pending"
+_LISTENER_NAME = "task_pending"
+
+
+class TaskPendingListener(PgNotifyListener):
+    """Слушает NOTIFY ae_task_pending и вызывает callback с payload задачи."""
+
+    def __init__(
+        self,
+        dsn: str,
+        on_task_pending: Callable[[dict[str, Any]], Coroutine[Any, Any, None]],
+    ) -> None:
+        super().__init__(dsn, channel=_CHANNEL, listener_name=_LISTENER_NAME)
+        self._on_task_pending = on_task_pending
+
+    async def _on_connected(self) -> None:
+        await self._dispatch({"reconnected": True})
+
+    def _notify_handler(
+        self,
+        conn: asyncpg.Connection,  # noqa: ARG002
+        pid: int,  # noqa: ARG002
+        channel: str,
+        payload: str,
+    ) -> None:
+        data = self._parse_payload(channel=channel, payload=payload)
+        if data is None:
+            return
+
+        logger.debug(
+            "TaskPendingListener: получен notify task_id=%s zone_id=%s due_at=%s",
+            data.get("task_id"),
+            data.get("zone_id"),
+            data.get("due_at"),
+        )
+        asyncio.get_running_loop().create_task(self._dispatch(data))
+
+    def _parse_payload(self, *, channel: str, payload: str) -> Optional[dict[str, Any]]:
+        try:
+            data: dict[str, Any] = json.loads(payload)
+        except json.JSONDecodeError:
+            LISTENER_INVALID_PAYLOAD.labels(listener=_LISTENER_NAME).inc()
+            logger.warning(
+                "TaskPendingListener: получен некорректный JSON payload в channel=%s payload=%r",
+                channel,
+                payload,
+            )
+            return None
+
+        if not isinstance(data, dict):
+            LISTENER_INVALID_PAYLOAD.labels(listener=_LISTENER_NAME).inc()
+            logger.warning(
+                "TaskPendingListener: payload не является object в channel=%s payload=%r",
+                channel,
+                payload,
+            )
+            return None
+
+        return data
+
+    async def _dispatch(self, data: dict[str, Any]) -> None:
+        try:
+            await self._on_task_pending(data)
+        except Exception as exc:
+            logger.error(
+                "TaskPendingListener: callback on_task_pending завершился ошибкой: %s",
+                exc,
+                exc_info=True,
+            )
+
+
+__all__ = ["TaskPendingListener"]
@@ -0,0 +1,324 @@
+"""In-memory кольцевые буферы семплов для окон решений и NOTIFY-listener ``telemetry_samples_committed``.
+
+history-logger после записи батча отправляет записанные семплы в NOTIFY
+``telemetry_samples_committed``. ``TelemetrySampleBuffers`` держит по каждому
+сенсору, чьё окно AE3 уже читал, ограниченный буфер последних семплов, и
+``PgZoneRuntimeMonitor`` отдаёт окно коррекции из памяти за O(окна) вместо
+``ORDER BY ts DESC LIMIT`` по ``telemetry_samples``.
+
+Буфер хранит «покрытие»: начиная с ``covered_since`` в нём есть все не-stub
+семплы сенсора. Первое чтение (miss) заполняет буфер из SQL; уведомления,
+пришедшие во время этого запроса, накапливаются и вливаются после него, дубли
+отсекаются по ``(ts, value)`` в точности хранения ``telemetry_samples``.
+Источник истины — БД: при разрыве LISTEN буферы сбрасываются, а окно
+перечитывается из SQL, если ``telemetry_last`` новее последнего увиденного
+семпла (потерянный NOTIFY) или с заполнения прошло ``verify_interval_sec``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+import asyncpg
+
+from ae3lite.infrastructure.metrics import LISTENER_INVALID_PAYLOAD
+from ae3lite.infrastructure.pg_notify_listener import PgNotifyListener
+
+logger = logging.getLogger(__name__)
+
+_CHANNEL = "telemetry_samples_committed"
+_LISTENER_NAME = "telemetry_samples"
+_DEFAULT_CAPACITY = 256
+_DEFAULT_MAX_SENSORS = 4096
+_DEFAULT_VERIFY_INTERVAL_SEC = 300.0
+_EPOCH = datetime(1970, 1, 1)
+_ONE_SECOND_US = 1_000_000
+_VALUE_QUANTUM = Decimal("0.0001")
+
+WindowSample = tuple[datetime, float]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def stored_ts(value: datetime) -> datetime:
+    """Время семпла в точности ``telemetry_samples.ts`` (timestamp(0): округление до секунды)."""
+    normalized = _naive_utc(value)
+    if normalized.microsecond >= _ONE_SECOND_US // 2:
+        normalized += timedelta(seconds=1)
+    return normalized.replace(microsecond=0)
+
+
+def stored_value(value: Any) -> float:
+    """Значение в точности ``telemetry_samples.value`` (decimal(10,4))."""
+    if isinstance(value, Decimal):
+        return float(value)
+    return float(Decimal(format(float(value), ".15g")).quantize(_VALUE_QUANTUM, rounding=ROUND_HALF_UP))
+
+
+class _SensorRing:
+    __slots__ = ("samples", "covered_since", "last_seen_ts", "filled_at")
+
+    def __init__(self, *, capacity: int, covered_since: datetime, last_seen_ts: Optional[datetime], filled_at: float) -> None:
+        self.samples: deque[WindowSample] = deque(maxlen=capacity)
+        self.covered_since = covered_since
+        self.last_seen_ts = last_seen_ts
+        self.filled_at = filled_at
+
+    def observe(self, ts: datetime) -> None:
+        if self.last_seen_ts is None or ts > self.last_seen_ts:
+            self.last_seen_ts = ts
+
+    def insert(self, sample: WindowSample) -> None:
+        ts = sample[0]
+        if ts < self.covered_since:
+            # Опоздавший семпл старше покрытия: окно, которому он нужен, всё равно пойдёт в SQL.
+            return
+        samples = self.samples
+        if not samples or ts > samples[-1][0]:
+            self._append(sample)
+            return
+        idx = bisect.bisect_right(samples, (ts, float("inf")))
+        probe = idx - 1
+        while probe >= 0 and samples[probe][0] == ts:
+            if samples[probe][1] == sample[1]:
+                return
+            probe -= 1
+        if idx == len(samples):
+            self._append(sample)
+            return
+        if len(samples) == samples.maxlen:
+            self._drop_oldest()
+            idx -= 1
+            if ts < self.covered_since:
+                return
+        samples.insert(idx, sample)
+
+    def window(self, *, since_ts: datetime, limit: int) -> Optional[tuple[WindowSample, ...]]:
+        """Последние ``limit`` семплов с ``ts >= since_ts`` или None, если буфер окно не покрывает."""
+        samples = self.samples
+        idx = bisect.bisect_left(samples, (since_ts,))
+        in_window = len(samples) - idx
+        if since_ts < self.covered_since and in_window < limit:
+            return None
+        start = max(idx, len(samples) - limit)
+        return tuple(itertools.islice(samples, start, None))
+
+    def _append(self, sample: WindowSample) -> None:
+        if len(self.samples) == self.samples.maxlen:
+            self._drop_oldest()
+        self.samples.append(sample)
+
+    def _drop_oldest(self) -> None:
+        dropped_ts = self.samples.popleft()[0]
+        # Семплы с тем же ts могли остаться только частично: покрытие начинается строго после.
+        self.covered_since = max(self.covered_since, dropped_ts + timedelta(microseconds=1))
+
+
+class TelemetrySampleBuffers:
+    """Кольцевые буферы последних не-stub семплов по sensor_id.
+
+    Все операции синхронные и выполняются в одном event loop, поэтому блокировок
+    нет. Уведомления по сенсорам, окна которых AE3 не читал, отбрасываются:
+    память ограничена ``capacity`` × ``max_sensors`` (LRU по сенсорам).
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int = _DEFAULT_CAPACITY,
+        max_sensors: int = _DEFAULT_MAX_SENSORS,
+        verify_interval_sec: float = _DEFAULT_VERIFY_INTERVAL_SEC,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = max(1, int(capacity))
+        self._max_sensors = max(1, int(max_sensors))
+        self._verify_interval_sec = max(0.0, float(verify_interval_sec))
+        self._clock = clock
+        self._rings: "OrderedDict[int, _SensorRing]" = OrderedDict()
+        # sensor_id -> {token: семплы, пришедшие во время SQL-заполнения}.
+        self._pending: dict[int, dict[int, list[tuple[datetime, Optional[float]]]]] = {}
+        self._tokens = itertools.count(1)
+        self._epoch = 0
+        # Пока listener не подключён, окна читаются только из SQL.
+        self.connected = False
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+    def reset(self) -> None:
+        """Сбрасывает всё: уведомления за время разрыва LISTEN могли потеряться."""
+        self._rings.clear()
+        self._pending.clear()
+        self._epoch += 1
+
+    def ingest(self, sensor_id: int, ts: datetime, value: Optional[float], *, stub: bool = False) -> None:
+        """Учитывает записанный семпл; ``value=None`` или ``stub`` только сдвигают last_seen."""
+        sample_ts = stored_ts(ts)
+        sample_value = None if stub or value is None else stored_value(value)
+        for pending in self._pending.get(sensor_id, {}).values():
+            pending.append((sample_ts, sample_value))
+        ring = self._rings.get(sensor_id)
+        if ring is None:
+            return
+        ring.observe(sample_ts)
+        if sample_value is not None:
+            ring.insert((sample_ts, sample_value))
+
+    def lookup(
+        self,
+        sensor_id: int,
+        *,
+        since_ts: datetime,
+        limit: int,
+        last_ts: Optional[datetime] = None,
+    ) -> tuple[Optional[tuple[WindowSample, ...]], str]:
+        """Окно из памяти: ``(семплы, "hit")`` или ``(None, причина промаха)``.
+
+        ``last_ts`` — ``telemetry_last`` сенсора: если он новее последнего
+        увиденного семпла, уведомление ещё не дошло или потеряно (``gap``).
+        """
+        if not self.connected:
+            return None, "disconnected"
+        ring = self._rings.get(sensor_id)
+        if ring is None:
+            return None, "untracked"
+        if self._verify_interval_sec > 0 and self._clock() - ring.filled_at > self._verify_interval_sec:
+            return None, "expired"
+        if last_ts is not None and (ring.last_seen_ts is None or stored_ts(last_ts) > ring.last_seen_ts):
+            return None, "gap"
+        samples = ring.window(since_ts=_naive_utc(since_ts), limit=max(1, int(limit)))
+        if samples is None:
+            return None, "not_covered"
+        self._rings.move_to_end(sensor_id)
+        return samples, "hit"
+
+    def begin_fill(self, sensor_id: int) -> Optional[tuple[int, int]]:
+        """Начинает SQL-заполнение: уведомления до ``complete_fill`` копятся отдельно."""
+        if not self.connected:
+            return None
+        token = next(self._tokens)
+        self._pending.setdefault(sensor_id, {})[token] = []
+        return self._epoch, token
+
+    def abort_fill(self, sensor_id: int, fill: Optional[tuple[int, int]]) -> None:
+        if fill is None:
+            return
+        pending = self._pending.get(sensor_id)
+        if pending is None:
+            return
+        pending.pop(fill[1], None)
+        if not pending:
+            self._pending.pop(sensor_id, None)
+
+    def complete_fill(
+        self,
+        sensor_id: int,
+        fill: Optional[tuple[int, int]],
+        *,
+        samples: Sequence[WindowSample],
+        since_ts: datetime,
+        truncated: bool,
+        last_ts: Optional[datetime] = None,
+    ) -> None:
+        """Заменяет буфер сенсора результатом SQL ``ts >= since_ts`` (по возрастанию ts).
+
+        ``truncated`` — запрос упёрся в LIMIT: покрытие начинается после самого
+        старого полученного семпла, а не с ``since_ts``.
+        """
+        if fill is None:
+            return
+        pending = self._pending.get(sensor_id, {}).get(fill[1])
+        self.abort_fill(sensor_id, fill)
+        if pending is None or fill[0] != self._epoch or not self.connected:
+            return
+        covered_since = _naive_utc(since_ts)
+        if truncated and samples:
+            covered_since = max(covered_since, samples[0][0] + timedelta(microseconds=1))
+        ring = _SensorRing(
+            capacity=self.capacity,
+            covered_since=covered_since,
+            last_seen_ts=stored_ts(last_ts) if last_ts is not None else None,
+            filled_at=self._clock(),
+        )
+        for ts, value in samples:
+            ring.observe(ts)
+            ring.insert((ts, value))
+        for ts, value in pending:
+            ring.observe(ts)
+            if value is not None:
+                ring.insert((ts, value))
+        self._rings[sensor_id] = ring
+        self._rings.move_to_end(sensor_id)
+        while len(self._rings) > self._max_sensors:
+            self._rings.popitem(last=False)
+
+
+class TelemetrySamplesListener(PgNotifyListener):
+    """Слушает NOTIFY telemetry_samples_committed и наполняет ``TelemetrySampleBuffers``."""
+
+    def __init__(self, dsn: str, buffers: TelemetrySampleBuffers) -> None:
+        super().__init__(dsn, channel=_CHANNEL, listener_name=_LISTENER_NAME)
+        self._buffers = buffers
+
+    async def _on_connected(self) -> None:
+        # Буферы, заполненные до разрыва, могли пропустить семплы.
+        self._buffers.reset()
+        self._buffers.connected = True
+
+    def _on_disconnected(self) -> None:
+        self._buffers.connected = False
+        self._buffers.reset()
+
+    def _notify_handler(
+        self,
+        conn: asyncpg.Connection,  # noqa: ARG002
+        pid: int,  # noqa: ARG002
+        channel: str,
+        payload: str,
+    ) -> None:
+        rows = self._parse_payload(channel=channel, payload=payload)
+        if rows is None:
+            return
+        for sensor_id, ts, value, stub in rows:
+            self._buffers.ingest(sensor_id, ts, value, stub=stub)
+
+    def _parse_payload(
+        self,
+        *,
+        channel: str,
+        payload: str,
+    ) -> Optional[list[tuple[int, datetime, Optional[float], bool]]]:
+        try:
+            data: Any = json.loads(payload)
+            raw_rows: Iterable[Any] = data["s"]
+            rows = [
+                (
+                    int(row[0]),
+                    _EPOCH + timedelta(microseconds=int(row[1])),
+                    float(row[2]) if row[2] is not None else None,
+                    bool(row[3]),
+                )
+                for row in raw_rows
+            ]
+        except (json.JSONDecodeError, TypeError, KeyError, IndexError, ValueError):
+            LISTENER_INVALID_PAYLOAD.labels(listener=_LISTENER_NAME).inc()
+            logger.warning(
+                "TelemetrySamplesListener: некорректный payload в channel=%s payload=%r",
+                channel,
+                payload[:200] if isinstance(payload, str) else payload,
+            )
+            return None
+        return rows
+
+
+__all__ = ["TelemetrySampleBuffers", "TelemetrySamplesListener", "stored_ts", "stored_value"]
@@ -0,0 +1,247 @@
+"""Кеш статичной части ``ZoneSnapshot`` и NOTIFY-listener ``ae_zone_config_changed``.
+
+Статичная часть snapshot'а зоны — effective bundle (profile, overrides,
+command_plans, pid/correction configs, process calibrations) и каналы
+актуаторов с channel bindings и активными калибровками насосов — меняется
+редко, но раньше перечитывалась из PostgreSQL при каждом ``load()``.
+``ZoneSnapshotStaticCache`` хранит её по зоне; волатильная часть (строка зоны,
+телеметрия, pid_state, liveness нод) читается из БД всегда.
+
+Инвалидация: триггеры ``ae_notify_zone_config_changed`` на
+``automation_effective_bundles``, ``nodes``, ``node_channels``,
+``channel_bindings`` и ``pump_calibrations`` шлют NOTIFY с ``zone_id``
+(NULL — сбросить всё). Дополнительно запись сверяется с ревизиями из строки
+зоны (grow_cycle, ``zones.config_revision``, ожидаемая ``bundle_revision``) и
+живёт не дольше ``ttl_sec`` и ближайшей границы окна действия калибровки.
+Источник истины — БД: пока listener не подключён, кеш не используется, при
+разрыве LISTEN он сбрасывается.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import asyncpg
+
+from ae3lite.infrastructure.metrics import LISTENER_INVALID_PAYLOAD
+from ae3lite.infrastructure.pg_notify_listener import PgNotifyListener
+
+logger = logging.getLogger(__name__)
+
+_CHANNEL = "ae_zone_config_changed"
+_LISTENER_NAME = "zone_config"
+_DEFAULT_TTL_SEC = 300.0
+_DEFAULT_MAX_ZONES = 1024
+
+# (grow_cycle_id, zones.config_revision)
+CacheKey = tuple[int, Optional[int]]
+
+
+class _ZoneEntry:
+    __slots__ = ("key", "bundle_revision", "value", "expires_at")
+
+    def __init__(self, *, key: CacheKey, bundle_revision: str, value: Any, expires_at: float) -> None:
+        self.key = key
+        self.bundle_revision = bundle_revision
+        self.value = value
+        self.expires_at = expires_at
+
+
+class ZoneSnapshotStaticCache:
+    """Статичная часть snapshot'а по zone_id (LRU, ``max_zones`` записей).
+
+    Операции синхронные и выполняются в одном event loop, блокировок нет.
+    Заполнение идёт через ``begin_fill``/``complete_fill``: если во время
+    SQL-чтения пришла инвалидация зоны или сброс, результат не сохраняется.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_sec: float = _DEFAULT_TTL_SEC,
+        max_zones: int = _DEFAULT_MAX_ZONES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl_sec = max(0.0, float(ttl_sec))
+        self._max_zones = max(1, int(max_zones))
+        self._clock = clock
+        self._entries: "OrderedDict[int, _ZoneEntry]" = OrderedDict()
+        # zone_id -> {token: устарело ли заполнение}.
+        self._pending: dict[int, dict[int, bool]] = {}
+        self._tokens = itertools.count(1)
+        self._epoch = 0
+        # Пока listener не подключён, статичная часть читается только из SQL.
+        self.connected = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reset(self) -> None:
+        """Сбрасывает всё: уведомления за время разрыва LISTEN могли потеряться."""
+        self._entries.clear()
+        self._pending.clear()
+        self._epoch += 1
+
+    def invalidate(self, zone_id: int) -> None:
+        self._entries.pop(zone_id, None)
+        pending = self._pending.get(zone_id)
+        if pending:
+            for token in pending:
+                pending[token] = True
+
+    def lookup(
+        self,
+        zone_id: int,
+        *,
+        key: CacheKey,
+        expected_bundle_revision: str = "",
+    ) -> tuple[Any, str]:
+        """Статичная часть из памяти: ``(value, "hit")`` или ``(None, причина промаха)``.
+
+        ``expected_bundle_revision`` — ``cycle_settings.bundle_revision``; пустая
+        строка означает, что цикл ревизию не фиксирует.
+        """
+        if not self.connected:
+            return None, "disconnected"
+        entry = self._entries.get(zone_id)
+        if entry is None:
+            return None, "untracked"
+        if self._clock() >= entry.expires_at:
+            self._entries.pop(zone_id, None)
+            return None, "expired"
+        if entry.key != key or (expected_bundle_revision and expected_bundle_revision != entry.bundle_revision):
+            self._entries.pop(zone_id, None)
+            return None, "revision"
+        self._entries.move_to_end(zone_id)
+        return entry.value, "hit"
+
+    def begin_fill(self, zone_id: int) -> Optional[tuple[int, int]]:
+        """Начинает SQL-заполнение: инвалидации до ``complete_fill`` отменяют его."""
+        if not self.connected:
+            return None
+        token = next(self._tokens)
+        self._pending.setdefault(zone_id, {})[token] = False
+        return self._epoch, token
+
+    def abort_fill(self, zone_id: int, fill: Optional[tuple[int, int]]) -> None:
+        if fill is None:
+            return
+        pending = self._pending.get(zone_id)
+        if pending is None:
+            return
+        pending.pop(fill[1], None)
+        if not pending:
+            self._pending.pop(zone_id, None)
+
+    def complete_fill(
+        self,
+        zone_id: int,
+        fill: Optional[tuple[int, int]],
+        *,
+        key: CacheKey,
+        bundle_revision: str,
+        value: Any,
+        max_age_sec: Optional[float] = None,
+    ) -> None:
+        """Сохраняет прочитанную статичную часть.
+
+        ``max_age_sec`` — до ближайшей границы ``valid_from``/``valid_to``
+        калибровок зоны: после неё выбор активной калибровки меняется без NOTIFY.
+        """
+        if fill is None:
+            return
+        stale = self._pending.get(zone_id, {}).get(fill[1])
+        self.abort_fill(zone_id, fill)
+        if stale is None or stale or fill[0] != self._epoch or not self.connected:
+            return
+        ttl_sec = self._ttl_sec
+        if max_age_sec is not None:
+            ttl_sec = min(ttl_sec, max(0.0, float(max_age_sec)))
+        if ttl_sec <= 0:
+            return
+        self._entries[zone_id] = _ZoneEntry(
+            key=key,
+            bundle_revision=bundle_revision,
+            value=value,
+            expires_at=self._clock() + ttl_sec,
+        )
+        self._entries.move_to_end(zone_id)
+        while len(self._entries) > self._max_zones:
+            self._entries.popitem(last=False)
+
+
+class ZoneConfigListener(PgNotifyListener):
+    """Слушает NOTIFY ae_zone_config_changed и инвалидирует ``ZoneSnapshotStaticCache``."""
+
+    def __init__(self, dsn: str, cache: ZoneSnapshotStaticCache) -> None:
+        super().__init__(dsn, channel=_CHANNEL, listener_name=_LISTENER_NAME)
+        self._cache = cache
+
+    async def _on_connected(self) -> None:
+        # Записи, сохранённые до разрыва, могли пропустить инвалидацию.
+        self._cache.reset()
+        self._cache.connected = True
+
+    def _on_disconnected(self) -> None:
+        self._cache.connected = False
+        self._cache.reset()
+
+    def _notify_handler(
+        self,
+        conn: asyncpg.Connection,  # noqa: ARG002
+        pid: int,  # noqa: ARG002
+        channel: str,
+        payload: str,
+    ) -> None:
+        data = self._parse_payload(channel=channel, payload=payload)
+        if data is None:
+            return
+        zone_id = data.get("zone_id")
+        logger.debug(
+            "ZoneConfigListener: получен notify zone_id=%s source=%s op=%s",
+            zone_id,
+            data.get("source"),
+            data.get("op"),
+        )
+        if zone_id is None:
+            self._cache.reset()
+            return
+        try:
+            self._cache.invalidate(int(zone_id))
+        except (TypeError, ValueError):
+            LISTENER_INVALID_PAYLOAD.labels(listener=_LISTENER_NAME).inc()
+            self._cache.reset()
+
+    def _parse_payload(self, *, channel: str, payload: str) -> Optional[dict[str, Any]]:
+        try:
+            data: dict[str, Any] = json.loads(payload)
+        except json.JSONDecodeError:
+            LISTENER_INVALID_PAYLOAD.labels(listener=_LISTENER_NAME).inc()
+            logger.warning(
+                "ZoneConfigListener: получен некорректный JSON payload в channel=%s payload=%r",
+                channel,
+                payload,
+            )
+            # Какую зону инвалидировать — неизвестно, безопаснее сбросить всё.
+            self._cache.reset()
+            return None
+
+        if not isinstance(data, dict):
+            LISTENER_INVALID_PAYLOAD.labels(listener=_LISTENER_NAME).inc()
+            logger.warning(
+                "ZoneConfigListener: payload не является object в channel=%s payload=%r",
+                channel,
+                payload,
+            )
+            self._cache.reset()
+            return None
+
+        return data
+
+
+__all__ = ["ZoneConfigListener", "ZoneSnapshotStaticCache"]
@@ -10,6 +10,7 @@ from typing import Any, Callable, Coroutine, Optional
 
 import asyncpg
 
+from ae3lite.infrastructure.irr_state_watch import IRR_STATE_SNAPSHOT_EVENT_TYPE, IrrStateWatch
 from ae3lite.infrastructure.metrics import (
     LISTENER_CONNECTED,
     LISTENER_INVALID_PAYLOAD,
@@ -37,9 +38,11 @@ class ZoneEventListener:
         on_zone_event: Callable[[dict[str, Any]], Coroutine[Any, Any, None]],
         *,
         replay_lookback_minutes: int = 5,
+        irr_state_watch: IrrStateWatch | None = None,
     ) -> None:
         self._dsn = dsn
         self._on_zone_event = on_zone_event
+        self._irr_state_watch = irr_state_watch
         self._stop_event: asyncio.Event = asyncio.Event()
         self._replay_on_connect = True
         self._replay_lookback_minutes = max(1, int(replay_lookback_minutes))
@@ -81,6 +84,10 @@ class ZoneEventListener:
                 await self._replay_missed_zone_events(conn)
                 self._replay_on_connect = False
             await conn.add_listener(_CHANNEL, self._notify_handler)
+            if self._irr_state_watch is not None:
+                self._irr_state_watch.connected = True
+                # Snapshot'ы за время разрыва не пришли: ожидающие probe перечитывают zone_events.
+                self._irr_state_watch.wake_all()
             while not self._stop_event.is_set():
                 try:
                     await asyncio.wait_for(
@@ -90,6 +97,9 @@ class ZoneEventListener:
                 except asyncio.TimeoutError:
                     await conn.execute("SELECT 1")
         finally:
+            if self._irr_state_watch is not None:
+                self._irr_state_watch.connected = False
+                self._irr_state_watch.wake_all()
             try:
                 await conn.remove_listener(_CHANNEL, self._notify_handler)
             except Exception:
@@ -162,8 +172,26 @@ class ZoneEventListener:
             data.get("event_type"),
             data.get("channel"),
         )
+        self._wake_irr_state_watch(data)
         asyncio.get_running_loop().create_task(self._dispatch(data))
 
+    def _wake_irr_state_watch(self, data: dict[str, Any]) -> None:
+        if self._irr_state_watch is None:
+            return
+        if str(data.get("event_type") or "").strip().upper() != IRR_STATE_SNAPSHOT_EVENT_TYPE:
+            return
+        try:
+            zone_id = int(data.get("zone_id"))
+        except (TypeError, ValueError):
+            return
+        woken = self._irr_state_watch.snapshot_ingested(zone_id, data.get("cmd_id"))
+        logger.debug(
+            "ZoneEventListener: IRR_STATE_SNAPSHOT notify zone_id=%s cmd_id=%s woken=%s",
+            zone_id,
+            data.get("cmd_id"),
+            woken,
+        )
+
     def _parse_payload(self, *, channel: str, payload: str) -> Optional[dict[str, Any]]:
         try:
             data: dict[str, Any] = json.loads(payload)
@@ -34,6 +34,10 @@ from ae3lite.api.responses import build_start_cycle_response
 from ae3lite.api.security import validate_scheduler_security_baseline
 from ae3lite.api.validation import validate_scheduler_zone
 from ae3lite.domain.errors import ManualControlError
+from ae3lite.infrastructure.command_terminal_listener import CommandTerminalListener
+from ae3lite.infrastructure.telemetry_sample_listener import TelemetrySamplesListener
+from ae3lite.infrastructure.task_pending_listener import TaskPendingListener
+from ae3lite.infrastructure.zone_config_listener import ZoneConfigListener
 from ae3lite.infrastructure.intent_status_listener import IntentStatusListener
 from ae3lite.infrastructure.metrics import NODE_RUNTIME_EVENT_KICK, initialize_counter_series
 from ae3lite.infrastructure.zone_event_listener import ZoneEventListener
@@ -232,6 +236,19 @@ def _build_intent_listener_callback(*, worker: Any, logger: logging.Logger) -> A
     return _on_terminal_intent
 
 
+def _build_task_pending_listener_callback(*, worker: Any, logger: logging.Logger) -> Any:
+    async def _on_task_pending(data: dict[str, Any]) -> None:
+        logger.debug(
+            "TaskPendingListener: pending task notify task_id=%s zone_id=%s reconnected=%s; kicking worker",
+            data.get("task_id"),
+            data.get("zone_id"),
+            bool(data.get("reconnected")),
+        )
+        worker.kick()
+
+    return _on_task_pending
+
+
 def _coerce_optional_bool(value: Any) -> bool | None:
     if isinstance(value, bool):
         return value
@@ -542,6 +559,14 @@ def create_app(config: Optional[Ae3RuntimeConfig] = None) -> FastAPI:
         intent_listener: Optional[IntentStatusListener] = None
         zone_event_listener_task: Optional[asyncio.Task] = None
         zone_event_listener: Optional[ZoneEventListener] = None
+        command_terminal_listener_task: Optional[asyncio.Task] = None
+        command_terminal_listener: Optional[CommandTerminalListener] = None
+        telemetry_samples_listener_task: Optional[asyncio.Task] = None
+        telemetry_samples_listener: Optional[TelemetrySamplesListener] = None
+        task_pending_listener_task: Optional[asyncio.Task] = None
+        task_pending_listener: Optional[TaskPendingListener] = None
+        zone_config_listener_task: Optional[asyncio.Task] = None
+        zone_config_listener: Optional[ZoneConfigListener] = None
         if runtime_config.db_dsn:
             intent_listener = IntentStatusListener(
                 dsn=runtime_config.db_dsn,
@@ -562,6 +587,7 @@ def create_app(config: Optional[Ae3RuntimeConfig] = None) -> FastAPI:
                     now_fn=_utcnow,
                     logger=logger,
                 ),
+                irr_state_watch=bundle.irr_state_watch,
             )
             zone_event_listener_task = _spawn_background_task(
                 zone_event_listener.run(),
@@ -569,6 +595,50 @@ def create_app(config: Optional[Ae3RuntimeConfig] = None) -> FastAPI:
                 task_name="ae3-zone-event-listener",
             )
             critical_background_tasks["ae3-zone-event-listener"] = zone_event_listener_task
+            if bundle.command_terminal_waiters is not None:
+                command_terminal_listener = CommandTerminalListener(
+                    dsn=runtime_config.db_dsn,
+                    waiters=bundle.command_terminal_waiters,
+                )
+                command_terminal_listener_task = _spawn_background_task(
+                    command_terminal_listener.run(),
+                    background_tasks=background_tasks,
+                    task_name="ae3-command-terminal-listener",
+                )
+                critical_background_tasks["ae3-command-terminal-listener"] = command_terminal_listener_task
+            if bundle.telemetry_sample_buffers is not None:
+                telemetry_samples_listener = TelemetrySamplesListener(
+                    dsn=runtime_config.db_dsn,
+                    buffers=bundle.telemetry_sample_buffers,
+                )
+                telemetry_samples_listener_task = _spawn_background_task(
+                    telemetry_samples_listener.run(),
+                    background_tasks=background_tasks,
+                    task_name="ae3-telemetry-samples-listener",
+                )
+                critical_background_tasks["ae3-telemetry-samples-listener"] = telemetry_samples_listener_task
+            if runtime_config.task_pending_notify_enabled:
+                task_pending_listener = TaskPendingListener(
+                    dsn=runtime_config.db_dsn,
+                    on_task_pending=_build_task_pending_listener_callback(worker=bundle.worker, logger=logger),
+                )
+                task_pending_listener_task = _spawn_background_task(
+                    task_pending_listener.run(),
+                    background_tasks=background_tasks,
+                    task_name="ae3-task-pending-listener",
+                )
+                critical_background_tasks["ae3-task-pending-listener"] = task_pending_listener_task
+            if bundle.zone_snapshot_static_cache is not None:
+                zone_config_listener = ZoneConfigListener(
+                    dsn=runtime_config.db_dsn,
+                    cache=bundle.zone_snapshot_static_cache,
+                )
+                zone_config_listener_task = _spawn_background_task(
+                    zone_config_listener.run(),
+                    background_tasks=background_tasks,
+                    task_name="ae3-zone-config-listener",
+                )
+                critical_background_tasks["ae3-zone-config-listener"] = zone_config_listener_task
 
         try:
             yield
@@ -577,6 +647,14 @@ def create_app(config: Optional[Ae3RuntimeConfig] = None) -> FastAPI:
                 intent_listener.stop()
             if zone_event_listener_task is not None and not zone_event_listener_task.done():
                 zone_event_listener.stop()
+            if command_terminal_listener_task is not None and not command_terminal_listener_task.done():
+                command_terminal_listener.stop()
+            if telemetry_samples_listener_task is not None and not telemetry_samples_listener_task.done():
+                telemetry_samples_listener.stop()
+            if task_pending_listener_task is not None and not task_pending_listener_task.done():
+                task_pending_listener.stop()
+            if zone_config_listener_task is not None and not zone_config_listener_task.done():
+                zone_config_listener.stop()
             await bundle.worker.shutdown(grace_sec=runtime_config.shutdown_grace_sec)
             await _drain_background_tasks(background_tasks)
             await bundle.http_client.aclose()
@@ -28,6 +28,10 @@ from ae3lite.application.use_cases.workflow_router import WorkflowRouter
 from ae3lite.domain.services.cycle_start_planner import CycleStartPlanner
 from ae3lite.domain.services.irrigation_decision_controller import IrrigationDecisionController
 from ae3lite.infrastructure.clients import HistoryLoggerClient
+from ae3lite.infrastructure.command_terminal_listener import CommandTerminalWaiters
+from ae3lite.infrastructure.irr_state_watch import IrrStateWatch
+from ae3lite.infrastructure.telemetry_sample_listener import TelemetrySampleBuffers
+from ae3lite.infrastructure.zone_config_listener import ZoneSnapshotStaticCache
 from ae3lite.infrastructure.gateways import SequentialCommandGateway
 from ae3lite.infrastructure.read_models import PgTaskStatusReadModel, PgZoneRuntimeMonitor, PgZoneSnapshotReadModel
 from ae3lite.infrastructure.repositories import (
@@ -62,6 +66,10 @@ class Ae3RuntimeBundle:
     worker: Ae3RuntimeWorker
     http_client: httpx.AsyncClient
     history_logger_client: HistoryLoggerClient
+    command_terminal_waiters: CommandTerminalWaiters | None = None
+    telemetry_sample_buffers: TelemetrySampleBuffers | None = None
+    irr_state_watch: IrrStateWatch | None = None
+    zone_snapshot_static_cache: ZoneSnapshotStaticCache | None = None
 
 
 def build_ae3_runtime_bundle(
@@ -102,6 +110,7 @@ def build_ae3_runtime_bundle(
         zone_intent_repository=zone_intent_repository,
         zone_alert_repository=zone_alert_repository,
     )
+    command_terminal_waiters = CommandTerminalWaiters() if config.command_terminal_notify_enabled else None
     command_gateway = SequentialCommandGateway(
         task_repository=task_repository,
         command_repository=command_repository,
@@ -109,6 +118,8 @@ def build_ae3_runtime_bundle(
         poll_interval_sec=config.reconcile_poll_interval_sec,
         command_poll_default_sec=config.command_poll_default_sec,
         command_poll_margin_sec=config.command_poll_margin_sec,
+        terminal_waiters=command_terminal_waiters,
+        terminal_safety_poll_sec=config.command_terminal_safety_poll_sec,
     )
     workflow_repository = PgZoneWorkflowRepository()
     alert_repository = BizAlertPublisher()
@@ -150,7 +161,30 @@ def build_ae3_runtime_bundle(
     )
     pid_state_repository = PgPidStateRepository()
     correction_authority_repository = PgZoneCorrectionAuthorityRepository()
-    runtime_monitor = PgZoneRuntimeMonitor()
+    telemetry_sample_buffers = (
+        TelemetrySampleBuffers(
+            capacity=config.telemetry_window_buffer_capacity,
+            verify_interval_sec=config.telemetry_window_buffer_verify_sec,
+        )
+        if config.telemetry_window_buffer_enabled
+        else None
+    )
+    irr_state_watch = (
+        IrrStateWatch(safety_poll_sec=config.irr_state_watch_safety_poll_sec)
+        if config.irr_state_watch_enabled
+        else None
+    )
+    zone_snapshot_static_cache = (
+        ZoneSnapshotStaticCache(ttl_sec=config.zone_snapshot_cache_ttl_sec)
+        if config.zone_snapshot_cache_enabled
+        else None
+    )
+    zone_snapshot_read_model = PgZoneSnapshotReadModel(static_cache=zone_snapshot_static_cache)
+    runtime_monitor = PgZoneRuntimeMonitor(
+        sample_buffers=telemetry_sample_buffers,
+        irr_state_watch=irr_state_watch,
+        zone_snapshot_read_model=zone_snapshot_read_model,
+    )
     irrigation_decision_controller = IrrigationDecisionController()
 
     workflow_router = WorkflowRouter(
@@ -174,7 +208,7 @@ def build_ae3_runtime_bundle(
         idle_poll_interval_sec=config.reconcile_poll_interval_sec,
         execute_task_use_case=ExecuteTaskUseCase(
             task_repository=task_repository,
-            zone_snapshot_read_model=PgZoneSnapshotReadModel(),
+            zone_snapshot_read_model=zone_snapshot_read_model,
             planner=CycleStartPlanner(),
             command_gateway=command_gateway,
             workflow_router=workflow_router,
@@ -254,4 +288,8 @@ def build_ae3_runtime_bundle(
         worker=worker,
         http_client=http_client,
         history_logger_client=history_logger_client,
+        command_terminal_waiters=command_terminal_waiters,
+        telemetry_sample_buffers=telemetry_sample_buffers,
+        irr_state_watch=irr_state_watch,
+        zone_snapshot_static_cache=zone_snapshot_static_cache,
     )
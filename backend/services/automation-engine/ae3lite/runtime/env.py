@@ -59,6 +59,16 @@ class Ae3RuntimeConfig:
     correction_interrupt_verify_grace_sec: int
     correction_interrupt_irr_state_max_age_sec: int
     correction_interrupt_replay_irrigation: bool
+    command_terminal_notify_enabled: bool = True
+    command_terminal_safety_poll_sec: float = 5.0
+    telemetry_window_buffer_enabled: bool = True
+    telemetry_window_buffer_capacity: int = 256
+    telemetry_window_buffer_verify_sec: float = 300.0
+    irr_state_watch_enabled: bool = True
+    irr_state_watch_safety_poll_sec: float = 2.0
+    task_pending_notify_enabled: bool = True
+    zone_snapshot_cache_enabled: bool = True
+    zone_snapshot_cache_ttl_sec: float = 300.0
 
     @classmethod
     def from_env(cls) -> "Ae3RuntimeConfig":
@@ -207,6 +217,40 @@ class Ae3RuntimeConfig:
                 "AE_CORRECTION_INTERRUPT_REPLAY_IRRIGATION",
                 "0",
             ),
+            # LISTEN ae_command_status: terminal-статус команды будит ожидание сразу,
+            # опрос commands остаётся safety net раз в AE_COMMAND_TERMINAL_SAFETY_POLL_SEC.
+            command_terminal_notify_enabled=_env_true("AE_COMMAND_TERMINAL_NOTIFY_ENABLED", "1"),
+            command_terminal_safety_poll_sec=max(
+                0.5,
+                float(os.getenv("AE_COMMAND_TERMINAL_SAFETY_POLL_SEC", "5")),
+            ),
+            # LISTEN telemetry_samples_committed: окна коррекции читаются из in-memory
+            # буферов по сенсору; SQL — fallback при промахе/разрыве и раз в VERIFY_SEC.
+            telemetry_window_buffer_enabled=_env_true("AE_TELEMETRY_WINDOW_BUFFER_ENABLED", "1"),
+            telemetry_window_buffer_capacity=max(
+                16,
+                int(os.getenv("AE_TELEMETRY_WINDOW_BUFFER_CAPACITY", "256")),
+            ),
+            telemetry_window_buffer_verify_sec=max(
+                0.0,
+                float(os.getenv("AE_TELEMETRY_WINDOW_BUFFER_VERIFY_SEC", "300")),
+            ),
+            # Probe IRR state ждёт push IRR_STATE_SNAPSHOT через LISTEN ae_zone_event;
+            # чтение zone_events без уведомления — раз в AE_IRR_STATE_WATCH_SAFETY_POLL_SEC.
+            irr_state_watch_enabled=_env_true("AE_IRR_STATE_WATCH_ENABLED", "1"),
+            irr_state_watch_safety_poll_sec=max(
+                0.2,
+                float(os.getenv("AE_IRR_STATE_WATCH_SAFETY_POLL_SEC", "2")),
+            ),
+            # LISTEN ae_task_pending: новая pending-задача (в т.ч. от другого экземпляра) будит drain.
+            task_pending_notify_enabled=_env_true("AE_TASK_PENDING_NOTIFY_ENABLED", "1"),
+            # Статичная часть ZoneSnapshot (bundle, каналы, калибровки) кешируется по зоне
+            # до NOTIFY ae_zone_config_changed или смены ревизии; не дольше TTL_SEC.
+            zone_snapshot_cache_enabled=_env_true("AE_ZONE_SNAPSHOT_CACHE_ENABLED", "1"),
+            zone_snapshot_cache_ttl_sec=max(
+                1.0,
+                float(os.getenv("AE_ZONE_SNAPSHOT_CACHE_TTL_SEC", "300")),
+            ),
         )
 
     @staticmethod
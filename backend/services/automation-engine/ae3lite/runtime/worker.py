@@ -16,8 +16,10 @@ from ae3lite.application.use_cases.execute_task import (
 from ae3lite.infrastructure.log_context import log_context_scope
 from ae3lite.infrastructure.metrics import (
     ACTIVE_TASKS,
+    CLAIM_BATCH_SIZE,
     CLAIM_ROLLBACK_FAILED,
     DRAIN_CRASHES,
+    DRAIN_WAKEUPS,
     INTENT_SYNC_FAILED,
     LEASE_HEARTBEAT_FAILED,
     RECONCILE_CONSECUTIVE_ERRORS,
@@ -128,6 +130,8 @@ class Ae3RuntimeWorker:
         self._last_drain_exit_reason = "idle"
         self._reconcile_loop_task: Optional[Any] = None
         self._reconcile_wake = asyncio.Event()
+        # Будит drain-цикл, ждущий задачи в работе, на kick (API, LISTEN, таймер due_at).
+        self._drain_wake = asyncio.Event()
         self._shutting_down = False
         self._shutdown_grace_sec = max(0.0, float(shutdown_grace_sec))
         self._active_shutdown_grace_sec: float | None = None
@@ -152,6 +156,7 @@ class Ae3RuntimeWorker:
         self._cancel_wake_task()
         self._ensure_waiting_command_reconcile_loop()
         self._reconcile_wake.set()
+        self._drain_wake.set()
         self._log_debug(
             "AE3 runtime kick received: pending_kicks=%s has_drain_task=%s",
             self._pending_kicks,
@@ -247,6 +252,7 @@ class Ae3RuntimeWorker:
         self._log_debug("AE3 runtime shutdown started: grace_sec=%.3f", effective_grace)
         self._cancel_wake_task()
         self._reconcile_wake.set()
+        self._drain_wake.set()
         reconcile_loop = self._reconcile_loop_task
         if reconcile_loop is not None and not reconcile_loop.done():
             reconcile_loop.cancel()
@@ -731,63 +737,54 @@ class Ae3RuntimeWorker:
         inflight: set[asyncio.Task] = set()
         try:
             while not self._shutting_down:
-                while not self._shutting_down and len(inflight) < self._max_parallel_tasks:
-                    claimed = await self._claim_next_task_safe()
-                    if claimed is None:
-                        break
+                # Kick, пришедший во время claim или выполнения, взведёт событие заново.
+                self._drain_wake.clear()
+                free_slots = self._max_parallel_tasks - len(inflight)
+                if free_slots > 0:
+                    claimed_batch = await self._claim_task_batch_safe(limit=free_slots)
+                    CLAIM_BATCH_SIZE.observe(len(claimed_batch))
+                    if claimed_batch:
+                        self._pending_kicks = 0
+                    for task, _lease in claimed_batch:
+                        self._log_debug("AE3 runtime claimed task: task_id=%s zone_id=%s", task.id, task.zone_id)
+                        worker_task = asyncio.create_task(
+                            self._execute_claimed_task_safe(task=task),
+                            name=f"ae3lite_claimed_task:{task.id}",
+                        )
+                        inflight.add(worker_task)
+                        self._inflight_automation_tasks[worker_task] = task
 
-                    self._pending_kicks = 0
-                    task, _lease = claimed
-                    self._log_debug("AE3 runtime claimed task: task_id=%s zone_id=%s", task.id, task.zone_id)
-                    worker_task = asyncio.create_task(
-                        self._execute_claimed_task_safe(task=task),
-                        name=f"ae3lite_claimed_task:{task.id}",
-                    )
-                    inflight.add(worker_task)
-                    self._inflight_automation_tasks[worker_task] = task
+                if self._shutting_down:
+                    break
 
                 if inflight:
-                    done, _pending = await asyncio.wait(
-                        inflight,
-                        timeout=0.0,
-                        return_when=asyncio.FIRST_COMPLETED,
-                    )
+                    if len(inflight) < self._max_parallel_tasks and self._wake_handle is None:
+                        # Свободные слоты: будущая due-задача разбудит цикл таймером, а не опросом.
+                        await self._schedule_wake_for_next_pending()
+                    done = await self._wait_inflight_or_wake(inflight)
                     if not done:
-                        await asyncio.sleep(0.01)
+                        DRAIN_WAKEUPS.labels(reason="kick").inc()
                         continue
+                    DRAIN_WAKEUPS.labels(reason="task_done").inc()
                     for done_task in done:
                         inflight.discard(done_task)
                         self._inflight_automation_tasks.pop(done_task, None)
                         await self._await_inflight_task_result(done_task)
                     continue
 
-                if self._shutting_down:
-                    break
-
-                claimed = await self._claim_next_task_safe()
-                if claimed is None:
-                    if self._pending_kicks > 0:
-                        self._log_debug("AE3 runtime drain retrying after deferred kick")
-                        self._pending_kicks = 0
-                        continue
-                    if await self._schedule_wake_for_next_pending():
-                        self._log_debug("AE3 runtime drain sleeping until next due task")
-                        drain_ok = True
-                        drain_reason = "sleeping"
-                        return
-                    self._log_debug("AE3 runtime drain idle: no pending tasks")
+                if self._pending_kicks > 0:
+                    self._log_debug("AE3 runtime drain retrying after deferred kick")
+                    self._pending_kicks = 0
+                    continue
+                if await self._schedule_wake_for_next_pending():
+                    self._log_debug("AE3 runtime drain sleeping until next due task")
                     drain_ok = True
-                    drain_reason = "idle"
+                    drain_reason = "sleeping"
                     return
-                self._pending_kicks = 0
-                task, _lease = claimed
-                self._log_debug("AE3 runtime claimed task: task_id=%s zone_id=%s", task.id, task.zone_id)
-                worker_task = asyncio.create_task(
-                    self._execute_claimed_task_safe(task=task),
-                    name=f"ae3lite_claimed_task:{task.id}",
-                )
-                inflight.add(worker_task)
-                self._inflight_automation_tasks[worker_task] = task
+                self._log_debug("AE3 runtime drain idle: no pending tasks")
+                drain_ok = True
+                drain_reason = "idle"
+                return
 
             if inflight:
                 await self._finalize_inflight_on_shutdown(inflight)
@@ -807,6 +804,44 @@ class Ae3RuntimeWorker:
             self._last_drain_exit_ok = drain_ok
             self._last_drain_exit_reason = drain_reason
 
+    async def _wait_inflight_or_wake(self, inflight: set[asyncio.Task]) -> set[asyncio.Task]:
+        """Ждёт завершения любой задачи или kick без таймаута; пустой set — разбудил kick."""
+        wake_waiter = asyncio.ensure_future(self._drain_wake.wait())
+        try:
+            done, _pending = await asyncio.wait(
+                {*inflight, wake_waiter},
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            if not wake_waiter.done():
+                wake_waiter.cancel()
+                with suppress(asyncio.CancelledError):
+                    await wake_waiter
+        done.discard(wake_waiter)
+        return done
+
+    async def _claim_task_batch_safe(self, *, limit: int) -> list[tuple[Any, Any]]:
+        run_batch = getattr(self._claim_next_task_use_case, "run_batch", None)
+        if not callable(run_batch):
+            claimed: list[tuple[Any, Any]] = []
+            while len(claimed) < limit:
+                item = await self._claim_next_task_safe()
+                if item is None:
+                    break
+                claimed.append(item)
+            return claimed
+        try:
+            return list(await run_batch(owner=self._owner, now=self._now_fn(), limit=limit))
+        except TaskClaimRollbackError as exc:
+            CLAIM_ROLLBACK_FAILED.inc()
+            self._logger.error(
+                "AE3 claim rollback failed after zone lease conflict; "
+                "task escalated via fail_for_recovery when possible: owner=%s error=%s",
+                self._owner,
+                exc,
+            )
+            return []
+
     async def _claim_next_task_safe(self) -> tuple[Any, Any] | None:
         try:
             return await self._claim_next_task_use_case.run(owner=self._owner, now=self._now_fn())
@@ -1713,6 +1748,7 @@ class Ae3RuntimeWorker:
                     self._drain_task,
                 )
                 self._pending_kicks += 1
+                self._drain_wake.set()
                 self._arm_respawn_on_done(self._drain_task)
                 return
             self._log_debug(
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Бенчмарк drain-цикла ``Ae3RuntimeWorker``: задержка dispatch новой задачи
+и CPU процесса, пока задачи в работе, в режимах ``event`` (ожидание
+FIRST_COMPLETED + kick, как сейчас) и ``spin`` (прежний опрос
+``asyncio.wait(timeout=0)`` + ``sleep(0.01)`` с claim на каждом шаге).
+
+БД не нужна: claim use case — in-memory очередь, выполнение задачи ждёт
+событие. ``spin`` воспроизводит прежний цикл подменой ожидания в подклассе.
+
+    cd backend/services/automation-engine
+    python scripts/bench_worker_drain.py --inflight 3 --idle-sec 2 --dispatches 50
+"""
+
+__test__ = False
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+for path in (SERVICE_DIR, SERVICE_DIR.parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from ae3lite.runtime.worker import Ae3RuntimeWorker  # noqa: E402
+
+
+class _SpinWorker(Ae3RuntimeWorker):
+    """Прежнее ожидание: опрос inflight без блокировки и повторный claim раз в 10 мс."""
+
+    async def _wait_inflight_or_wake(self, inflight):
+        done, _pending = await asyncio.wait(inflight, timeout=0.0, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            await asyncio.sleep(0.01)
+        return done
+
+
+class _Queue:
+    def __init__(self) -> None:
+        self.pending: list[SimpleNamespace] = []
+        self.claims = 0
+
+    async def run_batch(self, *, owner, now, limit):
+        self.claims += 1
+        batch, self.pending = self.pending[:limit], self.pending[limit:]
+        return [(task, SimpleNamespace(zone_id=task.zone_id)) for task in batch]
+
+    async def next_pending_due_at(self):
+        return None
+
+
+def _logger() -> object:
+    noop = staticmethod(lambda *args, **kwargs: None)
+    return type("Logger", (), {"debug": noop, "info": noop, "warning": noop, "error": noop})()
+
+
+def _build(worker_cls, queue: _Queue, execute, max_parallel: int) -> Ae3RuntimeWorker:
+    return worker_cls(
+        owner="bench",
+        claim_next_task_use_case=queue,
+        idle_poll_interval_sec=1.0,
+        execute_task_use_case=SimpleNamespace(run=execute),
+        startup_recovery_use_case=SimpleNamespace(run=AsyncMock(return_value=None)),
+        zone_lease_repository=SimpleNamespace(release=AsyncMock(return_value=True)),
+        zone_intent_repository=SimpleNamespace(mark_running=AsyncMock(), mark_terminal=AsyncMock()),
+        spawn_background_task_fn=lambda coro, **kwargs: asyncio.create_task(coro),
+        now_fn=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        logger=_logger(),
+        lease_ttl_sec=120,
+        max_task_execution_sec=900,
+        max_parallel_tasks=max_parallel,
+        shutdown_grace_sec=1.0,
+    )
+
+
+async def _run_mode(worker_cls, *, inflight: int, idle_sec: float, dispatches: int) -> dict:
+    queue = _Queue()
+    hold = asyncio.Event()
+    started: dict[int, float] = {}
+    started_event = asyncio.Event()
+
+    async def _execute(*, task, **_kwargs):
+        started[task.id] = time.perf_counter()
+        started_event.set()
+        if task.id < 0:
+            await hold.wait()
+
+    worker = _build(worker_cls, queue, AsyncMock(side_effect=_execute), max_parallel=inflight + 1)
+    queue.pending = [SimpleNamespace(id=-(i + 1), zone_id=1000 + i, intent_id=0, topology="bench") for i in range(inflight)]
+    worker.kick()
+    while len(started) < inflight:
+        await asyncio.sleep(0.005)
+
+    # Задачи в работе, свободный слот есть, новых задач нет: сколько CPU тратит цикл.
+    claims_before = queue.claims
+    cpu_before = time.process_time()
+    await asyncio.sleep(idle_sec)
+    idle_cpu_pct = 100.0 * (time.process_time() - cpu_before) / idle_sec
+    idle_claims_per_sec = (queue.claims - claims_before) / idle_sec
+
+    latencies_ms: list[float] = []
+    for task_id in range(1, dispatches + 1):
+        started_event.clear()
+        queue.pending.append(SimpleNamespace(id=task_id, zone_id=task_id, intent_id=0, topology="bench"))
+        enqueued = time.perf_counter()
+        worker.kick()
+        while task_id not in started:
+            started_event.clear()
+            await started_event.wait()
+        latencies_ms.append((started[task_id] - enqueued) * 1000.0)
+        await asyncio.sleep(0.003)
+
+    hold.set()
+    await worker.shutdown(grace_sec=1.0)
+    return {
+        "idle_cpu_pct": idle_cpu_pct,
+        "idle_claims_per_sec": idle_claims_per_sec,
+        "p50_ms": statistics.median(latencies_ms),
+        "max_ms": max(latencies_ms),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inflight", type=int, default=3, help="долгих задач в работе во время замера")
+    parser.add_argument("--idle-sec", type=float, default=2.0)
+    parser.add_argument("--dispatches", type=int, default=50)
+    args = parser.parse_args()
+
+    for mode, worker_cls in (("spin", _SpinWorker), ("event", Ae3RuntimeWorker)):
+        result = asyncio.run(
+            _run_mode(worker_cls, inflight=args.inflight, idle_sec=args.idle_sec, dispatches=args.dispatches)
+        )
+        print(
+            f"{mode:>5}: idle_cpu={result['idle_cpu_pct']:.2f}% idle_claims={result['idle_claims_per_sec']:.0f}/s "
+            f"dispatch_p50={result['p50_ms']:.3f}ms dispatch_max={result['max_ms']:.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
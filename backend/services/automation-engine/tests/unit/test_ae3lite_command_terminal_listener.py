@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from ae3lite.infrastructure.command_terminal_listener import CommandTerminalListener, CommandTerminalWaiters
+from ae3lite.infrastructure.metrics import LISTENER_INVALID_PAYLOAD
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_waiters_notify_wakes_registered_waiter() -> None:
+    waiters = CommandTerminalWaiters()
+    event = waiters.register("cmd-1")
+
+    asyncio.get_running_loop().call_later(0.01, waiters.notify, "cmd-1")
+
+    assert await waiters.wait(event, timeout=5.0) is True
+    assert await waiters.wait(event, timeout=0.01) is False
+    waiters.unregister("cmd-1", event)
+    assert waiters._waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_waiters_remember_notify_that_arrives_before_register() -> None:
+    clock = _Clock()
+    waiters = CommandTerminalWaiters(recent_ttl_sec=30.0, clock=clock)
+
+    assert waiters.notify("fast-cmd") == 0
+    assert waiters.register("fast-cmd").is_set()
+
+    waiters.notify("stale-cmd")
+    clock.now += 31.0
+    assert not waiters.register("stale-cmd").is_set()
+
+
+def test_waiters_recent_notifications_are_bounded() -> None:
+    waiters = CommandTerminalWaiters(recent_max_size=2)
+    for cmd_id in ("a", "b", "c"):
+        waiters.notify(cmd_id)
+    assert list(waiters._recent) == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_listener_wakes_only_on_terminal_status() -> None:
+    waiters = CommandTerminalWaiters()
+    listener = CommandTerminalListener(dsn="postgresql://unused", waiters=waiters)
+    event = waiters.register("cmd-7")
+
+    listener._notify_handler(None, 0, "ae_command_status", json.dumps({"cmd_id": "cmd-7", "status": "ACK"}))
+    assert not event.is_set()
+
+    listener._notify_handler(None, 0, "ae_command_status", json.dumps({"cmd_id": "cmd-7", "status": "DONE", "zone_id": 1}))
+    assert event.is_set()
+
+
+def test_listener_payload_without_cmd_id_increments_metric() -> None:
+    before = LISTENER_INVALID_PAYLOAD.labels(listener="command_status")._value.get()
+    listener = CommandTerminalListener(dsn="postgresql://unused", waiters=CommandTerminalWaiters())
+    listener._notify_handler(None, 0, "ae_command_status", json.dumps({"status": "DONE"}))
+    listener._notify_handler(None, 0, "ae_command_status", "not-json")
+    after = LISTENER_INVALID_PAYLOAD.labels(listener="command_status")._value.get()
+    assert after == before + 2
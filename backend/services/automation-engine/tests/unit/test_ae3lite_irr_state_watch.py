@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from time import monotonic
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+
+from _test_support_runtime_plan import make_runtime_plan
+from ae3lite.application.handlers.startup import StartupHandler
+from ae3lite.infrastructure.irr_state_watch import IrrStateWatch
+from ae3lite.infrastructure.metrics import IRR_STATE_PROBE_READS
+from ae3lite.infrastructure.zone_event_listener import ZoneEventListener
+
+_RUNTIME = make_runtime_plan(
+    irr_state_max_age_sec=60,
+    irr_state_wait_timeout_sec=10.0,
+    irr_state_wait_poll_interval_sec=5.0,
+)
+
+
+@pytest.mark.asyncio
+async def test_watch_wakes_probe_by_cmd_id_and_zone_wildcard() -> None:
+    watch = IrrStateWatch()
+    by_cmd = watch.watch(30, "probe-1")
+    any_cmd = watch.watch(30, None)
+    other_zone = watch.watch(31, "probe-1")
+
+    assert watch.snapshot_ingested(30, "probe-1") == 2
+    assert by_cmd.is_set() and any_cmd.is_set()
+    assert not other_zone.is_set()
+
+    watch.unwatch(30, "probe-1", by_cmd)
+    watch.unwatch(30, None, any_cmd)
+    watch.unwatch(31, "probe-1", other_zone)
+    assert watch._waiters._waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_zone_event_listener_pushes_irr_snapshot_to_watch() -> None:
+    watch = IrrStateWatch()
+    on_zone_event = AsyncMock()
+    listener = ZoneEventListener(dsn="postgresql://unused", on_zone_event=on_zone_event, irr_state_watch=watch)
+    event = watch.watch(30, "probe-1")
+
+    listener._notify_handler(
+        None,
+        0,
+        "ae_zone_event",
+        json.dumps({"zone_id": 30, "event_type": "LEVEL_SWITCH_CHANGED", "cmd_id": "probe-1"}),
+    )
+    assert not event.is_set()
+    listener._notify_handler(
+        None,
+        0,
+        "ae_zone_event",
+        json.dumps({"zone_id": 30, "event_type": "IRR_STATE_SNAPSHOT", "cmd_id": "probe-1"}),
+    )
+    assert event.is_set()
+    await asyncio.sleep(0)
+    assert on_zone_event.await_count == 2
+
+
+class _Monitor:
+    def __init__(self, watch: IrrStateWatch | None) -> None:
+        self.irr_state_watch = watch
+        self.states = [
+            {"has_snapshot": False, "is_stale": False, "snapshot": None, "cmd_id": "probe-1"},
+            {"has_snapshot": True, "is_stale": False, "snapshot": {"pump_main": False}, "cmd_id": "probe-1"},
+        ]
+        self.reads = 0
+
+    async def read_latest_irr_state(self, **_kw: Any) -> dict:
+        state = self.states[min(self.reads, len(self.states) - 1)]
+        self.reads += 1
+        return state
+
+
+@pytest.mark.asyncio
+async def test_probe_rereads_snapshot_on_push_instead_of_poll_interval() -> None:
+    watch = IrrStateWatch(safety_poll_sec=5.0)
+    watch.connected = True
+    monitor = _Monitor(watch)
+    handler = StartupHandler(runtime_monitor=monitor, command_gateway=SimpleNamespace())
+    notify_reads = IRR_STATE_PROBE_READS.labels(source="notify")
+    before = notify_reads._value.get()
+
+    asyncio.get_running_loop().call_later(0.02, watch.snapshot_ingested, 30, "probe-1")
+    started = monotonic()
+    state = await handler._read_probe_state_with_retry(
+        task=SimpleNamespace(zone_id=30),
+        runtime=_RUNTIME,
+        expected={"pump_main": False},
+        expected_cmd_id="probe-1",
+    )
+
+    assert state["has_snapshot"] is True
+    assert monitor.reads == 2
+    assert monotonic() - started < 1.0
+    assert notify_reads._value.get() == before + 1
+    assert watch._waiters._waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_probe_polls_when_watch_listener_is_down() -> None:
+    watch = IrrStateWatch(safety_poll_sec=5.0)
+    monitor = _Monitor(watch)
+    handler = StartupHandler(runtime_monitor=monitor, command_gateway=SimpleNamespace())
+    runtime = make_runtime_plan(
+        irr_state_max_age_sec=60,
+        irr_state_wait_timeout_sec=5.0,
+        irr_state_wait_poll_interval_sec=0.05,
+    )
+
+    state = await handler._read_probe_state_with_retry(
+        task=SimpleNamespace(zone_id=30),
+        runtime=runtime,
+        expected={"pump_main": False},
+        expected_cmd_id="probe-1",
+    )
+
+    assert state["has_snapshot"] is True
+    assert monitor.reads == 2
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pytest
+
+from ae3lite.infrastructure import pg_notify_listener
+from ae3lite.infrastructure.command_terminal_listener import CommandTerminalListener, CommandTerminalWaiters
+from ae3lite.infrastructure.metrics import LISTENER_CONNECTED, LISTENER_RECONNECT_TOTAL
+
+
+class _FakeConnection:
+    def __init__(self, *, on_add_listener=None, fail_keepalive: bool = False) -> None:
+        self._on_add_listener = on_add_listener
+        self._fail_keepalive = fail_keepalive
+        self.listeners: list[str] = []
+        self.closed = False
+
+    async def add_listener(self, channel, handler) -> None:  # noqa: ARG002
+        self.listeners.append(channel)
+        if self._on_add_listener is not None:
+            self._on_add_listener()
+
+    async def remove_listener(self, channel, handler) -> None:  # noqa: ARG002
+        self.listeners.remove(channel)
+
+    async def execute(self, query: str) -> None:
+        assert query == "SELECT 1"
+        if self._fail_keepalive:
+            raise ConnectionError("connection lost")
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_listener_reconnects_and_runs_subclass_hooks(monkeypatch) -> None:
+    waiters = CommandTerminalWaiters()
+    listener = CommandTerminalListener(dsn="postgresql://unused", waiters=waiters)
+    listener._keepalive_interval_sec = 0.01
+    monkeypatch.setattr(pg_notify_listener, "_INITIAL_BACKOFF_SEC", 0.01)
+
+    connected_states: list[bool] = []
+
+    def _stop_after_connect() -> None:
+        listener.stop()
+
+    connections = [
+        _FakeConnection(fail_keepalive=True),
+        _FakeConnection(on_add_listener=_stop_after_connect),
+    ]
+
+    async def _connect(dsn):  # noqa: ARG001
+        connected_states.append(waiters.connected)
+        return connections[len(connected_states) - 1]
+
+    monkeypatch.setattr(pg_notify_listener.asyncpg, "connect", _connect)
+    reconnects_before = LISTENER_RECONNECT_TOTAL.labels(listener="command_status")._value.get()
+
+    await listener.run()
+
+    assert connected_states == [False, False]
+    assert all(conn.closed and conn.listeners == [] for conn in connections)
+    assert waiters.connected is False
+    assert LISTENER_RECONNECT_TOTAL.labels(listener="command_status")._value.get() == reconnects_before + 1
+    assert LISTENER_CONNECTED.labels(listener="command_status")._value.get() == 0
@@ -32,7 +32,8 @@ from ae3lite.domain.errors import CommandPublishError, ErrorCodes, TaskExecution
 from ae3lite.infrastructure.gateways import sequential_command_gateway as sequential_command_gateway_module
 from ae3lite.infrastructure.gateways.command_publish_pipeline import CommandPublishPipeline
 from ae3lite.infrastructure.gateways.sequential_command_gateway import SequentialCommandGateway
-from ae3lite.infrastructure.metrics import COMMAND_POLL_ITERATIONS
+from ae3lite.infrastructure.command_terminal_listener import CommandTerminalWaiters
+from ae3lite.infrastructure.metrics import COMMAND_POLL_ITERATIONS, COMMAND_TERMINAL_WAKEUPS
 
 
 NOW = datetime(2026, 3, 10, 12, 0, 0)
@@ -1274,3 +1275,72 @@ async def test_run_batch_publish_only_fails_without_terminal_done(monkeypatch: p
 
     assert result["success"] is False
     assert result["error_code"] == "ae3_command_poll_deadline_exceeded"
+
+
+class _NotifyingHistoryLogger(_FakeHistoryLogger):
+    """Публикует команду и через ``delay`` шлёт terminal NOTIFY, как триггер на commands."""
+
+    def __init__(self, *, waiters: CommandTerminalWaiters, delay: float | None):
+        super().__init__()
+        self._waiters = waiters
+        self._delay = delay
+
+    async def publish(self, **kwargs):
+        published_cmd_id = await super().publish(**kwargs)
+        if self._delay is None:
+            self._waiters.notify(published_cmd_id)
+        else:
+            asyncio.get_running_loop().call_later(self._delay, self._waiters.notify, published_cmd_id)
+        return published_cmd_id
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("track_task_state", [True, False])
+@pytest.mark.parametrize("notify_delay", [0.02, None])
+async def test_run_batch_terminal_notify_wakes_waiter_before_safety_poll(track_task_state, notify_delay):
+    waiters = CommandTerminalWaiters()
+    waiters.connected = True
+    gw = SequentialCommandGateway(
+        task_repository=_FakeTaskRepo(),
+        command_repository=_FakeCommandRepo(),
+        history_logger_client=_NotifyingHistoryLogger(waiters=waiters, delay=notify_delay),
+        poll_interval_sec=0.05,
+        command_poll_default_sec=3600.0,
+        terminal_waiters=waiters,
+        terminal_safety_poll_sec=60.0,
+    )
+    before = COMMAND_TERMINAL_WAKEUPS.labels(source="notify")._value.get()
+
+    result = await asyncio.wait_for(
+        gw.run_batch(task=_make_task(), commands=[_planned()], now=NOW, track_task_state=track_task_state),
+        timeout=5.0,
+    )
+
+    assert result["success"] is True
+    assert COMMAND_TERMINAL_WAKEUPS.labels(source="notify")._value.get() == before + 1
+    assert waiters._waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_run_batch_polls_at_normal_interval_while_listener_disconnected(monkeypatch: pytest.MonkeyPatch):
+    sleep_calls: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleep_calls.append(delay)
+
+    monkeypatch.setattr(sequential_command_gateway_module.asyncio, "sleep", fake_sleep)
+    waiters = CommandTerminalWaiters()
+    gw = SequentialCommandGateway(
+        task_repository=_FakeTaskRepo(),
+        command_repository=_SequencedLegacyCommandRepo(legacy_rows=[_PENDING_ROW, _DONE_ROW]),
+        history_logger_client=_FakeHistoryLogger(),
+        poll_interval_sec=0.1,
+        command_poll_default_sec=3600.0,
+        terminal_waiters=waiters,
+        terminal_safety_poll_sec=60.0,
+    )
+
+    result = await gw.run_batch(task=_make_task(), commands=[_planned()], now=NOW)
+
+    assert result["success"] is True
+    assert sleep_calls == pytest.approx([0.1, 0.15])
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from ae3lite.infrastructure.metrics import LISTENER_INVALID_PAYLOAD
+from ae3lite.infrastructure.read_models import zone_runtime_monitor as monitor_module
+from ae3lite.infrastructure.read_models.zone_runtime_monitor import PgZoneRuntimeMonitor
+from ae3lite.infrastructure.telemetry_sample_listener import (
+    TelemetrySampleBuffers,
+    TelemetrySamplesListener,
+    stored_ts,
+    stored_value,
+)
+
+_T0 = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def _ts(sec: int) -> datetime:
+    return datetime(2026, 3, 1, 12, 0, sec)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _filled(buffers: TelemetrySampleBuffers, sensor_id: int, samples, *, since=_T0, truncated=False, last_ts=None):
+    fill = buffers.begin_fill(sensor_id)
+    buffers.complete_fill(sensor_id, fill, samples=samples, since_ts=since, truncated=truncated, last_ts=last_ts)
+
+
+def test_stored_precision_matches_telemetry_samples_columns() -> None:
+    assert stored_ts(datetime(2026, 3, 1, 12, 0, 1, 500000)) == _ts(2)
+    assert stored_ts(datetime(2026, 3, 1, 12, 0, 1, 499999)) == _ts(1)
+    assert stored_value(6.12345) == 6.1235
+    assert stored_value(Decimal("6.1200")) == 6.12
+
+
+def test_buffers_serve_window_after_fill_and_dedupe_overlapping_notify() -> None:
+    buffers = TelemetrySampleBuffers()
+    buffers.connected = True
+    assert buffers.lookup(7, since_ts=_T0, limit=64) == (None, "untracked")
+
+    _filled(buffers, 7, [(_ts(1), 6.1), (_ts(2), 6.2)], last_ts=_ts(2))
+    # NOTIFY семпла, уже прочитанного SQL, не дублирует его.
+    buffers.ingest(7, _ts(2), 6.2)
+    buffers.ingest(7, datetime(2026, 3, 1, 12, 0, 3, 100000), 6.30001)
+
+    samples, reason = buffers.lookup(7, since_ts=_ts(2), limit=64, last_ts=_ts(3))
+    assert reason == "hit"
+    assert samples == ((_ts(2), 6.2), (_ts(3), 6.3))
+    samples, _ = buffers.lookup(7, since_ts=_T0, limit=2)
+    assert samples == ((_ts(2), 6.2), (_ts(3), 6.3))
+
+
+def test_buffers_merge_notify_received_during_sql_fill() -> None:
+    buffers = TelemetrySampleBuffers()
+    buffers.connected = True
+    fill = buffers.begin_fill(7)
+    buffers.ingest(7, _ts(5), 6.5)
+    buffers.ingest(7, _ts(6), 6.6, stub=True)
+    buffers.complete_fill(7, fill, samples=[(_ts(1), 6.1)], since_ts=_T0, truncated=False)
+
+    samples, reason = buffers.lookup(7, since_ts=_T0, limit=64, last_ts=_ts(6))
+    assert reason == "hit"
+    assert samples == ((_ts(1), 6.1), (_ts(5), 6.5))
+
+
+def test_buffers_report_gap_expiry_and_reset() -> None:
+    clock = _Clock()
+    buffers = TelemetrySampleBuffers(verify_interval_sec=60.0, clock=clock)
+    buffers.connected = True
+    _filled(buffers, 7, [(_ts(1), 6.1)], last_ts=_ts(1))
+
+    # telemetry_last новее последнего увиденного семпла: NOTIFY ещё не дошёл или потерян.
+    assert buffers.lookup(7, since_ts=_T0, limit=64, last_ts=_ts(4)) == (None, "gap")
+    clock.now += 61.0
+    assert buffers.lookup(7, since_ts=_T0, limit=64) == (None, "expired")
+
+    buffers.reset()
+    assert buffers.lookup(7, since_ts=_T0, limit=64) == (None, "untracked")
+    buffers.connected = False
+    assert buffers.lookup(7, since_ts=_T0, limit=64) == (None, "disconnected")
+    assert buffers.begin_fill(7) is None
+
+
+def test_buffers_drop_fill_started_before_reset() -> None:
+    buffers = TelemetrySampleBuffers()
+    buffers.connected = True
+    fill = buffers.begin_fill(7)
+    buffers.reset()
+    buffers.complete_fill(7, fill, samples=[(_ts(1), 6.1)], since_ts=_T0, truncated=False)
+
+    assert len(buffers) == 0
+
+
+def test_buffers_capacity_moves_coverage_forward() -> None:
+    buffers = TelemetrySampleBuffers(capacity=3)
+    buffers.connected = True
+    _filled(buffers, 7, [(_ts(1), 6.1), (_ts(2), 6.2)])
+    buffers.ingest(7, _ts(3), 6.3)
+    buffers.ingest(7, _ts(4), 6.4)
+
+    # Семпл _ts(1) вытеснен: окно с since раньше _ts(2) покрывается, только если хватает limit.
+    assert buffers.lookup(7, since_ts=_T0, limit=64) == (None, "not_covered")
+    samples, reason = buffers.lookup(7, since_ts=_T0, limit=2)
+    assert reason == "hit" and samples == ((_ts(3), 6.3), (_ts(4), 6.4))
+    samples, _ = buffers.lookup(7, since_ts=_ts(2), limit=64)
+    assert samples == ((_ts(2), 6.2), (_ts(3), 6.3), (_ts(4), 6.4))
+
+    # Опоздавший семпл встаёт по ts (при равном ts — после уже записанных, как id в SQL).
+    buffers.ingest(7, datetime(2026, 3, 1, 12, 0, 2, 600000), 6.25)
+    samples, _ = buffers.lookup(7, since_ts=_ts(3), limit=64)
+    assert samples == ((_ts(3), 6.3), (_ts(3), 6.25), (_ts(4), 6.4))
+    assert buffers.lookup(7, since_ts=_ts(2), limit=64) == (None, "not_covered")
+
+
+def test_buffers_truncated_fill_covers_only_returned_range() -> None:
+    buffers = TelemetrySampleBuffers()
+    buffers.connected = True
+    _filled(buffers, 7, [(_ts(5), 6.5), (_ts(6), 6.6)], truncated=True)
+
+    assert buffers.lookup(7, since_ts=_T0, limit=64) == (None, "not_covered")
+    assert buffers.lookup(7, since_ts=_ts(6), limit=64)[1] == "hit"
+
+
+def test_listener_ingests_payload_and_counts_invalid() -> None:
+    buffers = TelemetrySampleBuffers()
+    buffers.connected = True
+    _filled(buffers, 7, [])
+    listener = TelemetrySamplesListener(dsn="postgresql://unused", buffers=buffers)
+
+    ts_us = int((_ts(3) - datetime(1970, 1, 1)).total_seconds() * 1_000_000)
+    payload = json.dumps({"s": [[7, ts_us, 6.3, 0], [8, ts_us, 5.0, 0]]})
+    listener._notify_handler(None, 0, "telemetry_samples_committed", payload)
+    samples, reason = buffers.lookup(7, since_ts=_T0, limit=64, last_ts=_ts(3))
+    assert reason == "hit" and samples == ((_ts(3), 6.3),)
+
+    counter = LISTENER_INVALID_PAYLOAD.labels(listener="telemetry_samples")
+    before = counter._value.get()
+    listener._notify_handler(None, 0, "telemetry_samples_committed", "{not json")
+    listener._notify_handler(None, 0, "telemetry_samples_committed", json.dumps({"s": [["x"]]}))
+    assert counter._value.get() == before + 2
+
+
+class _FakeConn:
+    def __init__(self, sensor_row, sample_rows) -> None:
+        self.sensor_row = sensor_row
+        self.sample_rows = sample_rows
+        self.fetch_calls: list[tuple] = []
+
+    async def fetchrow(self, query, *args):
+        return self.sensor_row
+
+    async def fetch(self, query, *args):
+        self.fetch_calls.append(args)
+        return self.sample_rows
+
+
+class _FakePool:
+    def __init__(self, conn) -> None:
+        self.conn = conn
+
+    def acquire(self):
+        pool = self
+
+        class _Ctx:
+            async def __aenter__(self):
+                return pool.conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Ctx()
+
+
+@pytest.mark.asyncio
+async def test_monitor_reads_window_from_buffer_after_sql_fill(monkeypatch) -> None:
+    conn = _FakeConn(
+        {"sensor_id": 7, "sensor_label": "ph", "value": Decimal("6.2"), "sample_ts": _ts(2), "last_quality": "GOOD"},
+        [
+            {"ts": _ts(1), "value": Decimal("6.1000"), "quality": "GOOD", "metadata": None},
+            {"ts": _ts(2), "value": Decimal("6.2000"), "quality": "GOOD", "metadata": None},
+        ],
+    )
+
+    async def _get_pool():
+        return _FakePool(conn)
+
+    monkeypatch.setattr(monitor_module, "get_pool", _get_pool)
+    buffers = TelemetrySampleBuffers(capacity=128)
+    buffers.connected = True
+    monitor = PgZoneRuntimeMonitor(sample_buffers=buffers)
+
+    first = await monitor.read_metric_window(
+        zone_id=1, sensor_type="PH", since_ts=_T0, telemetry_max_age_sec=10**9, limit=1
+    )
+    assert [s["value"] for s in first["samples"]] == [6.2]
+    assert conn.fetch_calls == [(7, _T0, 128)]
+
+    buffers.ingest(7, _ts(3), 6.3)
+    conn.sensor_row = {**conn.sensor_row, "sample_ts": _ts(3)}
+    second = await monitor.read_metric_window(
+        zone_id=1, sensor_type="PH", since_ts=_T0, telemetry_max_age_sec=10**9, limit=64
+    )
+    assert second["samples"] == ({"ts": _ts(1), "value": 6.1}, {"ts": _ts(2), "value": 6.2}, {"ts": _ts(3), "value": 6.3})
+    assert second["latest_sample_ts"] == _ts(3)
+    assert len(conn.fetch_calls) == 1
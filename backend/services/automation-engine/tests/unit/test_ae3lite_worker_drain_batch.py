@@ -0,0 +1,176 @@
+"""Batch claim и event-driven ожидание в drain-цикле AE3 worker."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from ae3lite.application.use_cases import ClaimNextTaskUseCase
+from ae3lite.infrastructure.metrics import LISTENER_INVALID_PAYLOAD
+from ae3lite.infrastructure.task_pending_listener import TaskPendingListener
+from ae3lite.runtime import Ae3RuntimeWorker
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _noop_logger() -> object:
+    return type(
+        "Logger",
+        (),
+        {
+            "warning": staticmethod(lambda *args, **kwargs: None),
+            "debug": staticmethod(lambda *args, **kwargs: None),
+            "error": staticmethod(lambda *args, **kwargs: None),
+        },
+    )()
+
+
+def _task(task_id: int) -> SimpleNamespace:
+    return SimpleNamespace(id=task_id, zone_id=task_id, intent_id=0, topology="single_tank")
+
+
+def _build_worker(*, claim_use_case: object, execute_run: AsyncMock, max_parallel_tasks: int) -> Ae3RuntimeWorker:
+    return Ae3RuntimeWorker(
+        owner="drain-batch-worker",
+        claim_next_task_use_case=claim_use_case,
+        idle_poll_interval_sec=0.01,
+        execute_task_use_case=SimpleNamespace(run=execute_run),
+        startup_recovery_use_case=SimpleNamespace(run=AsyncMock(return_value=None)),
+        zone_lease_repository=SimpleNamespace(release=AsyncMock(return_value=True)),
+        zone_intent_repository=SimpleNamespace(
+            mark_running=AsyncMock(return_value=None),
+            mark_terminal=AsyncMock(return_value=None),
+        ),
+        spawn_background_task_fn=lambda coro, **kwargs: asyncio.create_task(
+            coro,
+            name=str(kwargs.get("task_name") or "ae3-drain-batch-test"),
+        ),
+        now_fn=_utcnow,
+        logger=_noop_logger(),
+        lease_ttl_sec=120,
+        max_task_execution_sec=900,
+        max_parallel_tasks=max_parallel_tasks,
+        shutdown_grace_sec=0.5,
+    )
+
+
+@pytest.mark.asyncio
+async def test_drain_claims_free_slots_in_batch_and_waits_without_polling() -> None:
+    release = asyncio.Event()
+    started: list[int] = []
+
+    async def _execute(*, task: object, **_kwargs: object) -> None:
+        started.append(task.id)
+        await release.wait()
+
+    batches = [[(_task(1), SimpleNamespace()), (_task(2), SimpleNamespace())], [(_task(3), SimpleNamespace())]]
+    run_batch = AsyncMock(side_effect=lambda **_kw: batches.pop(0) if batches else [])
+    claim_use_case = SimpleNamespace(
+        run_batch=run_batch,
+        run=AsyncMock(return_value=None),
+        next_pending_due_at=AsyncMock(return_value=None),
+    )
+    worker = _build_worker(claim_use_case=claim_use_case, execute_run=AsyncMock(side_effect=_execute), max_parallel_tasks=3)
+
+    worker.kick()
+    for _ in range(100):
+        if len(started) == 2:
+            break
+        await asyncio.sleep(0.01)
+    assert sorted(started) == [1, 2]
+    assert run_batch.await_args_list[0].kwargs["limit"] == 3
+
+    # Задачи в работе и kick нет — цикл спит, а не опрашивает claim.
+    calls_before = run_batch.await_count
+    await asyncio.sleep(0.1)
+    assert run_batch.await_count == calls_before
+
+    worker.kick()
+    for _ in range(100):
+        if 3 in started:
+            break
+        await asyncio.sleep(0.01)
+    assert 3 in started
+    assert run_batch.await_args_list[-1].kwargs["limit"] == 1
+
+    release.set()
+    await worker.shutdown(grace_sec=0.5)
+    assert worker._last_drain_exit_reason in {"shutdown", "idle"}
+
+
+@pytest.mark.asyncio
+async def test_drain_reclaims_slot_when_inflight_task_finishes() -> None:
+    finish_first = asyncio.Event()
+    started: list[int] = []
+
+    async def _execute(*, task: object, **_kwargs: object) -> None:
+        started.append(task.id)
+        if task.id == 1:
+            await finish_first.wait()
+
+    batches = [[(_task(1), SimpleNamespace())], [(_task(2), SimpleNamespace())]]
+    run_batch = AsyncMock(side_effect=lambda **_kw: batches.pop(0) if batches else [])
+    claim_use_case = SimpleNamespace(
+        run_batch=run_batch,
+        next_pending_due_at=AsyncMock(return_value=None),
+    )
+    worker = _build_worker(claim_use_case=claim_use_case, execute_run=AsyncMock(side_effect=_execute), max_parallel_tasks=1)
+
+    worker.kick()
+    await asyncio.sleep(0.05)
+    assert started == [1]
+    assert run_batch.await_count == 1
+
+    finish_first.set()
+    await asyncio.wait_for(worker._drain_task, timeout=1.0)
+    assert started == [1, 2]
+    assert worker._last_drain_exit_reason == "idle"
+
+
+@pytest.mark.asyncio
+async def test_claim_use_case_batch_uses_repository_batch_claim() -> None:
+    now = datetime.now(timezone.utc)
+    claimed = [(SimpleNamespace(id=1, zone_id=1), SimpleNamespace(zone_id=1))]
+    task_repo = SimpleNamespace(claim_pending_batch=AsyncMock(return_value=claimed))
+    use_case = ClaimNextTaskUseCase(task_repository=task_repo, zone_lease_repository=SimpleNamespace(), lease_ttl_sec=90)
+
+    assert await use_case.run_batch(owner="worker-a", now=now, limit=4) == claimed
+    task_repo.claim_pending_batch.assert_awaited_once_with(owner="worker-a", now=now, limit=4, lease_ttl_sec=90)
+
+
+@pytest.mark.asyncio
+async def test_claim_use_case_batch_falls_back_to_sequential_claims() -> None:
+    now = datetime.now(timezone.utc)
+    tasks = [SimpleNamespace(id=1, zone_id=1), SimpleNamespace(id=2, zone_id=2), None]
+    task_repo = SimpleNamespace(claim_next_pending=AsyncMock(side_effect=tasks))
+    lease_repo = SimpleNamespace(claim=AsyncMock(side_effect=lambda **kw: SimpleNamespace(zone_id=kw["zone_id"])))
+    use_case = ClaimNextTaskUseCase(task_repository=task_repo, zone_lease_repository=lease_repo, lease_ttl_sec=90)
+
+    claimed = await use_case.run_batch(owner="worker-a", now=now, limit=5)
+
+    assert [task.id for task, _lease in claimed] == [1, 2]
+    assert task_repo.claim_next_pending.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_task_pending_listener_dispatches_notify_and_counts_invalid() -> None:
+    on_task_pending = AsyncMock()
+    listener = TaskPendingListener(dsn="postgresql://unused", on_task_pending=on_task_pending)
+
+    listener._notify_handler(None, 0, "ae_task_pending", json.dumps({"task_id": 5, "zone_id": 7, "due_at": None}))
+    await asyncio.sleep(0)
+    on_task_pending.assert_awaited_once_with({"task_id": 5, "zone_id": 7, "due_at": None})
+
+    counter = LISTENER_INVALID_PAYLOAD.labels(listener="task_pending")
+    before = counter._value.get()
+    listener._notify_handler(None, 0, "ae_task_pending", "{not json")
+    listener._notify_handler(None, 0, "ae_task_pending", "[1]")
+    assert counter._value.get() == before + 2
+    assert on_task_pending.await_count == 1
@@ -0,0 +1,246 @@
+"""Кеш статичной части ZoneSnapshot и его инвалидация через NOTIFY ae_zone_config_changed."""
+
+from __future__ import annotations
+
+import json
+from contextlib import asynccontextmanager
+from typing import Any
+
+import pytest
+
+from ae3lite.infrastructure.metrics import LISTENER_INVALID_PAYLOAD
+from ae3lite.infrastructure.read_models import zone_snapshot_read_model as read_model_module
+from ae3lite.infrastructure.read_models.zone_snapshot_read_model import PgZoneSnapshotReadModel
+from ae3lite.infrastructure.zone_config_listener import ZoneConfigListener, ZoneSnapshotStaticCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cache(**kwargs: Any) -> ZoneSnapshotStaticCache:
+    cache = ZoneSnapshotStaticCache(**kwargs)
+    cache.connected = True
+    return cache
+
+
+def _fill(cache: ZoneSnapshotStaticCache, zone_id: int, value: Any, *, key=(10, 3), bundle_revision="rev-1", **kwargs):
+    fill = cache.begin_fill(zone_id)
+    cache.complete_fill(zone_id, fill, key=key, bundle_revision=bundle_revision, value=value, **kwargs)
+
+
+def test_cache_lookup_reports_hit_and_miss_reasons() -> None:
+    clock = _Clock()
+    cache = _cache(ttl_sec=60, clock=clock)
+
+    assert cache.lookup(1, key=(10, 3)) == (None, "untracked")
+    _fill(cache, 1, "static")
+    assert cache.lookup(1, key=(10, 3), expected_bundle_revision="rev-1") == ("static", "hit")
+    assert cache.lookup(1, key=(10, 3)) == ("static", "hit")
+
+    # Новая config_revision зоны или другая bundle_revision цикла — запись устарела.
+    assert cache.lookup(1, key=(10, 4)) == (None, "revision")
+    _fill(cache, 1, "static")
+    assert cache.lookup(1, key=(10, 3), expected_bundle_revision="rev-2") == (None, "revision")
+    assert len(cache) == 0
+
+    _fill(cache, 1, "static")
+    clock.now += 61
+    assert cache.lookup(1, key=(10, 3)) == (None, "expired")
+
+    cache.connected = False
+    assert cache.lookup(1, key=(10, 3)) == (None, "disconnected")
+    assert cache.begin_fill(1) is None
+
+
+def test_cache_drops_fill_invalidated_while_loading() -> None:
+    cache = _cache()
+
+    fill = cache.begin_fill(1)
+    cache.invalidate(1)
+    cache.complete_fill(1, fill, key=(10, 3), bundle_revision="rev-1", value="stale")
+    assert cache.lookup(1, key=(10, 3)) == (None, "untracked")
+
+    fill = cache.begin_fill(1)
+    cache.reset()
+    cache.complete_fill(1, fill, key=(10, 3), bundle_revision="rev-1", value="stale")
+    assert cache.lookup(1, key=(10, 3)) == (None, "untracked")
+
+    # Инвалидация другой зоны заполнение не отменяет.
+    fill = cache.begin_fill(1)
+    cache.invalidate(2)
+    cache.complete_fill(1, fill, key=(10, 3), bundle_revision="rev-1", value="fresh")
+    assert cache.lookup(1, key=(10, 3)) == ("fresh", "hit")
+    assert cache._pending == {}
+
+
+def test_cache_entry_expires_at_calibration_boundary_and_respects_max_zones() -> None:
+    clock = _Clock()
+    cache = _cache(ttl_sec=300, max_zones=2, clock=clock)
+
+    _fill(cache, 1, "static", max_age_sec=5.0)
+    clock.now += 4
+    assert cache.lookup(1, key=(10, 3))[1] == "hit"
+    clock.now += 2
+    assert cache.lookup(1, key=(10, 3))[1] == "expired"
+
+    _fill(cache, 1, "a")
+    _fill(cache, 2, "b")
+    assert cache.lookup(1, key=(10, 3))[1] == "hit"
+    _fill(cache, 3, "c")
+    assert cache.lookup(2, key=(10, 3))[1] == "untracked"
+    assert cache.lookup(1, key=(10, 3))[1] == "hit"
+
+
+def test_zone_config_listener_invalidates_zone_and_resets_on_null_or_invalid() -> None:
+    cache = _cache()
+    listener = ZoneConfigListener(dsn="postgresql://unused", cache=cache)
+    _fill(cache, 1, "a")
+    _fill(cache, 2, "b")
+
+    listener._notify_handler(None, 0, "ae_zone_config_changed", json.dumps({"zone_id": 1, "source": "nodes", "op": "UPDATE"}))
+    assert cache.lookup(1, key=(10, 3))[1] == "untracked"
+    assert cache.lookup(2, key=(10, 3))[1] == "hit"
+
+    listener._notify_handler(None, 0, "ae_zone_config_changed", json.dumps({"zone_id": None, "source": "pump_calibrations"}))
+    assert len(cache) == 0
+
+    counter = LISTENER_INVALID_PAYLOAD.labels(listener="zone_config")
+    before = counter._value.get()
+    _fill(cache, 2, "b")
+    listener._notify_handler(None, 0, "ae_zone_config_changed", "{not json")
+    assert counter._value.get() == before + 1
+    assert len(cache) == 0
+
+
+class _FakeConn:
+    def __init__(self, *, live_node_ids: list[int]) -> None:
+        self.live_node_ids = live_node_ids
+        self.queries: list[str] = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    def _record(self, query: str) -> str:
+        if "FROM zones z" in query:
+            name = "zone"
+        elif "FROM automation_effective_bundles" in query:
+            name = "bundle"
+        elif "FROM sensors s" in query:
+            name = "telemetry"
+        elif "FROM pid_state" in query:
+            name = "pid_state"
+        elif "SELECT n.id AS node_id\n" in query:
+            name = "live_nodes"
+        elif "JOIN pump_calibrations p" in query:
+            name = "calibration_boundary"
+        elif "JOIN node_channels nc" in query and "GROUP BY n.id" not in query:
+            name = "actuators"
+        else:
+            name = "diagnostics"
+        self.queries.append(name)
+        return name
+
+    async def fetchrow(self, query: str, *args: Any) -> Any:
+        name = self._record(query)
+        if name == "zone":
+            return {
+                "zone_id": 1,
+                "greenhouse_id": 2,
+                "automation_runtime": "ae3",
+                "zone_config_revision": 3,
+                "grow_cycle_id": 10,
+                "current_phase_id": 20,
+                "cycle_settings": {"bundle_revision": "rev-1"},
+                "phase_name": "veg",
+                "workflow_phase": "idle",
+                "workflow_version": 1,
+                "ph_target": 5.8,
+            }
+        return {
+            "scope_type": "grow_cycle",
+            "scope_id": 10,
+            "bundle_revision": "rev-1",
+            "config": {
+                "system": {"pump_calibration_policy": {"min_dose_ms": 50}},
+                "zone": {
+                    "logic_profile": {
+                        "active_mode": "auto",
+                        "active_profile": {"command_plans": {"plans": {"irrigation": {"steps": []}}}},
+                    },
+                },
+            },
+        }
+
+    async def fetch(self, query: str, *args: Any) -> list[dict[str, Any]]:
+        name = self._record(query)
+        if name == "live_nodes":
+            return [{"node_id": node_id} for node_id in self.live_node_ids]
+        if name == "actuators":
+            return [
+                {"node_id": 100, "node_channel_id": 1, "node_uid": "nd-irr", "node_type": "irrig", "channel": "pump_main"},
+                {"node_id": 200, "node_channel_id": 2, "node_uid": "nd-ph", "node_type": "ph", "channel": "pump_acid"},
+            ]
+        return []
+
+    async def fetchval(self, query: str, *args: Any) -> Any:
+        self._record(query)
+        return None
+
+
+class _FakePool:
+    def __init__(self, conn: _FakeConn) -> None:
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.mark.asyncio
+async def test_load_reuses_cached_static_part_and_rereads_volatile(monkeypatch: pytest.MonkeyPatch) -> None:
+    conn = _FakeConn(live_node_ids=[100, 200])
+
+    async def _get_pool() -> _FakePool:
+        return _FakePool(conn)
+
+    monkeypatch.setattr(read_model_module, "get_pool", _get_pool)
+    read_model = PgZoneSnapshotReadModel(static_cache=_cache())
+
+    first = await read_model.load(zone_id=1)
+    assert [ref.node_uid for ref in first.actuators] == ["nd-irr", "nd-ph"]
+    assert first.bundle_revision == "rev-1"
+    assert first.config_revision == 3
+    assert {"bundle", "actuators", "calibration_boundary"} <= set(conn.queries)
+
+    # Snapshot не делит изменяемые объекты с кешем.
+    first.command_plans["plans"]["irrigation"]["steps"].append("mutated")
+
+    conn.queries.clear()
+    conn.live_node_ids = [100]
+    second = await read_model.load(zone_id=1)
+    assert conn.queries == ["zone", "telemetry", "pid_state", "live_nodes"]
+    assert [ref.node_uid for ref in second.actuators] == ["nd-irr"]
+    assert second.command_plans["plans"]["irrigation"]["steps"] == []
+    assert second.actuators[0].pump_calibration == {"min_dose_ms": 50, "max_dose_ms": None, "ml_per_sec_min": None, "ml_per_sec_max": None}
+
+
+@pytest.mark.asyncio
+async def test_load_without_cache_reads_static_part_every_time(monkeypatch: pytest.MonkeyPatch) -> None:
+    conn = _FakeConn(live_node_ids=[100])
+
+    async def _get_pool() -> _FakePool:
+        return _FakePool(conn)
+
+    monkeypatch.setattr(read_model_module, "get_pool", _get_pool)
+    read_model = PgZoneSnapshotReadModel()
+
+    await read_model.load(zone_id=1)
+    await read_model.load(zone_id=1)
+    assert conn.queries.count("bundle") == 2
+    assert conn.queries.count("actuators") == 2
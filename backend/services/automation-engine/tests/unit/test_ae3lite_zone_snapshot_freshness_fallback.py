@@ -1,8 +1,8 @@
 """Тесты SQL-фильтра snapshot read-model по ``last_seen_at`` fallback.
 
-Проверяют, что параметризованный SQL-запрос ``actuator_rows`` использует второй
-позиционный параметр ``$2`` для freshness window и читает env-переменную
-``AE3_NODE_FRESHNESS_FALLBACK_SEC``.
+Проверяют, что параметризованный SQL-запрос liveness нод (``live_node_rows``,
+фильтрует кешируемые каналы актуаторов) использует второй позиционный параметр
+``$2`` для freshness window и читает env-переменную ``AE3_NODE_FRESHNESS_FALLBACK_SEC``.
 """
 
 from __future__ import annotations
@@ -53,19 +53,19 @@ def test_persistent_dead_min_60_seconds(monkeypatch: pytest.MonkeyPatch) -> None
     assert _node_persistent_dead_sec() == 60
 
 
-def test_actuator_query_includes_freshness_fallback_clause() -> None:
-    """SQL-фильтр actuator-выборки содержит fallback по last_seen_at + параметр $2."""
+def test_live_node_query_includes_freshness_fallback_clause() -> None:
+    """SQL-фильтр liveness нод содержит fallback по last_seen_at + параметр $2."""
     from ae3lite.infrastructure.read_models import zone_snapshot_read_model as module
 
     source = module.__loader__.get_source(module.__name__)
-    actuator_query_marker = "FROM nodes n\n                    JOIN node_channels nc"
-    assert actuator_query_marker in source
+    live_node_query_marker = "SELECT n.id AS node_id\n                    FROM nodes n"
+    assert live_node_query_marker in source
 
     fallback_marker = (
         "OR COALESCE(n.last_seen_at, n.last_heartbeat_at, n.updated_at)\n"
         "                                 >= NOW() - ($2 * INTERVAL '1 second')"
     )
-    assert fallback_marker in source, "Actuator SQL должен использовать $2 для freshness fallback"
+    assert fallback_marker in source, "Liveness SQL должен использовать $2 для freshness fallback"
 
 
 def test_diagnostics_query_groups_by_node() -> None:
@@ -0,0 +1,396 @@
+"""
+Асинхронный TTL/LRU-кеш для резолва справочников (zone/node/sensor и т.п.).
+
+``AsyncTTLCache`` — MutableMapping с:
+
+* TTL на запись (``ttl_sec``; ``None``/0 — без истечения) и LRU-ограничением
+  ``max_size`` (0 — без ограничения);
+* negative caching: ключ, которого нет в источнике, запоминается на
+  ``negative_ttl_sec`` и не перезапрашивается каждым батчем;
+* single-flight загрузкой (``get_or_load`` / ``get_many_or_load``): конкурентные
+  промахи по одному ключу ждут один запрос к источнику;
+* фоновым обновлением (``refresh_ahead_sec``): запись, которой до истечения TTL
+  осталось меньше ``refresh_ahead_sec``, отдаётся сразу, а перечитывается в
+  фоне;
+* инвалидацией (``invalidate`` / ``invalidate_where``), в том числе по
+  PostgreSQL NOTIFY (см. ``common.db.listen_notifications``);
+* полной подменой снимка (``begin_refresh`` + ``replace_all``): инвалидации,
+  пришедшие, пока снимок читался из источника, применяются к нему при подмене.
+
+Метрики: ``cache_lookups_total{cache,result=hit|negative|miss}`` и
+``cache_evictions_total{cache,reason=expired|size|invalidated}``.
+
+Dict-совместимый доступ (``cache[key]``, ``in``, ``get``, ``pop``, ``clear``)
+сохранён: ``in`` и ``[]`` видят только живые положительные записи и не
+считаются в метриках — метрики пишут ``get`` и ``*_or_load``.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    TypeVar,
+)
+
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "AsyncTTLCache lookups by result (hit / negative / miss)",
+    ["cache", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total",
+    "AsyncTTLCache evictions by reason (expired / size / invalidated)",
+    ["cache", "reason"],
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "refresh_at", "negative")
+
+    def __init__(self, value: Any, expires_at: Optional[float], refresh_at: Optional[float], negative: bool):
+        self.value = value
+        self.expires_at = expires_at
+        self.refresh_at = refresh_at
+        self.negative = negative
+
+
+def _consume_exception(future: "asyncio.Future[Any]") -> None:
+    # Ошибку загрузки получает инициатор; ожидающих может не быть.
+    if not future.cancelled():
+        future.exception()
+
+
+class AsyncTTLCache(MutableMapping, Generic[K, V]):
+    """TTL/LRU-кеш с single-flight загрузкой и negative caching."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        ttl_sec: Optional[float] = None,
+        max_size: int = 0,
+        negative_ttl_sec: float = 0.0,
+        refresh_ahead_sec: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.ttl_sec = float(ttl_sec) if ttl_sec and ttl_sec > 0 else None
+        self.max_size = max(0, int(max_size))
+        self.negative_ttl_sec = max(0.0, float(negative_ttl_sec))
+        self.refresh_ahead_sec = max(0.0, float(refresh_ahead_sec))
+        self._clock = clock
+        self._entries: "OrderedDict[K, _Entry]" = OrderedDict()
+        self._inflight: Dict[K, "asyncio.Future[Optional[V]]"] = {}
+        self._refresh_tasks: "set[asyncio.Task]" = set()
+        # Растёт на каждой инвалидации: загрузка, начатая до неё, не записывает результат.
+        self._generation = 0
+        # token полного перечитывания -> инвалидации, пришедшие во время него.
+        self._refreshes: Dict[int, List[Callable[[K, Optional[V]], bool]]] = {}
+        self._refresh_tokens = itertools.count(1)
+
+        self._hit = CACHE_LOOKUPS.labels(cache=name, result="hit")
+        self._negative_hit = CACHE_LOOKUPS.labels(cache=name, result="negative")
+        self._miss = CACHE_LOOKUPS.labels(cache=name, result="miss")
+
+    # --- внутреннее состояние ---
+
+    def _live_entry(self, key: K) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= self._clock():
+            del self._entries[key]
+            CACHE_EVICTIONS.labels(cache=self.name, reason="expired").inc()
+            return None
+        return entry
+
+    def _store(self, key: K, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if self.max_size <= 0:
+            return
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            CACHE_EVICTIONS.labels(cache=self.name, reason="size").inc()
+
+    def _make_entry(self, value: Any, ttl_sec: Optional[float], negative: bool) -> _Entry:
+        now = self._clock()
+        ttl = ttl_sec if ttl_sec is not None else (self.negative_ttl_sec if negative else self.ttl_sec)
+        expires_at = now + ttl if ttl else None
+        refresh_at = None
+        if not negative and expires_at is not None and self.refresh_ahead_sec > 0:
+            refresh_at = expires_at - min(self.refresh_ahead_sec, ttl)
+        return _Entry(value, expires_at, refresh_at, negative)
+
+    def _lookup(self, key: K) -> Optional[_Entry]:
+        """Живая запись с учётом LRU и метрик (для ``get`` и ``*_or_load``)."""
+        entry = self._live_entry(key)
+        if entry is None:
+            self._miss.inc()
+            return None
+        self._entries.move_to_end(key)
+        (self._negative_hit if entry.negative else self._hit).inc()
+        return entry
+
+    def _needs_refresh(self, key: K, entry: _Entry) -> bool:
+        return (
+            entry.refresh_at is not None
+            and entry.refresh_at <= self._clock()
+            and key not in self._inflight
+        )
+
+    # --- MutableMapping ---
+
+    def __getitem__(self, key: K) -> V:
+        entry = self._live_entry(key)
+        if entry is None or entry.negative:
+            raise KeyError(key)
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: K) -> None:
+        entry = self._entries.pop(key)
+        if entry.negative:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._live_entry(key)  # type: ignore[arg-type]
+        return entry is not None and not entry.negative
+
+    def __iter__(self) -> Iterator[K]:
+        now = self._clock()
+        return iter(
+            [
+                key
+                for key, entry in self._entries.items()
+                if not entry.negative and (entry.expires_at is None or entry.expires_at > now)
+            ]
+        )
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:  # type: ignore[override]
+        entry = self._lookup(key)
+        if entry is None or entry.negative:
+            return default
+        return entry.value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._generation += 1
+        self._note_invalidation(lambda _key, _value: True)
+
+    # --- запись и инвалидация ---
+
+    def set(self, key: K, value: V, *, ttl_sec: Optional[float] = None) -> None:
+        self._store(key, self._make_entry(value, ttl_sec, negative=False))
+
+    def begin_refresh(self) -> int:
+        """
+        Начать полное перечитывание: вызывается до чтения снимка из источника,
+        token передаётся в ``replace_all``. Без token инвалидация, пришедшая
+        во время чтения, была бы перезаписана снимком, прочитанным до неё.
+        """
+        token = next(self._refresh_tokens)
+        self._refreshes[token] = []
+        return token
+
+    def abort_refresh(self, token: Optional[int]) -> None:
+        if token is not None:
+            self._refreshes.pop(token, None)
+
+    def _note_invalidation(self, predicate: Callable[[K, Optional[V]], bool]) -> None:
+        for predicates in self._refreshes.values():
+            predicates.append(predicate)
+
+    def replace_all(self, items: Mapping[K, V], *, refresh: Optional[int] = None) -> None:
+        """
+        Заменить содержимое целиком (double buffering): новый набор записей
+        собирается отдельно и подменяется одним присваиванием, поэтому читатели
+        видят либо старый, либо новый снимок. Negative-записи сбрасываются.
+
+        ``refresh`` — token из ``begin_refresh``: ключи, инвалидированные после
+        него, в новый снимок не попадают и будут догружены при промахе.
+        """
+        predicates = self._refreshes.pop(refresh, []) if refresh is not None else []
+        entries: "OrderedDict[K, _Entry]" = OrderedDict(
+            (key, self._make_entry(value, None, negative=False))
+            for key, value in items.items()
+            if not any(predicate(key, value) for predicate in predicates)
+        )
+        overflow = len(entries) - self.max_size if self.max_size > 0 else 0
+        for _ in range(max(0, overflow)):
+            entries.popitem(last=False)
+        if overflow > 0:
+            CACHE_EVICTIONS.labels(cache=self.name, reason="size").inc(overflow)
+        self._entries = entries
+        self._generation += 1
+
+    def set_negative(self, key: K, *, ttl_sec: Optional[float] = None) -> None:
+        """Запомнить, что ключа нет в источнике (no-op при выключенном negative caching)."""
+        if (ttl_sec if ttl_sec is not None else self.negative_ttl_sec) <= 0:
+            return
+        self._store(key, self._make_entry(None, ttl_sec, negative=True))
+
+    def is_negative(self, key: K) -> bool:
+        entry = self._live_entry(key)
+        return entry is not None and entry.negative
+
+    def invalidate(self, key: K) -> bool:
+        self._generation += 1
+        self._note_invalidation(lambda other, _value: other == key)
+        if self._entries.pop(key, None) is None:
+            return False
+        CACHE_EVICTIONS.labels(cache=self.name, reason="invalidated").inc()
+        return True
+
+    def invalidate_where(self, predicate: Callable[[K, Optional[V]], bool]) -> int:
+        """Удалить записи, для которых ``predicate(key, value)`` истинно (value=None у negative)."""
+        self._generation += 1
+        self._note_invalidation(predicate)
+        keys = [
+            key
+            for key, entry in self._entries.items()
+            if predicate(key, None if entry.negative else entry.value)
+        ]
+        for key in keys:
+            del self._entries[key]
+        if keys:
+            CACHE_EVICTIONS.labels(cache=self.name, reason="invalidated").inc(len(keys))
+        return len(keys)
+
+    # --- загрузка ---
+
+    async def get_or_load(self, key: K, loader: Callable[[K], Awaitable[Optional[V]]]) -> Optional[V]:
+        """Значение из кеша или из ``loader`` (None от loader — negative entry)."""
+        loaded = await self.get_many_or_load(
+            [key],
+            lambda keys: _single_loader(loader, keys[0]),
+        )
+        return loaded.get(key)
+
+    async def get_many_or_load(
+        self,
+        keys: Iterable[K],
+        loader: Callable[[List[K]], Awaitable[Mapping[K, V]]],
+    ) -> Dict[K, V]:
+        """
+        Пакетный вариант ``get_or_load``: промахи загружаются одним вызовом
+        ``loader(missing_keys)``; ключи, которые уже грузит другой вызов, ждут его.
+        Ключи, отсутствующие в результате loader, кешируются как negative.
+        """
+        result: Dict[K, V] = {}
+        to_load: List[K] = []
+        to_refresh: List[K] = []
+        waiting: Dict[K, "asyncio.Future[Optional[V]]"] = {}
+
+        for key in dict.fromkeys(keys):
+            entry = self._lookup(key)
+            if entry is not None:
+                if not entry.negative:
+                    result[key] = entry.value
+                    if self._needs_refresh(key, entry):
+                        to_refresh.append(key)
+                continue
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                waiting[key] = inflight
+            else:
+                to_load.append(key)
+
+        if to_refresh:
+            self._spawn_refresh(to_refresh, loader)
+        if to_load:
+            result.update(await self._load(to_load, loader))
+        for key, future in waiting.items():
+            value = await asyncio.shield(future)
+            if value is not None:
+                result[key] = value
+        return result
+
+    async def _load(
+        self,
+        keys: List[K],
+        loader: Callable[[List[K]], Awaitable[Mapping[K, V]]],
+    ) -> Dict[K, V]:
+        loop = asyncio.get_running_loop()
+        futures: Dict[K, "asyncio.Future[Optional[V]]"] = {}
+        for key in keys:
+            future = loop.create_future()
+            future.add_done_callback(_consume_exception)
+            futures[key] = future
+            self._inflight[key] = future
+        generation = self._generation
+        try:
+            loaded = await loader(list(keys))
+        except BaseException as exc:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(exc)
+            raise
+        finally:
+            for key, future in futures.items():
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+        result: Dict[K, V] = {}
+        store = generation == self._generation
+        for key, future in futures.items():
+            value = loaded.get(key) if loaded else None
+            if value is None:
+                if store:
+                    self.set_negative(key)
+            else:
+                result[key] = value
+                if store:
+                    self.set(key, value)
+            if not future.done():
+                future.set_result(value)
+        return result
+
+    def _spawn_refresh(
+        self,
+        keys: List[K],
+        loader: Callable[[List[K]], Awaitable[Mapping[K, V]]],
+    ) -> None:
+        async def _refresh() -> None:
+            try:
+                await self._load(keys, loader)
+            except Exception as exc:
+                # Старое значение остаётся до истечения TTL.
+                logger.warning("Cache %s background refresh failed (keys=%s): %s", self.name, len(keys), exc)
+
+        task = asyncio.create_task(_refresh(), name=f"cache_refresh:{self.name}")
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+
+async def _single_loader(loader: Callable[[Any], Awaitable[Any]], key: Any) -> Dict[Any, Any]:
+    value = await loader(key)
+    return {} if value is None else {key: value}
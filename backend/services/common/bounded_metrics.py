@@ -0,0 +1,142 @@
+"""
+Prometheus-метрики с ограниченной кардинальностью по узлам.
+
+``BoundedNodeCounter`` — Counter с label ``node_uid``, в котором одновременно
+живут серии не более чем ``max_nodes`` узлов (последние активные по LRU,
+включая ``other``). При вытеснении узла его серии удаляются из registry,
+а накопленные значения переносятся в серии ``node_uid="other"`` — сумма по
+``node_uid`` остаётся монотонной. При ``by_zone=True`` ведётся агрегат
+``<name>_by_zone_total{zone}`` без node_uid (zone передаётся в ``labels``).
+
+Интерфейс совместим с ``Counter``: ``COUNTER.labels(node_uid=..., ...).inc()``.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Set, Tuple
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter
+
+OTHER_NODE = "other"
+UNKNOWN_ZONE = "unknown"
+DEFAULT_MAX_NODE_SERIES = int(os.getenv("METRICS_MAX_NODE_SERIES", "500"))
+
+
+class _BoundedChild:
+    __slots__ = ("_parent", "_labelvalues", "_zone")
+
+    def __init__(self, parent: "BoundedNodeCounter", labelvalues: Tuple[str, ...], zone: Optional[str]):
+        self._parent = parent
+        self._labelvalues = labelvalues
+        self._zone = zone
+
+    def inc(self, amount: float = 1) -> None:
+        self._parent._inc(self._labelvalues, self._zone, amount)
+
+
+class BoundedNodeCounter:
+    """Counter с LRU-ограничением числа узлов в label ``node_label``."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = ("node_uid",),
+        *,
+        node_label: str = "node_uid",
+        max_nodes: Optional[int] = None,
+        by_zone: bool = False,
+        registry: Optional[CollectorRegistry] = REGISTRY,
+    ) -> None:
+        labelnames = tuple(labelnames)
+        if node_label not in labelnames:
+            raise ValueError(f"{node_label!r} must be one of labelnames {labelnames!r}")
+        self._labelnames = labelnames
+        self._node_index = labelnames.index(node_label)
+        self._node_label = node_label
+        # Один слот всегда зарезервирован под ``other``.
+        self.max_nodes = max(2, int(max_nodes if max_nodes is not None else DEFAULT_MAX_NODE_SERIES))
+
+        self._counter = Counter(name, documentation, labelnames, registry=registry)
+        self._zone_counter: Optional[Counter] = None
+        if by_zone:
+            base_name = name[: -len("_total")] if name.endswith("_total") else name
+            self._zone_counter = Counter(
+                f"{base_name}_by_zone_total",
+                f"{documentation} (aggregated by zone)",
+                ("zone",) + tuple(label for label in labelnames if label != node_label),
+                registry=registry,
+            )
+
+        # node_uid -> набор labelvalues его серий; порядок = LRU (последний — свежий).
+        self._nodes: "OrderedDict[str, Set[Tuple[str, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def labels(self, *labelvalues: str, zone: Optional[str] = None, **labelkwargs: str) -> _BoundedChild:
+        if labelvalues and labelkwargs:
+            raise ValueError("Can't pass both *args and **kwargs")
+        if labelkwargs:
+            if set(labelkwargs) != set(self._labelnames):
+                raise ValueError(f"Incorrect label names: {sorted(labelkwargs)!r}")
+            labelvalues = tuple(str(labelkwargs[label]) for label in self._labelnames)
+        elif len(labelvalues) != len(self._labelnames):
+            raise ValueError("Incorrect label count")
+        else:
+            labelvalues = tuple(str(value) for value in labelvalues)
+        return _BoundedChild(self, labelvalues, zone)
+
+    def tracked_nodes(self) -> int:
+        return len(self._nodes)
+
+    def _inc(self, labelvalues: Tuple[str, ...], zone: Optional[str], amount: float) -> None:
+        node = labelvalues[self._node_index]
+        with self._lock:
+            series = self._nodes.get(node)
+            if series is None:
+                tracked = len(self._nodes) - (1 if OTHER_NODE in self._nodes else 0)
+                if node != OTHER_NODE and tracked >= self.max_nodes - 1:
+                    self._evict_lru()
+                series = set()
+                self._nodes[node] = series
+            else:
+                self._nodes.move_to_end(node)
+            series.add(labelvalues)
+            self._counter.labels(*labelvalues).inc(amount)
+
+        if self._zone_counter is not None:
+            zone_values = (str(zone or UNKNOWN_ZONE),) + tuple(
+                value for index, value in enumerate(labelvalues) if index != self._node_index
+            )
+            self._zone_counter.labels(*zone_values).inc(amount)
+
+    def _evict_lru(self) -> None:
+        for node, series in self._nodes.items():
+            if node != OTHER_NODE:
+                break
+        else:
+            return
+        del self._nodes[node]
+        other_series = self._nodes.setdefault(OTHER_NODE, set())
+        for labelvalues in series:
+            value = self._counter.labels(*labelvalues)._value.get()
+            self._counter.remove(*labelvalues)
+            other_values = list(labelvalues)
+            other_values[self._node_index] = OTHER_NODE
+            other_values = tuple(other_values)
+            other_series.add(other_values)
+            if value:
+                self._counter.labels(*other_values).inc(value)
+
+
+def series_by_node(counter: BoundedNodeCounter) -> Dict[str, float]:
+    """Сумма значений по узлам (для диагностики и тестов)."""
+    totals: Dict[str, float] = {}
+    for metric in counter._counter.collect():
+        for sample in metric.samples:
+            if not sample.name.endswith("_total"):
+                continue
+            node = sample.labels.get(counter._node_label, "")
+            totals[node] = totals.get(node, 0.0) + sample.value
+    return totals
@@ -6,7 +6,7 @@ import os
 import threading
 import weakref
 from datetime import datetime, timezone
-from typing import Any, Optional, Dict, Mapping
+from typing import Any, Awaitable, Callable, Optional, Dict, Mapping
 
 import asyncpg
 
@@ -410,6 +410,80 @@ async def notify_zone_event_ingested(
     )
 
 
+async def listen_notifications(
+    channel: str,
+    on_notify: Callable[[str], Any],
+    *,
+    stop_event: asyncio.Event,
+    on_connect: Optional[Callable[[], Awaitable[None]]] = None,
+    keepalive_sec: float = 30.0,
+) -> None:
+    """
+    LISTEN на ``channel`` через выделенное соединение (не из пула) до ``stop_event``.
+
+    ``on_notify(payload)`` вызывается на каждое уведомление (может быть корутиной).
+    ``on_connect`` вызывается после каждого (пере)подключения: уведомления,
+    пришедшие во время разрыва, потеряны, и подписчик должен пересинхронизироваться.
+    """
+    loop = asyncio.get_running_loop()
+    tasks: set[asyncio.Task] = set()
+
+    def _handler(_conn: Any, _pid: int, _channel: str, payload: str) -> None:
+        try:
+            result = on_notify(payload)
+        except Exception:
+            logger.warning("NOTIFY handler failed: channel=%s", channel, exc_info=True)
+            return
+        if inspect.isawaitable(result):
+            task = loop.create_task(result)
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    backoff = 1.0
+    while not stop_event.is_set():
+        conn: Optional[asyncpg.Connection] = None
+        try:
+            s = get_settings()
+            conn = await asyncpg.connect(
+                host=s.pg_host,
+                port=s.pg_port,
+                database=s.pg_db,
+                user=s.pg_user,
+                password=s.pg_pass,
+                server_settings={"application_name": f"{getattr(s, 'pg_app_name', 'hydro')}:listen"},
+            )
+            await conn.add_listener(channel, _handler)
+            logger.info("Listening for PostgreSQL notifications: channel=%s", channel)
+            if on_connect is not None:
+                await on_connect()
+            backoff = 1.0
+            while not stop_event.is_set():
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=keepalive_sec)
+                except asyncio.TimeoutError:
+                    await conn.execute("SELECT 1")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning(
+                "PostgreSQL LISTEN connection lost: channel=%s, reconnect in %.1fs: %s",
+                channel,
+                backoff,
+                exc,
+            )
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, 60.0)
+        finally:
+            if conn is not None:
+                try:
+                    await conn.close()
+                except Exception:
+                    logger.debug("Failed to close LISTEN connection: channel=%s", channel, exc_info=True)
+
+
 async def _should_skip_duplicate_zone_event(
     *,
     zone_id: int,
@@ -55,9 +55,52 @@ class Settings:
 
     telemetry_batch_size: int = int(os.getenv("TELEMETRY_BATCH_SIZE", "1000"))  # Увеличено для высокой нагрузки
     telemetry_flush_ms: int = int(os.getenv("TELEMETRY_FLUSH_MS", "200"))  # Уменьшено для быстрой обработки
+    # Адаптивный batch size / flush deadline по времени записи батча и lag очереди (в границах ниже)
+    telemetry_adaptive_batch_enabled: bool = os.getenv("TELEMETRY_ADAPTIVE_BATCH_ENABLED", "0") in ("1", "true", "True", "yes", "Yes")
+    telemetry_adaptive_batch_min: int = int(os.getenv("TELEMETRY_ADAPTIVE_BATCH_MIN", "100"))
+    telemetry_adaptive_batch_max: int = int(os.getenv("TELEMETRY_ADAPTIVE_BATCH_MAX", "5000"))
+    telemetry_adaptive_flush_min_ms: int = int(os.getenv("TELEMETRY_ADAPTIVE_FLUSH_MIN_MS", "20"))
+    telemetry_adaptive_flush_max_ms: int = int(os.getenv("TELEMETRY_ADAPTIVE_FLUSH_MAX_MS", "1000"))
+    telemetry_adaptive_target_write_ms: float = float(os.getenv("TELEMETRY_ADAPTIVE_TARGET_WRITE_MS", "250"))
+    telemetry_adaptive_lag_threshold_sec: float = float(os.getenv("TELEMETRY_ADAPTIVE_LAG_THRESHOLD_SEC", "5"))
+    # Движок записи telemetry_samples: unnest (INSERT ... UNNEST) | copy (COPY в staging + merge)
+    telemetry_write_engine: str = os.getenv("TELEMETRY_WRITE_ENGINE", "unnest")
+    # Число consumer-воркеров очереди телеметрии; каждый владеет своим шардом (hash(node_uid) % N)
+    telemetry_consumer_workers: int = int(os.getenv("TELEMETRY_CONSUMER_WORKERS", "1"))
+    # Backend очереди телеметрии: list (LIST + processing list) | stream (Redis Streams + consumer group)
+    telemetry_queue_backend: str = os.getenv("TELEMETRY_QUEUE_BACKEND", "list")
+    # Имя consumer в группе stream; по умолчанию <hostname>-<pid>
+    telemetry_stream_consumer: str | None = os.getenv("TELEMETRY_STREAM_CONSUMER") or None
+    # Через сколько мс простоя в PEL сообщение забирается XAUTOCLAIM у упавшей реплики
+    telemetry_stream_claim_idle_ms: int = int(os.getenv("TELEMETRY_STREAM_CLAIM_IDLE_MS", "60000"))
+    # Режим чтения очереди: poll (size + sleep queue_check_interval_sec) | blocking (BLMOVE + linger telemetry_flush_ms)
+    telemetry_queue_pop_mode: str = os.getenv("TELEMETRY_QUEUE_POP_MODE", "poll")
+    telemetry_queue_block_timeout_sec: float = float(os.getenv("TELEMETRY_QUEUE_BLOCK_TIMEOUT_SEC", "1.0"))
+    # Период обновления health-gauge очереди (size/processing/age/dead) в blocking режиме
+    telemetry_queue_health_interval_sec: float = float(os.getenv("TELEMETRY_QUEUE_HEALTH_INTERVAL_SEC", "5.0"))
+    # /health читает снимки очереди, снятые consumer'ами не раньше этого срока (0 — всегда опрашивать Redis)
+    telemetry_queue_health_cache_sec: float = float(os.getenv("TELEMETRY_QUEUE_HEALTH_CACHE_SEC", "15.0"))
+    # Окно накопления MQTT ingress перед одним pipelined push в Redis (0 — push на каждое сообщение)
+    telemetry_ingress_linger_ms: float = float(os.getenv("TELEMETRY_INGRESS_LINGER_MS", "0"))
+    telemetry_ingress_batch_size: int = int(os.getenv("TELEMETRY_INGRESS_BATCH_SIZE", "500"))
+    # Максимум сообщений, ожидающих push; сверх него ingress отбрасывает (reason=ingress_backpressure)
+    telemetry_ingress_max_pending: int = int(os.getenv("TELEMETRY_INGRESS_MAX_PENDING", "10000"))
     realtime_queue_max_size: int = int(os.getenv("REALTIME_QUEUE_MAX_SIZE", "5000"))
     realtime_flush_ms: int = int(os.getenv("REALTIME_FLUSH_MS", "500"))
     realtime_batch_max_updates: int = int(os.getenv("REALTIME_BATCH_MAX_UPDATES", "200"))
+    # Нижняя граница паузы между flush при заполненной очереди (адаптивный flush)
+    realtime_flush_min_ms: int = int(os.getenv("REALTIME_FLUSH_MIN_MS", "50"))
+    # Подавление незначимых изменений: "METRIC:порог,..." + порог по умолчанию для остальных метрик
+    realtime_delta_enabled: bool = os.getenv("REALTIME_DELTA_ENABLED", "1") in ("1", "true", "True", "yes", "Yes")
+    realtime_delta_thresholds: str = os.getenv(
+        "REALTIME_DELTA_THRESHOLDS", "PH:0.01,EC:0.01,TEMPERATURE:0.1,HUMIDITY:0.5"
+    )
+    realtime_delta_default_threshold: float = float(os.getenv("REALTIME_DELTA_DEFAULT_THRESHOLD", "0"))
+    # Неизменившееся значение всё равно отправляется не реже этого интервала
+    realtime_delta_max_silence_sec: float = float(os.getenv("REALTIME_DELTA_MAX_SILENCE_SEC", "30"))
+    # rows (legacy {"updates": [...]}) | columnar; gzip при теле >= REALTIME_GZIP_MIN_BYTES (0 — выкл.)
+    realtime_payload_format: str = os.getenv("REALTIME_PAYLOAD_FORMAT", "rows").strip().lower()
+    realtime_gzip_min_bytes: int = int(os.getenv("REALTIME_GZIP_MIN_BYTES", "0"))
     http_max_concurrent_requests: int = int(os.getenv("HTTP_MAX_CONCURRENT_REQUESTS", "20"))
     http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "30"))
     http_max_keepalive_connections: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
@@ -91,6 +134,10 @@ class Settings:
     command_status_repair_batch_size: int = int(os.getenv("COMMAND_STATUS_REPAIR_BATCH_SIZE", "25"))
     node_offline_timeout_sec: int = int(os.getenv("NODE_OFFLINE_TIMEOUT_SEC", "120"))  # Таймаут офлайна по last_seen_at
     node_offline_check_interval_sec: int = int(os.getenv("NODE_OFFLINE_CHECK_INTERVAL_SEC", "30"))  # Интервал проверки офлайна
+    heartbeat_coalesce_ms: float = float(os.getenv("HEARTBEAT_COALESCE_MS", "0"))  # Окно коалесцирования heartbeat UPDATE nodes (0 — UPDATE на каждый heartbeat)
+    telemetry_cache_notify_enabled: bool = os.getenv("TELEMETRY_CACHE_NOTIFY_ENABLED", "1") in ("1", "true", "True", "yes", "Yes")  # LISTEN telemetry_cache_invalidate для кешей zone/node
+    telemetry_dirty_buckets_enabled: bool = os.getenv("TELEMETRY_DIRTY_BUCKETS_ENABLED", "1") in ("1", "true", "True", "yes", "Yes")  # Отметка опоздавших минут в telemetry_dirty_buckets для пересчёта агрегатором
+    telemetry_samples_notify_enabled: bool = os.getenv("TELEMETRY_SAMPLES_NOTIFY_ENABLED", "1") in ("1", "true", "True", "yes", "Yes")  # NOTIFY telemetry_samples_committed с записанными семплами для окон AE3
     
     redis_host: str = os.getenv("REDIS_HOST", "redis")
     redis_port: int = int(os.getenv("REDIS_PORT", "6379"))
@@ -9,8 +9,9 @@ import os
 import sys
 import threading
 import json
+import time
 from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from common.service_logs import send_service_log
 from common.trace_context import get_trace_id
@@ -89,6 +90,139 @@ class JsonFormatter(logging.Formatter):
         return json.dumps(data, ensure_ascii=False, default=str)
 
 
+def get_hot_path_log_rate(
+    env_var: str = "LOG_HOT_PATH_RATE_PER_SEC", default_rate: float = 1.0
+) -> float:
+    """Лимит записей hot-path лога в секунду на класс топика (<= 0 — без лимита)."""
+    try:
+        return float(os.getenv(env_var, str(default_rate)))
+    except ValueError:
+        return default_rate
+
+
+def topic_class(topic: Optional[str]) -> str:
+    """Класс MQTT топика для rate-limit: последний сегмент (telemetry, heartbeat, node_hello, ...)."""
+    if not topic:
+        return "unknown"
+    return topic.rsplit("/", 1)[-1] or "unknown"
+
+
+class HotPathLogger:
+    """
+    Логирование per-message hot path (MQTT dispatch, heartbeat, ingress).
+
+    - форматирование ленивое: аргументы передаются %-style и форматируются только
+      для записей, прошедших уровень и rate-limit;
+    - не больше ``rate_per_sec`` записей в секунду на класс топика (token bucket),
+      число подавленных попадает в поле ``suppressed`` следующей записи;
+    - при DEBUG лимит не действует и к записи прикладывается ``payload``
+      (значение или callable, вызывается только в этом режиме).
+    """
+
+    def __init__(self, logger: logging.Logger, *, rate_per_sec: float, burst: int = 1) -> None:
+        self._logger = logger
+        self.rate_per_sec = float(rate_per_sec)
+        self.burst = max(1, int(burst))
+        # topic_class -> [tokens, last_refill_monotonic, suppressed]
+        self._buckets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, klass: str) -> Optional[int]:
+        """None — запись подавлена; иначе число подавленных с прошлой записи."""
+        if self.rate_per_sec <= 0:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(klass)
+            if bucket is None:
+                self._buckets[klass] = [self.burst - 1.0, now, 0]
+                return 0
+            tokens = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate_per_sec)
+            bucket[1] = now
+            if tokens < 1.0:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return None
+            bucket[0] = tokens - 1.0
+            suppressed = int(bucket[2])
+            bucket[2] = 0
+            return suppressed
+
+    def log(
+        self,
+        level: int,
+        klass: str,
+        msg: str,
+        *args: Any,
+        payload: Union[Any, Callable[[], Any]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        return self._emit(level, klass, msg, args, payload, extra)
+
+    def info(
+        self,
+        klass: str,
+        msg: str,
+        *args: Any,
+        payload: Union[Any, Callable[[], Any]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        return self._emit(logging.INFO, klass, msg, args, payload, extra)
+
+    def debug(
+        self,
+        klass: str,
+        msg: str,
+        *args: Any,
+        payload: Union[Any, Callable[[], Any]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        return self._emit(logging.DEBUG, klass, msg, args, payload, extra)
+
+    def _emit(
+        self,
+        level: int,
+        klass: str,
+        msg: str,
+        args: Tuple[Any, ...],
+        payload: Union[Any, Callable[[], Any]],
+        extra: Optional[Dict[str, Any]],
+    ) -> bool:
+        logger = self._logger
+        if not logger.isEnabledFor(level):
+            return False
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            suppressed = 0
+        else:
+            suppressed = self._acquire(klass)
+            if suppressed is None:
+                return False
+
+        record_extra: Dict[str, Any] = {"topic_class": klass}
+        if extra:
+            record_extra.update(extra)
+        if suppressed:
+            record_extra["suppressed"] = suppressed
+        if debug and payload is not None:
+            record_extra["payload"] = payload() if callable(payload) else payload
+        # _emit -> log/info/debug -> вызывающий код: funcName/lineno записи — место вызова.
+        logger.log(level, msg, *args, extra=record_extra, stacklevel=3)
+        return True
+
+
+_hot_path_loggers: Dict[str, HotPathLogger] = {}
+
+
+def get_hot_path_logger(name: str) -> HotPathLogger:
+    """HotPathLogger для именованного логгера; лимит из ``LOG_HOT_PATH_RATE_PER_SEC``."""
+    hot_logger = _hot_path_loggers.get(name)
+    if hot_logger is None:
+        hot_logger = HotPathLogger(logging.getLogger(name), rate_per_sec=get_hot_path_log_rate())
+        _hot_path_loggers[name] = hot_logger
+    return hot_logger
+
+
 def setup_standard_logging(
     service_name: str,
     *,
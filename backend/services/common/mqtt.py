@@ -6,8 +6,10 @@ from typing import Callable, List, Optional, Tuple
 import paho.mqtt.client as mqtt
 
 from .env import get_settings
+from .logging_setup import get_hot_path_logger, topic_class
 
 logger = logging.getLogger(__name__)
+hot_path_log = get_hot_path_logger(__name__)
 
 _async_handler_error_callbacks: list[Callable[[str, str, BaseException], None]] = []
 
@@ -187,12 +189,17 @@ class MqttClient:
                             future.add_done_callback(
                                 _make_async_done_callback(handler, msg.topic)
                             )
-                            # Детальное логирование всех MQTT сообщений для диагностики
-                            logger.info(
-                                f"[MQTT] Message received on {msg.topic}: scheduled async handler "
-                                f"(future={future}, payload_len={len(msg.payload)}, handler={handler.__name__ if hasattr(handler, '__name__') else 'unknown'})"
+                            # Сэмплированный лог: не больше N записей/сек на класс топика,
+                            # payload — только при DEBUG.
+                            hot_path_log.info(
+                                topic_class(msg.topic),
+                                "[MQTT] Message received on %s: scheduled async handler "
+                                "(payload_len=%s, handler=%s)",
+                                msg.topic,
+                                len(msg.payload),
+                                getattr(handler, "__name__", "unknown"),
+                                payload=msg.payload,
                             )
-                            print(f"[MQTT] Message on {msg.topic}: payload_len={len(msg.payload)}, handler={handler.__name__ if hasattr(handler, '__name__') else 'unknown'}", flush=True)
                         except Exception as e:
                             logger.error(
                                 f"Failed to schedule async handler for topic {msg.topic}: {e}",
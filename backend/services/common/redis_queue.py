@@ -1,13 +1,16 @@
 """
 Redis queue для буферизации телеметрии перед записью в БД.
 """
+import asyncio
 import base64
 import json
 import logging
 import random
+import time
+import zlib
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import List, Optional, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 from .utils.time import utcnow
 
@@ -42,7 +45,11 @@ try:
         REDIS_CONNECTED = _NoOpGaugeRedis()
 
     try:
-        QUEUE_DROPPED = Counter("telemetry_queue_dropped_total", "Dropped messages due to queue overflow")
+        QUEUE_DROPPED = Counter(
+            "telemetry_queue_dropped_total",
+            "Dropped messages due to queue overflow",
+            ["reason"],
+        )
     except ValueError:
         class _NoOpCounter:
             def inc(self, *args, **kwargs): pass
@@ -110,6 +117,20 @@ def _unwrap_queue_bytes(data: bytes) -> Tuple[bytes, int]:
     return data, 0
 
 
+def shard_for_node_uid(node_uid: Optional[str], shard_count: int) -> int:
+    """Стабильный номер шарда по node_uid (crc32, не зависит от PYTHONHASHSEED)."""
+    if shard_count <= 1:
+        return 0
+    return zlib.crc32(str(node_uid or "").encode("utf-8")) % shard_count
+
+
+def shard_key(base_key: str, shard_index: int) -> str:
+    """Шард 0 сохраняет legacy-ключ, чтобы переход 1 -> N не терял очередь."""
+    if shard_index <= 0:
+        return base_key
+    return f"{base_key}:{shard_index}"
+
+
 @dataclass
 class TelemetryQueueItem:
     """Элемент очереди телеметрии."""
@@ -205,6 +226,36 @@ end
 return count
 """
 
+# Перекладывает голову списка шарда (N записей, прочитанных LRANGE) по шардам
+# текущего shard_count: проверяет, что голова не изменилась, снимает её и
+# возвращает каждую запись в голову её шарда (KEYS[idx]) с сохранением порядка.
+# Записи, которые остаются на месте, возвращаются в голову исходного списка.
+# ARGV: N, затем пары (raw, idx). Возвращает число перемещённых записей или -1 при гонке.
+_REBALANCE_SHARD_SCRIPT = """
+local source_key = KEYS[1]
+local n = tonumber(ARGV[1])
+local current = redis.call('LRANGE', source_key, 0, n - 1)
+if #current ~= n then
+  return -1
+end
+for i = 1, n do
+  if current[i] ~= ARGV[(i - 1) * 2 + 2] then
+    return -1
+  end
+end
+redis.call('LTRIM', source_key, n, -1)
+local moved = 0
+for i = n, 1, -1 do
+  local base = (i - 1) * 2 + 2
+  local target_key = KEYS[tonumber(ARGV[base + 1])]
+  redis.call('LPUSH', target_key, ARGV[base])
+  if target_key ~= source_key then
+    moved = moved + 1
+  end
+end
+return moved
+"""
+
 _MOVE_PROCESSING_TO_QUEUE_SCRIPT = """
 local processing_key = KEYS[1]
 local queue_key = KEYS[2]
@@ -231,22 +282,165 @@ end
 return 0
 """
 
+# Применяет решения bulk replay/purge к голове dead list атомарно: проверяет, что
+# первые N записей не изменились с момента чтения, снимает их и раскладывает —
+# keep обратно в хвост dead list, replay в хвост очереди шарда (KEYS[idx]), drop —
+# никуда. Возвращает число переложенных в очереди записей или -1 при гонке.
+# ARGV: N, затем тройки (raw, action, payload); action = keep | drop | <idx в KEYS>.
+# {replay} — команда записи в очередь (RPUSH для list, XADD для stream backend).
+APPLY_DEAD_CHUNK_SCRIPT_TEMPLATE = """
+local dead_key = KEYS[1]
+local n = tonumber(ARGV[1])
+local current = redis.call('LRANGE', dead_key, 0, n - 1)
+if #current ~= n then
+  return -1
+end
+for i = 1, n do
+  if current[i] ~= ARGV[(i - 1) * 3 + 2] then
+    return -1
+  end
+end
+redis.call('LTRIM', dead_key, n, -1)
+local replayed = 0
+for i = 1, n do
+  local base = (i - 1) * 3 + 1
+  local action = ARGV[base + 2]
+  if action == 'keep' then
+    redis.call('RPUSH', dead_key, ARGV[base + 1])
+  elseif action ~= 'drop' then
+    {replay}
+    replayed = replayed + 1
+  end
+end
+return replayed
+"""
+_APPLY_DEAD_CHUNK_SCRIPT = APPLY_DEAD_CHUNK_SCRIPT_TEMPLATE.format(
+    replay="redis.call('RPUSH', KEYS[tonumber(action)], ARGV[base + 3])"
+)
+
+DEAD_AGE_BUCKETS: Tuple[Tuple[str, float], ...] = (
+    ("<1h", 3600.0),
+    ("1h-24h", 24 * 3600.0),
+    ("1d-7d", 7 * 24 * 3600.0),
+)
+
+DEAD_AGE_LABELS = tuple(label for label, _ in DEAD_AGE_BUCKETS) + (">7d", "unknown")
+
+
+def _dead_age_bucket(age: Optional[float]) -> str:
+    if age is None:
+        return "unknown"
+    for label, upper in DEAD_AGE_BUCKETS:
+        if age < upper:
+            return label
+    return ">7d"
+
+
+@dataclass(frozen=True)
+class DeadListFilter:
+    """Отбор записей dead list для bulk-операций; пустое поле — без ограничения."""
+
+    reasons: FrozenSet[str] = frozenset()
+    zone_uids: FrozenSet[str] = frozenset()
+    node_uids: FrozenSet[str] = frozenset()
+    min_age_seconds: Optional[float] = None
+    max_age_seconds: Optional[float] = None
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        reasons: Optional[Iterable[str]] = None,
+        zone_uids: Optional[Iterable[str]] = None,
+        node_uids: Optional[Iterable[str]] = None,
+        min_age_seconds: Optional[float] = None,
+        max_age_seconds: Optional[float] = None,
+    ) -> "DeadListFilter":
+        return cls(
+            reasons=frozenset(reasons or ()),
+            zone_uids=frozenset(zone_uids or ()),
+            node_uids=frozenset(node_uids or ()),
+            min_age_seconds=min_age_seconds,
+            max_age_seconds=max_age_seconds,
+        )
+
+    def matches(self, record: dict) -> bool:
+        if self.reasons and record.get("reason") not in self.reasons:
+            return False
+        if self.zone_uids and record.get("zone_uid") not in self.zone_uids:
+            return False
+        if self.node_uids and record.get("node_uid") not in self.node_uids:
+            return False
+        age = record.get("age_seconds")
+        if self.min_age_seconds is not None and (age is None or age < self.min_age_seconds):
+            return False
+        if self.max_age_seconds is not None and (age is None or age > self.max_age_seconds):
+            return False
+        return True
+
+
+@dataclass(frozen=True)
+class QueueHealthSnapshot:
+    """Gauge одного шарда очереди, снятые одним pipeline-запросом в Redis."""
+
+    shard: int
+    size: int
+    processing_size: int
+    oldest_age_seconds: Optional[float]
+    dead_list_size: int
+    taken_at: float = field(default_factory=time.monotonic)
+
 
 class TelemetryQueue:
-    """Очередь телеметрии в Redis для буферизации перед записью в БД."""
+    """Очередь телеметрии в Redis для буферизации перед записью в БД.
+
+    Очередь может быть разбита на ``shard_count`` шардов по hash(node_uid):
+    ``push`` сам выбирает шард, а consumer работает со своим view из ``shard(i)``.
+    Per-shard операции (pop/ack/requeue/reclaim/size) касаются только ключей
+    своего шарда; dead list общий для всех шардов.
+    """
 
     QUEUE_KEY = "hydro:telemetry:queue"
     PROCESSING_KEY = "hydro:telemetry:processing"
     DEAD_KEY = "hydro:telemetry:dead"
+    APPLY_DEAD_CHUNK_SCRIPT = _APPLY_DEAD_CHUNK_SCRIPT
     DEAD_TTL_SEC = 7 * 24 * 3600
     MAX_QUEUE_SIZE = 50000
 
-    def __init__(self):
+    def __init__(self, shard_count: int = 1, shard_index: int = 0):
+        self.shard_count = max(1, int(shard_count))
+        if not 0 <= int(shard_index) < self.shard_count:
+            raise ValueError(f"shard_index {shard_index} out of range for {self.shard_count} shard(s)")
+        self.shard_index = int(shard_index)
+        self.QUEUE_KEY = shard_key(type(self).QUEUE_KEY, self.shard_index)
+        self.PROCESSING_KEY = shard_key(type(self).PROCESSING_KEY, self.shard_index)
         self._client: Optional[redis_async.Redis] = None
         self._pop_script = None
         self._reclaim_script = None
         self._move_processing_to_queue_script = None
         self._move_processing_to_dead_script = None
+        self._apply_dead_chunk_script = None
+        self._rebalance_shard_script = None
+        # Последние снимки health по номеру шарда; общий для всех view одной очереди.
+        self._health_snapshots: Dict[int, QueueHealthSnapshot] = {}
+
+    def shard(self, shard_index: int) -> "TelemetryQueue":
+        """View очереди, привязанный к ключам шарда ``shard_index``."""
+        if shard_index == self.shard_index:
+            return self
+        view = type(self)(shard_count=self.shard_count, shard_index=shard_index)
+        view._client = self._client
+        view._health_snapshots = self._health_snapshots
+        return view
+
+    def shards(self) -> List["TelemetryQueue"]:
+        return [self.shard(index) for index in range(self.shard_count)]
+
+    def _queue_key_for(self, item: TelemetryQueueItem) -> str:
+        return shard_key(
+            type(self).QUEUE_KEY,
+            shard_for_node_uid(item.node_uid, self.shard_count),
+        )
 
     def _max_pg_retries(self) -> int:
         return max(1, int(get_settings().telemetry_max_pg_retries))
@@ -266,48 +460,105 @@ class TelemetryQueue:
             self._move_processing_to_dead_script = self._client.register_script(
                 _MOVE_PROCESSING_TO_DEAD_SCRIPT
             )
+        if self._apply_dead_chunk_script is None:
+            self._apply_dead_chunk_script = self._client.register_script(self.APPLY_DEAD_CHUNK_SCRIPT)
+        if self._rebalance_shard_script is None:
+            self._rebalance_shard_script = self._client.register_script(_REBALANCE_SHARD_SCRIPT)
 
     async def push(self, item: TelemetryQueueItem) -> bool:
         try:
             await self._ensure_client()
 
-            size = await self._client.llen(self.QUEUE_KEY)
-            QUEUE_SIZE.set(size)
-
-            utilization = size / self.MAX_QUEUE_SIZE if self.MAX_QUEUE_SIZE > 0 else 0.0
-            if utilization > 0.95:
-                await self._send_overflow_alert(size)
-                sample_rate = 0.8 if utilization < 0.98 else 0.5
-                if random.random() > sample_rate:
-                    QUEUE_DROPPED.labels(reason="backpressure").inc()
-                    logger.warning(
-                        f"Dropping telemetry due to backpressure (queue {utilization:.1%} full)",
-                        extra={"queue_utilization": utilization, "queue_size": size},
-                    )
-                    return False
-
-            if size >= self.MAX_QUEUE_SIZE:
-                QUEUE_DROPPED.labels(reason="overflow").inc()
-                if size >= self.MAX_QUEUE_SIZE * 0.95:
-                    await self._send_overflow_alert(size)
-                logger.warning(
-                    f"Telemetry queue is full ({size} items), dropping message",
-                    extra={
-                        "queue_size": size,
-                        "max_size": self.MAX_QUEUE_SIZE,
-                        "utilization": f"{utilization:.1%}",
-                    },
-                )
+            queue_key = self._queue_key_for(item)
+            size = await self._client.llen(queue_key)
+            if not await self._admit(size):
                 return False
 
             item.enqueued_at = utcnow()
-            await self._client.rpush(self.QUEUE_KEY, item.to_json())
+            await self._client.rpush(queue_key, item.to_json())
             return True
 
         except Exception as e:
             logger.error(f"Failed to push to telemetry queue: {e}", exc_info=True)
             return False
 
+    async def push_many(self, items: List[TelemetryQueueItem]) -> List[bool]:
+        """
+        Пакетный push: один pipeline с размерами затронутых шардов и один — с записью.
+
+        Backpressure применяется поштучно, как в ``push``; возвращает флаг приёма
+        для каждого item. Ошибки Redis пробрасываются — retry на вызывающей стороне.
+        """
+        if not items:
+            return []
+        await self._ensure_client()
+
+        keys = [self._queue_key_for(item) for item in items]
+        unique_keys = list(dict.fromkeys(keys))
+        pipe = self._client.pipeline(transaction=False)
+        for key in unique_keys:
+            self._pipeline_depth(pipe, key)
+        sizes = {
+            key: int(size or 0)
+            for key, size in zip(unique_keys, await pipe.execute())
+        }
+
+        accepted: List[bool] = []
+        payloads: Dict[str, List[bytes]] = {}
+        enqueued_at = utcnow()
+        for item, key in zip(items, keys):
+            if not await self._admit(sizes[key]):
+                accepted.append(False)
+                continue
+            sizes[key] += 1
+            item.enqueued_at = enqueued_at
+            payloads.setdefault(key, []).append(item.to_json())
+            accepted.append(True)
+
+        if payloads:
+            pipe = self._client.pipeline(transaction=False)
+            for key, values in payloads.items():
+                self._pipeline_append(pipe, key, values)
+            await pipe.execute()
+        return accepted
+
+    def _pipeline_depth(self, pipe, key: str) -> None:
+        pipe.llen(key)
+
+    def _pipeline_append(self, pipe, key: str, values: List[bytes]) -> None:
+        pipe.rpush(key, *values)
+
+    async def _admit(self, size: int) -> bool:
+        """Backpressure/overflow по текущему размеру шарда: False — сообщение отброшено."""
+        QUEUE_SIZE.set(size)
+
+        utilization = size / self.MAX_QUEUE_SIZE if self.MAX_QUEUE_SIZE > 0 else 0.0
+        if utilization > 0.95:
+            await self._send_overflow_alert(size)
+            sample_rate = 0.8 if utilization < 0.98 else 0.5
+            if random.random() > sample_rate:
+                QUEUE_DROPPED.labels(reason="backpressure").inc()
+                logger.warning(
+                    f"Dropping telemetry due to backpressure (queue {utilization:.1%} full)",
+                    extra={"queue_utilization": utilization, "queue_size": size},
+                )
+                return False
+
+        if size >= self.MAX_QUEUE_SIZE:
+            QUEUE_DROPPED.labels(reason="overflow").inc()
+            if size >= self.MAX_QUEUE_SIZE * 0.95:
+                await self._send_overflow_alert(size)
+            logger.warning(
+                f"Telemetry queue is full ({size} items), dropping message",
+                extra={
+                    "queue_size": size,
+                    "max_size": self.MAX_QUEUE_SIZE,
+                    "utilization": f"{utilization:.1%}",
+                },
+            )
+            return False
+        return True
+
     async def _send_overflow_alert(self, current_size: int):
         try:
             await self._ensure_client()
@@ -353,27 +604,88 @@ class TelemetryQueue:
             if not raw_items:
                 return PopBatchResult()
 
-            entries: List[QueueEntry] = []
-            for wrapped in raw_items:
-                if wrapped is None:
-                    continue
-                if isinstance(wrapped, str):
-                    wrapped = wrapped.encode("utf-8")
-                inner, retry_count = _unwrap_queue_bytes(wrapped)
-                item = TelemetryQueueItem.from_json(inner)
-                if item is None:
-                    await self._move_raw_to_dead(wrapped, reason="deserialize_failed")
-                    continue
-                entries.append(
-                    QueueEntry(raw=wrapped, item=item, retry_count=retry_count)
-                )
-
-            return PopBatchResult(entries=entries)
+            return await self._entries_from_raw(raw_items)
 
         except Exception as e:
             logger.error(f"Failed to pop batch from telemetry queue: {e}", exc_info=True)
             return PopBatchResult()
 
+    async def pop_batch_blocking(
+        self,
+        batch_size: int,
+        *,
+        block_timeout_sec: float,
+        linger_ms: float,
+    ) -> PopBatchResult:
+        """
+        Блокирующий pop: ждёт первый элемент через BLMOVE (до ``block_timeout_sec``),
+        затем добирает батч до ``batch_size`` не дольше ``linger_ms``.
+
+        Пока очередь пуста, Redis получает одну команду за ``block_timeout_sec``
+        вместо постоянного polling.
+
+        Ошибки Redis пробрасываются: пустой результат означает только таймаут
+        BLMOVE, а consumer при ошибке выдерживает ``queue_error_retry_delay_sec``.
+        """
+        await self._ensure_client()
+        if batch_size <= 0:
+            return PopBatchResult()
+
+        first = await self._client.blmove(
+            self.QUEUE_KEY,
+            self.PROCESSING_KEY,
+            max(0.01, float(block_timeout_sec)),
+            "LEFT",
+            "RIGHT",
+        )
+        if first is None:
+            return PopBatchResult()
+
+        raw_items = [first]
+        deadline = time.monotonic() + max(0.0, float(linger_ms)) / 1000
+        while len(raw_items) < batch_size:
+            more = await self._pop_script(
+                keys=[self.QUEUE_KEY, self.PROCESSING_KEY],
+                args=[batch_size - len(raw_items)],
+            )
+            if more:
+                raw_items.extend(more)
+                continue
+            remaining = deadline - time.monotonic()
+            # BLMOVE с timeout=0 блокирует бесконечно — короткий остаток не ждём.
+            if remaining < 0.01:
+                break
+            next_item = await self._client.blmove(
+                self.QUEUE_KEY,
+                self.PROCESSING_KEY,
+                remaining,
+                "LEFT",
+                "RIGHT",
+            )
+            if next_item is None:
+                break
+            raw_items.append(next_item)
+
+        return await self._entries_from_raw(raw_items)
+
+    async def _entries_from_raw(self, raw_items: list) -> PopBatchResult:
+        entries: List[QueueEntry] = []
+        for wrapped in raw_items:
+            if wrapped is None:
+                continue
+            if isinstance(wrapped, str):
+                wrapped = wrapped.encode("utf-8")
+            inner, retry_count = _unwrap_queue_bytes(wrapped)
+            item = TelemetryQueueItem.from_json(inner)
+            if item is None:
+                await self._move_raw_to_dead(wrapped, reason="deserialize_failed")
+                continue
+            entries.append(
+                QueueEntry(raw=wrapped, item=item, retry_count=retry_count)
+            )
+
+        return PopBatchResult(entries=entries)
+
     async def ack_batch(self, raw_items: List[bytes]) -> int:
         if not raw_items:
             return 0
@@ -433,6 +745,67 @@ class TelemetryQueue:
             logger.error(f"Failed to reclaim telemetry processing list: {e}", exc_info=True)
             return 0
 
+    async def rebalance_shards(self, *, max_conflicts: int = 3) -> int:
+        """
+        Разложить очередь по текущему ``shard_count`` перед стартом consumer'ов.
+
+        После смены ``TELEMETRY_CONSUMER_WORKERS`` записи узла лежат в шарде,
+        выбранном по старому числу шардов: ключи ``:k`` для k >= shard_count
+        никто не читает, а в остальных бэклог узла конкурировал бы с его новыми
+        записями в другом шарде. Для каждого существующего шарда (включая
+        legacy-ключ без суффикса = шард 0) processing list возвращается в
+        очередь, затем записи, чей шард сменился, переносятся в голову нового
+        шарда в исходном порядке — бэклог узла читается раньше его новых записей.
+        Возвращает число перенесённых записей.
+        """
+        await self._ensure_client()
+        base_queue, base_processing = type(self).QUEUE_KEY, type(self).PROCESSING_KEY
+        target_keys = [shard_key(base_queue, index) for index in range(self.shard_count)]
+        moved = 0
+        for index in await self._existing_shard_indexes(base_queue, base_processing):
+            source_key = shard_key(base_queue, index)
+            if index >= self.shard_count:
+                await self._reclaim_script(keys=[shard_key(base_processing, index), source_key], args=[])
+            conflicts = 0
+            while True:
+                raw_items = await self._client.lrange(source_key, 0, -1)
+                targets = [self._shard_of_raw(raw) for raw in raw_items]
+                if all(target == index for target in targets):
+                    break
+                args: List[object] = [len(raw_items)]
+                for raw, target in zip(raw_items, targets):
+                    args.extend((raw, str(2 + target)))
+                result = int(await self._rebalance_shard_script(keys=[source_key, *target_keys], args=args))
+                if result >= 0:
+                    moved += result
+                    logger.info("Telemetry queue shard %s: moved %s item(s) to %s shard(s)", index, result, self.shard_count)
+                    break
+                conflicts += 1
+                if conflicts > max_conflicts:
+                    logger.warning("Telemetry queue shard %s rebalance aborted: list changes concurrently", index)
+                    break
+        return moved
+
+    async def _existing_shard_indexes(self, *base_keys: str) -> List[int]:
+        """Номера шардов текущего ``shard_count`` и найденных SCAN ключей ``<base>:<k>``."""
+        indexes = set(range(self.shard_count))
+        for base_key in base_keys:
+            async for key in self._client.scan_iter(match=f"{base_key}:*"):
+                if isinstance(key, bytes):
+                    key = key.decode("utf-8", errors="replace")
+                suffix = key[len(base_key) + 1 :]
+                if suffix.isdigit():
+                    indexes.add(int(suffix))
+        return sorted(indexes)
+
+    def _shard_of_raw(self, raw: bytes) -> int:
+        try:
+            node_uid = json.loads(_unwrap_queue_bytes(raw)[0]).get("node_uid")
+        except (ValueError, AttributeError):
+            # Нечитаемая запись уходит в шард node_uid=None: consumer переложит её в dead list.
+            node_uid = None
+        return shard_for_node_uid(node_uid, self.shard_count)
+
     async def move_entries_to_dead(self, entries: List[QueueEntry], *, reason: str) -> int:
         if not entries:
             return 0
@@ -467,32 +840,39 @@ class TelemetryQueue:
             await self._ensure_client()
             await self.prune_expired_dead()
             inner, retry = _unwrap_queue_bytes(raw)
-            dead_payload = json.dumps(
-                {
-                    "reason": reason,
-                    "retry": retry,
-                    "payload_b64": base64.b64encode(inner).decode("ascii"),
-                    "moved_at": utcnow().isoformat(),
-                },
-                separators=(",", ":"),
-            ).encode("utf-8")
+            dead_payload = self._dead_payload(inner, retry, reason=reason)
             moved = await self._atomic_move_processing_to_dead(raw, dead_payload)
             if moved <= 0:
                 return False
-            try:
-                from metrics import TELEMETRY_DEAD_LIST_SIZE, TELEMETRY_DESERIALIZE_FAILED
-
-                dead_size = await self._client.llen(self.DEAD_KEY)
-                TELEMETRY_DEAD_LIST_SIZE.set(int(dead_size or 0))
-                if reason == "deserialize_failed":
-                    TELEMETRY_DESERIALIZE_FAILED.inc()
-            except Exception:
-                pass
+            await self._record_dead_move(reason)
             return True
         except Exception as e:
             logger.error(f"Failed to move telemetry item to dead list: {e}", exc_info=True)
             return False
 
+    @staticmethod
+    def _dead_payload(inner: bytes, retry: int, *, reason: str) -> bytes:
+        return json.dumps(
+            {
+                "reason": reason,
+                "retry": retry,
+                "payload_b64": base64.b64encode(inner).decode("ascii"),
+                "moved_at": utcnow().isoformat(),
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    async def _record_dead_move(self, reason: str) -> None:
+        try:
+            from metrics import TELEMETRY_DEAD_LIST_SIZE, TELEMETRY_DESERIALIZE_FAILED
+
+            dead_size = await self._client.llen(self.DEAD_KEY)
+            TELEMETRY_DEAD_LIST_SIZE.set(int(dead_size or 0))
+            if reason == "deserialize_failed":
+                TELEMETRY_DESERIALIZE_FAILED.inc()
+        except Exception:
+            pass
+
     async def total_pending_size(self) -> int:
         try:
             await self._ensure_client()
@@ -626,8 +1006,7 @@ class TelemetryQueue:
                 return False
 
             inner = base64.b64decode(str(entry["payload_b64"]))
-            wrapped = _wrap_queue_bytes(inner, 0)
-            await self._client.lpush(self.QUEUE_KEY, wrapped)
+            await self._enqueue_replayed(inner)
             await self._client.lrem(self.DEAD_KEY, 1, raw)
             await self._update_dead_list_metric()
             return True
@@ -635,6 +1014,16 @@ class TelemetryQueue:
             logger.error(f"Failed to replay telemetry dead list item {index}: {e}", exc_info=True)
             return False
 
+    def _replay_target_keys(self) -> List[str]:
+        """Ключи очередей всех шардов для bulk replay (порядок = номер шарда)."""
+        return [shard_key(type(self).QUEUE_KEY, index) for index in range(self.shard_count)]
+
+    async def _enqueue_replayed(self, inner: bytes) -> None:
+        """Вернуть payload из dead list в голову очереди его шарда со сброшенным retry."""
+        item = TelemetryQueueItem.from_json(inner)
+        queue_key = self._queue_key_for(item) if item is not None else self.QUEUE_KEY
+        await self._client.lpush(queue_key, _wrap_queue_bytes(inner, 0))
+
     async def purge_dead(self, index: int) -> bool:
         try:
             await self._ensure_client()
@@ -663,6 +1052,196 @@ class TelemetryQueue:
             logger.error(f"Failed to purge telemetry dead list: {e}", exc_info=True)
             return 0
 
+    @classmethod
+    def _decode_dead_record(cls, raw: bytes, *, now: datetime) -> Optional[dict]:
+        """Запись dead list с полями фильтрации; None — запись не разбирается."""
+        entry = cls._parse_dead_entry(raw)
+        if entry is None or not entry.get("payload_b64"):
+            return None
+        try:
+            inner = base64.b64decode(str(entry["payload_b64"]))
+        except (ValueError, TypeError):
+            return None
+        item = TelemetryQueueItem.from_json(inner)
+        return {
+            "reason": entry.get("reason"),
+            "age_seconds": cls._dead_entry_age_seconds(entry.get("moved_at"), now=now),
+            "zone_uid": item.zone_uid if item is not None else None,
+            "node_uid": item.node_uid if item is not None else None,
+            "inner": inner,
+        }
+
+    async def summarize_dead(
+        self,
+        dead_filter: Optional[DeadListFilter] = None,
+        *,
+        chunk_size: int = 1000,
+        top: int = 20,
+    ) -> dict:
+        """
+        Сводка по dead list (счётчики по reason / zone / node / возрасту) без
+        загрузки всего списка: читается окнами ``LRANGE`` по ``chunk_size``.
+        С фильтром — сводка только по подходящим записям (dry-run bulk-операций).
+        """
+        await self._ensure_client()
+        chunk_size = max(1, int(chunk_size))
+        now = utcnow()
+        scanned = matched = unparseable = 0
+        by_reason: Dict[str, int] = {}
+        by_zone: Dict[str, int] = {}
+        by_node: Dict[str, int] = {}
+        by_age: Dict[str, int] = {}
+        oldest_age: Optional[float] = None
+
+        start = 0
+        while True:
+            raw_items = await self._client.lrange(self.DEAD_KEY, start, start + chunk_size - 1)
+            if not raw_items:
+                break
+            start += len(raw_items)
+            for raw in raw_items:
+                scanned += 1
+                record = self._decode_dead_record(raw, now=now)
+                if record is None:
+                    unparseable += 1
+                    continue
+                if dead_filter is not None and not dead_filter.matches(record):
+                    continue
+                matched += 1
+                for counts, key in (
+                    (by_reason, record["reason"]),
+                    (by_zone, record["zone_uid"]),
+                    (by_node, record["node_uid"]),
+                    (by_age, _dead_age_bucket(record["age_seconds"])),
+                ):
+                    label = str(key) if key is not None else "unknown"
+                    counts[label] = counts.get(label, 0) + 1
+                age = record["age_seconds"]
+                if age is not None and (oldest_age is None or age > oldest_age):
+                    oldest_age = age
+            if len(raw_items) < chunk_size:
+                break
+
+        def _top(counts: Dict[str, int]) -> Dict[str, int]:
+            return dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[: max(1, top)])
+
+        return {
+            "scanned": scanned,
+            "matched": matched,
+            "unparseable": unparseable,
+            "oldest_age_seconds": oldest_age,
+            "by_reason": _top(by_reason),
+            "by_zone": _top(by_zone),
+            "by_node": _top(by_node),
+            "by_age": {label: by_age[label] for label in DEAD_AGE_LABELS if label in by_age},
+        }
+
+    async def replay_dead_bulk(
+        self,
+        dead_filter: Optional[DeadListFilter] = None,
+        *,
+        chunk_size: int = 500,
+        rows_per_second: float = 0.0,
+    ) -> dict:
+        """
+        Возвращает подходящие записи dead list в хвост очередей их шардов со
+        сброшенным retry. Очередь не переполняется: перед каждым чанком ждём,
+        пока в шардах будет место под него. ``rows_per_second`` ограничивает темп.
+        """
+        return await self._process_dead_bulk(
+            "replay", dead_filter, chunk_size=chunk_size, rows_per_second=rows_per_second
+        )
+
+    async def purge_dead_bulk(
+        self,
+        dead_filter: Optional[DeadListFilter] = None,
+        *,
+        chunk_size: int = 500,
+    ) -> dict:
+        """Удаляет подходящие записи dead list, остальные сохраняют взаимный порядок."""
+        return await self._process_dead_bulk("purge", dead_filter, chunk_size=chunk_size, rows_per_second=0.0)
+
+    async def _process_dead_bulk(
+        self,
+        action: str,
+        dead_filter: Optional[DeadListFilter],
+        *,
+        chunk_size: int,
+        rows_per_second: float,
+        max_conflicts: int = 10,
+    ) -> dict:
+        """
+        Один проход по dead list от головы: каждый чанк читается ``LRANGE 0..N-1``,
+        решения применяются ``_APPLY_DEAD_CHUNK_SCRIPT`` (O(N) на чанк вместо
+        ``LINDEX`` + ``LREM`` на запись). Несовпавшие записи уходят в хвост, поэтому
+        проход ограничен длиной списка на старте; новые записи в хвосте не трогаем.
+        """
+        await self._ensure_client()
+        chunk_size = max(1, int(chunk_size))
+        queue_keys = self._replay_target_keys()
+        total = int(await self._client.llen(self.DEAD_KEY) or 0)
+        stats = {"scanned": 0, "replayed": 0, "purged": 0, "kept": 0, "unparseable": 0, "conflicts": 0}
+        started = time.monotonic()
+        affected = 0
+
+        while stats["scanned"] < total:
+            limit = min(chunk_size, total - stats["scanned"])
+            raw_items = await self._client.lrange(self.DEAD_KEY, 0, limit - 1)
+            if not raw_items:
+                break
+
+            now = utcnow()
+            args: List[object] = [len(raw_items)]
+            chunk = {"replayed": 0, "purged": 0, "kept": 0, "unparseable": 0}
+            for raw in raw_items:
+                record = self._decode_dead_record(raw, now=now)
+                if record is None:
+                    chunk["unparseable"] += 1
+                if record is None or (dead_filter is not None and not dead_filter.matches(record)):
+                    args.extend((raw, "keep", b""))
+                    chunk["kept"] += 1
+                elif action == "purge":
+                    args.extend((raw, "drop", b""))
+                    chunk["purged"] += 1
+                else:
+                    shard = shard_for_node_uid(record["node_uid"], self.shard_count)
+                    args.extend((raw, str(2 + shard), record["inner"]))
+                    chunk["replayed"] += 1
+
+            if chunk["replayed"]:
+                await self._wait_for_queue_room(chunk["replayed"])
+            result = int(await self._apply_dead_chunk_script(keys=[self.DEAD_KEY, *queue_keys], args=args))
+            if result < 0:
+                stats["conflicts"] += 1
+                if stats["conflicts"] > max_conflicts:
+                    logger.warning("Telemetry dead list bulk %s aborted: dead list changes concurrently", action)
+                    break
+                continue
+
+            stats["scanned"] += len(raw_items)
+            for key, value in chunk.items():
+                stats[key] += value
+            affected += chunk["replayed"] + chunk["purged"]
+
+            if rows_per_second > 0:
+                ahead = affected / rows_per_second - (time.monotonic() - started)
+                if ahead > 0:
+                    await asyncio.sleep(ahead)
+
+        await self._update_dead_list_metric()
+        stats["elapsed_seconds"] = round(time.monotonic() - started, 3)
+        return stats
+
+    async def _wait_for_queue_room(self, count: int, *, poll_sec: float = 1.0) -> None:
+        """Ждёт, пока самый заполненный шард примет ``count`` записей без backpressure."""
+        limit = max(count, int(self.MAX_QUEUE_SIZE * 0.9) - count)
+        while True:
+            sizes = [await shard.size() for shard in self.shards()]
+            if max(sizes, default=0) <= limit:
+                return
+            logger.info("Telemetry dead list replay waits for queue room: max shard size=%s", max(sizes))
+            await asyncio.sleep(poll_sec)
+
     async def get_dead_metrics(self) -> dict:
         await self.prune_expired_dead()
         size = await self.dead_list_size()
@@ -676,49 +1255,111 @@ class TelemetryQueue:
             "ttl_seconds": self.DEAD_TTL_SEC,
         }
 
-    async def get_health_metrics(self) -> dict:
-        """Метрики очереди телеметрии для /health и Prometheus."""
-        try:
-            await self._ensure_client()
-            queue_size = int(await self._client.llen(self.QUEUE_KEY) or 0)
-            processing_size = int(await self._client.llen(self.PROCESSING_KEY) or 0)
-            total_pending = queue_size + processing_size
-            utilization = (
-                total_pending / self.MAX_QUEUE_SIZE if self.MAX_QUEUE_SIZE > 0 else 0.0
-            )
-            oldest_age = await self.get_oldest_age_seconds()
-            dead_size = await self.dead_list_size()
+    async def snapshot_health(self) -> QueueHealthSnapshot:
+        """
+        Size / processing / oldest age шарда и размер dead list за один round trip
+        (pipeline без MULTI). Снимок кешируется для ``get_health_metrics``;
+        ошибки Redis пробрасываются.
+        """
+        await self._ensure_client()
+        pipe = self._client.pipeline(transaction=False)
+        self._pipeline_health(pipe)
+        results = await pipe.execute()
+        snapshot = self._health_snapshot_from(results)
+        self._health_snapshots[self.shard_index] = snapshot
+        return snapshot
+
+    def _pipeline_health(self, pipe) -> None:
+        pipe.llen(self.QUEUE_KEY)
+        pipe.llen(self.PROCESSING_KEY)
+        pipe.lindex(self.QUEUE_KEY, 0)
+        pipe.llen(self.DEAD_KEY)
+
+    def _health_snapshot_from(self, results: list) -> QueueHealthSnapshot:
+        queue_size, processing_size, oldest_raw, dead_size = results
+        return QueueHealthSnapshot(
+            shard=self.shard_index,
+            size=int(queue_size or 0),
+            processing_size=int(processing_size or 0),
+            oldest_age_seconds=self._queue_item_age_seconds(oldest_raw),
+            dead_list_size=int(dead_size or 0),
+        )
 
-            QUEUE_SIZE.set(queue_size)
-            QUEUE_UTILIZATION.set(utilization)
+    @staticmethod
+    def _queue_item_age_seconds(raw: Optional[bytes]) -> Optional[float]:
+        if not raw:
+            return None
+        inner, _ = _unwrap_queue_bytes(raw)
+        item = TelemetryQueueItem.from_json(inner)
+        if not item or not item.enqueued_at:
+            return None
+        return max(0.0, (utcnow() - item.enqueued_at).total_seconds())
 
-            return {
-                "size": queue_size,
-                "processing_size": processing_size,
-                "depth": total_pending,
-                "utilization": utilization,
-                "oldest_age_seconds": oldest_age or 0.0,
-                "dead_list_size": dead_size,
-                "max_size": self.MAX_QUEUE_SIZE,
-            }
+    def cached_health_metrics(self, max_age_sec: float) -> Optional[dict]:
+        """Агрегат по снимкам всех шардов не старше ``max_age_sec``; None — кеша нет."""
+        now = time.monotonic()
+        snapshots = [self._health_snapshots.get(index) for index in range(self.shard_count)]
+        if any(snap is None or now - snap.taken_at > max_age_sec for snap in snapshots):
+            return None
+        return self._aggregate_health(snapshots)
+
+    async def get_health_metrics(self, max_age_sec: float = 0.0) -> dict:
+        """
+        Метрики очереди телеметрии (сумма по всем шардам) для /health и Prometheus.
+
+        При ``max_age_sec > 0`` отдаёт снимки, которые consumer'ы шардов сняли
+        не раньше ``max_age_sec`` назад, не обращаясь к Redis.
+        """
+        if max_age_sec > 0:
+            cached = self.cached_health_metrics(max_age_sec)
+            if cached is not None:
+                return cached
+        try:
+            await self._ensure_client()
+            snapshots = []
+            for shard in self.shards():
+                shard._client = self._client
+                snapshots.append(await shard.snapshot_health())
+            return self._aggregate_health(snapshots)
         except Exception as e:
             logger.error(f"Failed to collect telemetry queue health metrics: {e}", exc_info=True)
             raise
 
+    def _aggregate_health(self, snapshots: List[QueueHealthSnapshot]) -> dict:
+        queue_size = sum(snap.size for snap in snapshots)
+        processing_size = sum(snap.processing_size for snap in snapshots)
+        ages = [snap.oldest_age_seconds for snap in snapshots if snap.oldest_age_seconds is not None]
+        total_pending = queue_size + processing_size
+        capacity = self.MAX_QUEUE_SIZE * self.shard_count
+        utilization = total_pending / capacity if capacity > 0 else 0.0
+
+        QUEUE_SIZE.set(queue_size)
+        QUEUE_UTILIZATION.set(utilization)
+
+        return {
+            "size": queue_size,
+            "processing_size": processing_size,
+            "depth": total_pending,
+            "utilization": utilization,
+            "oldest_age_seconds": max(ages) if ages else 0.0,
+            # Dead list общий: берём самый свежий снимок.
+            "dead_list_size": max(snapshots, key=lambda snap: snap.taken_at).dead_list_size if snapshots else 0,
+            "max_size": capacity,
+            "shards": [
+                {
+                    "shard": snap.shard,
+                    "size": snap.size,
+                    "processing_size": snap.processing_size,
+                    "oldest_age_seconds": snap.oldest_age_seconds or 0.0,
+                }
+                for snap in snapshots
+            ],
+        }
+
     async def get_oldest_age_seconds(self) -> Optional[float]:
         try:
             await self._ensure_client()
-            oldest_item_data = await self._client.lindex(self.QUEUE_KEY, 0)
-            if not oldest_item_data:
-                return None
-
-            inner, _ = _unwrap_queue_bytes(oldest_item_data)
-            oldest_item = TelemetryQueueItem.from_json(inner)
-            if not oldest_item or not oldest_item.enqueued_at:
-                return None
-
-            age = (utcnow() - oldest_item.enqueued_at).total_seconds()
-            return max(0.0, age)
+            return self._queue_item_age_seconds(await self._client.lindex(self.QUEUE_KEY, 0))
 
         except Exception as e:
             logger.error(f"Failed to get queue oldest age: {e}", exc_info=True)
@@ -733,6 +1374,29 @@ class TelemetryQueue:
             logger.error(f"Failed to clear telemetry queue: {e}", exc_info=True)
 
 
+QUEUE_BACKEND_LIST = "list"
+QUEUE_BACKEND_STREAM = "stream"
+
+
+def create_telemetry_queue(shard_count: Optional[int] = None) -> TelemetryQueue:
+    """Очередь телеметрии с backend из TELEMETRY_QUEUE_BACKEND и шардами из TELEMETRY_CONSUMER_WORKERS."""
+    settings = get_settings()
+    if shard_count is None:
+        shard_count = int(getattr(settings, "telemetry_consumer_workers", 1) or 1)
+    backend = str(getattr(settings, "telemetry_queue_backend", QUEUE_BACKEND_LIST) or "").strip().lower()
+    if backend == QUEUE_BACKEND_STREAM:
+        from .telemetry_stream_queue import TelemetryStreamQueue
+
+        return TelemetryStreamQueue(shard_count=shard_count)
+    if backend != QUEUE_BACKEND_LIST:
+        logger.warning(
+            "Unknown TELEMETRY_QUEUE_BACKEND=%r, falling back to %s",
+            backend,
+            QUEUE_BACKEND_LIST,
+        )
+    return TelemetryQueue(shard_count=shard_count)
+
+
 async def get_redis_client():
     global _redis_client
 
@@ -0,0 +1,500 @@
+"""
+Redis Streams backend очереди телеметрии (XADD / XREADGROUP / XACK / XAUTOCLAIM).
+
+Интерфейс совпадает с ``TelemetryQueue`` (push / pop_batch / ack_batch /
+requeue_batch / move_entries_to_dead / reclaim_processing), поэтому
+``telemetry_processing`` не знает, какой backend выбран.
+
+Отличия от list-backend:
+- processing list заменён pending entries list (PEL) consumer group: ack,
+  requeue и reclaim работают за O(batch), а не сканируют весь список;
+- несколько реплик history-logger читают один stream через общую consumer
+  group без двойной обработки;
+- ``QueueEntry.raw`` — id сообщения в stream, retry хранится в поле ``r``
+  сообщения (без base64-конверта);
+- requeue добавляет сообщение в хвост stream (XADD), а не в голову.
+
+Dead list общий с list-backend (``hydro:telemetry:dead``), поэтому CLI и
+метрики dead list работают без изменений.
+"""
+import logging
+import os
+import socket
+import time
+from typing import List, Optional, Tuple
+
+from .env import get_settings
+from .redis_queue import (
+    APPLY_DEAD_CHUNK_SCRIPT_TEMPLATE,
+    PopBatchResult,
+    QueueEntry,
+    QueueHealthSnapshot,
+    TelemetryQueue,
+    TelemetryQueueItem,
+    shard_for_node_uid,
+    shard_key,
+)
+from .utils.time import utcnow
+
+logger = logging.getLogger(__name__)
+
+_FIELD_DATA = b"d"
+_FIELD_RETRY = b"r"
+
+# Requeue: XACK, и только если он снял сообщение с учёта этого consumer'а — XDEL
+# и XADD в stream шарда с новым retry. XACK = 0 означает, что сообщение уже
+# забрала (XAUTOCLAIM) другая реплика: повторно его не добавляем.
+# KEYS[1] — stream шарда, KEYS[2 + shard] — stream'ы назначения.
+# ARGV: group, затем четвёрки (id, shard, data, retry). Возвращает число переложенных.
+_REQUEUE_SCRIPT = """
+local stream_key = KEYS[1]
+local group = ARGV[1]
+local requeued = 0
+for i = 2, #ARGV, 4 do
+  if redis.call('XACK', stream_key, group, ARGV[i]) > 0 then
+    redis.call('XDEL', stream_key, ARGV[i])
+    redis.call('XADD', KEYS[2 + tonumber(ARGV[i + 1])], '*', 'd', ARGV[i + 2], 'r', ARGV[i + 3])
+    requeued = requeued + 1
+  end
+end
+return requeued
+"""
+
+# Перенос в dead list по тому же правилу: RPUSH только после успешного XACK.
+# KEYS: stream шарда, dead list; ARGV: group, id, dead payload.
+_DEAD_MESSAGE_SCRIPT = """
+if redis.call('XACK', KEYS[1], ARGV[1], ARGV[2]) == 0 then
+  return 0
+end
+redis.call('XDEL', KEYS[1], ARGV[2])
+redis.call('RPUSH', KEYS[2], ARGV[3])
+return 1
+"""
+
+
+def _default_consumer_name() -> str:
+    return f"{os.getenv('HOSTNAME') or socket.gethostname()}-{os.getpid()}"
+
+
+def _stream_id_ms(stream_id: bytes) -> Optional[int]:
+    try:
+        if isinstance(stream_id, bytes):
+            stream_id = stream_id.decode("ascii")
+        return int(str(stream_id).split("-", 1)[0])
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+
+
+class TelemetryStreamQueue(TelemetryQueue):
+    """Очередь телеметрии на Redis Streams с consumer group."""
+
+    STREAM_KEY = "hydro:telemetry:stream"
+    GROUP = "history-logger"
+    # Bulk replay dead list пишет в stream шарда с обнулённым retry, как _enqueue_replayed.
+    APPLY_DEAD_CHUNK_SCRIPT = APPLY_DEAD_CHUNK_SCRIPT_TEMPLATE.format(
+        replay="redis.call('XADD', KEYS[tonumber(action)], '*', 'd', ARGV[base + 3], 'r', '0')"
+    )
+
+    def __init__(
+        self,
+        shard_count: int = 1,
+        shard_index: int = 0,
+        *,
+        consumer: Optional[str] = None,
+        claim_idle_ms: Optional[int] = None,
+    ):
+        super().__init__(shard_count=shard_count, shard_index=shard_index)
+        settings = get_settings()
+        self.STREAM_KEY = shard_key(type(self).STREAM_KEY, self.shard_index)
+        self.consumer = (
+            consumer
+            or getattr(settings, "telemetry_stream_consumer", None)
+            or _default_consumer_name()
+        )
+        self.claim_idle_ms = int(
+            claim_idle_ms
+            if claim_idle_ms is not None
+            else getattr(settings, "telemetry_stream_claim_idle_ms", 60000)
+        )
+        self._group_ready = False
+        self._requeue_script = None
+        self._dead_message_script = None
+        # После старта/XAUTOCLAIM сначала дочитываем собственный PEL (id "0"), затем новые (">").
+        self._read_own_pending = True
+
+    def shard(self, shard_index: int) -> "TelemetryStreamQueue":
+        if shard_index == self.shard_index:
+            return self
+        view = type(self)(
+            shard_count=self.shard_count,
+            shard_index=shard_index,
+            consumer=self.consumer,
+            claim_idle_ms=self.claim_idle_ms,
+        )
+        view._client = self._client
+        view._health_snapshots = self._health_snapshots
+        return view
+
+    def _stream_key_for(self, item: TelemetryQueueItem) -> str:
+        return shard_key(
+            type(self).STREAM_KEY,
+            shard_for_node_uid(item.node_uid, self.shard_count),
+        )
+
+    def _queue_key_for(self, item: TelemetryQueueItem) -> str:
+        # Общий push-путь базового класса (push_many) пишет в stream шарда.
+        return self._stream_key_for(item)
+
+    def _pipeline_depth(self, pipe, key: str) -> None:
+        pipe.xlen(key)
+
+    def _pipeline_append(self, pipe, key: str, values: List[bytes]) -> None:
+        for value in values:
+            pipe.xadd(key, {_FIELD_DATA: value, _FIELD_RETRY: 0})
+
+    async def _ensure_client(self):
+        await super()._ensure_client()
+        if self._requeue_script is None:
+            self._requeue_script = self._client.register_script(_REQUEUE_SCRIPT)
+        if self._dead_message_script is None:
+            self._dead_message_script = self._client.register_script(_DEAD_MESSAGE_SCRIPT)
+        if not self._group_ready:
+            try:
+                await self._client.xgroup_create(self.STREAM_KEY, self.GROUP, id="0", mkstream=True)
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+            self._group_ready = True
+
+    async def push(self, item: TelemetryQueueItem) -> bool:
+        try:
+            await self._ensure_client()
+
+            stream_key = self._stream_key_for(item)
+            size = await self._client.xlen(stream_key)
+            if not await self._admit(int(size or 0)):
+                return False
+
+            item.enqueued_at = utcnow()
+            await self._client.xadd(stream_key, {_FIELD_DATA: item.to_json(), _FIELD_RETRY: 0})
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to push to telemetry stream: {e}", exc_info=True)
+            return False
+
+    async def _read_group(self, count: int, block_ms: Optional[int] = None) -> list:
+        """XREADGROUP: сперва собственный PEL (id "0"), когда он пуст — новые сообщения."""
+        if self._read_own_pending:
+            response = await self._client.xreadgroup(
+                self.GROUP,
+                self.consumer,
+                {self.STREAM_KEY: "0"},
+                count=count,
+            )
+            messages = response[0][1] if response else []
+            if messages:
+                return messages
+            self._read_own_pending = False
+
+        response = await self._client.xreadgroup(
+            self.GROUP,
+            self.consumer,
+            {self.STREAM_KEY: ">"},
+            count=count,
+            block=block_ms,
+        )
+        return response[0][1] if response else []
+
+    async def pop_batch(self, batch_size: int) -> PopBatchResult:
+        try:
+            await self._ensure_client()
+            if batch_size <= 0:
+                return PopBatchResult()
+
+            messages = await self._read_group(max(1, int(batch_size)))
+            return await self._entries_from_messages(messages)
+
+        except Exception as e:
+            logger.error(f"Failed to pop batch from telemetry stream: {e}", exc_info=True)
+            return PopBatchResult()
+
+    async def pop_batch_blocking(
+        self,
+        batch_size: int,
+        *,
+        block_timeout_sec: float,
+        linger_ms: float,
+    ) -> PopBatchResult:
+        # Ошибки Redis пробрасываются: пустой результат означает только таймаут BLOCK,
+        # а consumer при ошибке выдерживает queue_error_retry_delay_sec.
+        await self._ensure_client()
+        if batch_size <= 0:
+            return PopBatchResult()
+
+        messages = await self._read_group(
+            batch_size,
+            block_ms=max(1, int(float(block_timeout_sec) * 1000)),
+        )
+        if not messages:
+            return PopBatchResult()
+
+        deadline = time.monotonic() + max(0.0, float(linger_ms)) / 1000
+        while len(messages) < batch_size:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            # BLOCK 0 ждёт бесконечно — короткий остаток не ждём.
+            if remaining_ms < 10:
+                break
+            more = await self._read_group(batch_size - len(messages), block_ms=remaining_ms)
+            if not more:
+                break
+            messages.extend(more)
+
+        return await self._entries_from_messages(messages)
+
+    async def _entries_from_messages(self, messages: list) -> PopBatchResult:
+        entries: List[QueueEntry] = []
+        for message_id, fields in messages:
+            if isinstance(message_id, str):
+                message_id = message_id.encode("ascii")
+            if fields is None:
+                # Сообщение уже удалено из stream, но осталось в PEL — просто снимаем с учёта.
+                await self._client.xack(self.STREAM_KEY, self.GROUP, message_id)
+                continue
+            data = fields.get(_FIELD_DATA)
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            item = TelemetryQueueItem.from_json(data) if data else None
+            if item is None:
+                await self._dead_message(message_id, data or b"", 0, reason="deserialize_failed")
+                continue
+            try:
+                retry_count = int(fields.get(_FIELD_RETRY) or 0)
+            except (TypeError, ValueError):
+                retry_count = 0
+            entries.append(QueueEntry(raw=message_id, item=item, retry_count=retry_count))
+        return PopBatchResult(entries=entries)
+
+    async def ack_batch(self, raw_items: List[bytes]) -> int:
+        if not raw_items:
+            return 0
+        try:
+            await self._ensure_client()
+            pipe = self._client.pipeline(transaction=True)
+            pipe.xack(self.STREAM_KEY, self.GROUP, *raw_items)
+            pipe.xdel(self.STREAM_KEY, *raw_items)
+            acked, _ = await pipe.execute()
+            acked_count = int(acked or 0)
+            if acked_count != len(raw_items):
+                self._record_orphaned_processing_move()
+            return acked_count
+        except Exception as e:
+            logger.error(f"Failed to ack telemetry stream batch: {e}", exc_info=True)
+            return 0
+
+    async def requeue_batch(self, entries: List[QueueEntry]) -> int:
+        if not entries:
+            return 0
+        try:
+            await self._ensure_client()
+            max_retries = self._max_pg_retries()
+            to_dead = [entry for entry in entries if int(entry.retry_count) + 1 > max_retries]
+            to_requeue = [entry for entry in entries if int(entry.retry_count) + 1 <= max_retries]
+            if to_dead:
+                await self.move_entries_to_dead(to_dead, reason="max_pg_retries")
+            if not to_requeue:
+                return 0
+
+            args: List[object] = [self.GROUP]
+            for entry in to_requeue:
+                args.extend(
+                    (
+                        entry.raw,
+                        shard_for_node_uid(entry.item.node_uid, self.shard_count),
+                        entry.item.to_json(),
+                        int(entry.retry_count) + 1,
+                    )
+                )
+            acked = int(
+                await self._requeue_script(keys=[self.STREAM_KEY, *self._replay_target_keys()], args=args) or 0
+            )
+            if acked != len(to_requeue):
+                self._record_orphaned_processing_move()
+            return acked
+        except Exception as e:
+            logger.error(f"Failed to requeue telemetry stream batch: {e}", exc_info=True)
+            return 0
+
+    async def reclaim_processing(self) -> int:
+        """XAUTOCLAIM сообщений, зависших в PEL дольше ``claim_idle_ms`` (упавшие реплики)."""
+        try:
+            await self._ensure_client()
+            reclaimed = 0
+            cursor = "0-0"
+            while True:
+                response = await self._client.xautoclaim(
+                    self.STREAM_KEY,
+                    self.GROUP,
+                    self.consumer,
+                    self.claim_idle_ms,
+                    start_id=cursor,
+                    count=100,
+                )
+                cursor = response[0]
+                reclaimed += len(response[1] or [])
+                if cursor in (b"0-0", "0-0"):
+                    break
+            if reclaimed:
+                self._read_own_pending = True
+            return reclaimed
+        except Exception as e:
+            logger.error(f"Failed to reclaim telemetry stream pending entries: {e}", exc_info=True)
+            return 0
+
+    async def rebalance_shards(self) -> int:
+        """
+        Перенести сообщения, чей шард сменился вместе с ``shard_count``, в stream
+        нового шарда (XADD + XDEL одной транзакцией), включая stream'ы ``:k`` для
+        k >= shard_count. Сообщение из PEL после XDEL снимается с учёта при чтении.
+        """
+        await self._ensure_client()
+        base_key = type(self).STREAM_KEY
+        moved = 0
+        for index in await self._existing_shard_indexes(base_key):
+            source_key = shard_key(base_key, index)
+            misplaced = []
+            for message_id, fields in await self._client.xrange(source_key, "-", "+"):
+                data = (fields or {}).get(_FIELD_DATA) or b""
+                if isinstance(data, str):
+                    data = data.encode("utf-8")
+                target = self._shard_of_raw(data)
+                if target != index:
+                    misplaced.append((message_id, target, data, (fields or {}).get(_FIELD_RETRY) or 0))
+            if not misplaced:
+                continue
+            pipe = self._client.pipeline(transaction=True)
+            for _, target, data, retry in misplaced:
+                pipe.xadd(shard_key(base_key, target), {_FIELD_DATA: data, _FIELD_RETRY: retry})
+            pipe.xdel(source_key, *[message_id for message_id, _, _, _ in misplaced])
+            await pipe.execute()
+            moved += len(misplaced)
+            logger.info("Telemetry stream shard %s: moved %s message(s) to %s shard(s)", index, len(misplaced), self.shard_count)
+            if index >= self.shard_count and int(await self._client.xlen(source_key) or 0) == 0:
+                await self._client.delete(source_key)
+        return moved
+
+    async def move_entries_to_dead(self, entries: List[QueueEntry], *, reason: str) -> int:
+        if not entries:
+            return 0
+        moved = 0
+        for entry in entries:
+            if await self._dead_message(
+                entry.raw,
+                entry.item.to_json(),
+                int(entry.retry_count),
+                reason=reason,
+            ):
+                moved += 1
+        return moved
+
+    async def _dead_message(self, message_id: bytes, inner: bytes, retry: int, *, reason: str) -> bool:
+        try:
+            await self._ensure_client()
+            await self.prune_expired_dead()
+            moved = await self._dead_message_script(
+                keys=[self.STREAM_KEY, self.DEAD_KEY],
+                args=[self.GROUP, message_id, self._dead_payload(inner, retry, reason=reason)],
+            )
+            if int(moved or 0) == 0:
+                # Сообщение уже у другой реплики: в dead list его положит она.
+                self._record_orphaned_processing_move()
+                return False
+            await self._record_dead_move(reason)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to move telemetry stream entry to dead list: {e}", exc_info=True)
+            return False
+
+    def _replay_target_keys(self) -> List[str]:
+        return [shard_key(type(self).STREAM_KEY, index) for index in range(self.shard_count)]
+
+    async def _enqueue_replayed(self, inner: bytes) -> None:
+        item = TelemetryQueueItem.from_json(inner)
+        stream_key = self._stream_key_for(item) if item is not None else self.STREAM_KEY
+        await self._client.xadd(stream_key, {_FIELD_DATA: inner, _FIELD_RETRY: 0})
+
+    def _pipeline_health(self, pipe) -> None:
+        pipe.xlen(self.STREAM_KEY)
+        pipe.xpending(self.STREAM_KEY, self.GROUP)
+        pipe.xrange(self.STREAM_KEY, "-", "+", count=1)
+        pipe.llen(self.DEAD_KEY)
+
+    def _health_snapshot_from(self, results: list) -> QueueHealthSnapshot:
+        stream_len, pending_summary, oldest, dead_size = results
+        pending = int((pending_summary or {}).get("pending") or 0)
+        oldest_ms = _stream_id_ms(oldest[0][0]) if oldest else None
+        return QueueHealthSnapshot(
+            shard=self.shard_index,
+            size=max(0, int(stream_len or 0) - pending),
+            processing_size=pending,
+            oldest_age_seconds=max(0.0, time.time() - oldest_ms / 1000) if oldest_ms is not None else None,
+            dead_list_size=int(dead_size or 0),
+        )
+
+    async def _pending_count(self) -> int:
+        summary = await self._client.xpending(self.STREAM_KEY, self.GROUP)
+        return int((summary or {}).get("pending") or 0)
+
+    async def _queue_depths(self) -> Tuple[int, int]:
+        await self._ensure_client()
+        stream_len = int(await self._client.xlen(self.STREAM_KEY) or 0)
+        pending = await self._pending_count()
+        return max(0, stream_len - pending), pending
+
+    async def total_pending_size(self) -> int:
+        try:
+            await self._ensure_client()
+            return int(await self._client.xlen(self.STREAM_KEY) or 0)
+        except Exception as e:
+            logger.error(f"Failed to get telemetry stream length: {e}", exc_info=True)
+            return 0
+
+    async def size(self) -> int:
+        try:
+            queue_size, _ = await self._queue_depths()
+            return queue_size
+        except Exception as e:
+            logger.error(f"Failed to get telemetry stream size: {e}", exc_info=True)
+            return 0
+
+    async def processing_size(self) -> int:
+        try:
+            await self._ensure_client()
+            return await self._pending_count()
+        except Exception as e:
+            logger.error(f"Failed to get telemetry stream pending size: {e}", exc_info=True)
+            return 0
+
+    async def get_oldest_age_seconds(self) -> Optional[float]:
+        """Возраст самого старого сообщения stream по времени из его id (часы Redis)."""
+        try:
+            await self._ensure_client()
+            oldest = await self._client.xrange(self.STREAM_KEY, "-", "+", count=1)
+            if not oldest:
+                return None
+            oldest_ms = _stream_id_ms(oldest[0][0])
+            if oldest_ms is None:
+                return None
+            return max(0.0, time.time() - oldest_ms / 1000)
+        except Exception as e:
+            logger.error(f"Failed to get telemetry stream oldest age: {e}", exc_info=True)
+            return None
+
+    async def clear(self):
+        try:
+            await self._ensure_client()
+            await self._client.delete(self.STREAM_KEY)
+            self._group_ready = False
+            logger.info("Telemetry stream cleared")
+        except Exception as e:
+            logger.error(f"Failed to clear telemetry stream: {e}", exc_info=True)
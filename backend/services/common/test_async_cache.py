@@ -0,0 +1,174 @@
+"""Тесты AsyncTTLCache: TTL, LRU, negative caching, single-flight, фоновое обновление."""
+import asyncio
+
+import pytest
+
+from common.async_cache import CACHE_EVICTIONS, CACHE_LOOKUPS, AsyncTTLCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _lookups(name: str, result: str) -> float:
+    return CACHE_LOOKUPS.labels(cache=name, result=result)._value.get()
+
+
+def _evictions(name: str, reason: str) -> float:
+    return CACHE_EVICTIONS.labels(cache=name, reason=reason)._value.get()
+
+
+def test_ttl_expiry_and_lru_size_bound():
+    clock = _Clock()
+    cache = AsyncTTLCache("test_ttl_lru", ttl_sec=10, max_size=2, clock=clock)
+
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1  # "b" становится наименее свежим
+    cache["c"] = 3
+    assert "b" not in cache
+    assert sorted(cache) == ["a", "c"]
+    assert _evictions("test_ttl_lru", "size") == 1
+
+    clock.now += 11
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert _lookups("test_ttl_lru", "hit") == 1
+    assert _lookups("test_ttl_lru", "miss") == 1
+
+
+@pytest.mark.asyncio
+async def test_get_many_or_load_caches_unknown_keys_as_negative():
+    clock = _Clock()
+    cache = AsyncTTLCache("test_negative", ttl_sec=60, negative_ttl_sec=5, clock=clock)
+    calls = []
+
+    async def loader(keys):
+        calls.append(list(keys))
+        return {key: key.upper() for key in keys if key != "missing"}
+
+    assert await cache.get_many_or_load(["a", "missing"], loader) == {"a": "A"}
+    assert await cache.get_many_or_load(["a", "missing"], loader) == {"a": "A"}
+    assert calls == [["a", "missing"]]
+    assert cache.is_negative("missing")
+    assert "missing" not in cache
+    assert _lookups("test_negative", "negative") == 1
+
+    clock.now += 6
+    await cache.get_many_or_load(["missing"], loader)
+    assert calls[-1] == ["missing"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = AsyncTTLCache("test_single_flight", ttl_sec=60)
+    started = asyncio.Event()
+    release = asyncio.Event()
+    calls = 0
+
+    async def loader(key):
+        nonlocal calls
+        calls += 1
+        started.set()
+        await release.wait()
+        return f"value:{key}"
+
+    first = asyncio.create_task(cache.get_or_load("k", loader))
+    await started.wait()
+    second = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(first, second) == ["value:k", "value:k"]
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_load_error_propagates_to_waiters_and_is_not_cached():
+    cache = AsyncTTLCache("test_load_error", ttl_sec=60, negative_ttl_sec=60)
+
+    async def failing(keys):
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_many_or_load(["k"], failing)
+    assert not cache.is_negative("k")
+    assert "k" not in cache
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_discards_stale_result():
+    cache = AsyncTTLCache("test_invalidate_race", ttl_sec=60)
+    release = asyncio.Event()
+
+    async def loader(keys):
+        await release.wait()
+        return {key: "old" for key in keys}
+
+    task = asyncio.create_task(cache.get_many_or_load(["node-1"], loader))
+    await asyncio.sleep(0)
+    cache.invalidate_where(lambda key, _value: key == "node-1")
+    release.set()
+
+    assert await task == {"node-1": "old"}
+    assert "node-1" not in cache
+
+
+@pytest.mark.asyncio
+async def test_refresh_ahead_serves_stale_value_and_reloads_in_background():
+    clock = _Clock()
+    cache = AsyncTTLCache("test_refresh_ahead", ttl_sec=10, refresh_ahead_sec=3, clock=clock)
+    version = 1
+
+    async def loader(keys):
+        return {key: version for key in keys}
+
+    assert await cache.get_many_or_load(["k"], loader) == {"k": 1}
+    version = 2
+    clock.now += 8
+    assert await cache.get_many_or_load(["k"], loader) == {"k": 1}
+    await asyncio.gather(*cache._refresh_tasks)
+    assert cache["k"] == 2
+
+
+def test_replace_all_swaps_snapshot_and_drops_negative_entries():
+    cache = AsyncTTLCache("test_replace_all", ttl_sec=60, max_size=2, negative_ttl_sec=60)
+    cache["old"] = 1
+    cache.set_negative("unknown")
+
+    cache.replace_all({"a": 1, "b": 2, "c": 3})
+
+    assert sorted(cache) == ["b", "c"]
+    assert not cache.is_negative("unknown")
+
+
+def test_replace_all_applies_invalidations_during_refresh():
+    cache = AsyncTTLCache("test_replace_all_refresh", ttl_sec=60)
+    cache["a"] = 1
+
+    token = cache.begin_refresh()
+    # Снимок прочитан до NOTIFY: "a" и "b" в нём устарели.
+    cache.invalidate("a")
+    cache.invalidate_where(lambda key, _value: key == "b")
+    cache.replace_all({"a": 1, "b": 2, "c": 3}, refresh=token)
+    assert sorted(cache) == ["c"]
+    assert cache._refreshes == {}
+
+    # Инвалидации до begin_refresh и после подмены на снимок не влияют.
+    token = cache.begin_refresh()
+    cache.replace_all({"a": 1}, refresh=token)
+    cache.invalidate("b")
+    assert sorted(cache) == ["a"]
+
+    token = cache.begin_refresh()
+    cache.clear()
+    cache.replace_all({"a": 1}, refresh=token)
+    assert len(cache) == 0
+
+    token = cache.begin_refresh()
+    cache.abort_refresh(token)
+    assert cache._refreshes == {}
@@ -0,0 +1,88 @@
+"""Тесты Prometheus-счётчиков с ограниченной кардинальностью по узлам."""
+import gc
+import tracemalloc
+
+from prometheus_client import CollectorRegistry
+
+from common.bounded_metrics import OTHER_NODE, BoundedNodeCounter, series_by_node
+
+
+def _sample_count(registry: CollectorRegistry) -> int:
+    return sum(len(metric.samples) for metric in registry.collect())
+
+
+def test_lru_eviction_folds_values_into_other_bucket():
+    counter = BoundedNodeCounter(
+        "test_heartbeats_total", "test", ["node_uid"], max_nodes=3, registry=CollectorRegistry()
+    )
+
+    counter.labels(node_uid="nd-1").inc(5)
+    counter.labels(node_uid="nd-2").inc(2)
+    counter.labels(node_uid="nd-1").inc()  # nd-2 становится наименее свежим
+    counter.labels(node_uid="nd-3").inc()
+
+    assert series_by_node(counter) == {"nd-1": 6.0, OTHER_NODE: 2.0, "nd-3": 1.0}
+    assert counter.tracked_nodes() == 3
+
+
+def test_extra_labels_are_preserved_in_other_and_zone_aggregate():
+    registry = CollectorRegistry()
+    counter = BoundedNodeCounter(
+        "test_status_total",
+        "test",
+        ["node_uid", "status"],
+        max_nodes=3,
+        by_zone=True,
+        registry=registry,
+    )
+
+    counter.labels(node_uid="nd-1", status="online", zone="zn-1").inc()
+    counter.labels(node_uid="nd-1", status="offline", zone="zn-1").inc()
+    counter.labels(node_uid="nd-2", status="online", zone="zn-2").inc()
+    counter.labels(node_uid="nd-3", status="online", zone="zn-2").inc()
+
+    assert registry.get_sample_value(
+        "test_status_total", {"node_uid": OTHER_NODE, "status": "online"}
+    ) == 1.0
+    assert registry.get_sample_value(
+        "test_status_total", {"node_uid": OTHER_NODE, "status": "offline"}
+    ) == 1.0
+    assert registry.get_sample_value(
+        "test_status_by_zone_total", {"zone": "zn-2", "status": "online"}
+    ) == 2.0
+    assert registry.get_sample_value(
+        "test_status_by_zone_total", {"zone": "zn-1", "status": "offline"}
+    ) == 1.0
+
+
+def test_registry_memory_stays_flat_for_10k_node_uids():
+    registry = CollectorRegistry()
+    counter = BoundedNodeCounter(
+        "test_flat_total", "test", ["node_uid"], max_nodes=100, by_zone=True, registry=registry
+    )
+
+    def _feed(start: int, stop: int) -> None:
+        for i in range(start, stop):
+            counter.labels(node_uid=f"nd-synthetic-{i}", zone=f"zn-{i % 10}").inc()
+
+    _feed(0, 1_000)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        _feed(1_000, 5_500)
+        gc.collect()
+        midway, _ = tracemalloc.get_traced_memory()
+        _feed(5_500, 10_000)
+        gc.collect()
+        final, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # 100 узлов (включая other) + 10 зон, по 2 сэмпла (_total, _created) на серию.
+    assert counter.tracked_nodes() == 100
+    assert _sample_count(registry) == (100 + 10) * 2
+    assert sum(series_by_node(counter).values()) == 10_000
+    # Вторые 4.5k узлов не добавляют памяти; живёт только рабочий набор из 100 серий
+    # (без ограничения 9k новых серий занимают ~5 MB).
+    assert final - midway < 16 * 1024
+    assert final < 256 * 1024
@@ -0,0 +1,71 @@
+"""Тесты сэмплированного hot-path логирования."""
+import logging
+
+from common.logging_setup import HotPathLogger, topic_class
+
+
+def _logger(name: str, level: int) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    return logger
+
+
+def test_topic_class_uses_last_topic_segment():
+    assert topic_class("hydro/gh-1/zn-1/nd-1/ph/telemetry") == "telemetry"
+    assert topic_class("hydro/gh-1/zn-1/nd-1/heartbeat") == "heartbeat"
+    assert topic_class("hydro/node_hello") == "node_hello"
+    assert topic_class("") == "unknown"
+
+
+def test_rate_limit_is_per_topic_class_and_reports_suppressed(caplog, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("common.logging_setup.time.monotonic", lambda: clock[0])
+    hot = HotPathLogger(_logger("test.hot_path.rate", logging.INFO), rate_per_sec=1.0)
+
+    with caplog.at_level(logging.INFO, logger="test.hot_path.rate"):
+        assert hot.info("telemetry", "msg %s", 1) is True
+        assert hot.info("telemetry", "msg %s", 2) is False
+        assert hot.info("telemetry", "msg %s", 3) is False
+        assert hot.info("heartbeat", "hb %s", 1) is True
+        clock[0] += 1.0
+        assert hot.info("telemetry", "msg %s", 4) is True
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages == ["msg 1", "hb 1", "msg 4"]
+    assert caplog.records[-1].suppressed == 2
+    assert not hasattr(caplog.records[0], "payload")
+
+
+def test_formatting_and_payload_are_lazy_outside_debug():
+    class _Explosive:
+        def __str__(self):
+            raise AssertionError("formatted suppressed record")
+
+    calls = []
+    hot = HotPathLogger(_logger("test.hot_path.lazy", logging.WARNING), rate_per_sec=1.0)
+
+    assert hot.info("telemetry", "value=%s", _Explosive(), payload=lambda: calls.append(1)) is False
+    assert calls == []
+
+
+def test_debug_mode_logs_every_message_with_payload(caplog):
+    hot = HotPathLogger(_logger("test.hot_path.debug", logging.DEBUG), rate_per_sec=1.0)
+
+    with caplog.at_level(logging.DEBUG, logger="test.hot_path.debug"):
+        for i in range(3):
+            hot.info("telemetry", "msg %s", i, payload=lambda: {"value": 6.5})
+
+    assert len(caplog.records) == 3
+    assert all(record.payload == {"value": 6.5} for record in caplog.records)
+
+
+def test_record_points_at_caller_of_wrappers_and_log(caplog):
+    hot = HotPathLogger(_logger("test.hot_path.caller", logging.DEBUG), rate_per_sec=0)
+
+    with caplog.at_level(logging.DEBUG, logger="test.hot_path.caller"):
+        hot.info("telemetry", "via info")
+        hot.debug("telemetry", "via debug")
+        hot.log(logging.INFO, "telemetry", "via log")
+
+    assert [record.funcName for record in caplog.records] == ["test_record_points_at_caller_of_wrappers_and_log"] * 3
+    assert all(record.filename == "test_logging_setup.py" for record in caplog.records)
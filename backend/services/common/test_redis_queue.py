@@ -127,6 +127,35 @@ async def test_telemetry_queue_pop_batch_success(mock_redis_client):
         assert result.entries[0].item.value == 6.5
 
 
+class _HealthPipeline:
+    """Pipeline-заглушка: команды копятся, execute отвечает по словарю (команда, ключ) -> значение."""
+
+    def __init__(self, values: dict):
+        self.values = values
+        self.calls = []
+
+    def llen(self, key):
+        self.calls.append(("llen", key))
+
+    def lindex(self, key, index):
+        self.calls.append(("lindex", key))
+
+    async def execute(self):
+        return [self.values.get(call, 0 if call[0] == "llen" else None) for call in self.calls]
+
+
+def _health_pipelines(client, values: dict) -> list:
+    pipes = []
+
+    def _pipeline(transaction=True):
+        pipe = _HealthPipeline(values)
+        pipes.append(pipe)
+        return pipe
+
+    client.pipeline = MagicMock(side_effect=_pipeline)
+    return pipes
+
+
 @pytest.mark.asyncio
 async def test_telemetry_queue_get_health_metrics(mock_redis_client):
     """Тест сбора health-метрик очереди телеметрии."""
@@ -134,20 +163,22 @@ async def test_telemetry_queue_get_health_metrics(mock_redis_client):
         queue = TelemetryQueue()
         queue._client = mock_redis_client
 
-        async def _llen_side_effect(key):
-            if key == TelemetryQueue.QUEUE_KEY:
-                return 100
-            if key == TelemetryQueue.PROCESSING_KEY:
-                return 25
-            if key == TelemetryQueue.DEAD_KEY:
-                return 2
-            return 0
-
-        mock_redis_client.llen.side_effect = _llen_side_effect
-        mock_redis_client.lindex.return_value = None
+        pipes = _health_pipelines(
+            mock_redis_client,
+            {
+                ("llen", TelemetryQueue.QUEUE_KEY): 100,
+                ("llen", TelemetryQueue.PROCESSING_KEY): 25,
+                ("llen", TelemetryQueue.DEAD_KEY): 2,
+            },
+        )
 
         metrics = await queue.get_health_metrics()
 
+        # Все gauge шарда — один round trip.
+        assert len(pipes) == 1
+        assert len(pipes[0].calls) == 4
+        mock_redis_client.llen.assert_not_called()
+
         assert metrics["size"] == 100
         assert metrics["processing_size"] == 25
         assert metrics["depth"] == 125
@@ -408,3 +439,437 @@ async def test_telemetry_dead_list_prune_expired(mock_redis_client):
     removed = await queue.prune_expired_dead()
     assert removed == 1
     mock_redis_client.lrem.assert_awaited_once_with(queue.DEAD_KEY, 1, expired_payload)
+
+
+def test_shard_for_node_uid_is_stable_and_in_range():
+    from common.redis_queue import shard_for_node_uid
+
+    assert shard_for_node_uid("nd-ph-1", 1) == 0
+    shards = {shard_for_node_uid(f"nd-{idx}", 4) for idx in range(64)}
+    assert shards == {0, 1, 2, 3}
+    assert shard_for_node_uid("nd-ph-1", 4) == shard_for_node_uid("nd-ph-1", 4)
+
+
+def test_shard_views_keep_legacy_keys_for_shard_zero():
+    queue = TelemetryQueue(shard_count=3)
+
+    shards = queue.shards()
+
+    assert shards[0] is queue
+    assert shards[0].QUEUE_KEY == TelemetryQueue.QUEUE_KEY
+    assert shards[2].QUEUE_KEY == f"{TelemetryQueue.QUEUE_KEY}:2"
+    assert shards[2].PROCESSING_KEY == f"{TelemetryQueue.PROCESSING_KEY}:2"
+    assert shards[2].DEAD_KEY == TelemetryQueue.DEAD_KEY
+    with pytest.raises(ValueError):
+        TelemetryQueue(shard_count=2, shard_index=2)
+
+
+@pytest.mark.asyncio
+async def test_push_routes_item_to_node_uid_shard(mock_redis_client, telemetry_queue_item):
+    from common.redis_queue import shard_for_node_uid, shard_key
+
+    queue = TelemetryQueue(shard_count=4)
+    queue._client = mock_redis_client
+    mock_redis_client.llen.return_value = 0
+
+    assert await queue.push(telemetry_queue_item) is True
+
+    expected_key = shard_key(
+        TelemetryQueue.QUEUE_KEY,
+        shard_for_node_uid(telemetry_queue_item.node_uid, 4),
+    )
+    assert mock_redis_client.rpush.call_args[0][0] == expected_key
+    mock_redis_client.llen.assert_called_once_with(expected_key)
+
+
+@pytest.mark.asyncio
+async def test_health_metrics_aggregate_all_shards(mock_redis_client):
+    queue = TelemetryQueue(shard_count=2)
+    queue._client = mock_redis_client
+    _health_pipelines(
+        mock_redis_client,
+        {
+            ("llen", TelemetryQueue.QUEUE_KEY): 10,
+            ("llen", f"{TelemetryQueue.QUEUE_KEY}:1"): 30,
+            ("llen", TelemetryQueue.PROCESSING_KEY): 1,
+            ("llen", f"{TelemetryQueue.PROCESSING_KEY}:1"): 2,
+        },
+    )
+
+    metrics = await queue.get_health_metrics()
+
+    assert metrics["size"] == 40
+    assert metrics["processing_size"] == 3
+    assert metrics["max_size"] == 2 * TelemetryQueue.MAX_QUEUE_SIZE
+    assert [shard["size"] for shard in metrics["shards"]] == [10, 30]
+
+
+@pytest.mark.asyncio
+async def test_pop_batch_blocking_wakes_on_first_item_and_fills_batch(mock_redis_client):
+    first = TelemetryQueueItem(node_uid="n1", metric_type="PH", value=1.0).to_json()
+    rest = [
+        TelemetryQueueItem(node_uid="n1", metric_type="PH", value=float(idx)).to_json()
+        for idx in range(2, 5)
+    ]
+    queue = TelemetryQueue()
+    queue._client = mock_redis_client
+    mock_redis_client.blmove = AsyncMock(return_value=first)
+    queue._pop_script = AsyncMock(return_value=rest)
+
+    result = await queue.pop_batch_blocking(4, block_timeout_sec=1.0, linger_ms=200)
+
+    assert [entry.item.value for entry in result.entries] == [1.0, 2.0, 3.0, 4.0]
+    mock_redis_client.blmove.assert_awaited_once_with(
+        TelemetryQueue.QUEUE_KEY,
+        TelemetryQueue.PROCESSING_KEY,
+        1.0,
+        "LEFT",
+        "RIGHT",
+    )
+    queue._pop_script.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_pop_batch_blocking_returns_partial_batch_after_linger(mock_redis_client):
+    first = TelemetryQueueItem(node_uid="n1", metric_type="PH", value=1.0).to_json()
+    queue = TelemetryQueue()
+    queue._client = mock_redis_client
+    mock_redis_client.blmove = AsyncMock(side_effect=[first, None])
+    queue._pop_script = AsyncMock(return_value=[])
+
+    result = await queue.pop_batch_blocking(100, block_timeout_sec=1.0, linger_ms=50)
+
+    assert len(result.entries) == 1
+    assert mock_redis_client.blmove.await_count == 2
+    linger_timeout = mock_redis_client.blmove.await_args_list[1].args[2]
+    assert 0 < linger_timeout <= 0.05
+
+
+@pytest.mark.asyncio
+async def test_pop_batch_blocking_idle_timeout_returns_empty(mock_redis_client):
+    queue = TelemetryQueue()
+    queue._client = mock_redis_client
+    mock_redis_client.blmove = AsyncMock(return_value=None)
+    queue._pop_script = AsyncMock()
+
+    result = await queue.pop_batch_blocking(100, block_timeout_sec=1.0, linger_ms=50)
+
+    assert result.entries == []
+    queue._pop_script.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_pop_batch_blocking_propagates_redis_errors(mock_redis_client):
+    """Ошибка Redis не маскируется под таймаут BLMOVE — consumer должен выдержать backoff."""
+    queue = TelemetryQueue()
+    queue._client = mock_redis_client
+    mock_redis_client.blmove = AsyncMock(side_effect=ConnectionError("redis down"))
+    queue._pop_script = AsyncMock()
+
+    with pytest.raises(ConnectionError):
+        await queue.pop_batch_blocking(100, block_timeout_sec=1.0, linger_ms=50)
+
+
+@pytest.mark.asyncio
+async def test_push_many_pipelines_sizes_and_writes_per_shard(mock_redis_client):
+    """push_many: один pipeline с LLEN по шардам и один с RPUSH на шард."""
+    size_pipe = MagicMock()
+    size_pipe.execute = AsyncMock(return_value=[3, 7])
+    write_pipe = MagicMock()
+    write_pipe.execute = AsyncMock(return_value=[2, 1])
+    mock_redis_client.pipeline = MagicMock(side_effect=[size_pipe, write_pipe])
+
+    queue = TelemetryQueue(shard_count=2)
+    queue._client = mock_redis_client
+    node_by_shard = {}
+    for i in range(50):
+        node_by_shard.setdefault(queue.shard(0)._queue_key_for(TelemetryQueueItem(node_uid=f"nd-{i}")), f"nd-{i}")
+    assert len(node_by_shard) == 2
+    node_a, node_b = node_by_shard.values()
+    items = [
+        TelemetryQueueItem(node_uid=node_a, metric_type="PH", value=1.0),
+        TelemetryQueueItem(node_uid=node_b, metric_type="EC", value=2.0),
+        TelemetryQueueItem(node_uid=node_a, metric_type="PH", value=3.0),
+    ]
+
+    accepted = await queue.push_many(items)
+
+    assert accepted == [True, True, True]
+    assert size_pipe.llen.call_count == 2
+    assert write_pipe.rpush.call_count == 2
+    key_a = queue._queue_key_for(items[0])
+    rpush_by_key = {call.args[0]: call.args[1:] for call in write_pipe.rpush.call_args_list}
+    assert len(rpush_by_key[key_a]) == 2
+    assert all(item.enqueued_at is not None for item in items)
+    mock_redis_client.rpush.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_push_many_applies_overflow_per_item(mock_redis_client):
+    """Размер шарда учитывает уже принятые в этом батче элементы."""
+    size_pipe = MagicMock()
+    size_pipe.execute = AsyncMock(return_value=[TelemetryQueue.MAX_QUEUE_SIZE - 1])
+    write_pipe = MagicMock()
+    write_pipe.execute = AsyncMock(return_value=[1])
+    mock_redis_client.pipeline = MagicMock(side_effect=[size_pipe, write_pipe])
+
+    queue = TelemetryQueue()
+    queue._client = mock_redis_client
+    items = [TelemetryQueueItem(node_uid="nd-1", metric_type="PH", value=float(i)) for i in range(2)]
+
+    with patch("common.redis_queue.random.random", return_value=0.0), \
+         patch.object(queue, "_send_overflow_alert", new=AsyncMock()):
+        accepted = await queue.push_many(items)
+
+    assert accepted == [True, False]
+    write_pipe.rpush.assert_called_once()
+    assert len(write_pipe.rpush.call_args.args) == 2
+
+
+def _dead_entry(reason: str, node_uid: str, zone_uid: str, age_hours: float) -> bytes:
+    import base64
+    import json
+    from datetime import timedelta
+
+    from common.utils.time import utcnow
+
+    inner = json.dumps({"node_uid": node_uid, "zone_uid": zone_uid, "metric_type": "PH", "value": 6.5}).encode("utf-8")
+    return json.dumps(
+        {
+            "reason": reason,
+            "retry": 3,
+            "payload_b64": base64.b64encode(inner).decode("ascii"),
+            "moved_at": (utcnow() - timedelta(hours=age_hours)).isoformat(),
+        }
+    ).encode("utf-8")
+
+
+class _InMemoryDeadRedis:
+    """Списки Redis в памяти и эмуляция _APPLY_DEAD_CHUNK_SCRIPT."""
+
+    def __init__(self, dead_key: str, dead: list):
+        self.lists = {dead_key: list(dead)}
+        self.lrange_calls = []
+
+    async def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    async def lrange(self, key, start, end):
+        self.lrange_calls.append((start, end))
+        items = self.lists.get(key, [])
+        return items[start : end + 1] if end >= 0 else items[start:]
+
+    async def apply_chunk(self, keys, args):
+        dead = self.lists.setdefault(keys[0], [])
+        n = args[0]
+        triples = [args[1 + i * 3 : 4 + i * 3] for i in range(n)]
+        if dead[:n] != [raw for raw, _, _ in triples]:
+            return -1
+        del dead[:n]
+        replayed = 0
+        for raw, action, payload in triples:
+            if action == "keep":
+                dead.append(raw)
+            elif action != "drop":
+                self.lists.setdefault(keys[int(action) - 1], []).append(payload)
+                replayed += 1
+        return replayed
+
+
+@pytest.mark.asyncio
+async def test_summarize_dead_streams_chunks_and_groups():
+    from common.redis_queue import DeadListFilter
+
+    dead = [
+        _dead_entry("fk_violation", "nd-1", "zn-1", 0.5),
+        _dead_entry("fk_violation", "nd-2", "zn-1", 30),
+        _dead_entry("max_pg_retries", "nd-3", "zn-2", 2),
+        b"not-json",
+        _dead_entry("fk_violation", "nd-1", "zn-1", 200),
+    ]
+    queue = TelemetryQueue()
+    fake = _InMemoryDeadRedis(queue.DEAD_KEY, dead)
+    queue._client = fake
+    queue._ensure_client = AsyncMock()
+
+    summary = await queue.summarize_dead(chunk_size=2)
+
+    assert fake.lrange_calls == [(0, 1), (2, 3), (4, 5)]
+    assert summary["scanned"] == 5
+    assert summary["unparseable"] == 1
+    assert summary["by_reason"] == {"fk_violation": 3, "max_pg_retries": 1}
+    assert summary["by_zone"] == {"zn-1": 3, "zn-2": 1}
+    assert summary["by_age"] == {"<1h": 1, "1h-24h": 1, "1d-7d": 1, ">7d": 1}
+
+    filtered = await queue.summarize_dead(DeadListFilter.build(zone_uids=["zn-1"], max_age_seconds=48 * 3600))
+    assert filtered["matched"] == 2
+    assert filtered["by_node"] == {"nd-1": 1, "nd-2": 1}
+
+
+@pytest.mark.asyncio
+async def test_replay_dead_bulk_moves_matching_entries_and_keeps_order_of_rest():
+    import json
+
+    from common.redis_queue import DeadListFilter, shard_for_node_uid, shard_key
+
+    dead = [
+        _dead_entry("fk_violation" if i % 2 == 0 else "max_pg_retries", f"nd-{i}", "zn-1", 1)
+        for i in range(7)
+    ]
+    queue = TelemetryQueue(shard_count=2)
+    fake = _InMemoryDeadRedis(queue.DEAD_KEY, dead)
+    queue._client = fake
+    queue._ensure_client = AsyncMock()
+    queue._apply_dead_chunk_script = fake.apply_chunk
+    queue._wait_for_queue_room = AsyncMock()
+
+    stats = await queue.replay_dead_bulk(DeadListFilter.build(reasons=["fk_violation"]), chunk_size=3)
+
+    assert stats["scanned"] == 7
+    assert stats["replayed"] == 4
+    assert stats["kept"] == 3
+    assert fake.lists[queue.DEAD_KEY] == [dead[1], dead[3], dead[5]]
+    replayed = []
+    for shard in range(2):
+        for payload in fake.lists.get(shard_key(TelemetryQueue.QUEUE_KEY, shard), []):
+            item = json.loads(payload)
+            assert shard_for_node_uid(item["node_uid"], 2) == shard
+            replayed.append(item["node_uid"])
+    assert sorted(replayed) == ["nd-0", "nd-2", "nd-4", "nd-6"]
+
+
+@pytest.mark.asyncio
+async def test_purge_dead_bulk_retries_chunk_after_concurrent_change():
+    from common.redis_queue import DeadListFilter
+
+    dead = [_dead_entry("deserialize_failed", "nd-1", "zn-1", 1), _dead_entry("fk_violation", "nd-2", "zn-1", 1)]
+    queue = TelemetryQueue()
+    fake = _InMemoryDeadRedis(queue.DEAD_KEY, dead)
+    queue._client = fake
+    queue._ensure_client = AsyncMock()
+    conflicts = iter([-1])
+
+    async def apply_chunk(keys, args):
+        for result in conflicts:
+            return result
+        return await fake.apply_chunk(keys, args)
+
+    queue._apply_dead_chunk_script = apply_chunk
+
+    stats = await queue.purge_dead_bulk(DeadListFilter.build(reasons=["deserialize_failed"]))
+
+    assert stats["conflicts"] == 1
+    assert stats["purged"] == 1
+    assert fake.lists[queue.DEAD_KEY] == [dead[1]]
+
+
+@pytest.mark.asyncio
+async def test_cached_health_metrics_served_without_redis_while_fresh(mock_redis_client):
+    from common.redis_queue import QueueHealthSnapshot
+
+    queue = TelemetryQueue(shard_count=2)
+    queue._client = mock_redis_client
+    pipes = _health_pipelines(mock_redis_client, {("llen", TelemetryQueue.QUEUE_KEY): 5})
+
+    # Consumer'ы шардов снимают health через свои view; кеш общий с корневой очередью.
+    for shard in queue.shards():
+        await shard.snapshot_health()
+    assert len(pipes) == 2
+
+    metrics = await queue.get_health_metrics(max_age_sec=60)
+    assert metrics["size"] == 5
+    assert len(pipes) == 2
+
+    queue._health_snapshots[1] = QueueHealthSnapshot(
+        shard=1, size=0, processing_size=0, oldest_age_seconds=None, dead_list_size=0, taken_at=0.0
+    )
+    assert queue.cached_health_metrics(60) is None
+    await queue.get_health_metrics(max_age_sec=60)
+    assert len(pipes) == 4
+
+
+class _InMemoryShardRedis:
+    """Списки шардов в памяти и эмуляция reclaim/_REBALANCE_SHARD_SCRIPT."""
+
+    def __init__(self, lists: dict):
+        self.lists = {key: list(values) for key, values in lists.items()}
+
+    async def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        for key in list(self.lists):
+            if key.startswith(prefix):
+                yield key.encode("utf-8")
+
+    async def lrange(self, key, start, end):
+        items = self.lists.get(key, [])
+        return list(items[start:] if end < 0 else items[start : end + 1])
+
+    async def reclaim(self, keys, args):
+        processing = self.lists.setdefault(keys[0], [])
+        queue = self.lists.setdefault(keys[1], [])
+        count = 0
+        while processing:
+            queue.insert(0, processing.pop(0))
+            count += 1
+        return count
+
+    async def rebalance(self, keys, args):
+        source = self.lists.setdefault(keys[0], [])
+        n = args[0]
+        pairs = [args[1 + i * 2 : 3 + i * 2] for i in range(n)]
+        if source[:n] != [raw for raw, _ in pairs]:
+            return -1
+        del source[:n]
+        moved = 0
+        for raw, idx in reversed(pairs):
+            target = keys[int(idx) - 1]
+            self.lists.setdefault(target, []).insert(0, raw)
+            moved += target != keys[0]
+        return moved
+
+
+@pytest.mark.asyncio
+async def test_rebalance_shards_moves_legacy_and_orphaned_backlog_in_node_order():
+    import json
+
+    from common.redis_queue import _wrap_queue_bytes, shard_for_node_uid, shard_key
+
+    shard_zero = [f"nd-{i}" for i in range(100) if shard_for_node_uid(f"nd-{i}", 2) == 0]
+    uids = {0: shard_zero[0], 1: next(f"nd-{i}" for i in range(100) if shard_for_node_uid(f"nd-{i}", 2) == 1)}
+    orphan_uid = shard_zero[1]
+
+    def raw(node_uid, seq):
+        return json.dumps({"node_uid": node_uid, "seq": seq}).encode("utf-8")
+
+    base_queue, base_processing = TelemetryQueue.QUEUE_KEY, TelemetryQueue.PROCESSING_KEY
+    fake = _InMemoryShardRedis(
+        {
+            # Legacy-ключ (один шард): бэклог обоих узлов вперемешку.
+            base_queue: [raw(uids[1], 1), raw(uids[0], 1), _wrap_queue_bytes(raw(uids[1], 2), 2)],
+            shard_key(base_queue, 1): [raw(uids[1], 10)],
+            # Шард 3 остался от TELEMETRY_CONSUMER_WORKERS=4.
+            shard_key(base_queue, 3): [raw(orphan_uid, 2)],
+            shard_key(base_processing, 3): [raw(orphan_uid, 1)],
+        }
+    )
+    queue = TelemetryQueue(shard_count=2)
+    queue._client = fake
+    queue._ensure_client = AsyncMock()
+    queue._reclaim_script = fake.reclaim
+    queue._rebalance_shard_script = fake.rebalance
+
+    moved = await queue.rebalance_shards()
+
+    assert moved == 4
+    assert fake.lists[shard_key(base_queue, 3)] == []
+    assert fake.lists[shard_key(base_processing, 3)] == []
+    # Бэклог узла переносится в голову нового шарда в исходном порядке,
+    # processing list — раньше очереди.
+    assert fake.lists[base_queue] == [raw(orphan_uid, 1), raw(orphan_uid, 2), raw(uids[0], 1)]
+    assert fake.lists[shard_key(base_queue, 1)] == [
+        raw(uids[1], 1),
+        _wrap_queue_bytes(raw(uids[1], 2), 2),
+        raw(uids[1], 10),
+    ]
+
+    assert await queue.rebalance_shards() == 0
@@ -0,0 +1,218 @@
+"""
+Тесты Redis Streams backend очереди телеметрии.
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from common.redis_queue import QueueEntry, TelemetryQueue, TelemetryQueueItem, create_telemetry_queue
+from common.telemetry_stream_queue import TelemetryStreamQueue
+
+
+def _item(node_uid: str = "nd-ph-1", value: float = 6.5) -> TelemetryQueueItem:
+    return TelemetryQueueItem(node_uid=node_uid, metric_type="PH", value=value)
+
+
+def _pipeline(results: list) -> MagicMock:
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=results)
+    return pipe
+
+
+@pytest.fixture
+def stream_queue():
+    queue = TelemetryStreamQueue(consumer="hl-1", claim_idle_ms=30000)
+    queue._client = AsyncMock()
+    queue._group_ready = True
+    for script in (
+        "_pop_script",
+        "_reclaim_script",
+        "_move_processing_to_queue_script",
+        "_move_processing_to_dead_script",
+        "_requeue_script",
+        "_dead_message_script",
+    ):
+        setattr(queue, script, AsyncMock())
+    queue.prune_expired_dead = AsyncMock(return_value=0)
+    return queue
+
+
+@pytest.mark.asyncio
+async def test_push_xadds_to_node_shard_stream():
+    queue = TelemetryStreamQueue(shard_count=4, consumer="hl-1")
+    queue._client = AsyncMock()
+    queue._client.xlen = AsyncMock(return_value=0)
+    queue._group_ready = True
+    queue._pop_script = queue._reclaim_script = AsyncMock()
+    queue._move_processing_to_queue_script = queue._move_processing_to_dead_script = AsyncMock()
+    item = _item()
+
+    assert await queue.push(item) is True
+
+    stream_key = queue._client.xadd.await_args.args[0]
+    assert stream_key == queue._stream_key_for(item)
+    fields = queue._client.xadd.await_args.args[1]
+    assert TelemetryQueueItem.from_json(fields[b"d"]).node_uid == "nd-ph-1"
+    assert fields[b"r"] == 0
+
+
+@pytest.mark.asyncio
+async def test_push_many_xadds_batch_in_one_pipeline(stream_queue):
+    size_pipe = _pipeline([5])
+    write_pipe = _pipeline([b"1-0", b"1-1"])
+    stream_queue._client.pipeline = MagicMock(side_effect=[size_pipe, write_pipe])
+
+    accepted = await stream_queue.push_many([_item(value=1.0), _item(value=2.0)])
+
+    assert accepted == [True, True]
+    size_pipe.xlen.assert_called_once_with(stream_queue.STREAM_KEY)
+    assert write_pipe.xadd.call_count == 2
+    assert all(call.args[0] == stream_queue.STREAM_KEY for call in write_pipe.xadd.call_args_list)
+    stream_queue._client.xadd.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_pop_batch_reads_own_pending_before_new_messages(stream_queue):
+    new_message = (b"2-0", {b"d": _item(value=1.0).to_json(), b"r": b"2"})
+    stream_queue._client.xreadgroup = AsyncMock(
+        side_effect=[[], [[stream_queue.STREAM_KEY, [new_message]]]]
+    )
+
+    result = await stream_queue.pop_batch(10)
+
+    assert [(entry.raw, entry.retry_count) for entry in result.entries] == [(b"2-0", 2)]
+    first_call, second_call = stream_queue._client.xreadgroup.await_args_list
+    assert first_call.args[2] == {stream_queue.STREAM_KEY: "0"}
+    assert second_call.args[2] == {stream_queue.STREAM_KEY: ">"}
+    assert stream_queue._read_own_pending is False
+
+
+@pytest.mark.asyncio
+async def test_ack_batch_acks_and_deletes_only_batch_ids(stream_queue):
+    pipe = _pipeline([2, 2])
+    stream_queue._client.pipeline = MagicMock(return_value=pipe)
+
+    acked = await stream_queue.ack_batch([b"1-0", b"2-0"])
+
+    assert acked == 2
+    pipe.xack.assert_called_once_with(stream_queue.STREAM_KEY, stream_queue.GROUP, b"1-0", b"2-0")
+    pipe.xdel.assert_called_once_with(stream_queue.STREAM_KEY, b"1-0", b"2-0")
+
+
+@pytest.mark.asyncio
+async def test_requeue_batch_readds_with_incremented_retry_and_dead_lists_exhausted(stream_queue):
+    retry_entry = QueueEntry(raw=b"1-0", item=_item(value=1.0), retry_count=0)
+    exhausted = QueueEntry(raw=b"2-0", item=_item(value=2.0), retry_count=3)
+    stream_queue._requeue_script.return_value = 1
+    stream_queue._dead_message_script.return_value = 1
+    stream_queue._client.llen = AsyncMock(return_value=1)
+
+    with patch.object(stream_queue, "_max_pg_retries", return_value=3):
+        requeued = await stream_queue.requeue_batch([retry_entry, exhausted])
+
+    assert requeued == 1
+    requeue_call = stream_queue._requeue_script.await_args.kwargs
+    assert requeue_call["keys"] == [stream_queue.STREAM_KEY, stream_queue.STREAM_KEY]
+    group, message_id, shard, data, retry = requeue_call["args"]
+    assert (group, message_id, shard, retry) == (stream_queue.GROUP, b"1-0", 0, 1)
+    assert TelemetryQueueItem.from_json(data).value == 1.0
+    dead_call = stream_queue._dead_message_script.await_args.kwargs
+    assert dead_call["keys"] == [stream_queue.STREAM_KEY, stream_queue.DEAD_KEY]
+    assert dead_call["args"][:2] == [stream_queue.GROUP, b"2-0"]
+    assert b'"reason":"max_pg_retries"' in dead_call["args"][2]
+
+
+@pytest.mark.asyncio
+async def test_message_claimed_by_other_replica_is_not_requeued_or_dead_listed(stream_queue):
+    """XACK = 0 (сообщение забрал XAUTOCLAIM другой реплики): скрипты ничего не пишут."""
+    stream_queue._requeue_script.return_value = 0
+    stream_queue._dead_message_script.return_value = 0
+    entry = QueueEntry(raw=b"1-0", item=_item(), retry_count=0)
+
+    with patch.object(stream_queue, "_max_pg_retries", return_value=3):
+        assert await stream_queue.requeue_batch([entry]) == 0
+    assert await stream_queue.move_entries_to_dead([entry], reason="fk_violation") == 0
+    stream_queue._client.rpush.assert_not_called()
+    stream_queue._client.xadd.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reclaim_processing_autoclaims_until_cursor_wraps(stream_queue):
+    stream_queue._read_own_pending = False
+    stream_queue._client.xautoclaim = AsyncMock(
+        side_effect=[
+            [b"5-0", [(b"1-0", {}), (b"2-0", {})], []],
+            [b"0-0", [(b"5-0", {})], []],
+        ]
+    )
+
+    reclaimed = await stream_queue.reclaim_processing()
+
+    assert reclaimed == 3
+    first_call = stream_queue._client.xautoclaim.await_args_list[0]
+    assert first_call.args == (stream_queue.STREAM_KEY, stream_queue.GROUP, "hl-1", 30000)
+    assert stream_queue._read_own_pending is True
+
+
+@pytest.mark.asyncio
+async def test_pop_batch_blocking_propagates_redis_errors(stream_queue):
+    stream_queue._client.xreadgroup = AsyncMock(side_effect=ConnectionError("redis down"))
+
+    with pytest.raises(ConnectionError):
+        await stream_queue.pop_batch_blocking(10, block_timeout_sec=1.0, linger_ms=50)
+
+
+def test_create_telemetry_queue_selects_backend():
+    settings = SimpleNamespace(telemetry_consumer_workers=2, telemetry_queue_backend="stream")
+    with patch("common.redis_queue.get_settings", return_value=settings):
+        queue = create_telemetry_queue()
+    assert isinstance(queue, TelemetryStreamQueue)
+    assert queue.shard_count == 2
+
+    settings = SimpleNamespace(telemetry_consumer_workers=1, telemetry_queue_backend="list")
+    with patch("common.redis_queue.get_settings", return_value=settings):
+        queue = create_telemetry_queue()
+    assert type(queue) is TelemetryQueue
+
+
+def test_bulk_dead_replay_targets_shard_streams():
+    queue = TelemetryStreamQueue(shard_count=2, consumer="c-1")
+
+    assert queue._replay_target_keys() == [TelemetryStreamQueue.STREAM_KEY, f"{TelemetryStreamQueue.STREAM_KEY}:1"]
+    assert "XADD" in queue.APPLY_DEAD_CHUNK_SCRIPT
+    assert "RPUSH', KEYS[tonumber(action)]" not in queue.APPLY_DEAD_CHUNK_SCRIPT
+
+
+@pytest.mark.asyncio
+async def test_rebalance_shards_moves_messages_from_orphaned_streams():
+    from common.redis_queue import shard_for_node_uid, shard_key
+
+    queue = TelemetryStreamQueue(shard_count=2, consumer="hl-1")
+    queue._client = MagicMock()
+    queue._ensure_client = AsyncMock()
+    uid = next(f"nd-{i}" for i in range(100) if shard_for_node_uid(f"nd-{i}", 2) == 1)
+    orphan_key = shard_key(TelemetryStreamQueue.STREAM_KEY, 3)
+    streams = {orphan_key: [(b"1-0", {b"d": _item(node_uid=uid).to_json(), b"r": b"1"})]}
+
+    async def scan_iter(match):
+        yield orphan_key.encode("utf-8")
+
+    async def xrange(key, start, end):
+        return streams.get(key, [])
+
+    queue._client.scan_iter = scan_iter
+    queue._client.xrange = xrange
+    queue._client.xlen = AsyncMock(return_value=0)
+    queue._client.delete = AsyncMock()
+    pipe = _pipeline([b"2-0", 1])
+    queue._client.pipeline = MagicMock(return_value=pipe)
+
+    assert await queue.rebalance_shards() == 1
+
+    target_key, fields = pipe.xadd.call_args.args
+    assert target_key == shard_key(TelemetryStreamQueue.STREAM_KEY, 1)
+    assert TelemetryQueueItem.from_json(fields[b"d"]).node_uid == uid
+    assert fields[b"r"] == b"1"
+    pipe.xdel.assert_called_once_with(orphan_key, b"1-0")
+    queue._client.delete.assert_awaited_once_with(orphan_key)
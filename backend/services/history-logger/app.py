@@ -20,7 +20,7 @@ from commands.drain import drain_stale_queued_commands_once, drain_worker as que
 from common.env import get_settings
 from common.http_client_pool import close_http_client as close_unified_http_client
 from common.mqtt import get_mqtt_client
-from common.redis_queue import TelemetryQueue, close_redis_client
+from common.redis_queue import close_redis_client, create_telemetry_queue
 from common.service_logs import send_service_log
 from common.trace_context import clear_trace_id, set_trace_id_from_headers
 from ingest_routes import router as ingest_router
@@ -39,7 +39,14 @@ from mqtt_handlers import (
     monitor_offline_nodes,
 )
 from system_routes import router as system_router
-from telemetry_processing import handle_telemetry, process_realtime_queue, process_telemetry_queue
+from handlers.heartbeat_status import flush_heartbeat_coalescer
+from telemetry.ingress import flush_ingress_batcher
+from telemetry_processing import (
+    handle_telemetry,
+    process_realtime_queue,
+    process_telemetry_queue,
+    run_cache_invalidation_listener,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -63,15 +70,28 @@ async def lifespan(app: FastAPI):
     s = get_settings()
 
     if state.telemetry_queue is None:
-        state.telemetry_queue = TelemetryQueue()
+        state.telemetry_queue = create_telemetry_queue(
+            shard_count=int(getattr(s, "telemetry_consumer_workers", 1) or 1)
+        )
 
     try:
-        reclaimed = await state.telemetry_queue.reclaim_processing()
+        reclaimed = 0
+        for shard in state.telemetry_queue.shards():
+            reclaimed += await shard.reclaim_processing()
         if reclaimed:
             logger.info("Reclaimed %s telemetry item(s) from processing list", reclaimed)
     except Exception:
         logger.warning("Failed to reclaim telemetry processing list on startup", exc_info=True)
 
+    # До consumer'ов и подписки MQTT: после смены TELEMETRY_CONSUMER_WORKERS
+    # бэклог узлов переносится в шарды по новому числу шардов.
+    try:
+        rebalanced = await state.telemetry_queue.rebalance_shards()
+        if rebalanced:
+            logger.info("Moved %s telemetry item(s) to their shards after shard count change", rebalanced)
+    except Exception:
+        logger.warning("Failed to rebalance telemetry queue shards on startup", exc_info=True)
+
     task = asyncio.create_task(process_telemetry_queue(), name="telemetry_queue_processor")
     state.background_tasks.append(task)
 
@@ -121,6 +141,12 @@ async def lifespan(app: FastAPI):
     offline_task = asyncio.create_task(monitor_offline_nodes())
     state.background_tasks.append(offline_task)
 
+    if getattr(s, "telemetry_cache_notify_enabled", False):
+        cache_listener_task = asyncio.create_task(
+            run_cache_invalidation_listener(), name="telemetry_cache_invalidation_listener"
+        )
+        state.background_tasks.append(cache_listener_task)
+
     mqtt = await get_mqtt_client()
     await mqtt.subscribe("hydro/+/+/+/+/telemetry", handle_telemetry)
     await mqtt.subscribe("hydro/+/+/+/heartbeat", handle_heartbeat)
@@ -158,6 +184,16 @@ async def lifespan(app: FastAPI):
     except Exception:
         logger.warning("Shutdown queued command drain failed", exc_info=True)
 
+    try:
+        await asyncio.wait_for(flush_ingress_batcher(), timeout=s.shutdown_timeout_sec)
+    except Exception:
+        logger.warning("Shutdown telemetry ingress flush failed", exc_info=True)
+
+    try:
+        await asyncio.wait_for(flush_heartbeat_coalescer(), timeout=s.shutdown_timeout_sec)
+    except Exception:
+        logger.warning("Shutdown heartbeat flush failed", exc_info=True)
+
     state.shutdown_event.set()
 
     telemetry_task = next(
@@ -119,15 +119,18 @@ def log_transient_warning(kind: str, entity: str, message: str) -> None:
     logger.warning(message)
 
 
-def log_transient_info(kind: str, entity: str, message: str) -> None:
+def log_transient_info(
+    kind: str, entity: str, message: str, *, log: logging.Logger | None = None
+) -> None:
+    log = log or logger
     now = utcnow().timestamp()
     key = (kind, entity)
     last = _transient_warning_last_seen.get(key)
     if last is not None and (now - last) < TRANSIENT_WARNING_TTL_SEC:
-        logger.debug(message)
+        log.debug(message)
         return
     _transient_warning_last_seen[key] = now
-    logger.info(message)
+    log.info(message)
 
 
 # ---------------------------------------------------------------------------
@@ -11,7 +11,7 @@ from common.command_status_queue import (
     normalize_status,
 )
 from common.utils.time import normalize_device_timestamp, utcnow
-from common.db import create_zone_event, execute, fetch
+from common.db import create_zone_event, execute, fetch, notify_zone_event_ingested
 from common.simulation_events import record_simulation_event
 from common.trace_context import clear_trace_id
 from metrics import (
@@ -360,7 +360,7 @@ async def _maybe_persist_irr_state_snapshot(
         return
 
     try:
-        await create_zone_event(
+        inserted = await create_zone_event(
             int(zone_id),
             IRR_STATE_SNAPSHOT_EVENT_TYPE,
             {
@@ -372,6 +372,13 @@ async def _maybe_persist_irr_state_snapshot(
                 "snapshot": snapshot,
             },
         )
+        if inserted:
+            # AE3 ждёт snapshot probe-команды по (zone_id, cmd_id) вместо опроса zone_events.
+            await notify_zone_event_ingested(
+                zone_id=int(zone_id),
+                event_type=IRR_STATE_SNAPSHOT_EVENT_TYPE,
+                payload={"source": "command_response_state", "cmd_id": cmd_id, "channel": channel},
+            )
     except Exception:
         logger.warning(
             "[COMMAND_RESPONSE] Failed to persist IRR_STATE_SNAPSHOT for zone_id=%s cmd_id=%s",
@@ -40,7 +40,7 @@ async def handle_diagnostics(topic: str, payload: bytes) -> None:
         error_handler = get_error_handler()
         await error_handler.handle_diagnostics(node_uid, data)
 
-        DIAGNOSTICS_RECEIVED.labels(node_uid=node_uid).inc()
+        DIAGNOSTICS_RECEIVED.labels(node_uid=node_uid, zone=_extract_zone_uid(topic)).inc()
     except Exception as exc:
         logger.error(
             "[DIAGNOSTICS] Unexpected error processing diagnostics for topic %s: %s",
@@ -133,7 +133,7 @@ async def handle_error(topic: str, payload: bytes) -> None:
             error_handler = get_error_handler()
             await error_handler.handle_error(node_uid, data)
 
-        ERROR_RECEIVED.labels(node_uid=node_uid, level=level.lower()).inc()
+        ERROR_RECEIVED.labels(node_uid=node_uid, level=level.lower(), zone=zone_uid).inc()
     finally:
         clear_trace_id()
 
@@ -170,7 +170,9 @@ async def _save_unassigned_error_from_temp(topic: str, data: dict) -> None:
     except Exception as e:
         logger.error(f"[ERROR] Failed to save unassigned node error: {e}", exc_info=True)
 
-    ERROR_RECEIVED.labels(node_uid=f"unassigned-{hardware_id}", level=level.lower()).inc()
+    ERROR_RECEIVED.labels(
+        node_uid=f"unassigned-{hardware_id}", level=level.lower(), zone=_extract_zone_uid(topic)
+    ).inc()
 
 
 async def _save_unassigned_error_node_not_found(
@@ -200,7 +202,9 @@ async def _save_unassigned_error_node_not_found(
     except Exception as e:
         logger.error(f"[ERROR] Failed to save unassigned node error: {e}", exc_info=True)
 
-    ERROR_RECEIVED.labels(node_uid=f"unassigned-{hardware_id}", level=level.lower()).inc()
+    ERROR_RECEIVED.labels(
+        node_uid=f"unassigned-{hardware_id}", level=level.lower(), zone=_extract_zone_uid(topic)
+    ).inc()
 
 
 async def _save_unassigned_error_no_zone(
@@ -229,4 +233,6 @@ async def _save_unassigned_error_no_zone(
         logger.info(f"[ERROR] Saved error for unassigned node hardware_id={hardware_id}")
     except Exception as e:
         logger.error(f"[ERROR] Failed to save unassigned node error: {e}", exc_info=True)
-    ERROR_RECEIVED.labels(node_uid=f"unassigned-{hardware_id}", level=level.lower()).inc()
+    ERROR_RECEIVED.labels(
+        node_uid=f"unassigned-{hardware_id}", level=level.lower(), zone=_extract_zone_uid(topic)
+    ).inc()
@@ -0,0 +1,196 @@
+"""Коалесцирование heartbeat-обновлений ``nodes``.
+
+Heartbeat'ы, пришедшие за окно ``flush_ms``, сливаются по ноде (последнее
+не-NULL значение uptime / free_heap / rssi / fw_version) и пишутся одним
+``UPDATE ... FROM UNNEST(...)`` на тип ключа (``uid`` или ``hardware_id`` для
+temp-топиков). ``last_seen_at`` / ``last_heartbeat_at`` выставляются на момент
+получения последнего heartbeat (``NOW() - age``), а не на момент flush, —
+``monitor_offline_nodes`` видит те же значения, что и при записи по одному.
+
+Каждый ``submit`` ждёт flush своего окна и получает ``uid`` обновлённой ноды
+(``None`` — строки нет), так что обработчик heartbeat сохраняет поштучную логику.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KEY_UID = "uid"
+KEY_HARDWARE_ID = "hardware_id"
+
+_UPDATE_SQL_TEMPLATE = """
+UPDATE nodes AS n
+SET uptime_seconds = COALESCE(u.uptime_seconds, n.uptime_seconds),
+    free_heap_bytes = COALESCE(u.free_heap_bytes, n.free_heap_bytes),
+    rssi = COALESCE(u.rssi, n.rssi),
+    fw_version = COALESCE(u.fw_version, n.fw_version),
+    last_heartbeat_at = GREATEST(n.last_heartbeat_at, NOW() - u.age_sec * interval '1 second'),
+    last_seen_at = GREATEST(n.last_seen_at, NOW() - u.age_sec * interval '1 second'),
+    updated_at = NOW(),
+    status = 'online'
+FROM UNNEST($1::text[], $2::int[], $3::int[], $4::int[], $5::text[], $6::float8[])
+    AS u(key, uptime_seconds, free_heap_bytes, rssi, fw_version, age_sec)
+WHERE n.{column} = u.key
+RETURNING u.key AS key, n.uid AS uid
+"""
+
+UPDATE_BY_UID_SQL = _UPDATE_SQL_TEMPLATE.format(column=KEY_UID)
+UPDATE_BY_HARDWARE_ID_SQL = _UPDATE_SQL_TEMPLATE.format(column=KEY_HARDWARE_ID)
+
+
+@dataclass
+class _PendingHeartbeat:
+    uptime_seconds: Optional[int] = None
+    free_heap_bytes: Optional[int] = None
+    rssi: Optional[int] = None
+    fw_version: Optional[str] = None
+    received_at: float = 0.0
+    waiters: List["asyncio.Future[Optional[str]]"] = field(default_factory=list)
+
+    def merge(
+        self,
+        *,
+        uptime_seconds: Optional[int],
+        free_heap_bytes: Optional[int],
+        rssi: Optional[int],
+        fw_version: Optional[str],
+        received_at: float,
+    ) -> None:
+        if uptime_seconds is not None:
+            self.uptime_seconds = uptime_seconds
+        if free_heap_bytes is not None:
+            self.free_heap_bytes = free_heap_bytes
+        if rssi is not None:
+            self.rssi = rssi
+        if fw_version is not None:
+            self.fw_version = fw_version
+        self.received_at = max(self.received_at, received_at)
+
+
+class HeartbeatCoalescer:
+    """Копит heartbeat'ы по ноде и пишет их пачкой раз в ``flush_ms``."""
+
+    def __init__(
+        self,
+        fetch: Callable[..., Awaitable[list]],
+        *,
+        flush_ms: float,
+    ):
+        self._fetch = fetch
+        self.flush_sec = max(0.0, float(flush_ms)) / 1000
+        self._pending: Dict[Tuple[str, str], _PendingHeartbeat] = {}
+        # Завершаются после записи текущего окна / окна, которое пишется сейчас.
+        self._window_done: Optional[asyncio.Future] = None
+        self._inflight_done: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_now = asyncio.Event()
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def submit(
+        self,
+        *,
+        key_kind: str,
+        key: str,
+        uptime_seconds: Optional[int] = None,
+        free_heap_bytes: Optional[int] = None,
+        rssi: Optional[int] = None,
+        fw_version: Optional[str] = None,
+    ) -> Optional[str]:
+        """Ставит heartbeat в текущее окно; возвращает ``uid`` обновлённой ноды или None."""
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            self._window_done = loop.create_future()
+        entry = self._pending.get((key_kind, key))
+        if entry is None:
+            entry = _PendingHeartbeat()
+            self._pending[(key_kind, key)] = entry
+        entry.merge(
+            uptime_seconds=uptime_seconds,
+            free_heap_bytes=free_heap_bytes,
+            rssi=rssi,
+            fw_version=fw_version,
+            received_at=time.monotonic(),
+        )
+        future: asyncio.Future[Optional[str]] = loop.create_future()
+        entry.waiters.append(future)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="heartbeat_coalescer")
+        return await future
+
+    async def flush(self) -> None:
+        """
+        Дожидается записи всего, что получено до вызова: окна в полёте и текущего
+        (текущее пишется без ожидания ``flush_ms``). Используется перед status/LWT,
+        чтобы более ранний heartbeat не перезаписал offline, и при shutdown.
+        """
+        waits = [
+            done
+            for done in (self._inflight_done, self._window_done if self._pending else None)
+            if done is not None and not done.done()
+        ]
+        if not waits:
+            return
+        if self._pending:
+            self._flush_now.set()
+        await asyncio.shield(asyncio.gather(*waits))
+
+    async def _run(self) -> None:
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_sec)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            batch, self._pending = self._pending, {}
+            self._inflight_done, self._window_done = self._window_done, None
+            try:
+                await self._write_batch(batch)
+            finally:
+                if self._inflight_done is not None and not self._inflight_done.done():
+                    self._inflight_done.set_result(None)
+
+    async def _write_batch(self, batch: Dict[Tuple[str, str], _PendingHeartbeat]) -> None:
+        now = time.monotonic()
+        by_kind: Dict[str, List[Tuple[str, _PendingHeartbeat]]] = {}
+        for (key_kind, key), entry in batch.items():
+            by_kind.setdefault(key_kind, []).append((key, entry))
+
+        for key_kind, entries in by_kind.items():
+            sql = UPDATE_BY_HARDWARE_ID_SQL if key_kind == KEY_HARDWARE_ID else UPDATE_BY_UID_SQL
+            try:
+                rows = await self._fetch(
+                    sql,
+                    [key for key, _ in entries],
+                    [entry.uptime_seconds for _, entry in entries],
+                    [entry.free_heap_bytes for _, entry in entries],
+                    [entry.rssi for _, entry in entries],
+                    [entry.fw_version for _, entry in entries],
+                    [max(0.0, now - entry.received_at) for _, entry in entries],
+                )
+            except Exception as exc:
+                logger.error(
+                    "[HEARTBEAT] Coalesced nodes update failed: key_kind=%s, nodes=%s, error=%s",
+                    key_kind,
+                    len(entries),
+                    exc,
+                )
+                for _, entry in entries:
+                    for waiter in entry.waiters:
+                        if not waiter.done():
+                            waiter.set_exception(exc)
+                continue
+
+            updated = {str(row["key"]): str(row["uid"]) for row in rows or []}
+            for key, entry in entries:
+                uid = updated.get(key)
+                for waiter in entry.waiters:
+                    if not waiter.done():
+                        waiter.set_result(uid)
@@ -8,6 +8,7 @@ import logging
 import state
 from common.db import execute, fetch
 from common.env import get_settings
+from common.logging_setup import get_hot_path_logger
 from common.trace_context import clear_trace_id
 from metrics import (
     HEARTBEAT_RECEIVED,
@@ -17,7 +18,8 @@ from metrics import (
 )
 from utils import _extract_gh_uid, _extract_node_uid, _extract_zone_uid, _parse_json
 
-from ._shared import apply_trace_context
+from ._shared import apply_trace_context, log_transient_info
+from .heartbeat_coalescer import KEY_HARDWARE_ID, KEY_UID, HeartbeatCoalescer
 from .node_connectivity_alerts import (
     raise_node_offline_alert,
     resolve_node_online_alert,
@@ -25,6 +27,7 @@ from .node_connectivity_alerts import (
 from telemetry_processing import refresh_node_cache_for_uid
 
 logger = logging.getLogger(__name__)
+hot_path_log = get_hot_path_logger(__name__)
 
 
 def _rows_affected(result: str) -> int:
@@ -37,25 +40,57 @@ def _rows_affected(result: str) -> int:
         return -1
 
 
+def _record_zero_rows_update(*, handler: str, node_uid: str) -> None:
+    logger.warning(
+        "[%s] UPDATE affected 0 rows for unknown node_uid=%s",
+        handler.upper(),
+        node_uid,
+    )
+    NODE_UPDATE_ZERO_ROWS.labels(handler=handler).inc()
+
+
+_heartbeat_coalescer: HeartbeatCoalescer | None = None
+
+
+def _get_heartbeat_coalescer() -> HeartbeatCoalescer | None:
+    """Coalescer при ``HEARTBEAT_COALESCE_MS > 0``, иначе None (UPDATE на каждый heartbeat)."""
+    global _heartbeat_coalescer
+    flush_ms = float(getattr(get_settings(), "heartbeat_coalesce_ms", 0) or 0)
+    if flush_ms <= 0:
+        return None
+    if _heartbeat_coalescer is None or _heartbeat_coalescer.flush_sec != flush_ms / 1000:
+        # fetch читается при каждом вызове: тесты и mqtt_handlers подменяют его в модуле.
+        _heartbeat_coalescer = HeartbeatCoalescer(
+            lambda *args: fetch(*args),
+            flush_ms=flush_ms,
+        )
+    return _heartbeat_coalescer
+
+
+async def flush_heartbeat_coalescer() -> None:
+    """Записывает накопленные heartbeat (перед status/LWT и при shutdown)."""
+    if _heartbeat_coalescer is not None:
+        await _heartbeat_coalescer.flush()
+
+
 async def _update_node_status(
     *,
     node_uid: str,
     query: str,
     params: tuple,
     handler: str,
-    success_log: str,
+    success_log: str | None,
 ) -> bool:
+    if handler != "heartbeat":
+        # Status/LWT применяются после всех heartbeat, полученных раньше них.
+        await flush_heartbeat_coalescer()
     result = await execute(query, *params)
     affected = _rows_affected(result)
     if affected == 0:
-        logger.warning(
-            "[%s] UPDATE affected 0 rows for unknown node_uid=%s",
-            handler.upper(),
-            node_uid,
-        )
-        NODE_UPDATE_ZERO_ROWS.labels(handler=handler).inc()
+        _record_zero_rows_update(handler=handler, node_uid=node_uid)
         return False
-    logger.info(success_log)
+    if success_log:
+        logger.info(success_log)
     return True
 
 
@@ -70,12 +105,118 @@ def _extract_fw_version(data: dict) -> str | None:
     return None
 
 
+def _parse_heartbeat_fields(
+    *,
+    node_uid: str,
+    uptime,
+    free_heap,
+    rssi,
+    fw_version: str | None,
+) -> dict:
+    """uptime / free_heap / rssi / fw_version из payload; невалидные значения пропускаются."""
+    fields: dict = {
+        "uptime_seconds": None,
+        "free_heap_bytes": None,
+        "rssi": None,
+        "fw_version": fw_version,
+    }
+    if uptime is not None:
+        try:
+            fields["uptime_seconds"] = int(float(uptime))
+        except (ValueError, TypeError) as e:
+            logger.warning(
+                "Invalid uptime value: %s",
+                uptime,
+                extra={"error": str(e), "node_uid": node_uid},
+            )
+    if free_heap is not None:
+        try:
+            fields["free_heap_bytes"] = int(free_heap)
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid free_heap value: {free_heap}")
+    if rssi is not None:
+        try:
+            fields["rssi"] = int(rssi)
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid rssi value: {rssi}")
+    return fields
+
+
+def _log_temp_heartbeat_unregistered(hardware_id: str) -> None:
+    log_transient_info(
+        "heartbeat_temp_unregistered",
+        hardware_id,
+        f"[HEARTBEAT] Temp heartbeat buffered by registration flow: hardware_id={hardware_id}",
+        log=logger,
+    )
+
+
+async def _write_heartbeat_direct(
+    *,
+    node_uid: str,
+    is_temp_topic: bool,
+    fields: dict,
+) -> str | None:
+    """Немедленный UPDATE nodes; возвращает uid обновлённой ноды или None."""
+    if is_temp_topic:
+        # Для temp топиков ``node_uid`` на самом деле hardware_id
+        hardware_id = node_uid
+        node_rows = await fetch(
+            "SELECT uid FROM nodes WHERE hardware_id = $1",
+            hardware_id,
+        )
+        if not node_rows:
+            _log_temp_heartbeat_unregistered(hardware_id)
+            return None
+        node_uid = node_rows[0]["uid"]
+        logger.debug("[HEARTBEAT] Found node_uid=%s for hardware_id=%s", node_uid, hardware_id)
+
+    updates: list[str] = []
+    params: list = [node_uid]
+    for column in ("uptime_seconds", "free_heap_bytes", "rssi", "fw_version"):
+        if fields[column] is not None:
+            params.append(fields[column])
+            updates.append(f"{column}=${len(params)}")
+
+    updates.append("last_heartbeat_at=NOW()")
+    updates.append("updated_at=NOW()")
+    updates.append("last_seen_at=NOW()")
+    updates.append("status='online'")
+
+    updated = await _update_node_status(
+        node_uid=node_uid,
+        query="UPDATE nodes SET " + ", ".join(updates) + " WHERE uid=$1",
+        params=tuple(params),
+        handler="heartbeat",
+        success_log=None,
+    )
+    return node_uid if updated else None
+
+
+async def _write_heartbeat_coalesced(
+    coalescer: HeartbeatCoalescer,
+    *,
+    node_uid: str,
+    is_temp_topic: bool,
+    fields: dict,
+) -> str | None:
+    """Heartbeat через общий UPDATE ... FROM UNNEST окна коалесцирования."""
+    resolved_uid = await coalescer.submit(
+        key_kind=KEY_HARDWARE_ID if is_temp_topic else KEY_UID,
+        key=node_uid,
+        **fields,
+    )
+    if resolved_uid is None:
+        if is_temp_topic:
+            _log_temp_heartbeat_unregistered(node_uid)
+        else:
+            _record_zero_rows_update(handler="heartbeat", node_uid=node_uid)
+    return resolved_uid
+
+
 async def handle_heartbeat(topic: str, payload: bytes) -> None:
     """Обновляет ``nodes`` на heartbeat: uptime / free_heap / rssi / last_seen."""
     try:
-        logger.info("[HEARTBEAT] ===== START processing heartbeat =====")
-        logger.info(f"[HEARTBEAT] Topic: {topic}, payload length: {len(payload)}")
-
         data = _parse_json(payload)
         if not data or not isinstance(data, dict):
             logger.warning(f"[HEARTBEAT] Invalid JSON in heartbeat from topic {topic}")
@@ -92,120 +233,43 @@ async def handle_heartbeat(topic: str, payload: bytes) -> None:
         zone_uid = _extract_zone_uid(topic)
         is_temp_topic = gh_uid == "gh-temp" and zone_uid == "zn-temp"
 
-        logger.info(
-            f"[HEARTBEAT] Extracted gh_uid='{gh_uid}', zone_uid='{zone_uid}', is_temp_topic={is_temp_topic}, topic='{topic}'"
-        )
-
-        if is_temp_topic:
-            # Для temp топиков ``node_uid`` на самом деле hardware_id
-            hardware_id = node_uid
-            logger.info(
-                f"[HEARTBEAT] Processing heartbeat for temp topic, hardware_id: {hardware_id}, data: {data}"
-            )
-            node_rows = await fetch(
-                "SELECT uid FROM nodes WHERE hardware_id = $1",
-                hardware_id,
-            )
-            if not node_rows:
-                logger.debug(
-                    "[HEARTBEAT] Temp heartbeat buffered by registration flow: hardware_id=%s",
-                    hardware_id,
-                )
-                return
-            node_uid = node_rows[0]["uid"]
-            logger.info(f"[HEARTBEAT] Found node_uid: {node_uid} for hardware_id: {hardware_id}")
-        else:
-            logger.info(f"[HEARTBEAT] Processing heartbeat for node_uid: {node_uid}, data: {data}")
-
         uptime = data.get("uptime")
         free_heap = data.get("free_heap") or data.get("free_heap_bytes")
         rssi = data.get("rssi")
-        fw_version = _extract_fw_version(data)
-
-        updates: list[str] = []
-        params: list = [node_uid]
-        param_index = 1
-
-        if uptime is not None:
-            try:
-                uptime_seconds = int(float(uptime))
-                updates.append(f"uptime_seconds=${param_index + 1}")
-                params.append(uptime_seconds)
-                param_index += 1
-            except (ValueError, TypeError) as e:
-                logger.warning(
-                    "Invalid uptime value: %s",
-                    uptime,
-                    extra={"error": str(e), "node_uid": node_uid},
-                )
+        fields = _parse_heartbeat_fields(
+            node_uid=node_uid,
+            uptime=uptime,
+            free_heap=free_heap,
+            rssi=rssi,
+            fw_version=_extract_fw_version(data),
+        )
 
-        if free_heap is not None:
-            try:
-                free_heap_int = int(free_heap)
-                updates.append(f"free_heap_bytes=${param_index + 1}")
-                params.append(free_heap_int)
-                param_index += 1
-            except (ValueError, TypeError):
-                logger.warning(f"Invalid free_heap value: {free_heap}")
-
-        if rssi is not None:
-            try:
-                rssi_int = int(rssi)
-                updates.append(f"rssi=${param_index + 1}")
-                params.append(rssi_int)
-                param_index += 1
-            except (ValueError, TypeError):
-                logger.warning(f"Invalid rssi value: {rssi}")
-
-        if fw_version is not None:
-            updates.append(f"fw_version=${param_index + 1}")
-            params.append(fw_version)
-            param_index += 1
-
-        updates.append("last_heartbeat_at=NOW()")
-        updates.append("updated_at=NOW()")
-        updates.append("last_seen_at=NOW()")
-        updates.append("status='online'")
-
-        if len(updates) > 4:
-            query = "UPDATE nodes SET " + ", ".join(updates) + " WHERE uid=$1"
-            updated = await _update_node_status(
-                node_uid=node_uid,
-                query=query,
-                params=tuple(params),
-                handler="heartbeat",
-                success_log=f"[HEARTBEAT] Node heartbeat processed successfully: node_uid={node_uid}",
+        coalescer = _get_heartbeat_coalescer()
+        if coalescer is not None:
+            resolved_uid = await _write_heartbeat_coalesced(
+                coalescer, node_uid=node_uid, is_temp_topic=is_temp_topic, fields=fields
             )
         else:
-            updated = await _update_node_status(
-                node_uid=node_uid,
-                query=(
-                    "UPDATE nodes SET last_heartbeat_at=NOW(), updated_at=NOW(), "
-                    "last_seen_at=NOW(), status='online' WHERE uid=$1"
-                ),
-                params=(node_uid,),
-                handler="heartbeat",
-                success_log=f"[HEARTBEAT] Node heartbeat processed successfully: node_uid={node_uid}",
+            resolved_uid = await _write_heartbeat_direct(
+                node_uid=node_uid, is_temp_topic=is_temp_topic, fields=fields
             )
-
-        if not updated:
+        if resolved_uid is None:
             return
+        node_uid = resolved_uid
 
-        HEARTBEAT_RECEIVED.labels(node_uid=node_uid).inc()
-
-        logged_uptime = None
-        if uptime is not None:
-            try:
-                logged_uptime = int(float(uptime))
-            except (ValueError, TypeError):
-                logged_uptime = uptime
+        HEARTBEAT_RECEIVED.labels(node_uid=node_uid, zone=zone_uid).inc()
 
-        logger.info(
-            "[HEARTBEAT] Node heartbeat details: node_uid=%s, uptime_seconds=%s, free_heap=%s, rssi=%s",
+        hot_path_log.info(
+            "heartbeat",
+            "[HEARTBEAT] Node heartbeat processed: node_uid=%s, gh_uid=%s, zone_uid=%s, "
+            "uptime=%s, free_heap=%s, rssi=%s",
             node_uid,
-            logged_uptime,
+            gh_uid,
+            zone_uid,
+            uptime,
             free_heap,
             rssi,
+            payload=data,
         )
         try:
             await refresh_node_cache_for_uid(node_uid)
@@ -300,7 +364,9 @@ async def handle_status(topic: str, payload: bytes) -> None:
         else:
             logger.warning(f"[STATUS] Unknown status value: {status} for node {node_uid}")
 
-        STATUS_RECEIVED.labels(node_uid=node_uid, status=status.lower()).inc()
+        STATUS_RECEIVED.labels(
+            node_uid=node_uid, status=status.lower(), zone=_extract_zone_uid(topic)
+        ).inc()
     except Exception as exc:
         logger.error(
             "[STATUS] Unexpected error processing status for topic %s: %s",
@@ -358,7 +424,9 @@ async def handle_lwt(topic: str, payload: bytes) -> None:
             if updated:
                 await raise_node_offline_alert(node_uid=node_uid, reason="mqtt_lwt")
 
-        STATUS_RECEIVED.labels(node_uid=node_uid, status=status.lower()).inc()
+        STATUS_RECEIVED.labels(
+            node_uid=node_uid, status=status.lower(), zone=_extract_zone_uid(topic)
+        ).inc()
     except Exception as exc:
         logger.error(
             "[LWT] Unexpected error processing LWT for topic %s: %s",
@@ -381,6 +449,8 @@ async def monitor_offline_nodes() -> None:
 
     while not state.shutdown_event.is_set():
         try:
+            # Накопленные heartbeat пишутся до проверки stale last_seen_at.
+            await flush_heartbeat_coalescer()
             rows = await fetch(
                 """
                 UPDATE nodes
@@ -147,4 +147,13 @@ async def _maybe_persist_irr_state_snapshot(
         "snapshot": snapshot,
     }
     snapshot_payload = {k: v for k, v in snapshot_payload.items() if v is not None}
-    await create_zone_event(zone_id, IRR_STATE_SNAPSHOT_EVENT_TYPE, snapshot_payload)
+    if await create_zone_event(zone_id, IRR_STATE_SNAPSHOT_EVENT_TYPE, snapshot_payload):
+        await notify_zone_event_ingested(
+            zone_id=zone_id,
+            event_type=IRR_STATE_SNAPSHOT_EVENT_TYPE,
+            payload={
+                "source": "node_event_storage_state",
+                "cmd_id": snapshot_payload.get("cmd_id"),
+                "channel": channel,
+            },
+        )
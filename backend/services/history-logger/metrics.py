@@ -1,5 +1,6 @@
 from prometheus_client import Counter, Histogram, Gauge
 
+from common.bounded_metrics import BoundedNodeCounter
 from common.redis_queue import QUEUE_SIZE as TELEMETRY_QUEUE_SIZE
 
 TELEM_RECEIVED = Counter(
@@ -14,25 +15,29 @@ TELEM_BATCH_SIZE = Histogram(
     "telemetry_batch_size",
     "Size of telemetry batches processed",
 )
-HEARTBEAT_RECEIVED = Counter(
+HEARTBEAT_RECEIVED = BoundedNodeCounter(
     "heartbeat_received_total",
     "Total heartbeat messages received",
     ["node_uid"],
+    by_zone=True,
 )
-STATUS_RECEIVED = Counter(
+STATUS_RECEIVED = BoundedNodeCounter(
     "status_received_total",
     "Total status messages received",
     ["node_uid", "status"],
+    by_zone=True,
 )
-DIAGNOSTICS_RECEIVED = Counter(
+DIAGNOSTICS_RECEIVED = BoundedNodeCounter(
     "diagnostics_received_total",
     "Total diagnostics messages received",
     ["node_uid"],
+    by_zone=True,
 )
-ERROR_RECEIVED = Counter(
+ERROR_RECEIVED = BoundedNodeCounter(
     "error_received_total",
     "Total error messages received",
     ["node_uid", "level"],
+    by_zone=True,
 )
 NODE_EVENT_RECEIVED = Counter(
     "node_event_received_total",
@@ -69,17 +74,17 @@ CONFIG_REPORT_PROCESSED = Counter(
     "config_report_processed_total",
     "Total config_report messages processed",
 )
-CONFIG_REPORT_ERROR = Counter(
+CONFIG_REPORT_ERROR = BoundedNodeCounter(
     "config_report_error_total",
     "Total error config_report messages",
     ["node_uid"],
 )
-CONFIG_REPORT_ACK_FAILED = Counter(
+CONFIG_REPORT_ACK_FAILED = BoundedNodeCounter(
     "config_report_ack_failed_total",
     "config_report stored locally but Laravel config-report-observed ACK failed",
     ["node_uid"],
 )
-CONFIG_REPORT_CHANNEL_SYNC_FAILED = Counter(
+CONFIG_REPORT_CHANNEL_SYNC_FAILED = BoundedNodeCounter(
     "config_report_channel_sync_failed_total",
     "config_report channel sync failed before marking processed",
     ["node_uid"],
@@ -165,6 +170,12 @@ TELEMETRY_SAMPLES_JOIN_MISMATCH = Counter(
     "telemetry_samples_join_mismatch_total",
     "telemetry_samples batch insert dropped rows due to sensors JOIN mismatch",
 )
+TELEMETRY_SAMPLES_WRITE_DURATION = Histogram(
+    "telemetry_samples_write_duration_seconds",
+    "telemetry_samples batch write duration by write engine",
+    ["engine"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0],
+)
 TELEMETRY_PROCESSING_RECLAIMED = Counter(
     "telemetry_processing_reclaimed_total",
     "Telemetry items reclaimed from processing list back to queue",
@@ -213,6 +224,36 @@ TELEMETRY_QUEUE_AGE = Gauge(
     "telemetry_queue_age_seconds",
     "Age of oldest item in queue in seconds",
 )
+TELEMETRY_SHARD_QUEUE_SIZE = Gauge(
+    "telemetry_shard_queue_size",
+    "Telemetry queue size per consumer shard",
+    ["shard"],
+)
+TELEMETRY_SHARD_PROCESSING_SIZE = Gauge(
+    "telemetry_shard_processing_size",
+    "Telemetry processing list size per consumer shard",
+    ["shard"],
+)
+TELEMETRY_SHARD_QUEUE_AGE = Gauge(
+    "telemetry_shard_queue_age_seconds",
+    "Age of the oldest telemetry item per consumer shard (consumer lag)",
+    ["shard"],
+)
+TELEMETRY_ADAPTIVE_BATCH_SIZE = Gauge(
+    "telemetry_adaptive_batch_size",
+    "Current telemetry batch size limit chosen per consumer shard",
+    ["shard"],
+)
+TELEMETRY_ADAPTIVE_FLUSH_MS = Gauge(
+    "telemetry_adaptive_flush_ms",
+    "Current telemetry flush deadline in milliseconds chosen per consumer shard",
+    ["shard"],
+)
+TELEMETRY_BATCH_WRITE_MS = Gauge(
+    "telemetry_batch_write_ms_ewma",
+    "EWMA of telemetry batch write time in milliseconds per consumer shard",
+    ["shard"],
+)
 REALTIME_QUEUE_LEN = Gauge(
     "realtime_queue_len",
     "Current realtime updates queue length",
@@ -227,11 +268,27 @@ REALTIME_FLUSH_LATENCY_MS = Histogram(
     "Realtime telemetry flush latency in milliseconds",
     buckets=[25, 50, 100, 250, 500, 1000, 2000, 5000],
 )
+REALTIME_FLUSH_BYTES = Histogram(
+    "realtime_flush_bytes",
+    "Realtime telemetry batch request body size in bytes",
+    ["format", "encoding"],
+    buckets=[256, 1024, 4096, 16384, 65536, 262144, 1048576],
+)
+REALTIME_SUPPRESSED_UPDATES = Counter(
+    "realtime_suppressed_updates_total",
+    "Realtime updates not sent because the value did not change significantly",
+)
 TELEMETRY_PROCESSING_DURATION = Histogram(
     "telemetry_processing_duration_seconds",
     "Time to process telemetry batch",
     buckets=[0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0],
 )
+
+TELEMETRY_CACHE_REFRESH_DURATION = Histogram(
+    "telemetry_cache_refresh_seconds",
+    "Time to reload zone/node resolve caches (background, off the batch path)",
+    buckets=[0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0],
+)
 LARAVEL_API_DURATION = Histogram(
     "laravel_api_request_duration_seconds",
     "Laravel API request duration",
@@ -242,6 +299,16 @@ REDIS_OPERATION_DURATION = Histogram(
     "Redis operation duration",
     buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5],
 )
+TELEMETRY_INGRESS_LATENCY = Histogram(
+    "telemetry_ingress_to_queue_seconds",
+    "Latency from MQTT telemetry receipt to acknowledged Redis queue push",
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+TELEMETRY_INGRESS_BATCH_SIZE = Histogram(
+    "telemetry_ingress_batch_size",
+    "Telemetry messages per pipelined ingress push",
+    buckets=[1, 5, 10, 25, 50, 100, 250, 500, 1000],
+)
 TELEMETRY_DROPPED = Counter(
     "telemetry_dropped_total",
     "Total dropped telemetry messages",
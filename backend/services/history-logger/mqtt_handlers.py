@@ -98,6 +98,7 @@ def _sync_command_response_overrides() -> None:
     command_response_module.deliver_status_to_laravel = deliver_status_to_laravel
     command_response_module.record_simulation_event = record_simulation_event
     command_response_module.create_zone_event = create_zone_event
+    command_response_module.notify_zone_event_ingested = notify_zone_event_ingested
     command_response_module.normalize_status = normalize_status
     command_response_module.COMMAND_RESPONSE_RECEIVED = COMMAND_RESPONSE_RECEIVED
     command_response_module.COMMAND_RESPONSE_ERROR = COMMAND_RESPONSE_ERROR
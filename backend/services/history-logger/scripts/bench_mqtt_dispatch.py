@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Бенчмарк MQTT dispatch (``MqttClient._wrap``): messages/sec с hot-path
+логированием в режимах ``sampled`` (лимит на класс топика) и ``unlimited``
+(запись на каждое сообщение, как было до ``HotPathLogger``).
+
+Брокер не нужен: ``on_message`` вызывается напрямую, handler — пустая корутина
+в фоновом event loop. Логи пишутся в /dev/null, поэтому в замер входит
+форматирование и запись, но не терминал.
+
+    cd backend/services/history-logger
+    python scripts/bench_mqtt_dispatch.py --messages 20000 --repeat 3
+"""
+
+__test__ = False
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+for path in (SERVICE_DIR, SERVICE_DIR.parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from common import mqtt as common_mqtt  # noqa: E402
+
+TOPICS = (
+    "hydro/gh-1/zn-1/nd-ph-1/ph/telemetry",
+    "hydro/gh-1/zn-1/nd-ec-1/ec/telemetry",
+    "hydro/gh-1/zn-1/nd-ph-1/heartbeat",
+)
+PAYLOAD = b'{"metric_type":"PH","value":6.52,"ts":1760000000,"raw":{"adc":2048}}'
+
+
+def _start_loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+async def _handle(topic: str, payload: bytes) -> None:
+    return None
+
+
+def _run_once(on_message, loop, messages: int) -> float:
+    msgs = [SimpleNamespace(topic=TOPICS[i % len(TOPICS)], payload=PAYLOAD) for i in range(messages)]
+    started = time.perf_counter()
+    for msg in msgs:
+        on_message(None, None, msg)
+    # Задачи loop выполняются FIFO: sentinel завершится после всех handler'ов.
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result()
+    return messages / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rate", type=float, default=1.0, help="записей/сек на класс топика в режиме sampled")
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, "w")
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[handler], force=True)
+
+    loop = _start_loop()
+    client = object.__new__(common_mqtt.MqttClient)
+    client._event_loop = loop
+    on_message = client._wrap(_handle)
+
+    for mode, rate in (("unlimited", 0.0), ("sampled", args.rate)):
+        common_mqtt.hot_path_log.rate_per_sec = rate
+        common_mqtt.hot_path_log._buckets.clear()
+        _run_once(on_message, loop, min(1000, args.messages))
+        results = [_run_once(on_message, loop, args.messages) for _ in range(args.repeat)]
+        print(
+            f"{mode:>9}: median={statistics.median(results):,.0f} msg/s "
+            f"min={min(results):,.0f} max={max(results):,.0f}"
+        )
+
+    loop.call_soon_threadsafe(loop.stop)
+    devnull.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Бенчмарк realtime-буфера: время event loop на enqueue + drain потока
+обновлений в режимах ``lock`` (OrderedDict под ``asyncio.Lock`` на каждое
+обновление, как было до ``RealtimeUpdateBuffer``) и ``buffer`` (``put_many``
+на пакет обработки, ``drain`` пачками).
+
+Поток — ``--rate`` обновлений/сек по ``--sensors`` сенсорам, порциями по
+``--batch`` (как из ``process_telemetry_batch``). Печатается доля секунды
+event loop, которую съедает буфер при таком потоке.
+
+    cd backend/services/history-logger
+    python scripts/bench_realtime_buffer.py --rate 50000 --repeat 5
+"""
+
+__test__ = False
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+for path in (SERVICE_DIR, SERVICE_DIR.parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from telemetry.realtime_buffer import RealtimeUpdateBuffer  # noqa: E402
+
+MAX_SIZE = 5000
+DRAIN_LIMIT = 200
+
+
+def _make_entries(rate: int, sensors: int) -> list:
+    return [
+        (
+            ("sensor", i % sensors),
+            {
+                "zone_id": 1 + i % 20,
+                "node_id": 100 + i % sensors,
+                "channel": "ph_sensor",
+                "metric_type": "PH",
+                "value": 6.0 + (i % 100) / 100,
+                "timestamp": 1700000000000 + i,
+            },
+        )
+        for i in range(rate)
+    ]
+
+
+async def _run_lock(entries: list, batch: int) -> float:
+    updates: "OrderedDict[tuple, dict]" = OrderedDict()
+    lock = asyncio.Lock()
+    settings = {"realtime_queue_max_size": MAX_SIZE}
+    dropped = 0
+
+    async def enqueue(key, update):
+        nonlocal dropped
+        async with lock:
+            updates[key] = update
+            updates.move_to_end(key)
+            max_size = settings.get("realtime_queue_max_size", 0)
+            if max_size > 0 and len(updates) > max_size:
+                updates.popitem(last=False)
+                dropped += 1
+
+    async def pop(limit):
+        async with lock:
+            return [updates.popitem(last=False)[1] for _ in range(min(limit, len(updates)))]
+
+    started = time.perf_counter()
+    for offset in range(0, len(entries), batch):
+        for key, update in entries[offset : offset + batch]:
+            await enqueue(key, update)
+        await pop(DRAIN_LIMIT)
+    return time.perf_counter() - started
+
+
+async def _run_buffer(entries: list, batch: int) -> float:
+    buffer = RealtimeUpdateBuffer(on_evict=lambda count: None, on_size=lambda size: None)
+
+    started = time.perf_counter()
+    for offset in range(0, len(entries), batch):
+        buffer.put_many(entries[offset : offset + batch], max_size=MAX_SIZE)
+        buffer.drain(DRAIN_LIMIT)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=int, default=50000, help="обновлений в секунду потока")
+    parser.add_argument("--sensors", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500, help="обновлений на один process_telemetry_batch")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    entries = _make_entries(args.rate, args.sensors)
+    for mode, runner in (("lock", _run_lock), ("buffer", _run_buffer)):
+        asyncio.run(runner(entries, args.batch))
+        results = [asyncio.run(runner(entries, args.batch)) for _ in range(args.repeat)]
+        median = statistics.median(results)
+        print(
+            f"{mode:>6}: median={median * 1000:,.1f} ms per {args.rate:,} updates "
+            f"(loop busy {median * 100:.1f}% of each second) min={min(results) * 1000:,.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
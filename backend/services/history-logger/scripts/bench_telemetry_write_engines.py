@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Бенчмарк write engines ``telemetry_samples``: unnest vs copy (rows/sec).
+
+Запуск (нужна БД с заполненными ``sensors``; ``PG_*`` как у сервиса):
+
+    cd backend/services/history-logger
+    python scripts/bench_telemetry_write_engines.py --rows 5000 --repeat 5
+
+Каждый прогон выполняется во внешней транзакции, которая откатывается, —
+``telemetry_samples`` после бенчмарка не меняется.
+"""
+
+__test__ = False
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+for path in (SERVICE_DIR, SERVICE_DIR.parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from common.db import get_pool  # noqa: E402
+from common.utils.time import utcnow  # noqa: E402
+from telemetry.sample_writer import (  # noqa: E402
+    UNNEST_INSERT_SQL,
+    SampleRow,
+    write_samples_copy,
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+async def _load_sensors(conn, limit: int) -> list[tuple[int, int]]:
+    rows = await conn.fetch(
+        """
+        SELECT id, zone_id
+        FROM sensors
+        WHERE zone_id IS NOT NULL
+        ORDER BY id
+        LIMIT $1
+        """,
+        limit,
+    )
+    return [(int(row["id"]), int(row["zone_id"])) for row in rows]
+
+
+def _build_rows(sensors: list[tuple[int, int]], count: int) -> list[SampleRow]:
+    base_ts = utcnow().replace(tzinfo=None) - timedelta(hours=1)
+    rows: list[SampleRow] = []
+    for idx in range(count):
+        sensor_id, zone_id = sensors[idx % len(sensors)]
+        rows.append(
+            SampleRow(
+                sensor_id=sensor_id,
+                ts=base_ts + timedelta(milliseconds=idx),
+                zone_id=zone_id,
+                value=6.0 + (idx % 100) / 100.0,
+                quality="GOOD",
+                metadata={"metric_type": "PH", "channel": "ph_sensor", "bench": True},
+            )
+        )
+    return rows
+
+
+async def _run_unnest(conn, rows: list[SampleRow]) -> int:
+    returned = await conn.fetch(
+        UNNEST_INSERT_SQL,
+        [row.sensor_id for row in rows],
+        [row.ts for row in rows],
+        [row.zone_id for row in rows],
+        [row.value for row in rows],
+        [row.quality for row in rows],
+        [row.metadata for row in rows],
+    )
+    return len(returned)
+
+
+async def _run_copy(conn, rows: list[SampleRow]) -> int:
+    result = await write_samples_copy(rows, conn=conn)
+    return len(result.written)
+
+
+async def _measure(pool, engine: str, rows: list[SampleRow]) -> tuple[float, int]:
+    runner = _run_copy if engine == "copy" else _run_unnest
+    async with pool.acquire() as conn:
+        written = 0
+        started = time.perf_counter()
+        try:
+            async with conn.transaction():
+                written = await runner(conn, rows)
+                elapsed = time.perf_counter() - started
+                raise _Rollback()
+        except _Rollback:
+            pass
+    return elapsed, written
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="строк в батче")
+    parser.add_argument("--repeat", type=int, default=5, help="прогонов на движок")
+    parser.add_argument("--sensors", type=int, default=200, help="сколько sensors использовать")
+    args = parser.parse_args()
+
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        sensors = await _load_sensors(conn, args.sensors)
+    if not sensors:
+        print("Нет sensors с zone_id — нечего писать", file=sys.stderr)
+        return 1
+
+    rows = _build_rows(sensors, args.rows)
+    print(f"rows/batch={args.rows} sensors={len(sensors)} repeat={args.repeat}")
+    for engine in ("unnest", "copy"):
+        # Прогрев: prepared statements и temp staging-таблица.
+        await _measure(pool, engine, rows[: min(len(rows), 100)])
+        rates: list[float] = []
+        written = 0
+        for _ in range(args.repeat):
+            elapsed, written = await _measure(pool, engine, rows)
+            rates.append(len(rows) / elapsed if elapsed > 0 else float("inf"))
+        print(
+            f"{engine:>6}: median={statistics.median(rates):,.0f} rows/s "
+            f"min={min(rates):,.0f} max={max(rates):,.0f} written={written}"
+        )
+    await pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
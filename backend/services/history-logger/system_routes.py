@@ -10,7 +10,7 @@ from common.alert_queue import get_alert_queue
 from common.command_status_queue import get_status_queue
 from common.infra_monitor import check_db_health, check_mqtt_health
 from common.mqtt import get_mqtt_client
-from common.redis_queue import TelemetryQueue, get_redis_client, update_redis_health
+from common.redis_queue import create_telemetry_queue, get_redis_client, update_redis_health
 from common.pipeline_metrics import (
     COMMAND_ACK_TO_DONE_LATENCY,
     COMMAND_E2E_LATENCY,
@@ -24,6 +24,7 @@ from common.pipeline_metrics import (
     update_queue_metrics,
 )
 from common.db import get_pool
+from common.env import get_settings
 from metrics import ALERT_DLQ_SIZE, COMMAND_STATUS_DLQ_SIZE, WS_AUTH_TOTAL, WS_BROADCAST_TOTAL
 import state as hl_state
 
@@ -165,8 +166,10 @@ async def health():
 
     if redis_ok:
         try:
-            telemetry_queue = hl_state.telemetry_queue or TelemetryQueue()
-            telemetry_metrics = await telemetry_queue.get_health_metrics()
+            telemetry_queue = hl_state.telemetry_queue or create_telemetry_queue()
+            telemetry_metrics = await telemetry_queue.get_health_metrics(
+                max_age_sec=get_settings().telemetry_queue_health_cache_sec
+            )
             telemetry_healthy = (
                 telemetry_metrics["depth"] < 10000
                 and telemetry_metrics["utilization"] < 0.95
@@ -5,4 +5,5 @@ caches) остаются в ``telemetry_processing.py`` — ломать test pa
 Модули:
     helpers        — pure normalisation / keys / FK helpers (без module-state)
     anomaly_alerts — ``_emit_telemetry_anomaly_alert`` + resolved counterpart
+    sample_writer  — write engines ``telemetry_samples`` (UNNEST / COPY + merge)
 """
@@ -0,0 +1,101 @@
+"""Адаптивный размер батча и дедлайн flush для consumer'а очереди телеметрии.
+
+Статические ``telemetry_batch_size`` / ``telemetry_flush_ms`` подобраны под
+одну нагрузку: при слабом потоке консьюмер зря ждёт дедлайн, при сильном —
+пишет мелкими батчами и не амортизирует UNNEST-вставку. Контроллер после
+каждого батча смотрит на время записи и на то, осталось ли в очереди больше
+батча (или копится lag), и двигает оба параметра в заданных границах:
+
+- запись дольше ``target_write_ms`` → батч уменьшается (мультипликативно);
+- очередь насыщена и запись укладывается в цель → батч растёт, дедлайн
+  растёт (пусть частичные батчи набираются);
+- очередь не насыщена → дедлайн сокращается: ждать нечего, важна задержка.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+GROW_FACTOR = 1.25
+SHRINK_FACTOR = 0.7
+FLUSH_GROW_FACTOR = 1.5
+FLUSH_SHRINK_FACTOR = 0.5
+# Вес нового наблюдения в EWMA времени записи.
+WRITE_EWMA_ALPHA = 0.3
+
+
+@dataclass(frozen=True)
+class AdaptiveBatchBounds:
+    min_batch: int
+    max_batch: int
+    min_flush_ms: float
+    max_flush_ms: float
+    target_write_ms: float
+    # Queue age, после которого очередь считается отстающей даже без полного батча.
+    lag_threshold_sec: float = 5.0
+
+
+class AdaptiveBatchController:
+    """Текущее решение (batch_size, flush_ms) одного шарда и правило его обновления."""
+
+    def __init__(self, bounds: AdaptiveBatchBounds, *, initial_batch: int, initial_flush_ms: float) -> None:
+        min_batch = max(1, int(bounds.min_batch))
+        max_batch = max(min_batch, int(bounds.max_batch))
+        min_flush = max(0.0, float(bounds.min_flush_ms))
+        max_flush = max(min_flush, float(bounds.max_flush_ms))
+        self.bounds = AdaptiveBatchBounds(
+            min_batch=min_batch,
+            max_batch=max_batch,
+            min_flush_ms=min_flush,
+            max_flush_ms=max_flush,
+            target_write_ms=max(1.0, float(bounds.target_write_ms)),
+            lag_threshold_sec=max(0.0, float(bounds.lag_threshold_sec)),
+        )
+        self._batch = float(self._clamp_batch(initial_batch))
+        self._flush_ms = self._clamp_flush(initial_flush_ms)
+        self.write_ms_ewma: Optional[float] = None
+
+    @property
+    def batch_size(self) -> int:
+        return int(self._batch)
+
+    @property
+    def flush_ms(self) -> float:
+        return self._flush_ms
+
+    def observe(
+        self,
+        *,
+        rows: int,
+        write_seconds: float,
+        saturated: bool,
+        queue_age_sec: Optional[float] = None,
+    ) -> None:
+        """Учитывает записанный батч: ``saturated`` — в очереди осталось не меньше батча."""
+        if rows <= 0:
+            return
+        write_ms = max(0.0, float(write_seconds)) * 1000
+        if self.write_ms_ewma is None:
+            self.write_ms_ewma = write_ms
+        else:
+            self.write_ms_ewma += WRITE_EWMA_ALPHA * (write_ms - self.write_ms_ewma)
+
+        lagging = queue_age_sec is not None and queue_age_sec > self.bounds.lag_threshold_sec
+        if self.write_ms_ewma > self.bounds.target_write_ms:
+            self._batch = float(self._clamp_batch(self._batch * SHRINK_FACTOR))
+        elif saturated or lagging:
+            # Рост только если батч был заполнен: иначе размер не был ограничением.
+            if rows >= self.batch_size:
+                self._batch = float(self._clamp_batch(self._batch * GROW_FACTOR + 1))
+
+        if saturated or lagging:
+            self._flush_ms = self._clamp_flush(max(self._flush_ms, 1.0) * FLUSH_GROW_FACTOR)
+        else:
+            self._flush_ms = self._clamp_flush(self._flush_ms * FLUSH_SHRINK_FACTOR)
+
+    def _clamp_batch(self, value: float) -> int:
+        return max(self.bounds.min_batch, min(self.bounds.max_batch, int(value)))
+
+    def _clamp_flush(self, value: float) -> float:
+        return max(self.bounds.min_flush_ms, min(self.bounds.max_flush_ms, float(value)))
@@ -0,0 +1,71 @@
+"""Отметка минутных bucket'ов, которые прямой проход агрегатора мог пропустить.
+
+Опоздавшие семплы (requeue, replay dead-list, исправленный clock skew ноды)
+попадают в минуты, которые telemetry-aggregator уже агрегировал, — прямой проход
+от ``aggregator_state.last_ts`` их не увидит. После записи батча кандидаты
+(минуты раньше текущей) сводятся к уникальным ``(sensor_id, bucket)`` и одним
+``INSERT ... FROM UNNEST`` пишутся в ``telemetry_dirty_buckets``.
+
+С watermark кандидаты намеренно не сравниваются: срез catch-up читает
+``telemetry_samples`` до того, как двигает ``last_ts``, и батч, закоммиченный
+между этими моментами, оказался бы позади нового watermark, но не позади
+старого, — его минуты не пересчитал бы никто. Поэтому отмечается каждая
+минута раньше текущей (лишний пересчёт свежих минут идемпотентен), а запрос
+лишь проверяет, что агрегатор вообще запущен (``last_ts`` 1m задан), чтобы
+таблица не росла без потребителя. Агрегатор пересчитывает отметки и удаляет их.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+MARK_DIRTY_SQL = """
+    INSERT INTO telemetry_dirty_buckets (sensor_id, bucket, zone_id, marked_at)
+    SELECT d.sensor_id, d.bucket, d.zone_id, NOW()
+    FROM UNNEST($1::bigint[], $2::timestamp[], $3::bigint[]) AS d(sensor_id, bucket, zone_id)
+    WHERE EXISTS (
+        SELECT 1 FROM aggregator_state a
+        WHERE a.aggregation_type = '1m' AND a.last_ts IS NOT NULL
+    )
+    ON CONFLICT (sensor_id, bucket)
+    DO UPDATE SET marked_at = EXCLUDED.marked_at, zone_id = EXCLUDED.zone_id
+"""
+
+_MINUTE = timedelta(minutes=1)
+
+
+def floor_minute(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def late_bucket_candidates(
+    samples: Iterable[Tuple[int, datetime, Optional[int]]],
+    *,
+    now: datetime,
+) -> Dict[Tuple[int, datetime], Optional[int]]:
+    """
+    ``(sensor_id, ts, zone_id)`` → ``{(sensor_id, bucket): zone_id}`` для минут
+    раньше текущей. Watermark агрегатора не бывает дальше начала текущей минуты,
+    поэтому семплы текущей минуты прямой проход увидит сам. ``ts`` и ``now`` —
+    naive UTC, как в ``telemetry_samples``.
+    """
+    current_bucket = floor_minute(now)
+    candidates: Dict[Tuple[int, datetime], Optional[int]] = {}
+    for sensor_id, ts, zone_id in samples:
+        bucket = floor_minute(ts)
+        if bucket < current_bucket:
+            candidates[(int(sensor_id), bucket)] = zone_id
+    return candidates
+
+
+async def mark_dirty_buckets(execute, candidates: Dict[Tuple[int, datetime], Optional[int]]) -> None:
+    if not candidates:
+        return
+    keys = list(candidates)
+    await execute(
+        MARK_DIRTY_SQL,
+        [sensor_id for sensor_id, _ in keys],
+        [bucket for _, bucket in keys],
+        [candidates[key] for key in keys],
+    )
@@ -181,16 +181,6 @@ def build_realtime_key(
     return ("legacy", zone_id, node_id or 0, metric_type or "", channel or "")
 
 
-def build_realtime_key_from_update(update: dict) -> tuple:
-    return (
-        "legacy",
-        int(update.get("zone_id") or 0),
-        int(update.get("node_id") or 0),
-        str(update.get("metric_type") or ""),
-        str(update.get("channel") or ""),
-    )
-
-
 def build_anomaly_throttle_key(
     *,
     code: str,
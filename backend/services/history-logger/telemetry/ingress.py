@@ -2,6 +2,8 @@
 
 ``handle_telemetry`` — entry point для MQTT сообщения: валидирует payload,
 нормализует timestamp, пушит в Redis очередь (``state.telemetry_queue``).
+При ``TELEMETRY_INGRESS_LINGER_MS > 0`` push идёт через ``IngressBatcher``
+(один pipelined push на окно накопления).
 """
 
 from __future__ import annotations
@@ -10,8 +12,11 @@ import asyncio
 import logging
 import time
 from datetime import datetime, timezone
+from typing import Optional
 
 import state
+from common.env import get_settings
+from common.logging_setup import get_hot_path_logger
 from common.redis_queue import TelemetryQueueItem
 from common.trace_context import clear_trace_id, set_trace_id_from_payload
 from common.utils.time import utcnow
@@ -19,6 +24,7 @@ from metrics import (
     REDIS_OPERATION_DURATION,
     TELEM_RECEIVED,
     TELEMETRY_DROPPED,
+    TELEMETRY_INGRESS_LATENCY,
 )
 from models import TelemetryPayloadModel
 from utils import (
@@ -31,8 +37,10 @@ from utils import (
 )
 
 from .anomaly_alerts import emit_telemetry_anomaly_alert
+from .ingress_batcher import IngressBatcher
 
 logger = logging.getLogger(__name__)
+hot_path_log = get_hot_path_logger(__name__)
 
 REDIS_PUSH_MAX_RETRIES = 3
 REDIS_PUSH_RETRY_BACKOFF_BASE = 2
@@ -42,6 +50,43 @@ def _telemetry_queue():
     return state.telemetry_queue
 
 
+_ingress_batcher: Optional[IngressBatcher] = None
+
+
+def _get_ingress_batcher() -> Optional[IngressBatcher]:
+    """Batcher при включённом окне накопления; настройки перечитываются на каждый вызов."""
+    global _ingress_batcher
+    s = get_settings()
+    linger_ms = float(getattr(s, "telemetry_ingress_linger_ms", 0) or 0)
+    if linger_ms <= 0:
+        return None
+    batch_size = int(getattr(s, "telemetry_ingress_batch_size", 500) or 500)
+    max_pending = int(getattr(s, "telemetry_ingress_max_pending", 10000) or 10000)
+    batcher = _ingress_batcher
+    if (
+        batcher is None
+        or batcher.linger_sec != linger_ms / 1000
+        or batcher.batch_size != max(1, batch_size)
+    ):
+        # Прежний batcher (если был) дорабатывает свой хвост собственным flusher-task.
+        batcher = IngressBatcher(
+            _telemetry_queue,
+            linger_ms=linger_ms,
+            batch_size=batch_size,
+            max_pending=max_pending,
+            max_retries=REDIS_PUSH_MAX_RETRIES,
+            retry_backoff_base=REDIS_PUSH_RETRY_BACKOFF_BASE,
+        )
+        _ingress_batcher = batcher
+    return batcher
+
+
+async def flush_ingress_batcher() -> None:
+    """Отправляет накопленный ingress-батч (shutdown до drain очереди)."""
+    if _ingress_batcher is not None:
+        await _ingress_batcher.flush()
+
+
 async def push_with_retry(
     queue_item: TelemetryQueueItem, max_retries: int = REDIS_PUSH_MAX_RETRIES
 ) -> bool:
@@ -86,6 +131,7 @@ async def push_with_retry(
 
 async def handle_telemetry(topic: str, payload: bytes) -> None:
     """MQTT telemetry entry point: parse → validate → normalize ts → push в Redis."""
+    received_at = time.monotonic()
     try:
         data = _parse_json(payload)
         if not data:
@@ -170,15 +216,37 @@ async def handle_telemetry(topic: str, payload: bytes) -> None:
             enqueued_at=utcnow(),
         )
 
-        logger.info(
-            f"[TELEMETRY] Received: node={node_uid}, metric={metric_type}, value={validated_data.value}"
+        hot_path_log.info(
+            "telemetry",
+            "[TELEMETRY] Received: node=%s, metric=%s, value=%s",
+            node_uid,
+            metric_type,
+            validated_data.value,
+            payload=data,
         )
 
         if _telemetry_queue():
-            start_time = time.time()
-            success = await push_with_retry(queue_item)
-            redis_duration = time.time() - start_time
-            REDIS_OPERATION_DURATION.observe(redis_duration)
+            batcher = _get_ingress_batcher()
+            if batcher is not None:
+                if batcher.is_saturated():
+                    TELEMETRY_DROPPED.labels(reason="ingress_backpressure").inc()
+                    logger.warning(
+                        "Telemetry ingress backlog is full, dropping message",
+                        extra={
+                            "node_uid": node_uid,
+                            "metric_type": metric_type,
+                            "pending": batcher.pending_count(),
+                        },
+                    )
+                    return
+                success = await batcher.submit(queue_item, received_at)
+            else:
+                start_time = time.time()
+                success = await push_with_retry(queue_item)
+                redis_duration = time.time() - start_time
+                REDIS_OPERATION_DURATION.observe(redis_duration)
+                if success:
+                    TELEMETRY_INGRESS_LATENCY.observe(time.monotonic() - received_at)
 
             if not success:
                 logger.warning(
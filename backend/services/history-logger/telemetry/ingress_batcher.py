@@ -0,0 +1,132 @@
+"""Накопитель MQTT ingress: сообщения, пришедшие в пределах ``linger_ms``,
+уходят в Redis одним pipelined push (``TelemetryQueue.push_many``).
+
+Каждый ``handle_telemetry`` ждёт future своего сообщения, поэтому семантика
+"принято/отброшено" и метрики drop остаются поштучными.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Callable, List, Optional, Tuple
+
+from common.redis_queue import TelemetryQueue, TelemetryQueueItem
+from metrics import (
+    REDIS_OPERATION_DURATION,
+    TELEMETRY_INGRESS_BATCH_SIZE,
+    TELEMETRY_INGRESS_LATENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+_PendingItem = Tuple[TelemetryQueueItem, float, "asyncio.Future[bool]"]
+
+
+class IngressBatcher:
+    """Группирует push'и телеметрии; один flusher-task на процесс."""
+
+    def __init__(
+        self,
+        queue_getter: Callable[[], Optional[TelemetryQueue]],
+        *,
+        linger_ms: float,
+        batch_size: int,
+        max_pending: int,
+        max_retries: int,
+        retry_backoff_base: float,
+    ):
+        self._queue_getter = queue_getter
+        self.linger_sec = max(0.0, float(linger_ms)) / 1000
+        self.batch_size = max(1, int(batch_size))
+        self.max_pending = max(self.batch_size, int(max_pending))
+        self.max_retries = max(1, int(max_retries))
+        self.retry_backoff_base = retry_backoff_base
+        self._pending: List[_PendingItem] = []
+        self._batch_full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def is_saturated(self) -> bool:
+        return len(self._pending) >= self.max_pending
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, item: TelemetryQueueItem, received_at: float) -> bool:
+        """Ставит item в текущий батч и ждёт результата push (``received_at`` — monotonic)."""
+        future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self._pending.append((item, received_at, future))
+        if len(self._pending) >= self.batch_size:
+            self._batch_full.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="telemetry_ingress_batcher")
+        return await future
+
+    async def flush(self) -> None:
+        """Дожидается отправки всего накопленного (используется при shutdown)."""
+        self._batch_full.set()
+        task = self._task
+        if task is not None and not task.done():
+            await task
+
+    async def _run(self) -> None:
+        while self._pending:
+            if len(self._pending) < self.batch_size:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), timeout=self.linger_sec)
+                except asyncio.TimeoutError:
+                    pass
+            batch = self._pending[: self.batch_size]
+            del self._pending[: self.batch_size]
+            try:
+                await self._flush_batch(batch)
+            except Exception as e:
+                logger.error(f"Telemetry ingress batch flush failed: {e}", exc_info=True)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_result(False)
+
+    async def _flush_batch(self, batch: List[_PendingItem]) -> None:
+        items = [item for item, _, _ in batch]
+        results = await self._push_with_retry(items)
+
+        now = time.monotonic()
+        for (_, received_at, future), accepted in zip(batch, results):
+            if accepted:
+                TELEMETRY_INGRESS_LATENCY.observe(now - received_at)
+            if not future.done():
+                future.set_result(bool(accepted))
+
+    async def _push_with_retry(self, items: List[TelemetryQueueItem]) -> List[bool]:
+        TELEMETRY_INGRESS_BATCH_SIZE.observe(len(items))
+        for attempt in range(self.max_retries):
+            queue = self._queue_getter()
+            if queue is None:
+                return [False] * len(items)
+            try:
+                start_time = time.time()
+                results = await queue.push_many(items)
+                REDIS_OPERATION_DURATION.observe(time.time() - start_time)
+                if attempt > 0:
+                    logger.info(
+                        f"Successfully pushed ingress batch to Redis queue after {attempt + 1} attempts"
+                    )
+                return results
+            except Exception as e:
+                if attempt < self.max_retries - 1:
+                    backoff_seconds = self.retry_backoff_base**attempt
+                    logger.warning(
+                        "Failed to push ingress batch to Redis queue "
+                        f"(attempt {attempt + 1}/{self.max_retries}, items={len(items)}), "
+                        f"retrying in {backoff_seconds}s: {e}"
+                    )
+                    await asyncio.sleep(backoff_seconds)
+                else:
+                    logger.error(
+                        f"Failed to push ingress batch to Redis queue after {self.max_retries} attempts "
+                        f"(items={len(items)}): {e}",
+                        exc_info=True,
+                    )
+        return [False] * len(items)
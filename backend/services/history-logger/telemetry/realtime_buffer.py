@@ -0,0 +1,93 @@
+"""Буфер realtime-обновлений для flush в Laravel.
+
+Всё обращение к буферу идёт из одного event loop и без ``await`` внутри
+операций, поэтому ``asyncio.Lock`` не нужен: ``put_many`` / ``drain`` атомарны
+относительно других корутин. Ключ — (sensor | legacy-кортеж), значение —
+последнее обновление; повторный ``put`` того же ключа переносит его в конец
+(coalescing: в Laravel уходит только свежее значение).
+
+Метрики очереди обновляются один раз на вызов, а не на каждое обновление.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+RealtimeEntry = Tuple[Hashable, dict]
+
+
+class RealtimeUpdateBuffer:
+    """Ограниченный упорядоченный буфер последних обновлений по ключу."""
+
+    def __init__(
+        self,
+        *,
+        on_evict: Optional[Callable[[int], None]] = None,
+        on_size: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self._entries: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self._on_evict = on_evict
+        self._on_size = on_size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._entries)
+
+    def values(self):
+        return self._entries.values()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._report(0)
+
+    def put(self, key: Hashable, update: dict, *, max_size: int = 0) -> None:
+        self.put_many(((key, update),), max_size=max_size)
+
+    def put_many(self, entries: Iterable[RealtimeEntry], *, max_size: int = 0) -> None:
+        """Кладёт обновления в конец; при переполнении вытесняет самые старые."""
+        buffer = self._entries
+        for key, update in entries:
+            buffer[key] = update
+            buffer.move_to_end(key)
+        self._report(self._trim(max_size))
+
+    def requeue(self, entries: Iterable[RealtimeEntry], *, max_size: int = 0) -> None:
+        """
+        Возвращает неотправленные обновления в начало буфера. Ключ, для которого
+        уже пришло более свежее значение, не перезаписывается.
+        """
+        buffer = self._entries
+        for key, update in reversed(list(entries)):
+            if key in buffer:
+                continue
+            buffer[key] = update
+            buffer.move_to_end(key, last=False)
+        self._report(self._trim(max_size))
+
+    def drain(self, limit: int) -> List[RealtimeEntry]:
+        """Забирает до ``limit`` самых старых обновлений вместе с ключами."""
+        buffer = self._entries
+        count = min(max(0, int(limit)), len(buffer))
+        drained = [buffer.popitem(last=False) for _ in range(count)]
+        if drained:
+            self._report(0)
+        return drained
+
+    def _trim(self, max_size: int) -> int:
+        buffer = self._entries
+        overflow = len(buffer) - max_size if max_size > 0 else 0
+        for _ in range(max(0, overflow)):
+            buffer.popitem(last=False)
+        return max(0, overflow)
+
+    def _report(self, evicted: int) -> None:
+        if evicted and self._on_evict is not None:
+            self._on_evict(evicted)
+        if self._on_size is not None:
+            self._on_size(len(self._entries))
@@ -0,0 +1,148 @@
+"""Delta-фильтр и компактный payload realtime-канала в Laravel.
+
+``RealtimeDeltaFilter`` подавляет обновления, значение которых по
+(zone, node, channel, metric) не ушло дальше порога значимости метрики от
+последнего отправленного (pH 6.00 → 6.00 не шлётся). Раз в ``max_silence_sec``
+обновление уходит даже без изменений, чтобы UI, подключившийся позже, получил
+значение. Состояние фиксируется только после успешной отправки (``commit``),
+поэтому неудачный flush не «съедает» изменение.
+
+``encode_realtime_payload`` собирает тело запроса: построчный legacy-формат
+``{"updates": [...]}`` или колоночный ``{"format": "columnar", "columns": {...}}``,
+опционально сжатый gzip (``Content-Encoding: gzip``).
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional, Tuple
+
+PAYLOAD_FORMAT_ROWS = "rows"
+PAYLOAD_FORMAT_COLUMNAR = "columnar"
+
+COLUMNAR_FIELDS = ("zone_id", "node_id", "channel", "metric_type", "value", "timestamp")
+
+# Последние отправленные значения держим не более чем для стольких ключей (LRU).
+DEFAULT_MAX_TRACKED_KEYS = 20000
+
+DeltaKey = Tuple[int, int, str, str]
+
+
+def parse_delta_thresholds(spec: Optional[str]) -> Dict[str, float]:
+    """Разбирает ``"PH:0.01,EC:0.02"`` в ``{"PH": 0.01, "EC": 0.02}``; мусор пропускается."""
+    thresholds: Dict[str, float] = {}
+    for part in (spec or "").split(","):
+        metric, sep, raw = part.partition(":")
+        metric = metric.strip().upper()
+        if not sep or not metric:
+            continue
+        try:
+            thresholds[metric] = max(0.0, float(raw))
+        except ValueError:
+            continue
+    return thresholds
+
+
+def delta_key(update: Mapping) -> DeltaKey:
+    return (
+        int(update.get("zone_id") or 0),
+        int(update.get("node_id") or 0),
+        str(update.get("channel") or ""),
+        str(update.get("metric_type") or "").upper(),
+    )
+
+
+class RealtimeDeltaFilter:
+    """Последние отправленные значения по сенсору и пороги значимости по метрике."""
+
+    def __init__(
+        self,
+        thresholds: Optional[Mapping[str, float]] = None,
+        *,
+        default_threshold: float = 0.0,
+        max_silence_sec: float = 30.0,
+        max_tracked_keys: int = DEFAULT_MAX_TRACKED_KEYS,
+    ) -> None:
+        self.thresholds = {str(k).upper(): float(v) for k, v in (thresholds or {}).items()}
+        self.default_threshold = max(0.0, float(default_threshold))
+        self.max_silence_sec = max(0.0, float(max_silence_sec))
+        self.max_tracked_keys = max(1, int(max_tracked_keys))
+        # key -> (value, sent_at); порядок = LRU (последний — свежий).
+        self._last_sent: "OrderedDict[DeltaKey, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._last_sent)
+
+    def threshold_for(self, metric_type: str) -> float:
+        return self.thresholds.get(str(metric_type or "").upper(), self.default_threshold)
+
+    def split(self, updates: List[dict], *, now: float) -> Tuple[List[dict], List[dict]]:
+        """Делит обновления на (к отправке, подавленные). Состояние не меняет."""
+        to_send: List[dict] = []
+        suppressed: List[dict] = []
+        for update in updates:
+            last = self._last_sent.get(delta_key(update))
+            if last is None:
+                to_send.append(update)
+                continue
+            last_value, sent_at = last
+            if self.max_silence_sec > 0 and now - sent_at >= self.max_silence_sec:
+                to_send.append(update)
+                continue
+            try:
+                delta = abs(float(update.get("value")) - last_value)
+            except (TypeError, ValueError):
+                to_send.append(update)
+                continue
+            if delta <= self.threshold_for(update.get("metric_type")):
+                suppressed.append(update)
+            else:
+                to_send.append(update)
+        return to_send, suppressed
+
+    def commit(self, updates: List[dict], *, now: float) -> None:
+        """Запоминает успешно отправленные значения."""
+        for update in updates:
+            try:
+                value = float(update.get("value"))
+            except (TypeError, ValueError):
+                continue
+            key = delta_key(update)
+            self._last_sent[key] = (value, now)
+            self._last_sent.move_to_end(key)
+        while len(self._last_sent) > self.max_tracked_keys:
+            self._last_sent.popitem(last=False)
+
+    def clear(self) -> None:
+        self._last_sent.clear()
+
+
+def to_columnar(updates: List[dict]) -> dict:
+    return {
+        "format": PAYLOAD_FORMAT_COLUMNAR,
+        "columns": {field: [update.get(field) for update in updates] for field in COLUMNAR_FIELDS},
+    }
+
+
+def encode_realtime_payload(
+    updates: List[dict],
+    *,
+    payload_format: str = PAYLOAD_FORMAT_ROWS,
+    gzip_min_bytes: int = 0,
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Возвращает (тело, заголовки). gzip включается при ``gzip_min_bytes > 0`` и
+    JSON не меньше этого размера: мелкие пакеты сжатие только удлиняет.
+    """
+    if payload_format == PAYLOAD_FORMAT_COLUMNAR:
+        document = to_columnar(updates)
+    else:
+        document = {"updates": updates}
+    body = json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if gzip_min_bytes > 0 and len(body) >= gzip_min_bytes:
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
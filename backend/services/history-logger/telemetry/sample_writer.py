@@ -0,0 +1,204 @@
+"""Write engines для ``telemetry_samples``.
+
+``unnest`` — исторический путь: один ``INSERT ... SELECT FROM UNNEST(...)
+JOIN sensors ... RETURNING``; при ошибке ``telemetry_processing`` уходит в
+per-item fallback.
+
+``copy`` — батч стримится через ``copy_records_to_table`` во временную
+staging-таблицу сессии и мержится в ``telemetry_samples`` одним set-based
+INSERT. Каждой строке присваивается ``seq``; merge возвращает ``seq`` принятых
+строк, поэтому отфильтрованные JOIN'ом строки известны без сверки
+``(sensor_id, ts)``.
+Если merge падает на данных, чанк делится пополам: плохая строка изолируется
+за O(log n) round trips вместо одного INSERT на каждую строку батча.
+
+Staging-таблица — ``TEMP ... ON COMMIT DELETE ROWS``: живёт в рамках
+соединения пула, не является частью схемы и не требует миграции.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+from common.db import get_pool
+
+WRITE_ENGINE_UNNEST = "unnest"
+WRITE_ENGINE_COPY = "copy"
+WRITE_ENGINES = frozenset({WRITE_ENGINE_UNNEST, WRITE_ENGINE_COPY})
+
+UNNEST_INSERT_SQL = """
+    WITH incoming (sensor_id, ts, zone_id, value, quality, metadata) AS (
+        SELECT *
+        FROM UNNEST(
+            $1::bigint[],
+            $2::timestamp[],
+            $3::bigint[],
+            $4::double precision[],
+            $5::text[],
+            $6::jsonb[]
+        ) AS t(sensor_id, ts, zone_id, value, quality, metadata)
+    )
+    INSERT INTO telemetry_samples (
+        sensor_id, ts, zone_id, value, quality, metadata
+    )
+    SELECT
+        incoming.sensor_id,
+        incoming.ts,
+        incoming.zone_id,
+        incoming.value,
+        incoming.quality,
+        incoming.metadata
+    FROM incoming
+    JOIN sensors s
+      ON s.id = incoming.sensor_id
+     AND s.zone_id = incoming.zone_id
+    RETURNING sensor_id, ts
+"""
+
+STAGE_TABLE = "telemetry_samples_stage"
+STAGE_COLUMNS = ("seq", "sensor_id", "ts", "zone_id", "value", "quality", "metadata")
+
+# metadata передаётся текстом и кастуется в jsonb на merge: binary COPY не
+# использует JSON-кодеки, которые ``common.db`` регистрирует на соединении.
+# DELETE страхует чанки внутри внешней транзакции (savepoint не чистит
+# ON COMMIT DELETE ROWS); на пустой таблице он бесплатен и идёт тем же round trip.
+_STAGE_PREPARE_SQL = f"""
+    CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} (
+        seq integer NOT NULL,
+        sensor_id bigint NOT NULL,
+        ts timestamp NOT NULL,
+        zone_id bigint,
+        value double precision,
+        quality text NOT NULL,
+        metadata text
+    ) ON COMMIT DELETE ROWS;
+    DELETE FROM {STAGE_TABLE}
+"""
+
+_STAGE_MERGE_SQL = f"""
+    WITH accepted AS (
+        SELECT stage.*
+        FROM {STAGE_TABLE} stage
+        JOIN sensors s
+          ON s.id = stage.sensor_id
+         AND s.zone_id = stage.zone_id
+    ),
+    merged AS (
+        INSERT INTO telemetry_samples (
+            sensor_id, ts, zone_id, value, quality, metadata
+        )
+        SELECT sensor_id, ts, zone_id, value, quality, metadata::jsonb
+        FROM accepted
+        ORDER BY seq
+    )
+    SELECT seq FROM accepted
+"""
+
+
+@dataclass(frozen=True)
+class SampleRow:
+    """Одна строка для записи в ``telemetry_samples``."""
+
+    sensor_id: int
+    ts: datetime
+    zone_id: Optional[int]
+    value: Optional[float]
+    quality: str
+    metadata: Optional[dict]
+
+
+@dataclass
+class CopyWriteResult:
+    """Итог COPY-записи: индексы записанных и отклонённых строк."""
+
+    written: List[int] = field(default_factory=list)
+    filtered: List[int] = field(default_factory=list)
+    rejected: List[tuple[int, Exception]] = field(default_factory=list)
+    round_trips: int = 0
+
+
+def _stage_records(rows: Sequence[SampleRow], indexes: Sequence[int]) -> list[tuple]:
+    records: list[tuple] = []
+    for idx in indexes:
+        row = rows[idx]
+        records.append(
+            (
+                idx,
+                int(row.sensor_id),
+                row.ts,
+                int(row.zone_id) if row.zone_id is not None else None,
+                row.value,
+                row.quality,
+                json.dumps(row.metadata) if row.metadata else None,
+            )
+        )
+    return records
+
+
+async def copy_merge_chunk(conn: Any, rows: Sequence[SampleRow], indexes: Sequence[int]) -> set[int]:
+    """COPY чанка в staging + merge одной транзакцией; вернуть записанные seq."""
+    async with conn.transaction():
+        await conn.execute(_STAGE_PREPARE_SQL)
+        await conn.copy_records_to_table(
+            STAGE_TABLE,
+            records=_stage_records(rows, indexes),
+            columns=STAGE_COLUMNS,
+        )
+        returned = await conn.fetch(_STAGE_MERGE_SQL)
+    return {int(record["seq"]) for record in returned}
+
+
+async def write_samples_copy(
+    rows: Sequence[SampleRow],
+    *,
+    conn: Any = None,
+    is_transport_error: Callable[[Exception], bool] = lambda exc: False,
+    merge_chunk: Callable[[Any, Sequence[SampleRow], Sequence[int]], Awaitable[set[int]]] = copy_merge_chunk,
+) -> CopyWriteResult:
+    """Записать строки COPY-движком с бисекцией отказавших чанков.
+
+    Транспортные ошибки (``is_transport_error``) пробрасываются как есть —
+    вызывающий код requeue'ит батч целиком. Остальные ошибки чанка приводят
+    к делению пополам; чанк из одной строки попадает в ``rejected``.
+    """
+    result = CopyWriteResult()
+    if not rows:
+        return result
+
+    async def _run(connection: Any) -> None:
+        pending: list[list[int]] = [list(range(len(rows)))]
+        while pending:
+            indexes = pending.pop()
+            result.round_trips += 1
+            try:
+                written = await merge_chunk(connection, rows, indexes)
+            except Exception as exc:
+                if is_transport_error(exc):
+                    raise
+                if len(indexes) == 1:
+                    result.rejected.append((indexes[0], exc))
+                    continue
+                middle = len(indexes) // 2
+                pending.append(indexes[middle:])
+                pending.append(indexes[:middle])
+                continue
+            for idx in indexes:
+                if idx in written:
+                    result.written.append(idx)
+                else:
+                    result.filtered.append(idx)
+
+    if conn is not None:
+        await _run(conn)
+    else:
+        pool = await get_pool()
+        async with pool.acquire() as acquired:
+            await _run(acquired)
+
+    result.written.sort()
+    result.filtered.sort()
+    result.rejected.sort(key=lambda pair: pair[0])
+    return result
@@ -0,0 +1,76 @@
+"""NOTIFY ``telemetry_samples_committed``: записанные семплы для окон решений AE3.
+
+AE3 держит в памяти кольцевые буферы последних семплов по сенсору и читает
+окна коррекции из них, а не ``ORDER BY ts DESC LIMIT`` по ``telemetry_samples``.
+После записи батча (семплы и ``telemetry_last`` уже закоммичены) consumer
+отправляет записанное одним ``SELECT pg_notify(...) FROM UNNEST(...)``.
+
+Payload — компактный JSON ``{"s": [[sensor_id, ts_us, value, stub], ...]}``:
+``ts_us`` — микросекунды от эпохи (naive UTC, как пишется в БД), ``stub`` — 0/1.
+Лимит payload NOTIFY — 8000 байт, поэтому батч режется на чанки по размеру.
+Уведомление — только подсказка: потерянный чанк AE3 обнаружит по
+``telemetry_last`` и перечитает окно из SQL.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+SAMPLES_NOTIFY_CHANNEL = "telemetry_samples_committed"
+
+NOTIFY_SAMPLES_SQL = "SELECT pg_notify($1, p.payload) FROM UNNEST($2::text[]) AS p(payload)"
+
+# Запас до лимита PostgreSQL (8000 байт) на обрамление JSON.
+MAX_PAYLOAD_BYTES = 7800
+
+_EPOCH = datetime(1970, 1, 1)
+
+NotifySample = Tuple[int, datetime, Optional[float], bool]
+
+
+def _ts_us(ts: datetime) -> int:
+    delta = ts - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def encode_samples_notify_payloads(
+    samples: Iterable[NotifySample],
+    *,
+    max_bytes: int = MAX_PAYLOAD_BYTES,
+) -> List[str]:
+    """
+    ``(sensor_id, ts, value, stub)`` → payload'ы не длиннее ``max_bytes``.
+    ``ts`` — naive UTC. Семплы без конечного значения пропускаются: окно AE3
+    их всё равно не использует, а NaN не сериализуется в JSON.
+    """
+    payloads: List[str] = []
+    chunk: List[str] = []
+    size = 0
+    for sensor_id, ts, value, stub in samples:
+        if value is None:
+            continue
+        try:
+            numeric = float(value)
+        except (TypeError, ValueError):
+            continue
+        if not math.isfinite(numeric):
+            continue
+        row = json.dumps([int(sensor_id), _ts_us(ts), numeric, 1 if stub else 0], separators=(",", ":"))
+        if chunk and size + len(row) + 1 > max_bytes:
+            payloads.append('{"s":[' + ",".join(chunk) + "]}")
+            chunk = []
+            size = 0
+        chunk.append(row)
+        size += len(row) + 1
+    if chunk:
+        payloads.append('{"s":[' + ",".join(chunk) + "]}")
+    return payloads
+
+
+async def notify_written_samples(execute, payloads: List[str]) -> None:
+    if not payloads:
+        return
+    await execute(NOTIFY_SAMPLES_SQL, SAMPLES_NOTIFY_CHANNEL, payloads)
@@ -8,17 +8,25 @@ CLI для управления dead-list телеметрии (hydro:telemetry:
     python telemetry_dead_cli.py purge <index>
     python telemetry_dead_cli.py purge-all
     python telemetry_dead_cli.py metrics
+    python telemetry_dead_cli.py summary [--reason R] [--zone Z] [--node N] [--older-than SEC] [--newer-than SEC]
+    python telemetry_dead_cli.py replay-bulk [фильтры] [--rate 500] [--chunk 500] [--dry-run]
+    python telemetry_dead_cli.py purge-bulk [фильтры] [--chunk 500] [--dry-run]
+
+Фильтры повторяемы (--reason a --reason b) и объединяются по И между видами.
+replay-bulk/purge-bulk проходят dead list чанками от головы (один Lua-скрипт
+на чанк), без поиндексного LINDEX/LREM; --dry-run печатает сводку по
+подходящим записям, ничего не меняя.
 """
 import argparse
 import asyncio
 import json
 import sys
 
-from common.redis_queue import TelemetryQueue
+from common.redis_queue import DeadListFilter, create_telemetry_queue
 
 
 async def list_dead(limit: int = 100, offset: int = 0) -> None:
-    queue = TelemetryQueue()
+    queue = create_telemetry_queue()
     metrics = await queue.get_dead_metrics()
     items = await queue.list_dead(limit=limit, offset=offset)
 
@@ -45,7 +53,7 @@ async def list_dead(limit: int = 100, offset: int = 0) -> None:
 
 
 async def replay_dead(index: int) -> None:
-    queue = TelemetryQueue()
+    queue = create_telemetry_queue()
     success = await queue.replay_dead(index)
     if success:
         print(f"✓ Telemetry dead list item {index} replayed to queue")
@@ -55,7 +63,7 @@ async def replay_dead(index: int) -> None:
 
 
 async def purge_dead(index: int) -> None:
-    queue = TelemetryQueue()
+    queue = create_telemetry_queue()
     success = await queue.purge_dead(index)
     if success:
         print(f"✓ Telemetry dead list item {index} purged")
@@ -65,18 +73,67 @@ async def purge_dead(index: int) -> None:
 
 
 async def purge_all_dead() -> None:
-    queue = TelemetryQueue()
+    queue = create_telemetry_queue()
     count = await queue.purge_dead_all()
     print(f"✓ Purged {count} telemetry dead list items")
 
 
 async def show_metrics() -> None:
-    queue = TelemetryQueue()
+    queue = create_telemetry_queue()
     metrics = await queue.get_dead_metrics()
     print("\n=== Telemetry Dead List Metrics ===")
     print(json.dumps(metrics, indent=2, sort_keys=True))
 
 
+def _filter_from_args(args: argparse.Namespace) -> DeadListFilter:
+    return DeadListFilter.build(
+        reasons=args.reason,
+        zone_uids=args.zone,
+        node_uids=args.node,
+        min_age_seconds=args.older_than,
+        max_age_seconds=args.newer_than,
+    )
+
+
+async def show_summary(dead_filter: DeadListFilter) -> None:
+    queue = create_telemetry_queue()
+    summary = await queue.summarize_dead(dead_filter)
+    print("\n=== Telemetry Dead List Summary ===")
+    print(json.dumps(summary, indent=2, sort_keys=True))
+
+
+async def replay_bulk(dead_filter: DeadListFilter, *, chunk: int, rate: float, dry_run: bool) -> None:
+    queue = create_telemetry_queue()
+    if dry_run:
+        summary = await queue.summarize_dead(dead_filter)
+        print(f"Dry run: {summary['matched']} of {summary['scanned']} items would be replayed")
+        print(json.dumps(summary, indent=2, sort_keys=True))
+        return
+    stats = await queue.replay_dead_bulk(dead_filter, chunk_size=chunk, rows_per_second=rate)
+    print(f"✓ Replayed {stats['replayed']} telemetry dead list items ({stats['kept']} kept)")
+    print(json.dumps(stats, indent=2, sort_keys=True))
+
+
+async def purge_bulk(dead_filter: DeadListFilter, *, chunk: int, dry_run: bool) -> None:
+    queue = create_telemetry_queue()
+    if dry_run:
+        summary = await queue.summarize_dead(dead_filter)
+        print(f"Dry run: {summary['matched']} of {summary['scanned']} items would be purged")
+        print(json.dumps(summary, indent=2, sort_keys=True))
+        return
+    stats = await queue.purge_dead_bulk(dead_filter, chunk_size=chunk)
+    print(f"✓ Purged {stats['purged']} telemetry dead list items ({stats['kept']} kept)")
+    print(json.dumps(stats, indent=2, sort_keys=True))
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--reason", action="append", help="Dead reason (repeatable)")
+    parser.add_argument("--zone", action="append", help="zone_uid (repeatable)")
+    parser.add_argument("--node", action="append", help="node_uid (repeatable)")
+    parser.add_argument("--older-than", type=float, default=None, help="Min age in seconds")
+    parser.add_argument("--newer-than", type=float, default=None, help="Max age in seconds")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Telemetry dead-list CLI for history-logger")
     subparsers = parser.add_subparsers(dest="action", help="Action")
@@ -94,6 +151,20 @@ def main() -> None:
     subparsers.add_parser("purge-all", help="Purge all dead-list items")
     subparsers.add_parser("metrics", help="Show dead-list metrics")
 
+    summary_parser = subparsers.add_parser("summary", help="Grouped counts by reason/zone/node/age")
+    _add_filter_arguments(summary_parser)
+
+    replay_bulk_parser = subparsers.add_parser("replay-bulk", help="Replay matching items to queue")
+    _add_filter_arguments(replay_bulk_parser)
+    replay_bulk_parser.add_argument("--chunk", type=int, default=500, help="Items per chunk (default: 500)")
+    replay_bulk_parser.add_argument("--rate", type=float, default=500.0, help="Max replayed items/sec, 0 = unlimited (default: 500)")
+    replay_bulk_parser.add_argument("--dry-run", action="store_true", help="Only report what would be replayed")
+
+    purge_bulk_parser = subparsers.add_parser("purge-bulk", help="Purge matching items")
+    _add_filter_arguments(purge_bulk_parser)
+    purge_bulk_parser.add_argument("--chunk", type=int, default=500, help="Items per chunk (default: 500)")
+    purge_bulk_parser.add_argument("--dry-run", action="store_true", help="Only report what would be purged")
+
     args = parser.parse_args()
     if args.action == "list":
         asyncio.run(list_dead(limit=args.limit, offset=args.offset))
@@ -105,6 +176,12 @@ def main() -> None:
         asyncio.run(purge_all_dead())
     elif args.action == "metrics":
         asyncio.run(show_metrics())
+    elif args.action == "summary":
+        asyncio.run(show_summary(_filter_from_args(args)))
+    elif args.action == "replay-bulk":
+        asyncio.run(replay_bulk(_filter_from_args(args), chunk=args.chunk, rate=args.rate, dry_run=args.dry_run))
+    elif args.action == "purge-bulk":
+        asyncio.run(purge_bulk(_filter_from_args(args), chunk=args.chunk, dry_run=args.dry_run))
     else:
         parser.print_help()
         sys.exit(1)
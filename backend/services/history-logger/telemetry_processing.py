@@ -1,8 +1,9 @@
 import asyncio
+import json
 import logging
 import os
 import time
-from collections import OrderedDict
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Set
@@ -11,23 +12,30 @@ import asyncpg
 import httpx
 
 import state
-from common.db import create_zone_event, execute, fetch
+from common.async_cache import AsyncTTLCache
+from common.db import create_zone_event, execute, fetch, listen_notifications
 from common.env import get_settings
 from common.infra_alerts import send_infra_alert, send_infra_resolved_alert
 from common.simulation_events import record_simulation_event_throttled
-from common.redis_queue import PopBatchResult, QueueEntry, TelemetryQueueItem
-from common.utils.time import utcnow
+from common.redis_queue import PopBatchResult, QueueEntry, QueueHealthSnapshot, TelemetryQueueItem
+from common.utils.time import utcnow, utcnow_naive
 from common.trace_context import clear_trace_id, set_trace_id_from_payload
 from metrics import (
     DATABASE_ERRORS,
     LARAVEL_API_DURATION,
     REALTIME_DROPPED_UPDATES,
+    REALTIME_FLUSH_BYTES,
     REALTIME_FLUSH_LATENCY_MS,
     REALTIME_QUEUE_LEN,
+    REALTIME_SUPPRESSED_UPDATES,
     REDIS_OPERATION_DURATION,
     TELEM_BATCH_SIZE,
     TELEM_PROCESSED,
     TELEM_RECEIVED,
+    TELEMETRY_ADAPTIVE_BATCH_SIZE,
+    TELEMETRY_ADAPTIVE_FLUSH_MS,
+    TELEMETRY_BATCH_WRITE_MS,
+    TELEMETRY_CACHE_REFRESH_DURATION,
     TELEMETRY_DROPPED,
     TELEMETRY_DEAD_LIST_SIZE,
     TELEMETRY_PG_WRITE_FAILED,
@@ -38,6 +46,10 @@ from metrics import (
     TELEMETRY_QUEUE_AGE,
     TELEMETRY_REQUEUE_DUPLICATE_RISK,
     TELEMETRY_SAMPLES_JOIN_MISMATCH,
+    TELEMETRY_SAMPLES_WRITE_DURATION,
+    TELEMETRY_SHARD_PROCESSING_SIZE,
+    TELEMETRY_SHARD_QUEUE_AGE,
+    TELEMETRY_SHARD_QUEUE_SIZE,
 )
 from models import TelemetryPayloadModel, TelemetrySampleModel
 from telemetry.anomaly_alerts import (
@@ -51,10 +63,17 @@ from telemetry.ingress import (
     handle_telemetry as _handle_telemetry_impl,
     push_with_retry as _push_with_retry,
 )
+from telemetry.batch_controller import AdaptiveBatchBounds, AdaptiveBatchController
+from telemetry.realtime_buffer import RealtimeEntry, RealtimeUpdateBuffer
+from telemetry.realtime_payload import (
+    PAYLOAD_FORMAT_ROWS,
+    RealtimeDeltaFilter,
+    encode_realtime_payload,
+    parse_delta_thresholds,
+)
 from telemetry.helpers import (
     build_anomaly_throttle_key as _build_anomaly_throttle_key,
     build_realtime_key as _build_realtime_key,
-    build_realtime_key_from_update as _build_realtime_key_from_update,
     build_sensor_label as _build_sensor_label,
     effective_anomaly_throttle_sec as _effective_anomaly_throttle_sec,
     filter_existing_sensor_ids as _filter_existing_sensor_ids,
@@ -68,6 +87,16 @@ from telemetry.helpers import (
     to_timestamp_ms as _to_timestamp_ms,
 )
 from telemetry import helpers as telemetry_helpers_module
+from telemetry.dirty_buckets import late_bucket_candidates, mark_dirty_buckets
+from telemetry.samples_notify import encode_samples_notify_payloads, notify_written_samples
+from telemetry.sample_writer import (
+    UNNEST_INSERT_SQL,
+    WRITE_ENGINE_COPY,
+    WRITE_ENGINE_UNNEST,
+    WRITE_ENGINES,
+    SampleRow,
+    write_samples_copy,
+)
 from utils import (
     MAX_PAYLOAD_SIZE,
     _calculate_broadcast_backoff,
@@ -177,17 +206,38 @@ async def handle_telemetry(topic: str, payload: bytes) -> None:
 SIMULATION_TELEMETRY_EVENTS_ENABLED = os.getenv("SIMULATION_TELEMETRY_EVENTS", "0") in ("1", "true", "True", "yes", "Yes")
 SIMULATION_TELEMETRY_EVENT_INTERVAL_SEC = float(os.getenv("SIMULATION_TELEMETRY_EVENT_INTERVAL_SEC", "10"))
 
-# Глобальный кеш для резолва zone_id и node_id (с TTL refresh)
-_zone_cache: dict[tuple[str, Optional[str]], int] = {}
-_node_cache: dict[
-    tuple[str, Optional[str]],
-    tuple[int, Optional[int], Optional[int]] | tuple[int, Optional[int]],
-] = {}
-_zone_greenhouse_cache: dict[int, int] = {}
-_sensor_cache: "OrderedDict[tuple[int, Optional[int], str, str], int]" = OrderedDict()
+# Кеши резолва zone_id / node_id / sensor_id. Полный reload — refresh_caches() раз в
+# _cache_ttl; между reload записи живут TELEMETRY_CACHE_ENTRY_TTL_SEC, неизвестные
+# uid кешируются как negative, смена привязки узлов/зон инвалидирует записи по NOTIFY.
+_cache_entry_ttl_sec = float(os.getenv("TELEMETRY_CACHE_ENTRY_TTL_SEC", "300"))
+_cache_negative_ttl_sec = float(os.getenv("TELEMETRY_CACHE_NEGATIVE_TTL_SEC", "30"))
+_cache_max_entries = int(os.getenv("TELEMETRY_CACHE_MAX_ENTRIES", "50000"))
+_zone_cache: "AsyncTTLCache[tuple[str, Optional[str]], int]" = AsyncTTLCache(
+    "telemetry_zone",
+    ttl_sec=_cache_entry_ttl_sec,
+    max_size=_cache_max_entries,
+    negative_ttl_sec=_cache_negative_ttl_sec,
+)
+_node_cache: "AsyncTTLCache[tuple[str, Optional[str]], tuple[int, Optional[int], Optional[int]] | tuple[int, Optional[int]]]" = AsyncTTLCache(
+    "telemetry_node",
+    ttl_sec=_cache_entry_ttl_sec,
+    max_size=_cache_max_entries,
+    negative_ttl_sec=_cache_negative_ttl_sec,
+)
+_zone_greenhouse_cache: "AsyncTTLCache[int, int]" = AsyncTTLCache(
+    "telemetry_zone_greenhouse",
+    ttl_sec=_cache_entry_ttl_sec,
+    max_size=_cache_max_entries,
+)
 _sensor_cache_max_size = int(os.getenv("SENSOR_CACHE_MAX_SIZE", "5000"))
+_sensor_cache: "AsyncTTLCache[tuple[int, Optional[int], str, str], int]" = AsyncTTLCache(
+    "telemetry_sensor",
+    max_size=_sensor_cache_max_size,
+)
 _cache_last_update = 0.0
 _cache_ttl = 60.0
+_cache_refresh_task: Optional[asyncio.Task] = None
+CACHE_INVALIDATE_CHANNEL = "telemetry_cache_invalidate"
 
 _node_unassigned_last_seen: dict[tuple[int, str], float] = {}
 _node_unassigned_recovery_grace_sec = float(
@@ -203,42 +253,28 @@ _broadcast_error_count = 0
 _broadcast_last_error_time: Optional[float] = None
 _broadcast_backoff_until: Optional[float] = None
 
-_realtime_updates: "OrderedDict[tuple, dict]" = OrderedDict()
-_realtime_lock = asyncio.Lock()
+def _count_realtime_evictions(count: int) -> None:
+    REALTIME_DROPPED_UPDATES.labels(reason="queue_full").inc(count)
 
 
-def _sensor_cache_touch(key: tuple[int, Optional[int], str, str]) -> None:
-    if hasattr(_sensor_cache, "move_to_end"):
-        _sensor_cache.move_to_end(key)
+def _set_realtime_queue_len(length: int) -> None:
+    REALTIME_QUEUE_LEN.set(length)
 
 
-def _sensor_cache_pop_oldest() -> None:
-    try:
-        _sensor_cache.popitem(last=False)
-        return
-    except TypeError:
-        pass
-    try:
-        oldest_key = next(iter(_sensor_cache))
-    except StopIteration:
-        return
-    del _sensor_cache[oldest_key]
+_realtime_updates = RealtimeUpdateBuffer(
+    on_evict=_count_realtime_evictions,
+    on_size=_set_realtime_queue_len,
+)
+# Создаётся лениво из настроек при первом flush (см. _get_realtime_delta_filter).
+_realtime_delta_filter: Optional[RealtimeDeltaFilter] = None
 
 
 def _sensor_cache_get(key: tuple[int, Optional[int], str, str]) -> Optional[int]:
-    sensor_id = _sensor_cache.get(key)
-    if sensor_id is not None:
-        _sensor_cache_touch(key)
-    return sensor_id
+    return _sensor_cache.get(key)
 
 
 def _sensor_cache_set(key: tuple[int, Optional[int], str, str], sensor_id: int) -> None:
     _sensor_cache[key] = sensor_id
-    _sensor_cache_touch(key)
-    if _sensor_cache_max_size <= 0:
-        return
-    while len(_sensor_cache) > _sensor_cache_max_size:
-        _sensor_cache_pop_oldest()
 
 
 def _get_telemetry_queue():
@@ -273,53 +309,56 @@ def _log_warning_throttled(
         logger.debug(message, extra=extra)
 
 
-async def _enqueue_realtime_update(key: tuple, update: dict) -> None:
-    s = get_settings()
-    async with _realtime_lock:
-        _realtime_updates[key] = update
-        _realtime_updates.move_to_end(key)
+def _enqueue_realtime_update(key: tuple, update: dict) -> None:
+    _enqueue_realtime_updates([(key, update)])
 
-        max_size = getattr(s, "realtime_queue_max_size", 0)
-        if max_size > 0 and len(_realtime_updates) > max_size:
-            _realtime_updates.popitem(last=False)
-            REALTIME_DROPPED_UPDATES.labels(reason="queue_full").inc()
 
-        REALTIME_QUEUE_LEN.set(len(_realtime_updates))
+def _enqueue_realtime_updates(entries: list[RealtimeEntry]) -> None:
+    if not entries:
+        return
+    s = get_settings()
+    _realtime_updates.put_many(entries, max_size=getattr(s, "realtime_queue_max_size", 0))
 
 
-async def _pop_realtime_updates(limit: int) -> list[dict]:
-    async with _realtime_lock:
-        if not _realtime_updates:
-            return []
+def _pop_realtime_updates(limit: int) -> list[RealtimeEntry]:
+    return _realtime_updates.drain(limit)
 
-        count = min(limit, len(_realtime_updates))
-        updates = []
-        for _ in range(count):
-            _, update = _realtime_updates.popitem(last=False)
-            updates.append(update)
 
-        REALTIME_QUEUE_LEN.set(len(_realtime_updates))
-        return updates
+def _requeue_realtime_updates(entries: list[RealtimeEntry]) -> None:
+    s = get_settings()
+    _realtime_updates.requeue(entries, max_size=getattr(s, "realtime_queue_max_size", 0))
 
 
-async def _requeue_realtime_updates(updates: list[dict]) -> None:
-    s = get_settings()
-    async with _realtime_lock:
-        for update in updates:
-            key = _build_realtime_key_from_update(update)
-            _realtime_updates[key] = update
-            _realtime_updates.move_to_end(key)
+def _broadcast_in_backoff(current_time: float) -> bool:
+    return _broadcast_backoff_until is not None and current_time < _broadcast_backoff_until
 
-            max_size = getattr(s, "realtime_queue_max_size", 0)
-            if max_size > 0 and len(_realtime_updates) > max_size:
-                _realtime_updates.popitem(last=False)
-                REALTIME_DROPPED_UPDATES.labels(reason="queue_full").inc()
 
-        REALTIME_QUEUE_LEN.set(len(_realtime_updates))
+def _get_realtime_delta_filter() -> Optional[RealtimeDeltaFilter]:
+    global _realtime_delta_filter
+    s = get_settings()
+    if not getattr(s, "realtime_delta_enabled", False):
+        return None
+    if _realtime_delta_filter is None:
+        spec = getattr(s, "realtime_delta_thresholds", "")
+        _realtime_delta_filter = RealtimeDeltaFilter(
+            parse_delta_thresholds(spec if isinstance(spec, str) else ""),
+            default_threshold=float(getattr(s, "realtime_delta_default_threshold", 0.0)),
+            max_silence_sec=float(getattr(s, "realtime_delta_max_silence_sec", 30.0)),
+        )
+    return _realtime_delta_filter
 
 
-def _broadcast_in_backoff(current_time: float) -> bool:
-    return _broadcast_backoff_until is not None and current_time < _broadcast_backoff_until
+def _next_realtime_flush_delay(queue_len: int) -> float:
+    """
+    Пауза до следующего flush: ``realtime_flush_ms`` для почти пустой очереди,
+    линейно короче по мере заполнения пакета, не меньше ``realtime_flush_min_ms``.
+    """
+    s = get_settings()
+    flush_ms = float(getattr(s, "realtime_flush_ms", 500))
+    min_ms = min(flush_ms, float(getattr(s, "realtime_flush_min_ms", flush_ms)))
+    batch_max = max(1, int(getattr(s, "realtime_batch_max_updates", 200)))
+    fill = min(1.0, queue_len / batch_max)
+    return max(min_ms, flush_ms * (1.0 - fill)) / 1000
 
 
 async def _broadcast_telemetry_batch_to_laravel(updates: list[dict]) -> bool:
@@ -370,15 +409,26 @@ async def _broadcast_telemetry_batch_to_laravel(updates: list[dict]) -> bool:
     try:
         from common.http_client_pool import make_request
 
+        payload_format = getattr(s, "realtime_payload_format", PAYLOAD_FORMAT_ROWS)
+        body, headers = encode_realtime_payload(
+            updates,
+            payload_format=payload_format,
+            gzip_min_bytes=int(getattr(s, "realtime_gzip_min_bytes", 0)),
+        )
+        REALTIME_FLUSH_BYTES.labels(
+            format=payload_format,
+            encoding=headers.get("Content-Encoding", "identity"),
+        ).observe(len(body))
+
         api_start = time.time()
         response = await make_request(
             "post",
             f"{laravel_url}/api/internal/realtime/telemetry-batch",
             endpoint="telemetry_broadcast_batch",
-            json={"updates": updates},
+            content=body,
             headers={
                 "Authorization": f"Bearer {ingest_token}",
-                "Content-Type": "application/json",
+                **headers,
             },
         )
         api_duration = time.time() - api_start
@@ -455,18 +505,29 @@ async def _flush_realtime_updates(force: bool = False) -> None:
     if not force and _broadcast_in_backoff(time.time()):
         return
 
-    updates = await _pop_realtime_updates(
-        getattr(s, "realtime_batch_max_updates", 200)
-    )
-    if not updates:
+    entries = _pop_realtime_updates(getattr(s, "realtime_batch_max_updates", 200))
+    if not entries:
         return
 
+    updates = [update for _, update in entries]
+    delta_filter = _get_realtime_delta_filter()
+    if delta_filter is not None:
+        updates, suppressed = delta_filter.split(updates, now=time.monotonic())
+        if suppressed:
+            REALTIME_SUPPRESSED_UPDATES.inc(len(suppressed))
+        if not updates:
+            return
+
     flush_start = time.time()
     success = await _broadcast_telemetry_batch_to_laravel(updates)
     REALTIME_FLUSH_LATENCY_MS.observe((time.time() - flush_start) * 1000)
 
-    if not success and not force:
-        await _requeue_realtime_updates(updates)
+    if success:
+        if delta_filter is not None:
+            delta_filter.commit(updates, now=time.monotonic())
+    elif not force:
+        unsent = {id(update) for update in updates}
+        _requeue_realtime_updates([entry for entry in entries if id(entry[1]) in unsent])
 
 
 async def process_realtime_queue() -> None:
@@ -479,7 +540,11 @@ async def process_realtime_queue() -> None:
     while not _shutdown_event().is_set():
         try:
             await _flush_realtime_updates()
-            await asyncio.sleep(getattr(s, "realtime_flush_ms", 500) / 1000)
+            if _broadcast_in_backoff(time.time()):
+                delay = getattr(s, "realtime_flush_ms", 500) / 1000
+            else:
+                delay = _next_realtime_flush_delay(len(_realtime_updates))
+            await asyncio.sleep(delay)
         except Exception as e:
             logger.error("Error in realtime telemetry broadcaster: %s", e, exc_info=True)
             await asyncio.sleep(s.queue_error_retry_delay_sec)
@@ -497,16 +562,19 @@ def _store_node_cache_entry(
     node_id: int,
     zone_id: Optional[int],
     pending_zone_id: Optional[int],
+    target: Optional[MutableMapping] = None,
 ) -> None:
+    if target is None:
+        target = _node_cache
     info: tuple[int, Optional[int], Optional[int]] = (
         node_id,
         zone_id,
         pending_zone_id,
     )
     if gh_uid:
-        _node_cache[(node_uid, gh_uid)] = info
-    if (node_uid, None) not in _node_cache:
-        _node_cache[(node_uid, None)] = info
+        target[(node_uid, gh_uid)] = info
+    if (node_uid, None) not in target:
+        target[(node_uid, None)] = info
 
 
 async def refresh_node_cache_for_uid(node_uid: str) -> bool:
@@ -576,10 +644,240 @@ async def _prewarm_stale_node_assignments(
                 node_uid_to_info[cache_key] = cache_info
 
 
+async def _cache_get_many_or_load(cache, keys, loader) -> dict:
+    if hasattr(cache, "get_many_or_load"):
+        return await cache.get_many_or_load(keys, loader)
+    # Кеш подменён обычным dict: без TTL, negative caching и single-flight.
+    result = {key: cache[key] for key in keys if key in cache}
+    missing = [key for key in keys if key not in result]
+    if missing:
+        loaded = await loader(missing)
+        cache.update(loaded)
+        result.update(loaded)
+    return result
+
+
+async def _load_zone_ids(
+    keys: list[tuple[str, Optional[str]]],
+) -> dict[tuple[str, Optional[str]], int]:
+    """Batch-loader ``_zone_cache``: сначала fallback-запись (zone_uid, None), затем БД."""
+    resolved: dict[tuple[str, Optional[str]], int] = {}
+    zones_with_gh: list[tuple[str, str]] = []
+    zones_without_gh: list[str] = []
+    for zone_uid, gh_uid in keys:
+        fallback_key = (zone_uid, None)
+        if gh_uid and fallback_key in _zone_cache:
+            resolved[(zone_uid, gh_uid)] = _zone_cache[fallback_key]
+        elif gh_uid:
+            zones_with_gh.append((zone_uid, gh_uid))
+        else:
+            zones_without_gh.append(zone_uid)
+
+    if zones_with_gh:
+        zone_rows = await fetch(
+            """
+            SELECT z.id, z.uid, g.uid as gh_uid
+            FROM zones z
+            JOIN greenhouses g ON g.id = z.greenhouse_id
+            WHERE (z.uid, g.uid) IN (SELECT unnest($1::text[]), unnest($2::text[]))
+            """,
+            [z for z, _ in zones_with_gh],
+            [g for _, g in zones_with_gh],
+        )
+        for zone in zone_rows:
+            zone_uid = zone.get("uid")
+            zone_id = zone.get("id")
+            if not zone_uid or zone_id is None:
+                continue
+            resolved[(zone_uid, zone.get("gh_uid"))] = zone_id
+
+    if zones_without_gh:
+        zone_rows = await fetch(
+            """
+            SELECT id, uid
+            FROM zones
+            WHERE uid = ANY($1)
+            """,
+            zones_without_gh,
+        )
+        for zone in zone_rows:
+            zone_uid = zone.get("uid")
+            zone_id = zone.get("id")
+            if not zone_uid or zone_id is None:
+                continue
+            resolved[(zone_uid, None)] = zone_id
+
+    return resolved
+
+
+async def _load_node_infos(
+    keys: list[tuple[str, Optional[str]]],
+) -> dict[
+    tuple[str, Optional[str]],
+    tuple[int, Optional[int], Optional[int]] | tuple[int, Optional[int]],
+]:
+    """
+    Batch-loader ``_node_cache``: fallback-запись (node_uid, None) из кеша, затем БД
+    по (uid, gh_uid); не найденные с gh_uid дочитываются по одному uid.
+    """
+    resolved: dict[
+        tuple[str, Optional[str]],
+        tuple[int, Optional[int], Optional[int]] | tuple[int, Optional[int]],
+    ] = {}
+    nodes_with_gh: list[tuple[str, str]] = []
+    nodes_without_gh: list[str] = []
+    for node_uid, gh_uid in keys:
+        fallback_key = (node_uid, None)
+        if gh_uid and fallback_key in _node_cache:
+            resolved[(node_uid, gh_uid)] = _node_cache[fallback_key]
+        elif gh_uid:
+            nodes_with_gh.append((node_uid, gh_uid))
+        else:
+            nodes_without_gh.append(node_uid)
+
+    if nodes_with_gh:
+        node_rows = await fetch(
+            """
+            SELECT n.id, n.uid, n.zone_id, n.pending_zone_id, g.uid as gh_uid
+            FROM nodes n
+            LEFT JOIN zones z ON z.id = n.zone_id
+            LEFT JOIN greenhouses g ON g.id = z.greenhouse_id
+            WHERE (n.uid, COALESCE(g.uid, '')) IN (
+                SELECT unnest($1::text[]), unnest($2::text[])
+            )
+            """,
+            [n for n, _ in nodes_with_gh],
+            [g for _, g in nodes_with_gh],
+        )
+        for node in node_rows:
+            node_uid = node.get("uid")
+            node_id = node.get("id")
+            if not node_uid or node_id is None:
+                continue
+            resolved[(node_uid, node.get("gh_uid"))] = (
+                node_id,
+                node.get("zone_id"),
+                node.get("pending_zone_id"),
+            )
+
+        unresolved_nodes_with_gh = [key for key in nodes_with_gh if key not in resolved]
+        if unresolved_nodes_with_gh:
+            fallback_rows = await fetch(
+                """
+                SELECT id, uid, zone_id, pending_zone_id
+                FROM nodes
+                WHERE uid = ANY($1)
+                """,
+                sorted({node_uid for node_uid, _ in unresolved_nodes_with_gh}),
+            )
+            fallback_infos: dict[str, tuple[int, Optional[int], Optional[int]]] = {}
+            for node in fallback_rows:
+                node_uid = node.get("uid")
+                node_id = node.get("id")
+                if not node_uid or node_id is None:
+                    continue
+                info = (node_id, node.get("zone_id"), node.get("pending_zone_id"))
+                fallback_infos[node_uid] = info
+                _node_cache[(node_uid, None)] = info
+
+            for node_uid, gh_uid in unresolved_nodes_with_gh:
+                fallback_info = fallback_infos.get(node_uid)
+                if fallback_info is not None:
+                    resolved[(node_uid, gh_uid)] = fallback_info
+
+    if nodes_without_gh:
+        node_rows = await fetch(
+            """
+            SELECT id, uid, zone_id, pending_zone_id
+            FROM nodes
+            WHERE uid = ANY($1)
+            """,
+            nodes_without_gh,
+        )
+        for node in node_rows:
+            node_uid = node.get("uid")
+            node_id = node.get("id")
+            if not node_uid or node_id is None:
+                continue
+            resolved[(node_uid, None)] = (
+                node_id,
+                node.get("zone_id"),
+                node.get("pending_zone_id"),
+            )
+
+    return resolved
+
+
+def _handle_cache_invalidation(payload: str) -> None:
+    """NOTIFY telemetry_cache_invalidate: сбросить записи изменённого узла/зоны."""
+    try:
+        data = json.loads(payload)
+    except (TypeError, ValueError):
+        logger.warning("Invalid telemetry cache invalidation payload: %r", payload)
+        return
+    if not isinstance(data, dict):
+        return
+    entity = data.get("entity")
+    uid = data.get("uid")
+    entity_id = data.get("id")
+    if entity == "node" and uid:
+        _node_cache.invalidate_where(lambda key, _value: key[0] == uid)
+    elif entity == "zone":
+        if uid:
+            _zone_cache.invalidate_where(lambda key, _value: key[0] == uid)
+        if entity_id is not None:
+            _zone_greenhouse_cache.invalidate(int(entity_id))
+            # gh_uid узлов резолвится через зону: ключи (node_uid, gh_uid) зоны устарели.
+            _node_cache.invalidate_where(
+                lambda _key, value: value is None or _parse_node_info(value)[1] == int(entity_id)
+            )
+
+
+async def _resync_caches_after_listen() -> None:
+    # Уведомления во время разрыва LISTEN потеряны — перечитываем кеши в фоне.
+    _schedule_cache_refresh()
+
+
+async def run_cache_invalidation_listener() -> None:
+    """Фоновая задача: LISTEN telemetry_cache_invalidate до shutdown."""
+    await listen_notifications(
+        CACHE_INVALIDATE_CHANNEL,
+        _handle_cache_invalidation,
+        stop_event=_shutdown_event(),
+        on_connect=_resync_caches_after_listen,
+    )
+
+
+def _begin_cache_refresh(cache: MutableMapping) -> Optional[int]:
+    if hasattr(cache, "begin_refresh"):
+        return cache.begin_refresh()
+    return None
+
+
+def _swap_cache(cache: MutableMapping, items: dict, refresh: Optional[int] = None) -> None:
+    if hasattr(cache, "replace_all"):
+        cache.replace_all(items, refresh=refresh)
+        return
+    # Кеш подменён обычным dict.
+    cache.clear()
+    cache.update(items)
+
+
 async def refresh_caches() -> None:
-    """Обновить кеши zone_id и node_id."""
-    global _zone_cache, _node_cache, _cache_last_update
+    """
+    Полностью перечитать кеши zone_id и node_id.
 
+    Новые снимки собираются в отдельных dict и подменяются вместе, без await между
+    подменами (double buffering): батчи, идущие параллельно с refresh, читают
+    прежний согласованный снимок. NOTIFY-инвалидации, пришедшие во время
+    запросов, применяются к новому снимку при подмене.
+    """
+    global _cache_last_update
+
+    started_at = time.monotonic()
+    caches = (_zone_cache, _zone_greenhouse_cache, _node_cache)
+    refresh_tokens = [_begin_cache_refresh(cache) for cache in caches]
+    zone_token, zone_greenhouse_token, node_token = refresh_tokens
     try:
         zones = await fetch(
             """
@@ -588,22 +886,21 @@ async def refresh_caches() -> None:
             JOIN greenhouses g ON g.id = z.greenhouse_id
             """
         )
+        zone_snapshot: Optional[dict[tuple[str, Optional[str]], int]] = None
+        zone_greenhouse_snapshot: dict[int, int] = {}
         if zones:
-            _zone_cache.clear()
-            _zone_greenhouse_cache.clear()
+            zone_snapshot = {}
             for zone in zones:
                 zone_uid = zone.get("uid")
                 zone_id = zone.get("id")
                 if not zone_uid or zone_id is None:
                     continue
                 gh_uid = zone.get("gh_uid")
-                key = (zone_uid, gh_uid)
-                _zone_cache[key] = zone_id
-                if (zone_uid, None) not in _zone_cache:
-                    _zone_cache[(zone_uid, None)] = zone_id
+                zone_snapshot[(zone_uid, gh_uid)] = zone_id
+                zone_snapshot.setdefault((zone_uid, None), zone_id)
                 greenhouse_id = zone.get("greenhouse_id")
                 if greenhouse_id is not None:
-                    _zone_greenhouse_cache[zone_id] = greenhouse_id
+                    zone_greenhouse_snapshot[zone_id] = greenhouse_id
         else:
             logger.info("refresh_caches: zones query returned 0 rows, keeping existing cache to avoid data loss")
 
@@ -615,36 +912,67 @@ async def refresh_caches() -> None:
             LEFT JOIN greenhouses g ON g.id = z.greenhouse_id
             """
         )
-        if not nodes:
+        node_snapshot: Optional[dict] = None
+        if nodes:
+            node_snapshot = {}
+            for node in nodes:
+                node_uid = node.get("uid")
+                node_id = node.get("id")
+                if not node_uid or node_id is None:
+                    continue
+                zone_id = node.get("zone_id")
+                pending_zone_id = node.get("pending_zone_id")
+                _store_node_cache_entry(
+                    node_uid=str(node_uid),
+                    gh_uid=node.get("gh_uid"),
+                    node_id=int(node_id),
+                    zone_id=int(zone_id) if zone_id is not None else None,
+                    pending_zone_id=int(pending_zone_id) if pending_zone_id is not None else None,
+                    target=node_snapshot,
+                )
+        else:
             logger.info("refresh_caches: nodes query returned 0 rows, keeping existing cache to avoid data loss")
-            _cache_last_update = time.time()
-            logger.info(
-                f"Cache refreshed: {len(_zone_cache)} zone entries, {len(_node_cache)} node entries"
-            )
-            return
-        _node_cache.clear()
-        for node in nodes:
-            node_uid = node.get("uid")
-            node_id = node.get("id")
-            if not node_uid or node_id is None:
-                continue
-            gh_uid = node.get("gh_uid")
-            zone_id = node.get("zone_id")
-            pending_zone_id = node.get("pending_zone_id")
-            _store_node_cache_entry(
-                node_uid=str(node_uid),
-                gh_uid=gh_uid,
-                node_id=int(node_id),
-                zone_id=int(zone_id) if zone_id is not None else None,
-                pending_zone_id=int(pending_zone_id) if pending_zone_id is not None else None,
-            )
+
+        if zone_snapshot is not None:
+            _swap_cache(_zone_cache, zone_snapshot, zone_token)
+            _swap_cache(_zone_greenhouse_cache, zone_greenhouse_snapshot, zone_greenhouse_token)
+        if node_snapshot is not None:
+            _swap_cache(_node_cache, node_snapshot, node_token)
 
         _cache_last_update = time.time()
+        TELEMETRY_CACHE_REFRESH_DURATION.observe(time.monotonic() - started_at)
         logger.info(
             f"Cache refreshed: {len(_zone_cache)} zone entries, {len(_node_cache)} node entries"
         )
     except Exception as e:
         logger.error(f"Failed to refresh caches: {e}", exc_info=True)
+    finally:
+        for cache, token in zip(caches, refresh_tokens):
+            if hasattr(cache, "abort_refresh"):
+                cache.abort_refresh(token)
+
+
+def _schedule_cache_refresh() -> asyncio.Task:
+    """Запустить refresh_caches() в фоне, если он ещё не идёт (single-flight)."""
+    global _cache_refresh_task
+    task = _cache_refresh_task
+    if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.create_task(refresh_caches(), name="telemetry_cache_refresh")
+        _cache_refresh_task = task
+    return task
+
+
+async def _ensure_caches_fresh() -> None:
+    """
+    Stale-while-revalidate: по истечении _cache_ttl батч продолжает работать с
+    текущим снимком, а reload идёт в фоне. Ждём reload только если снимка ещё нет
+    (старт сервиса или сброс кешей после FK-ошибки sensors).
+    """
+    if time.time() - _cache_last_update <= _cache_ttl:
+        return
+    task = _schedule_cache_refresh()
+    if _cache_last_update == 0.0:
+        await asyncio.shield(task)
 
 
 async def _create_sensors_per_item(
@@ -978,6 +1306,176 @@ def _handle_samples_join_mismatch(
     return written_items
 
 
+def _resolve_write_engine(settings: Any) -> str:
+    engine = str(getattr(settings, "telemetry_write_engine", WRITE_ENGINE_UNNEST) or "").strip().lower()
+    if engine in WRITE_ENGINES:
+        return engine
+    _log_warning_throttled(
+        key=("unknown_write_engine", engine or "-", "-", "-"),
+        message=f"Unknown TELEMETRY_WRITE_ENGINE={engine!r}, falling back to {WRITE_ENGINE_UNNEST}",
+    )
+    return WRITE_ENGINE_UNNEST
+
+
+def _log_written_samples(written_items: list[dict], engine: str) -> None:
+    logger.info(
+        "[TELEMETRY] Written: count=%s, unique_sensors=%s, engine=%s",
+        len(written_items),
+        len({int(item["sensor_id"]) for item in written_items}),
+        engine,
+    )
+
+
+async def _mark_late_buckets(written_items: list[dict]) -> None:
+    """Отметить минуты позади watermark агрегатора; ошибка не роняет батч (семплы уже записаны)."""
+    candidates = late_bucket_candidates(
+        (
+            (
+                int(item["sensor_id"]),
+                _normalize_ts_for_db(item["sample"].ts),
+                int(item["zone_id"]) if item.get("zone_id") is not None else None,
+            )
+            for item in written_items
+        ),
+        now=utcnow_naive(),
+    )
+    if not candidates:
+        return
+    try:
+        await mark_dirty_buckets(execute, candidates)
+    except Exception as e:
+        TELEMETRY_PG_WRITE_FAILED.labels(stage="dirty_buckets").inc()
+        _log_warning_throttled(
+            key=("dirty_buckets", type(e).__name__, "-", "-"),
+            message=f"Failed to mark late telemetry buckets: {e}",
+        )
+
+
+async def _notify_written_samples(written_items: list[dict]) -> None:
+    """NOTIFY записанных семплов для окон AE3; ошибка не роняет батч (семплы уже записаны)."""
+    payloads = encode_samples_notify_payloads(
+        (
+            int(item["sensor_id"]),
+            _normalize_ts_for_db(item["sample"].ts),
+            item["sample"].value,
+            bool(getattr(item["sample"], "stub", False)),
+        )
+        for item in written_items
+    )
+    try:
+        await notify_written_samples(execute, payloads)
+    except Exception as e:
+        TELEMETRY_PG_WRITE_FAILED.labels(stage="samples_notify").inc()
+        _log_warning_throttled(
+            key=("samples_notify", type(e).__name__, "-", "-"),
+            message=f"Failed to notify written telemetry samples: {e}",
+        )
+
+
+async def _record_written_simulation_events(written_items: list[dict]) -> None:
+    if not written_items or not SIMULATION_TELEMETRY_EVENTS_ENABLED:
+        return
+    zone_stats: Dict[int, Dict[str, object]] = {}
+    for item in written_items:
+        zone_id = item.get("zone_id")
+        if zone_id is None:
+            continue
+        sample = item.get("sample")
+        metric_type = getattr(sample, "metric_type", None)
+        channel = getattr(sample, "channel", None)
+        stats = zone_stats.setdefault(zone_id, {"count": 0, "metrics": set(), "channels": set()})
+        stats["count"] = int(stats["count"]) + 1
+        if metric_type:
+            stats["metrics"].add(metric_type)
+        if channel:
+            stats["channels"].add(channel)
+
+    for zone_id, stats in zone_stats.items():
+        await record_simulation_event_throttled(
+            zone_id,
+            service="history-logger",
+            stage="telemetry",
+            status="received",
+            message="Телеметрия принята",
+            payload={
+                "samples": stats["count"],
+                "metrics": sorted(stats["metrics"]),
+                "channels": sorted(stats["channels"]),
+            },
+            min_interval_seconds=SIMULATION_TELEMETRY_EVENT_INTERVAL_SEC,
+            throttle_key=f"telemetry:{zone_id}",
+        )
+
+
+async def _write_samples_via_copy(
+    writable_items: list[dict],
+    rows: list[SampleRow],
+    result: TelemetryBatchResult,
+) -> list[dict]:
+    """COPY + set-based merge; отказы раскладываются в dead/requeue построчно."""
+    try:
+        copy_result = await write_samples_copy(
+            rows,
+            is_transport_error=_is_pg_transport_error,
+        )
+    except Exception as e:
+        DATABASE_ERRORS.labels(error_type=type(e).__name__).inc()
+        if _is_pg_transport_error(e):
+            raise PgTransportError(str(e)) from e
+        raise
+
+    for idx in copy_result.filtered:
+        item = writable_items[idx]
+        TELEMETRY_SAMPLES_JOIN_MISMATCH.inc()
+        _append_requeue_entry(result, item.get("entry"))
+        logger.warning(
+            "telemetry_samples JOIN mismatch, scheduling requeue",
+            extra={
+                "sensor_id": rows[idx].sensor_id,
+                "zone_id": item.get("zone_id"),
+                "metric_type": getattr(item.get("sample"), "metric_type", None),
+            },
+        )
+
+    for idx, error in copy_result.rejected:
+        item = writable_items[idx]
+        TELEMETRY_PG_WRITE_FAILED.labels(stage="samples").inc()
+        DATABASE_ERRORS.labels(error_type=type(error).__name__).inc()
+        if _is_sensor_fk_error(error):
+            _sensor_cache.pop(item.get("sensor_key"), None)
+            _append_dead_entry(result, item.get("entry"))
+            logger.warning(
+                "COPY telemetry_samples FK violation, moving queue entry to dead-list",
+                extra={
+                    "sensor_id": item.get("sensor_id"),
+                    "zone_id": item.get("zone_id"),
+                    "error": str(error),
+                },
+            )
+            continue
+        _append_requeue_entry(result, item.get("entry"))
+        logger.error(
+            "COPY telemetry_samples row rejected, scheduling requeue",
+            extra={
+                "sensor_id": item.get("sensor_id"),
+                "zone_id": item.get("zone_id"),
+                "error": str(error),
+            },
+        )
+
+    if copy_result.rejected:
+        logger.warning(
+            "COPY telemetry batch isolated rejected rows",
+            extra={
+                "rejected": len(copy_result.rejected),
+                "rows": len(rows),
+                "round_trips": copy_result.round_trips,
+            },
+        )
+
+    return [writable_items[idx] for idx in copy_result.written]
+
+
 async def process_telemetry_batch(
     samples: List[TelemetrySampleModel],
     entries: Optional[List[QueueEntry]] = None,
@@ -995,10 +1493,8 @@ async def process_telemetry_batch(
     max_age_minutes = float(os.getenv("TELEMETRY_MAX_AGE_MINUTES", "30"))
     max_age_seconds = max_age_minutes * 60
 
-    global _cache_last_update, _cache_ttl
-    current_time = time.time()
-    if current_time - _cache_last_update > _cache_ttl:
-        await refresh_caches()
+    global _cache_last_update
+    await _ensure_caches_fresh()
 
     zone_uid_to_id: dict[tuple[str, Optional[str]], int] = {}
 
@@ -1011,65 +1507,9 @@ async def process_telemetry_batch(
     )
 
     if zone_gh_pairs:
-        missing_zones = []
-        for zone_uid, gh_uid in zone_gh_pairs:
-            key = (zone_uid, gh_uid)
-            if key in _zone_cache:
-                zone_uid_to_id[key] = _zone_cache[key]
-            else:
-                fallback_key = (zone_uid, None)
-                if fallback_key in _zone_cache:
-                    zone_uid_to_id[key] = _zone_cache[fallback_key]
-                else:
-                    missing_zones.append((zone_uid, gh_uid))
-
-        if missing_zones:
-            zones_with_gh = [(z, g) for z, g in missing_zones if g]
-            zones_without_gh = [(z, g) for z, g in missing_zones if not g]
-
-            if zones_with_gh:
-                zone_uids = [z for z, _ in zones_with_gh]
-                gh_uids = [g for _, g in zones_with_gh]
-                zone_rows = await fetch(
-                    """
-                    SELECT z.id, z.uid, g.uid as gh_uid
-                    FROM zones z
-                    JOIN greenhouses g ON g.id = z.greenhouse_id
-                    WHERE (z.uid, g.uid) IN (SELECT unnest($1::text[]), unnest($2::text[]))
-                    """,
-                    zone_uids,
-                    gh_uids,
-                )
-
-                for zone in zone_rows:
-                    zone_uid = zone.get("uid")
-                    zone_id = zone.get("id")
-                    if not zone_uid or zone_id is None:
-                        continue
-                    gh_uid = zone.get("gh_uid")
-                    key = (zone_uid, gh_uid)
-                    zone_uid_to_id[key] = zone_id
-                    _zone_cache[key] = zone_id
-
-            if zones_without_gh:
-                zone_uids = [z for z, _ in zones_without_gh]
-                zone_rows = await fetch(
-                    """
-                    SELECT id, uid
-                    FROM zones
-                    WHERE uid = ANY($1)
-                    """,
-                    zone_uids,
-                )
-
-                for zone in zone_rows:
-                    zone_uid = zone.get("uid")
-                    zone_id = zone.get("id")
-                    if not zone_uid or zone_id is None:
-                        continue
-                    key = (zone_uid, None)
-                    zone_uid_to_id[key] = zone_id
-                    _zone_cache[key] = zone_id
+        zone_uid_to_id.update(
+            await _cache_get_many_or_load(_zone_cache, zone_gh_pairs, _load_zone_ids)
+        )
 
         for zone_uid, gh_uid in zone_gh_pairs:
             if (zone_uid, gh_uid) not in zone_uid_to_id:
@@ -1107,117 +1547,12 @@ async def process_telemetry_batch(
     )
 
     if node_gh_pairs:
-        missing_nodes = []
-        for node_uid, gh_uid in node_gh_pairs:
-            key = (node_uid, gh_uid)
-            if key in _node_cache:
-                node_uid_to_info[key] = _node_cache[key]
-                node_info_source[key] = "cache"
-            else:
-                fallback_key = (node_uid, None)
-                if fallback_key in _node_cache:
-                    node_uid_to_info[key] = _node_cache[fallback_key]
-                    node_info_source[key] = "cache"
-                else:
-                    missing_nodes.append((node_uid, gh_uid))
-
-        if missing_nodes:
-            nodes_with_gh = [(n, g) for n, g in missing_nodes if g]
-            nodes_without_gh = [(n, g) for n, g in missing_nodes if not g]
-
-            if nodes_with_gh:
-                node_uids = [n for n, _ in nodes_with_gh]
-                gh_uids = [g for _, g in nodes_with_gh]
-                node_rows = await fetch(
-                    """
-                    SELECT n.id, n.uid, n.zone_id, n.pending_zone_id, g.uid as gh_uid
-                    FROM nodes n
-                    LEFT JOIN zones z ON z.id = n.zone_id
-                    LEFT JOIN greenhouses g ON g.id = z.greenhouse_id
-                    WHERE (n.uid, COALESCE(g.uid, '')) IN (
-                        SELECT unnest($1::text[]), unnest($2::text[])
-                    )
-                    """,
-                    node_uids,
-                    gh_uids,
-                )
-
-                for node in node_rows:
-                    node_uid = node.get("uid")
-                    node_id = node.get("id")
-                    if not node_uid or node_id is None:
-                        continue
-                    gh_uid = node.get("gh_uid")
-                    zone_id = node.get("zone_id")
-                    pending_zone_id = node.get("pending_zone_id")
-                    key = (node_uid, gh_uid)
-                    node_uid_to_info[key] = (node_id, zone_id, pending_zone_id)
-                    _node_cache[key] = (node_id, zone_id, pending_zone_id)
-                    node_info_source[key] = "db"
-
-                unresolved_nodes_with_gh = [
-                    (node_uid, gh_uid)
-                    for node_uid, gh_uid in nodes_with_gh
-                    if (node_uid, gh_uid) not in node_uid_to_info
-                ]
-                if unresolved_nodes_with_gh:
-                    fallback_node_uids = sorted(
-                        {node_uid for node_uid, _ in unresolved_nodes_with_gh}
-                    )
-                    fallback_rows = await fetch(
-                        """
-                        SELECT id, uid, zone_id, pending_zone_id
-                        FROM nodes
-                        WHERE uid = ANY($1)
-                        """,
-                        fallback_node_uids,
-                    )
-
-                    for node in fallback_rows:
-                        node_uid = node.get("uid")
-                        node_id = node.get("id")
-                        if not node_uid or node_id is None:
-                            continue
-                        zone_id = node.get("zone_id")
-                        pending_zone_id = node.get("pending_zone_id")
-                        key = (node_uid, None)
-                        node_uid_to_info[key] = (node_id, zone_id, pending_zone_id)
-                        _node_cache[key] = (node_id, zone_id, pending_zone_id)
-                        node_info_source[key] = "db"
-
-                    for node_uid, gh_uid in unresolved_nodes_with_gh:
-                        fallback_key = (node_uid, None)
-                        fallback_info = node_uid_to_info.get(fallback_key)
-                        if fallback_info is not None:
-                            node_uid_to_info[(node_uid, gh_uid)] = fallback_info
-                            _node_cache[(node_uid, gh_uid)] = fallback_info
-                            node_info_source[(node_uid, gh_uid)] = node_info_source.get(
-                                fallback_key,
-                                "db",
-                            )
-
-            if nodes_without_gh:
-                node_uids = [n for n, _ in nodes_without_gh]
-                node_rows = await fetch(
-                    """
-                    SELECT id, uid, zone_id, pending_zone_id
-                    FROM nodes
-                    WHERE uid = ANY($1)
-                    """,
-                    node_uids,
-                )
-
-                for node in node_rows:
-                    node_uid = node.get("uid")
-                    node_id = node.get("id")
-                    if not node_uid or node_id is None:
-                        continue
-                    zone_id = node.get("zone_id")
-                    pending_zone_id = node.get("pending_zone_id")
-                    key = (node_uid, None)
-                    node_uid_to_info[key] = (node_id, zone_id, pending_zone_id)
-                    _node_cache[key] = (node_id, zone_id, pending_zone_id)
-                    node_info_source[key] = "db"
+        cached_node_keys = {key for key in node_gh_pairs if key in _node_cache}
+        node_uid_to_info.update(
+            await _cache_get_many_or_load(_node_cache, node_gh_pairs, _load_node_infos)
+        )
+        for key in node_uid_to_info:
+            node_info_source[key] = "cache" if key in cached_node_keys else "db"
 
         for node_uid, gh_uid in node_gh_pairs:
             if (node_uid, gh_uid) not in node_uid_to_info:
@@ -1836,108 +2171,71 @@ async def process_telemetry_batch(
         metadata_values.append(metadata or None)
 
     if sensor_ids:
-        query = """
-            WITH incoming (sensor_id, ts, zone_id, value, quality, metadata) AS (
-                SELECT *
-                FROM UNNEST(
-                    $1::bigint[],
-                    $2::timestamp[],
-                    $3::bigint[],
-                    $4::double precision[],
-                    $5::text[],
-                    $6::jsonb[]
-                ) AS t(sensor_id, ts, zone_id, value, quality, metadata)
-            )
-            INSERT INTO telemetry_samples (
-                sensor_id, ts, zone_id, value, quality, metadata
-            )
-            SELECT
-                incoming.sensor_id,
-                incoming.ts,
-                incoming.zone_id,
-                incoming.value,
-                incoming.quality,
-                incoming.metadata
-            FROM incoming
-            JOIN sensors s
-              ON s.id = incoming.sensor_id
-             AND s.zone_id = incoming.zone_id
-            RETURNING sensor_id, ts
-        """
-        try:
-            returned_rows = await fetch(
-                query,
-                sensor_ids,
-                sample_ts_values,
-                zone_ids,
-                sample_values,
-                qualities,
-                metadata_values,
-            )
-            written_items = _handle_samples_join_mismatch(
+        write_engine = _resolve_write_engine(s)
+        write_start = time.time()
+        if write_engine == WRITE_ENGINE_COPY:
+            written_items = await _write_samples_via_copy(
                 writable_items,
-                sensor_ids,
-                sample_ts_values,
-                returned_rows,
+                [
+                    SampleRow(
+                        sensor_id=sensor_ids[idx],
+                        ts=sample_ts_values[idx],
+                        zone_id=zone_ids[idx],
+                        value=sample_values[idx],
+                        quality=qualities[idx],
+                        metadata=metadata_values[idx],
+                    )
+                    for idx in range(len(sensor_ids))
+                ],
                 result,
             )
             processed_count = len(written_items)
-            logger.info(
-                "[TELEMETRY] Written: count=%s, unique_sensors=%s",
-                processed_count,
-                len({int(item["sensor_id"]) for item in written_items}),
-            )
-            if processed_count > 0 and SIMULATION_TELEMETRY_EVENTS_ENABLED:
-                zone_stats: Dict[int, Dict[str, object]] = {}
-                for item in written_items:
-                    zone_id = item.get("zone_id")
-                    if zone_id is None:
-                        continue
-                    sample = item.get("sample")
-                    metric_type = getattr(sample, "metric_type", None)
-                    channel = getattr(sample, "channel", None)
-                    stats = zone_stats.setdefault(zone_id, {"count": 0, "metrics": set(), "channels": set()})
-                    stats["count"] = int(stats["count"]) + 1
-                    if metric_type:
-                        stats["metrics"].add(metric_type)
-                    if channel:
-                        stats["channels"].add(channel)
-
-                for zone_id, stats in zone_stats.items():
-                    await record_simulation_event_throttled(
-                        zone_id,
-                        service="history-logger",
-                        stage="telemetry",
-                        status="received",
-                        message="Телеметрия принята",
-                        payload={
-                            "samples": stats["count"],
-                            "metrics": sorted(stats["metrics"]),
-                            "channels": sorted(stats["channels"]),
-                        },
-                        min_interval_seconds=SIMULATION_TELEMETRY_EVENT_INTERVAL_SEC,
-                        throttle_key=f"telemetry:{zone_id}",
-                    )
-        except Exception as e:
-            error_type = type(e).__name__
-            DATABASE_ERRORS.labels(error_type=error_type).inc()
-            if _is_pg_transport_error(e):
-                raise PgTransportError(str(e)) from e
-            logger.error(
-                "Failed to insert telemetry batch, retrying per-item",
-                extra={
-                    "error_type": error_type,
-                    "error": str(e),
-                    "samples_count": len(writable_items),
-                },
-                exc_info=True,
-            )
-            if _is_sensor_fk_error(e):
-                _sensor_cache.clear()
-            for item in writable_items:
-                if await _insert_telemetry_sample_item(item, result):
-                    written_items.append(item)
-                    processed_count += 1
+            _log_written_samples(written_items, write_engine)
+            await _record_written_simulation_events(written_items)
+        else:
+            try:
+                returned_rows = await fetch(
+                    UNNEST_INSERT_SQL,
+                    sensor_ids,
+                    sample_ts_values,
+                    zone_ids,
+                    sample_values,
+                    qualities,
+                    metadata_values,
+                )
+                written_items = _handle_samples_join_mismatch(
+                    writable_items,
+                    sensor_ids,
+                    sample_ts_values,
+                    returned_rows,
+                    result,
+                )
+                processed_count = len(written_items)
+                _log_written_samples(written_items, write_engine)
+                await _record_written_simulation_events(written_items)
+            except Exception as e:
+                error_type = type(e).__name__
+                DATABASE_ERRORS.labels(error_type=error_type).inc()
+                if _is_pg_transport_error(e):
+                    raise PgTransportError(str(e)) from e
+                logger.error(
+                    "Failed to insert telemetry batch, retrying per-item",
+                    extra={
+                        "error_type": error_type,
+                        "error": str(e),
+                        "samples_count": len(writable_items),
+                    },
+                    exc_info=True,
+                )
+                if _is_sensor_fk_error(e):
+                    _sensor_cache.clear()
+                for item in writable_items:
+                    if await _insert_telemetry_sample_item(item, result):
+                        written_items.append(item)
+                        processed_count += 1
+        TELEMETRY_SAMPLES_WRITE_DURATION.labels(engine=write_engine).observe(
+            time.time() - write_start
+        )
 
     if written_items:
         written_sensor_ids = {int(item["sensor_id"]) for item in written_items}
@@ -1952,9 +2250,14 @@ async def process_telemetry_batch(
             result,
             samples_committed=True,
         )
+        if getattr(s, "telemetry_dirty_buckets_enabled", False):
+            await _mark_late_buckets(written_items)
+        if getattr(s, "telemetry_samples_notify_enabled", False):
+            await _notify_written_samples(written_items)
 
     tracked_ids = _tracked_entry_ids(result)
     written_item_ids = {id(item) for item in written_items}
+    realtime_entries: list[RealtimeEntry] = []
     for (zone_id, metric_type, node_id, channel), group_items in broadcast_groups.items():
         writable_group_items = [
             item
@@ -1991,7 +2294,8 @@ async def process_telemetry_batch(
             metric_type,
             channel,
         )
-        await _enqueue_realtime_update(realtime_key, update)
+        realtime_entries.append((realtime_key, update))
+    _enqueue_realtime_updates(realtime_entries)
 
     processing_duration = time.time() - start_time
     TELEMETRY_PROCESSING_DURATION.observe(processing_duration)
@@ -2105,11 +2409,12 @@ async def _finalize_queue_batch(
                 )
 
 
-async def _handle_pop_batch(pop: PopBatchResult) -> None:
+async def _handle_pop_batch(pop: PopBatchResult, queue=None) -> None:
     if not pop.entries:
         return
 
-    queue = _get_telemetry_queue()
+    if queue is None:
+        queue = _get_telemetry_queue()
     if queue is None:
         return
 
@@ -2124,8 +2429,9 @@ async def _handle_pop_batch(pop: PopBatchResult) -> None:
     await _finalize_queue_batch(queue, pop, batch_result)
 
 
-async def _drain_telemetry_queue_on_shutdown() -> None:
-    queue = _get_telemetry_queue()
+async def _drain_telemetry_queue_on_shutdown(queue=None) -> None:
+    if queue is None:
+        queue = _get_telemetry_queue()
     if queue is None:
         return
 
@@ -2142,80 +2448,284 @@ async def _drain_telemetry_queue_on_shutdown() -> None:
         if not pop.entries:
             break
 
-        await _handle_pop_batch(pop)
+        await _handle_pop_batch(pop, queue=queue)
 
 
-async def process_telemetry_queue() -> None:
+POP_MODE_POLL = "poll"
+POP_MODE_BLOCKING = "blocking"
+POP_MODES = (POP_MODE_POLL, POP_MODE_BLOCKING)
+
+_shard_lag: dict[int, tuple[int, float]] = {}
+
+
+def _queue_shard_count(queue) -> int:
+    try:
+        return max(1, int(getattr(queue, "shard_count", 1)))
+    except (TypeError, ValueError):
+        return 1
+
+
+def _publish_shard_lag(shard: int, processing_size: int, queue_age: Optional[float]) -> None:
+    """Per-shard gauges + агрегаты по процессу (сумма processing, максимальный lag)."""
+    shard_label = str(shard)
+    age = float(queue_age) if queue_age is not None else 0.0
+    TELEMETRY_SHARD_PROCESSING_SIZE.labels(shard=shard_label).set(processing_size)
+    TELEMETRY_SHARD_QUEUE_AGE.labels(shard=shard_label).set(age)
+    _shard_lag[shard] = (processing_size, age)
+    TELEMETRY_PROCESSING_SIZE.set(sum(size for size, _ in _shard_lag.values()))
+    TELEMETRY_QUEUE_AGE.set(max(lag for _, lag in _shard_lag.values()))
+
+
+def _reclaim_interval_sec() -> float:
+    return float(os.getenv("TELEMETRY_PROCESSING_RECLAIM_INTERVAL_SEC", "60"))
+
+
+def _resolve_pop_mode(settings: Any) -> str:
+    mode = getattr(settings, "telemetry_queue_pop_mode", POP_MODE_POLL)
+    if not isinstance(mode, str):
+        return POP_MODE_POLL
+    mode = mode.strip().lower()
+    if mode in POP_MODES:
+        return mode
+    _log_warning_throttled(
+        key=("unknown_pop_mode", mode or "-", "-", "-"),
+        message=f"Unknown TELEMETRY_QUEUE_POP_MODE={mode!r}, falling back to {POP_MODE_POLL}",
+    )
+    return POP_MODE_POLL
+
+
+def _build_batch_controller(settings: Any) -> Optional[AdaptiveBatchController]:
+    enabled = getattr(settings, "telemetry_adaptive_batch_enabled", False)
+    if not isinstance(enabled, bool) or not enabled:
+        return None
+    return AdaptiveBatchController(
+        AdaptiveBatchBounds(
+            min_batch=settings.telemetry_adaptive_batch_min,
+            max_batch=settings.telemetry_adaptive_batch_max,
+            min_flush_ms=settings.telemetry_adaptive_flush_min_ms,
+            max_flush_ms=settings.telemetry_adaptive_flush_max_ms,
+            target_write_ms=settings.telemetry_adaptive_target_write_ms,
+            lag_threshold_sec=settings.telemetry_adaptive_lag_threshold_sec,
+        ),
+        initial_batch=settings.telemetry_batch_size,
+        initial_flush_ms=settings.telemetry_flush_ms,
+    )
+
+
+def _batch_decision(
+    settings: Any, controller: Optional[AdaptiveBatchController], shard: int
+) -> tuple[int, float]:
+    """(batch_size, flush_ms) для следующего батча шарда; без контроллера — статические."""
+    if controller is None:
+        batch_size, flush_ms = max(1, int(settings.telemetry_batch_size)), settings.telemetry_flush_ms
+    else:
+        batch_size, flush_ms = controller.batch_size, controller.flush_ms
+    TELEMETRY_ADAPTIVE_BATCH_SIZE.labels(shard=str(shard)).set(batch_size)
+    TELEMETRY_ADAPTIVE_FLUSH_MS.labels(shard=str(shard)).set(flush_ms)
+    return batch_size, flush_ms
+
+
+def _observe_batch_write(
+    controller: Optional[AdaptiveBatchController],
+    shard: int,
+    *,
+    rows: int,
+    write_seconds: float,
+    saturated: bool,
+) -> None:
+    if controller is None:
+        return
+    queue_age = _shard_lag.get(shard, (0, None))[1]
+    controller.observe(rows=rows, write_seconds=write_seconds, saturated=saturated, queue_age_sec=queue_age)
+    if controller.write_ms_ewma is not None:
+        TELEMETRY_BATCH_WRITE_MS.labels(shard=str(shard)).set(controller.write_ms_ewma)
+
+
+async def _reclaim_shard_processing(queue, shard: int) -> None:
+    reclaimed = await queue.reclaim_processing()
+    if reclaimed:
+        TELEMETRY_PROCESSING_RECLAIMED.inc(reclaimed)
+        logger.warning(
+            "Reclaimed %s stale telemetry item(s) from processing list (shard=%s)",
+            reclaimed,
+            shard,
+        )
+
+
+async def _refresh_shard_health(queue, shard: int) -> QueueHealthSnapshot:
+    """Один pipeline-запрос за все health-gauge шарда; снимок кешируется для /health."""
+    redis_start_time = time.time()
+    snapshot = await queue.snapshot_health()
+    REDIS_OPERATION_DURATION.observe(time.time() - redis_start_time)
+    TELEMETRY_SHARD_QUEUE_SIZE.labels(shard=str(shard)).set(snapshot.size)
+    _publish_shard_lag(shard, snapshot.processing_size, snapshot.oldest_age_seconds)
+    TELEMETRY_DEAD_LIST_SIZE.set(snapshot.dead_list_size)
+    return snapshot
+
+
+async def _consume_telemetry_shard(queue, shard: int) -> None:
     """
-    Фоновая задача для обработки очереди телеметрии из Redis.
+    Consumer одного шарда очереди: батчи шарда пишутся последовательно
+    (порядок per-node сохраняется), разные шарды пишут параллельно через пул.
     """
     s = get_settings()
     last_flush = utcnow()
     last_reclaim_at = time.monotonic()
-    reclaim_interval_sec = float(
-        os.getenv("TELEMETRY_PROCESSING_RECLAIM_INTERVAL_SEC", "60")
-    )
-
-    logger.info("Starting telemetry queue processor")
+    reclaim_interval_sec = _reclaim_interval_sec()
+    controller = _build_batch_controller(s)
 
     while not _shutdown_event().is_set():
         try:
-            queue = _get_telemetry_queue()
-            queue_start_time = time.time()
-            queue_size = await queue.size()
-            processing_size = await queue.processing_size()
-            TELEMETRY_PROCESSING_SIZE.set(processing_size)
-            queue_duration = time.time() - queue_start_time
-            REDIS_OPERATION_DURATION.observe(queue_duration)
+            health = await _refresh_shard_health(queue, shard)
+            queue_size = health.size
 
             if (
-                processing_size > 0
+                health.processing_size > 0
                 and (time.monotonic() - last_reclaim_at) >= reclaim_interval_sec
             ):
-                reclaimed = await queue.reclaim_processing()
+                await _reclaim_shard_processing(queue, shard)
                 last_reclaim_at = time.monotonic()
-                if reclaimed:
-                    TELEMETRY_PROCESSING_RECLAIMED.inc(reclaimed)
-                    logger.warning(
-                        "Reclaimed %s stale telemetry item(s) from processing list",
-                        reclaimed,
-                    )
-
-            queue_age_start_time = time.time()
-            queue_age = await queue.get_oldest_age_seconds()
-            queue_age_duration = time.time() - queue_age_start_time
-            REDIS_OPERATION_DURATION.observe(queue_age_duration)
-
-            if queue_age is not None:
-                TELEMETRY_QUEUE_AGE.set(queue_age)
-            else:
-                TELEMETRY_QUEUE_AGE.set(0.0)
-
-            dead_list_size = await queue.dead_list_size()
-            TELEMETRY_DEAD_LIST_SIZE.set(dead_list_size)
 
             time_since_flush = (utcnow() - last_flush).total_seconds() * 1000
+            batch_limit, flush_ms = _batch_decision(s, controller, shard)
 
-            should_flush = queue_size >= s.telemetry_batch_size or (
-                time_since_flush >= s.telemetry_flush_ms and queue_size > 0
+            should_flush = queue_size >= batch_limit or (
+                time_since_flush >= flush_ms and queue_size > 0
             )
 
             if should_flush:
-                batch_size = min(s.telemetry_batch_size, queue_size)
+                batch_size = min(batch_limit, queue_size)
                 pop = await queue.pop_batch(batch_size)
 
                 if pop.entries:
-                    await _handle_pop_batch(pop)
+                    write_start = time.monotonic()
+                    await _handle_pop_batch(pop, queue=queue)
                     last_flush = utcnow()
+                    _observe_batch_write(
+                        controller,
+                        shard,
+                        rows=len(pop.entries),
+                        write_seconds=time.monotonic() - write_start,
+                        saturated=queue_size > batch_limit,
+                    )
 
             await asyncio.sleep(s.queue_check_interval_sec)
 
         except Exception as e:
-            logger.error(f"Error in telemetry queue processor: {e}", exc_info=True)
+            logger.error(
+                f"Error in telemetry queue processor (shard={shard}): {e}",
+                exc_info=True,
+            )
             await asyncio.sleep(s.queue_error_retry_delay_sec)
 
+
+async def _consume_telemetry_shard_blocking(queue, shard: int) -> None:
+    """
+    Consumer шарда в blocking режиме: просыпается на первом элементе (BLMOVE),
+    добирает до ``telemetry_batch_size`` за ``telemetry_flush_ms`` (или до
+    решения адаптивного контроллера). Health-gauge считает отдельный таймер
+    ``_monitor_telemetry_shard_health``; reclaim выполняется здесь, между
+    батчами: пока батч пишется, его записи лежат в processing list шарда.
+    """
+    s = get_settings()
+    block_timeout_sec = float(getattr(s, "telemetry_queue_block_timeout_sec", 1.0))
+    controller = _build_batch_controller(s)
+    last_reclaim_at = time.monotonic()
+    reclaim_interval_sec = _reclaim_interval_sec()
+
+    while not _shutdown_event().is_set():
+        try:
+            if (
+                _shard_lag.get(shard, (0, None))[0] > 0
+                and (time.monotonic() - last_reclaim_at) >= reclaim_interval_sec
+            ):
+                await _reclaim_shard_processing(queue, shard)
+                last_reclaim_at = time.monotonic()
+
+            batch_size, flush_ms = _batch_decision(s, controller, shard)
+            pop = await queue.pop_batch_blocking(
+                batch_size,
+                block_timeout_sec=block_timeout_sec,
+                linger_ms=flush_ms,
+            )
+            if pop.entries:
+                write_start = time.monotonic()
+                await _handle_pop_batch(pop, queue=queue)
+                # Полный батч до истечения linger — признак, что в очереди есть ещё.
+                _observe_batch_write(
+                    controller,
+                    shard,
+                    rows=len(pop.entries),
+                    write_seconds=time.monotonic() - write_start,
+                    saturated=len(pop.entries) >= batch_size,
+                )
+        except Exception as e:
+            logger.error(
+                f"Error in telemetry queue processor (shard={shard}): {e}",
+                exc_info=True,
+            )
+            await asyncio.sleep(s.queue_error_retry_delay_sec)
+
+
+async def _monitor_telemetry_shard_health(queue, shard: int) -> None:
+    """Low-frequency таймер health-gauge для blocking режима (без reclaim — см. consumer)."""
+    s = get_settings()
+    interval_sec = max(0.1, float(getattr(s, "telemetry_queue_health_interval_sec", 5.0)))
+
+    while not _shutdown_event().is_set():
+        try:
+            await _refresh_shard_health(queue, shard)
+        except Exception as e:
+            logger.warning(
+                "Telemetry queue health refresh failed (shard=%s): %s",
+                shard,
+                e,
+            )
+        await _wait_for_shutdown(interval_sec)
+
+
+async def _wait_for_shutdown(timeout_sec: float) -> None:
+    event = _shutdown_event()
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout_sec)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def process_telemetry_queue() -> None:
+    """
+    Фоновая задача для обработки очереди телеметрии из Redis.
+
+    Запускает по одному consumer на шард ``TelemetryQueue`` (TELEMETRY_CONSUMER_WORKERS);
+    TELEMETRY_QUEUE_POP_MODE выбирает polling или blocking чтение.
+    """
+    queue = _get_telemetry_queue()
+    shard_count = _queue_shard_count(queue)
+    shard_queues = [queue] if shard_count <= 1 else queue.shards()
+    pop_mode = _resolve_pop_mode(get_settings())
+
+    logger.info(
+        "Starting telemetry queue processor: workers=%s, pop_mode=%s",
+        len(shard_queues),
+        pop_mode,
+    )
+
+    workers = []
+    for shard, shard_queue in enumerate(shard_queues):
+        if pop_mode == POP_MODE_BLOCKING:
+            workers.append(_consume_telemetry_shard_blocking(shard_queue, shard))
+            workers.append(_monitor_telemetry_shard_health(shard_queue, shard))
+        else:
+            workers.append(_consume_telemetry_shard(shard_queue, shard))
+    await asyncio.gather(*workers)
+
     logger.info(
         "Shutting down telemetry queue processor, processing remaining items..."
     )
-    await _drain_telemetry_queue_on_shutdown()
+    if len(shard_queues) <= 1:
+        await _drain_telemetry_queue_on_shutdown()
+    else:
+        await asyncio.gather(
+            *(_drain_telemetry_queue_on_shutdown(shard_queue) for shard_queue in shard_queues)
+        )
     logger.info("Telemetry queue processor stopped")
@@ -370,7 +370,8 @@ async def test_handle_command_response_state_persists_irr_snapshot_event():
     with patch("mqtt_handlers.fetch", new_callable=AsyncMock) as mock_fetch, \
          patch("mqtt_handlers.deliver_status_to_laravel", new_callable=AsyncMock) as mock_send, \
          patch("mqtt_handlers.record_simulation_event", new_callable=AsyncMock), \
-         patch("mqtt_handlers.create_zone_event", new_callable=AsyncMock) as mock_create_zone_event:
+         patch("mqtt_handlers.create_zone_event", new_callable=AsyncMock) as mock_create_zone_event, \
+         patch("mqtt_handlers.notify_zone_event_ingested", new_callable=AsyncMock) as mock_notify_zone_event:
         mock_fetch.return_value = [{"status": "SENT", "zone_id": 7, "cmd": "state"}]
         mock_send.return_value = _delivery_result(delivered=True)
 
@@ -382,6 +383,11 @@ async def test_handle_command_response_state_persists_irr_snapshot_event():
         assert args[1] == "IRR_STATE_SNAPSHOT"
         assert args[2]["snapshot"]["clean_level_max"] is True
         assert args[2]["snapshot"]["solution_level_max"] is False
+        mock_notify_zone_event.assert_awaited_once()
+        notify_kwargs = mock_notify_zone_event.await_args.kwargs
+        assert notify_kwargs["zone_id"] == 7
+        assert notify_kwargs["event_type"] == "IRR_STATE_SNAPSHOT"
+        assert notify_kwargs["payload"]["cmd_id"] == "cmd-state-1"
 
 
 @pytest.mark.asyncio
@@ -413,7 +419,8 @@ async def test_handle_command_response_storage_state_persists_snapshot_even_with
     with patch("mqtt_handlers.fetch", new_callable=AsyncMock) as mock_fetch, \
          patch("mqtt_handlers.deliver_status_to_laravel", new_callable=AsyncMock) as mock_send, \
          patch("mqtt_handlers.record_simulation_event", new_callable=AsyncMock), \
-         patch("mqtt_handlers.create_zone_event", new_callable=AsyncMock) as mock_create_zone_event:
+         patch("mqtt_handlers.create_zone_event", new_callable=AsyncMock) as mock_create_zone_event, \
+         patch("mqtt_handlers.notify_zone_event_ingested", new_callable=AsyncMock):
         # cmd != state, но канал storage_state — snapshot всё равно должен попасть в zone_events.
         mock_fetch.return_value = [{"status": "SENT", "zone_id": 7, "cmd": "set_fault_mode"}]
         mock_send.return_value = _delivery_result(delivered=True)
@@ -18,7 +18,7 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 services_dir = os.path.dirname(current_dir)
 sys.path.insert(0, services_dir)
 
-from common.redis_queue import PopBatchResult, TelemetryQueueItem
+from common.redis_queue import PopBatchResult, QueueHealthSnapshot, TelemetryQueueItem
 
 
 class TestExtractZoneIdFromUid:
@@ -112,12 +112,13 @@ class TestMetrics:
         from unittest.mock import AsyncMock
         
         mock_queue = AsyncMock()
-        mock_queue.size = AsyncMock(return_value=100)
-        mock_queue.processing_size = AsyncMock(return_value=0)
+        mock_queue.snapshot_health = AsyncMock(
+            return_value=QueueHealthSnapshot(
+                shard=0, size=100, processing_size=0, oldest_age_seconds=None, dead_list_size=0
+            )
+        )
         mock_queue.pop_batch = AsyncMock(return_value=PopBatchResult())
         mock_queue.total_pending_size = AsyncMock(return_value=0)
-        mock_queue.get_oldest_age_seconds = AsyncMock(return_value=None)
-        mock_queue.dead_list_size = AsyncMock(return_value=0)
         mock_queue.reclaim_processing = AsyncMock(return_value=0)
         
         # Создаем mock для shutdown_event
@@ -144,8 +145,8 @@ class TestMetrics:
             # Запускаем процессор (он завершится после первой итерации)
             await process_telemetry_queue()
             
-            # Проверяем, что size был вызван
-            assert mock_queue.size.called
+            # Проверяем, что health-снимок очереди был снят
+            assert mock_queue.snapshot_health.called
     
     @pytest.mark.asyncio
     async def test_telemetry_processing_duration_metric(self):
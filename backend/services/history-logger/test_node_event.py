@@ -80,7 +80,10 @@ async def test_handle_node_event_storage_state_state_fallback_persists_irr_snaps
         assert snapshot_args[2]["snapshot"]["clean_level_max"] is True
         assert snapshot_args[2]["snapshot"]["pump_main"] is False
 
-        mock_notify_zone_event.assert_awaited_once()
+        assert mock_notify_zone_event.await_count == 2
+        snapshot_notify = mock_notify_zone_event.await_args_list[1].kwargs
+        assert snapshot_notify["event_type"] == "IRR_STATE_SNAPSHOT"
+        assert snapshot_notify["payload"]["cmd_id"] == "cmd-state-event-legacy"
         mock_event_received.labels.assert_called_once_with(event_code="CLEAN_FILL_COMPLETED")
         mock_event_unknown.inc.assert_not_called()
 
@@ -132,7 +135,10 @@ async def test_handle_node_event_storage_state_snapshot_persists_irr_snapshot_ev
         assert snapshot_args[2]["snapshot"]["pump_main"] is False
         assert "valve_irrigation" not in snapshot_args[2]["snapshot"]
 
-        mock_notify_zone_event.assert_awaited_once()
+        assert mock_notify_zone_event.await_count == 2
+        snapshot_notify = mock_notify_zone_event.await_args_list[1].kwargs
+        assert snapshot_notify["event_type"] == "IRR_STATE_SNAPSHOT"
+        assert snapshot_notify["payload"]["cmd_id"] == "cmd-state-event-1"
         mock_event_received.labels.assert_called_once_with(event_code="CLEAN_FILL_COMPLETED")
         mock_event_unknown.inc.assert_not_called()
 
@@ -164,7 +170,7 @@ async def test_handle_node_event_irrigation_solution_low_notifies_payload_for_ae
 
         assert mock_fetch.await_count >= 1
         assert mock_create_zone_event.await_count == 2
-        notify_kwargs = mock_notify_zone_event.await_args.kwargs
+        notify_kwargs = mock_notify_zone_event.await_args_list[0].kwargs
         assert notify_kwargs["zone_id"] == 7
         assert notify_kwargs["event_type"] == "IRRIGATION_SOLUTION_LOW"
         assert notify_kwargs["payload"]["channel"] == "storage_state"
@@ -0,0 +1,67 @@
+"""Тесты адаптивного batch size / flush deadline consumer'а телеметрии."""
+from types import SimpleNamespace
+
+import telemetry_processing as tp
+from metrics import TELEMETRY_ADAPTIVE_BATCH_SIZE, TELEMETRY_ADAPTIVE_FLUSH_MS
+from telemetry.batch_controller import AdaptiveBatchBounds, AdaptiveBatchController
+
+BOUNDS = AdaptiveBatchBounds(
+    min_batch=100,
+    max_batch=2000,
+    min_flush_ms=20,
+    max_flush_ms=1000,
+    target_write_ms=250,
+    lag_threshold_sec=5,
+)
+
+
+def test_saturated_queue_grows_batch_and_deadline_within_bounds():
+    controller = AdaptiveBatchController(BOUNDS, initial_batch=500, initial_flush_ms=200)
+
+    for _ in range(30):
+        controller.observe(rows=controller.batch_size, write_seconds=0.05, saturated=True)
+
+    assert controller.batch_size == 2000
+    assert controller.flush_ms == 1000
+
+
+def test_slow_writes_shrink_batch_even_under_load():
+    controller = AdaptiveBatchController(BOUNDS, initial_batch=1000, initial_flush_ms=200)
+
+    controller.observe(rows=1000, write_seconds=0.8, saturated=True)
+    assert controller.batch_size == 700
+    for _ in range(20):
+        controller.observe(rows=controller.batch_size, write_seconds=0.8, saturated=True)
+    assert controller.batch_size == 100
+
+
+def test_light_load_cuts_flush_deadline_and_keeps_batch():
+    controller = AdaptiveBatchController(BOUNDS, initial_batch=1000, initial_flush_ms=200)
+
+    for _ in range(5):
+        controller.observe(rows=3, write_seconds=0.01, saturated=False, queue_age_sec=0.1)
+
+    assert controller.flush_ms == 20
+    assert controller.batch_size == 1000
+
+
+def test_lagging_queue_counts_as_saturated():
+    controller = AdaptiveBatchController(BOUNDS, initial_batch=200, initial_flush_ms=100)
+
+    controller.observe(rows=200, write_seconds=0.05, saturated=False, queue_age_sec=30)
+
+    assert controller.batch_size > 200
+    assert controller.flush_ms == 150
+
+
+def test_batch_decision_publishes_static_values_when_disabled():
+    settings = SimpleNamespace(
+        telemetry_batch_size=300,
+        telemetry_flush_ms=150,
+        telemetry_adaptive_batch_enabled=False,
+    )
+
+    assert tp._build_batch_controller(settings) is None
+    assert tp._batch_decision(settings, None, 7) == (300, 150)
+    assert TELEMETRY_ADAPTIVE_BATCH_SIZE.labels(shard="7")._value.get() == 300
+    assert TELEMETRY_ADAPTIVE_FLUSH_MS.labels(shard="7")._value.get() == 150
@@ -2,6 +2,7 @@
 Тесты для batch processing в history-logger.
 Проверяет кеширование, batch resolve, batch insert и batch upsert.
 """
+import asyncio
 import time
 from datetime import datetime
 from common.utils.time import utcnow
@@ -355,3 +356,117 @@ async def test_sensor_fk_violation_clears_caches_and_stops_batch():
         assert _zone_greenhouse_cache == {}
         assert tp._cache_last_update == 0.0
         assert not mock_execute.called
+
+
+@pytest.mark.asyncio
+async def test_unknown_node_is_negative_cached_between_batches():
+    with patch('telemetry_processing.fetch', new_callable=AsyncMock) as mock_fetch:
+        _node_cache.clear()
+        mock_fetch.return_value = []
+
+        keys = [('nd-unknown', 'gh-1')]
+        assert await tp._cache_get_many_or_load(_node_cache, keys, tp._load_node_infos) == {}
+        queries_after_first = mock_fetch.await_count
+        assert await tp._cache_get_many_or_load(_node_cache, keys, tp._load_node_infos) == {}
+
+        # Первый промах: запрос по (uid, gh_uid) + fallback по uid; второй — из negative cache.
+        assert queries_after_first == 2
+        assert mock_fetch.await_count == 2
+        assert _node_cache.is_negative(('nd-unknown', 'gh-1'))
+        _node_cache.clear()
+
+
+def test_cache_invalidation_notify_drops_node_and_zone_entries():
+    _zone_cache.clear()
+    _node_cache.clear()
+    _zone_greenhouse_cache.clear()
+    _zone_cache[('zn-1', 'gh-1')] = 1
+    _zone_cache[('zn-2', 'gh-1')] = 2
+    _zone_greenhouse_cache[1] = 99
+    _node_cache[('nd-1', 'gh-1')] = (10, 1, None)
+    _node_cache[('nd-1', None)] = (10, 1, None)
+    _node_cache[('nd-2', 'gh-1')] = (11, 2, None)
+
+    tp._handle_cache_invalidation('{"entity": "node", "id": 10, "uid": "nd-1", "op": "UPDATE"}')
+    assert set(_node_cache) == {('nd-2', 'gh-1')}
+
+    _node_cache[('nd-3', 'gh-1')] = (12, 1, None)
+    tp._handle_cache_invalidation('{"entity": "zone", "id": 1, "uid": "zn-1", "op": "UPDATE"}')
+    assert set(_zone_cache) == {('zn-2', 'gh-1')}
+    assert 1 not in _zone_greenhouse_cache
+    assert set(_node_cache) == {('nd-2', 'gh-1')}
+
+    tp._handle_cache_invalidation('not json')
+    _zone_cache.clear()
+    _node_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_expired_cache_ttl_refreshes_in_background_without_blocking_batch():
+    release = asyncio.Event()
+    refresh_calls = 0
+
+    async def slow_refresh():
+        nonlocal refresh_calls
+        refresh_calls += 1
+        await release.wait()
+        tp._cache_last_update = time.time()
+
+    with patch('telemetry_processing.refresh_caches', new=slow_refresh):
+        tp._cache_last_update = time.time() - tp._cache_ttl - 1
+        await asyncio.wait_for(tp._ensure_caches_fresh(), timeout=1.0)
+        await asyncio.wait_for(tp._ensure_caches_fresh(), timeout=1.0)
+        await asyncio.sleep(0)
+        assert refresh_calls == 1
+
+        release.set()
+        await tp._cache_refresh_task
+        assert time.time() - tp._cache_last_update < tp._cache_ttl
+
+
+@pytest.mark.asyncio
+async def test_refresh_caches_swaps_snapshot_after_all_queries():
+    _zone_cache.clear()
+    _node_cache.clear()
+    _zone_cache[('zn-old', 'gh-1')] = 1
+    _node_cache[('nd-old', 'gh-1')] = (10, 1, None)
+    seen_during_refresh = []
+
+    async def fetch_side_effect(query, *args):
+        seen_during_refresh.append((set(_zone_cache), set(_node_cache)))
+        if 'FROM zones' in query:
+            return [{'id': 2, 'uid': 'zn-new', 'gh_uid': 'gh-1', 'greenhouse_id': 7}]
+        return [{'id': 20, 'uid': 'nd-new', 'zone_id': 2, 'pending_zone_id': None, 'gh_uid': 'gh-1'}]
+
+    with patch('telemetry_processing.fetch', new=AsyncMock(side_effect=fetch_side_effect)):
+        await refresh_caches()
+
+    # Пока идут запросы, читатели видят прежний снимок целиком.
+    assert seen_during_refresh == [({('zn-old', 'gh-1')}, {('nd-old', 'gh-1')})] * 2
+    assert set(_zone_cache) == {('zn-new', 'gh-1'), ('zn-new', None)}
+    assert _node_cache[('nd-new', 'gh-1')] == (20, 2, None)
+    assert _zone_greenhouse_cache[2] == 7
+
+
+@pytest.mark.asyncio
+async def test_refresh_caches_keeps_invalidation_received_during_refresh():
+    _zone_cache.clear()
+    _node_cache.clear()
+
+    async def fetch_side_effect(query, *args):
+        if 'FROM zones' in query:
+            return [{'id': 2, 'uid': 'zn-new', 'gh_uid': 'gh-1', 'greenhouse_id': 7}]
+        # Узел перепривязан, пока refresh ждал запрос nodes: прочитанная строка устарела.
+        tp._handle_cache_invalidation('{"entity": "node", "id": 20, "uid": "nd-moved", "op": "UPDATE"}')
+        return [
+            {'id': 20, 'uid': 'nd-moved', 'zone_id': 2, 'pending_zone_id': None, 'gh_uid': 'gh-1'},
+            {'id': 21, 'uid': 'nd-other', 'zone_id': 2, 'pending_zone_id': None, 'gh_uid': 'gh-1'},
+        ]
+
+    with patch('telemetry_processing.fetch', new=AsyncMock(side_effect=fetch_side_effect)):
+        await refresh_caches()
+
+    assert ('nd-moved', 'gh-1') not in _node_cache
+    assert ('nd-moved', None) not in _node_cache
+    assert _node_cache[('nd-other', 'gh-1')] == (21, 2, None)
+    assert _zone_cache[('zn-new', 'gh-1')] == 2
@@ -0,0 +1,186 @@
+"""
+Тесты COPY write engine для telemetry_samples.
+Проверяет бисекцию отказов, раскладку rejects в dead/requeue и выбор движка по настройке.
+"""
+import time
+from dataclasses import replace
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import telemetry_processing as tp
+from common.env import get_settings
+from common.redis_queue import QueueEntry, TelemetryQueueItem
+from common.utils.time import utcnow
+from models import TelemetrySampleModel
+from telemetry.sample_writer import (
+    STAGE_COLUMNS,
+    STAGE_TABLE,
+    SampleRow,
+    copy_merge_chunk,
+    write_samples_copy,
+)
+
+
+def _rows(count: int) -> list[SampleRow]:
+    return [
+        SampleRow(
+            sensor_id=100 + idx,
+            ts=datetime(2026, 1, 1, 0, 0, idx),
+            zone_id=1,
+            value=float(idx),
+            quality="GOOD",
+            metadata={"metric_type": "PH"},
+        )
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_write_samples_copy_bisects_to_isolate_bad_rows():
+    rows = _rows(16)
+    bad = {3, 11}
+    calls: list[list[int]] = []
+
+    async def _merge(conn, all_rows, indexes):
+        calls.append(list(indexes))
+        if bad & set(indexes):
+            raise ValueError("invalid input value")
+        return set(indexes)
+
+    result = await write_samples_copy(rows, conn=object(), merge_chunk=_merge)
+
+    assert [idx for idx, _ in result.rejected] == [3, 11]
+    assert result.written == [idx for idx in range(16) if idx not in bad]
+    assert result.filtered == []
+    # Каждая плохая строка изолируется за O(log n) chunk-ов, а не построчным INSERT.
+    assert result.round_trips == len(calls) < 2 * len(rows)
+
+
+@pytest.mark.asyncio
+async def test_write_samples_copy_reports_join_filtered_rows():
+    rows = _rows(4)
+
+    async def _merge(conn, all_rows, indexes):
+        return {idx for idx in indexes if idx != 2}
+
+    result = await write_samples_copy(rows, conn=object(), merge_chunk=_merge)
+
+    assert result.written == [0, 1, 3]
+    assert result.filtered == [2]
+    assert result.round_trips == 1
+
+
+@pytest.mark.asyncio
+async def test_write_samples_copy_propagates_transport_errors():
+    async def _merge(conn, all_rows, indexes):
+        raise ConnectionError("connection reset")
+
+    with pytest.raises(ConnectionError):
+        await write_samples_copy(
+            _rows(4),
+            conn=object(),
+            merge_chunk=_merge,
+            is_transport_error=lambda exc: isinstance(exc, ConnectionError),
+        )
+
+
+@pytest.mark.asyncio
+async def test_copy_merge_chunk_streams_records_into_staging_table():
+    conn = MagicMock()
+    conn.transaction.return_value.__aenter__ = AsyncMock(return_value=None)
+    conn.transaction.return_value.__aexit__ = AsyncMock(return_value=None)
+    conn.execute = AsyncMock()
+    conn.copy_records_to_table = AsyncMock()
+    conn.fetch = AsyncMock(return_value=[{"seq": 0}, {"seq": 2}])
+
+    written = await copy_merge_chunk(conn, _rows(3), [0, 1, 2])
+
+    assert written == {0, 2}
+    assert "CREATE TEMP TABLE IF NOT EXISTS" in conn.execute.call_args.args[0]
+    copy_call = conn.copy_records_to_table.call_args
+    assert copy_call.args[0] == STAGE_TABLE
+    assert copy_call.kwargs["columns"] == STAGE_COLUMNS
+    records = copy_call.kwargs["records"]
+    assert [record[0] for record in records] == [0, 1, 2]
+    assert records[0][-1] == '{"metric_type": "PH"}'
+    merge_sql = conn.fetch.call_args.args[0]
+    assert "INSERT INTO telemetry_samples" in merge_sql
+    assert "JOIN sensors s" in merge_sql
+
+
+def _queue_entry(metric_type: str) -> QueueEntry:
+    item = TelemetryQueueItem(
+        node_uid="nd-1",
+        zone_uid="zn-1",
+        gh_uid="gh-1",
+        metric_type=metric_type,
+        value=1.0,
+        ts=utcnow(),
+    )
+    return QueueEntry(raw=item.to_json(), item=item)
+
+
+@pytest.mark.asyncio
+async def test_process_batch_with_copy_engine_routes_rejects_per_row():
+    tp._zone_cache.clear()
+    tp._node_cache.clear()
+    tp._sensor_cache.clear()
+    tp._cache_last_update = time.time()
+    tp._zone_cache[("zn-1", "gh-1")] = 1
+    tp._node_cache[("nd-1", "gh-1")] = (10, 1)
+    tp._sensor_cache[(1, 10, "PH", "PH")] = 101
+    tp._sensor_cache[(1, 10, "EC", "EC")] = 102
+    tp._sensor_cache[(1, 10, "TEMPERATURE", "TEMPERATURE")] = 103
+
+    entries = [_queue_entry("PH"), _queue_entry("EC"), _queue_entry("TEMPERATURE")]
+    samples = [
+        TelemetrySampleModel(
+            zone_uid="zn-1",
+            gh_uid="gh-1",
+            node_uid="nd-1",
+            metric_type=entry.item.metric_type,
+            value=1.0,
+            ts=entry.item.ts,
+        )
+        for entry in entries
+    ]
+
+    async def _fetch(query, *args):
+        if "ANY($1::bigint[])" in str(query):
+            return [{"id": 101}, {"id": 102}, {"id": 103}]
+        return []
+
+    fk_error = Exception('insert violates foreign key constraint "telemetry_samples_sensor_id_foreign"')
+    copy_result = SimpleNamespace(
+        written=[0],
+        filtered=[],
+        rejected=[(1, fk_error), (2, ValueError("numeric field overflow"))],
+        round_trips=5,
+    )
+    settings = replace(get_settings(), telemetry_write_engine="copy")
+
+    with patch("telemetry_processing.get_settings", return_value=settings), \
+         patch("telemetry_processing.fetch", new_callable=AsyncMock) as mock_fetch, \
+         patch("telemetry_processing.execute", new_callable=AsyncMock), \
+         patch("telemetry_processing.write_samples_copy", new_callable=AsyncMock) as mock_copy:
+        mock_fetch.side_effect = _fetch
+        mock_copy.return_value = copy_result
+
+        result = await tp.process_telemetry_batch(samples, entries=entries)
+
+    rows = mock_copy.call_args.args[0]
+    assert [row.sensor_id for row in rows] == [101, 102, 103]
+    assert not any("telemetry_samples" in str(call.args[0]) for call in mock_fetch.call_args_list)
+    assert result.processed_count == 1
+    assert result.entries_to_dead == [entries[1]]
+    assert result.entries_to_requeue == [entries[2]]
+    assert result.entries_to_ack(entries) == [entries[0]]
+
+
+def test_unknown_write_engine_falls_back_to_unnest():
+    settings = SimpleNamespace(telemetry_write_engine="bulk")
+    assert tp._resolve_write_engine(settings) == "unnest"
+    assert tp._resolve_write_engine(SimpleNamespace(telemetry_write_engine="COPY")) == "copy"
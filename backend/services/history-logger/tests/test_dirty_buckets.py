@@ -0,0 +1,54 @@
+"""
+Тесты отметки опоздавших минут telemetry_dirty_buckets.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import telemetry_processing
+from telemetry.dirty_buckets import MARK_DIRTY_SQL, late_bucket_candidates, mark_dirty_buckets
+
+
+def test_late_bucket_candidates_skip_current_minute_and_dedupe():
+    now = datetime(2026, 1, 1, 12, 30, 40)
+    candidates = late_bucket_candidates(
+        [
+            (10, datetime(2026, 1, 1, 12, 30, 5), 1),  # текущая минута
+            (10, datetime(2026, 1, 1, 11, 2, 1), 1),
+            (10, datetime(2026, 1, 1, 11, 2, 59), 1),
+            (11, datetime(2026, 1, 1, 12, 29, 59), None),
+        ],
+        now=now,
+    )
+
+    assert candidates == {
+        (10, datetime(2026, 1, 1, 11, 2)): 1,
+        (11, datetime(2026, 1, 1, 12, 29)): None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_mark_dirty_buckets_sends_one_unnest_statement():
+    execute = AsyncMock()
+    await mark_dirty_buckets(execute, {(10, datetime(2026, 1, 1, 11, 2)): 1})
+    await mark_dirty_buckets(execute, {})
+
+    execute.assert_awaited_once_with(MARK_DIRTY_SQL, [10], [datetime(2026, 1, 1, 11, 2)], [1])
+
+
+def test_mark_dirty_sql_does_not_compare_with_watermark():
+    # Батч, закоммиченный между чтением среза catch-up и сдвигом last_ts, лежит
+    # за старым watermark — сравнение с ним потеряло бы эти минуты.
+    assert "d.bucket < a.last_ts" not in MARK_DIRTY_SQL
+    assert "a.last_ts IS NOT NULL" in MARK_DIRTY_SQL
+
+
+@pytest.mark.asyncio
+async def test_mark_late_buckets_failure_does_not_raise():
+    items = [{"sensor_id": 10, "zone_id": 1, "sample": SimpleNamespace(ts=datetime(2020, 1, 1, 0, 0, 1))}]
+    with patch.object(telemetry_processing, "execute", new=AsyncMock(side_effect=RuntimeError("no table"))) as execute:
+        await telemetry_processing._mark_late_buckets(items)
+
+    execute.assert_awaited_once()
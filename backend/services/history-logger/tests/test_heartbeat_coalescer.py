@@ -0,0 +1,125 @@
+"""
+Тесты коалесцирования heartbeat-обновлений nodes.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from handlers import heartbeat_status
+from handlers.heartbeat_coalescer import (
+    KEY_HARDWARE_ID,
+    KEY_UID,
+    UPDATE_BY_HARDWARE_ID_SQL,
+    UPDATE_BY_UID_SQL,
+    HeartbeatCoalescer,
+)
+
+
+@pytest.mark.asyncio
+async def test_heartbeats_in_window_are_merged_into_one_update():
+    fetch = AsyncMock(return_value=[{"key": "nd-1", "uid": "nd-1"}])
+    coalescer = HeartbeatCoalescer(fetch, flush_ms=20)
+
+    results = await asyncio.gather(
+        coalescer.submit(key_kind=KEY_UID, key="nd-1", uptime_seconds=10, rssi=-60),
+        coalescer.submit(key_kind=KEY_UID, key="nd-1", uptime_seconds=11, free_heap_bytes=1000),
+        coalescer.submit(key_kind=KEY_UID, key="nd-missing", uptime_seconds=5),
+    )
+
+    assert results == ["nd-1", "nd-1", None]
+    fetch.assert_awaited_once()
+    sql, keys, uptimes, heaps, rssis, fw_versions, ages = fetch.await_args.args
+    assert sql == UPDATE_BY_UID_SQL
+    assert keys == ["nd-1", "nd-missing"]
+    assert uptimes == [11, 5]
+    assert heaps == [1000, None]
+    assert rssis == [-60, None]
+    assert fw_versions == [None, None]
+    assert all(0.0 <= age < 1.0 for age in ages)
+
+
+@pytest.mark.asyncio
+async def test_temp_topic_heartbeats_update_by_hardware_id():
+    fetch = AsyncMock(side_effect=[
+        [{"key": "nd-1", "uid": "nd-1"}],
+        [{"key": "esp32-aa", "uid": "nd-2"}],
+    ])
+    coalescer = HeartbeatCoalescer(fetch, flush_ms=10)
+
+    results = await asyncio.gather(
+        coalescer.submit(key_kind=KEY_UID, key="nd-1"),
+        coalescer.submit(key_kind=KEY_HARDWARE_ID, key="esp32-aa"),
+    )
+
+    assert results == ["nd-1", "nd-2"]
+    assert [call.args[0] for call in fetch.await_args_list] == [UPDATE_BY_UID_SQL, UPDATE_BY_HARDWARE_ID_SQL]
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_window_without_waiting_for_interval():
+    fetch = AsyncMock(return_value=[{"key": "nd-1", "uid": "nd-1"}])
+    coalescer = HeartbeatCoalescer(fetch, flush_ms=60_000)
+
+    pending = asyncio.create_task(coalescer.submit(key_kind=KEY_UID, key="nd-1"))
+    await asyncio.sleep(0)
+    await asyncio.wait_for(coalescer.flush(), timeout=1.0)
+
+    assert await pending == "nd-1"
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_write_failure_propagates_to_every_waiter():
+    coalescer = HeartbeatCoalescer(AsyncMock(side_effect=RuntimeError("db down")), flush_ms=5)
+
+    results = await asyncio.gather(
+        coalescer.submit(key_kind=KEY_UID, key="nd-1"),
+        coalescer.submit(key_kind=KEY_UID, key="nd-2"),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_handle_heartbeat_coalesced_and_status_update_flushes_first():
+    calls: list[str] = []
+
+    async def _fetch(sql, *args):
+        calls.append("heartbeat_update")
+        return [{"key": key, "uid": key} for key in args[0]]
+
+    async def _execute(query, *args):
+        calls.append("status_update")
+        return "UPDATE 1"
+
+    settings = SimpleNamespace(heartbeat_coalesce_ms=60_000)
+    payload = json.dumps({"uptime": 100, "rssi": -55}).encode("utf-8")
+
+    with patch.object(heartbeat_status, "get_settings", return_value=settings), \
+         patch.object(heartbeat_status, "_heartbeat_coalescer", None), \
+         patch.object(heartbeat_status, "fetch", side_effect=_fetch), \
+         patch.object(heartbeat_status, "execute", side_effect=_execute), \
+         patch.object(heartbeat_status, "HEARTBEAT_RECEIVED") as mock_received, \
+         patch.object(heartbeat_status, "refresh_node_cache_for_uid", new=AsyncMock()), \
+         patch.object(heartbeat_status, "resolve_node_online_alert", new=AsyncMock()):
+        heartbeat = asyncio.create_task(
+            heartbeat_status.handle_heartbeat("hydro/gh-1/zn-1/nd-1/heartbeat", payload)
+        )
+        await asyncio.sleep(0)
+        assert calls == []
+
+        await heartbeat_status._update_node_status(
+            node_uid="nd-1",
+            query="UPDATE nodes SET status='offline', updated_at=NOW() WHERE uid=$1",
+            params=("nd-1",),
+            handler="lwt",
+            success_log=None,
+        )
+        await heartbeat
+
+    assert calls == ["heartbeat_update", "status_update"]
+    mock_received.labels.assert_called_once_with(node_uid="nd-1", zone="zn-1")
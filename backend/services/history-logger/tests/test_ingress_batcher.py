@@ -0,0 +1,95 @@
+"""
+Тесты накопителя MQTT ingress (pipelined push в Redis).
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from common.redis_queue import TelemetryQueueItem
+from metrics import TELEMETRY_DROPPED
+from telemetry import ingress
+from telemetry.ingress_batcher import IngressBatcher
+
+
+def _batcher(queue, **overrides):
+    params = {
+        "linger_ms": 20,
+        "batch_size": 100,
+        "max_pending": 1000,
+        "max_retries": 2,
+        "retry_backoff_base": 0.001,
+    }
+    params.update(overrides)
+    return IngressBatcher(lambda: queue, **params)
+
+
+def _item(i: int) -> TelemetryQueueItem:
+    return TelemetryQueueItem(node_uid=f"nd-{i}", metric_type="PH", value=float(i))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_one_pipelined_push():
+    queue = AsyncMock()
+    queue.push_many = AsyncMock(side_effect=lambda items: [i % 2 == 0 for i in range(len(items))])
+    batcher = _batcher(queue)
+
+    results = await asyncio.gather(
+        *(batcher.submit(_item(i), time.monotonic()) for i in range(5))
+    )
+
+    queue.push_many.assert_awaited_once()
+    assert len(queue.push_many.await_args.args[0]) == 5
+    assert results == [True, False, True, False, True]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting_for_linger():
+    queue = AsyncMock()
+    queue.push_many = AsyncMock(side_effect=lambda items: [True] * len(items))
+    batcher = _batcher(queue, linger_ms=10_000, batch_size=3)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(_item(i), time.monotonic()) for i in range(3))),
+        timeout=1.0,
+    )
+
+    assert results == [True, True, True]
+
+
+@pytest.mark.asyncio
+async def test_push_errors_are_retried_then_reported_as_failed():
+    queue = AsyncMock()
+    queue.push_many = AsyncMock(side_effect=ConnectionError("redis down"))
+    batcher = _batcher(queue)
+
+    result = await batcher.submit(_item(1), time.monotonic())
+
+    assert result is False
+    assert queue.push_many.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_handle_telemetry_drops_when_ingress_backlog_full():
+    queue = AsyncMock()
+    settings = SimpleNamespace(
+        telemetry_ingress_linger_ms=50,
+        telemetry_ingress_batch_size=1,
+        telemetry_ingress_max_pending=1,
+    )
+    payload = json.dumps({"metric_type": "PH", "value": 6.5, "ts": time.time()}).encode()
+    before = TELEMETRY_DROPPED.labels(reason="ingress_backpressure")._value.get()
+
+    with patch.object(ingress, "get_settings", return_value=settings), \
+         patch.object(ingress, "_telemetry_queue", return_value=queue), \
+         patch.object(ingress, "_ingress_batcher", None):
+        batcher = ingress._get_ingress_batcher()
+        batcher._pending.append((_item(0), time.monotonic(), asyncio.get_running_loop().create_future()))
+        await ingress.handle_telemetry("hydro/gh-1/zn-1/nd-1/ph/telemetry", payload)
+
+    after = TELEMETRY_DROPPED.labels(reason="ingress_backpressure")._value.get()
+    assert after == before + 1
+    queue.push_many.assert_not_called()
@@ -1,22 +1,25 @@
 """
 Тесты для realtime очереди history-logger.
-Проверяют coalescing, bounded queue и flush.
+Проверяют coalescing, bounded queue, flush, delta-подавление и компактный payload.
 """
+import gzip
+import json
 from unittest.mock import AsyncMock, patch
 
 import pytest
 import telemetry_processing as tp
+from telemetry.realtime_buffer import RealtimeUpdateBuffer
+from telemetry.realtime_payload import RealtimeDeltaFilter, encode_realtime_payload, parse_delta_thresholds
 from telemetry_processing import _enqueue_realtime_update, _flush_realtime_updates
 
 
-@pytest.mark.asyncio
-async def test_realtime_queue_coalesces_by_key():
+def test_realtime_queue_coalesces_by_key():
     tp._realtime_updates.clear()
 
     with patch("telemetry_processing.get_settings") as mock_settings:
         mock_settings.return_value.realtime_queue_max_size = 10
 
-        await _enqueue_realtime_update(("sensor", 1), {
+        _enqueue_realtime_update(("sensor", 1), {
             "zone_id": 1,
             "node_id": 10,
             "channel": "ph_sensor",
@@ -24,7 +27,7 @@ async def test_realtime_queue_coalesces_by_key():
             "value": 6.2,
             "timestamp": 1700000000000,
         })
-        await _enqueue_realtime_update(("sensor", 1), {
+        _enqueue_realtime_update(("sensor", 1), {
             "zone_id": 1,
             "node_id": 10,
             "channel": "ph_sensor",
@@ -38,15 +41,14 @@ async def test_realtime_queue_coalesces_by_key():
     assert update["value"] == 6.4
 
 
-@pytest.mark.asyncio
-async def test_realtime_queue_drops_oldest_when_full():
+def test_realtime_queue_drops_oldest_when_full():
     tp._realtime_updates.clear()
 
     with patch("telemetry_processing.get_settings") as mock_settings, \
          patch("telemetry_processing.REALTIME_DROPPED_UPDATES") as mock_dropped:
         mock_settings.return_value.realtime_queue_max_size = 1
 
-        await _enqueue_realtime_update(("sensor", 1), {
+        _enqueue_realtime_update(("sensor", 1), {
             "zone_id": 1,
             "node_id": 10,
             "channel": "ph_sensor",
@@ -54,7 +56,7 @@ async def test_realtime_queue_drops_oldest_when_full():
             "value": 6.2,
             "timestamp": 1700000000000,
         })
-        await _enqueue_realtime_update(("sensor", 2), {
+        _enqueue_realtime_update(("sensor", 2), {
             "zone_id": 1,
             "node_id": 11,
             "channel": "ec_sensor",
@@ -80,7 +82,7 @@ async def test_flush_realtime_updates_sends_batch():
         mock_settings.return_value.realtime_batch_max_updates = 2
         mock_broadcast.return_value = True
 
-        await _enqueue_realtime_update(("sensor", 1), {
+        _enqueue_realtime_update(("sensor", 1), {
             "zone_id": 1,
             "node_id": 10,
             "channel": "ph_sensor",
@@ -88,7 +90,7 @@ async def test_flush_realtime_updates_sends_batch():
             "value": 6.2,
             "timestamp": 1700000000000,
         })
-        await _enqueue_realtime_update(("sensor", 2), {
+        _enqueue_realtime_update(("sensor", 2), {
             "zone_id": 1,
             "node_id": 11,
             "channel": "ec_sensor",
@@ -101,3 +103,116 @@ async def test_flush_realtime_updates_sends_batch():
 
         assert mock_broadcast.called
         assert len(tp._realtime_updates) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_requeues_without_overwriting_newer_value():
+    tp._realtime_updates.clear()
+    tp._broadcast_backoff_until = None
+
+    async def broadcast_while_new_value_arrives(updates):
+        _enqueue_realtime_update(("sensor", 1), _ph_update(6.5, ts=1700000005000))
+        return False
+
+    with patch("telemetry_processing.get_settings") as mock_settings, \
+         patch("telemetry_processing._broadcast_telemetry_batch_to_laravel", side_effect=broadcast_while_new_value_arrives):
+        mock_settings.return_value.realtime_queue_max_size = 10
+        mock_settings.return_value.realtime_batch_max_updates = 10
+        mock_settings.return_value.realtime_delta_enabled = False
+
+        _enqueue_realtime_update(("sensor", 1), _ph_update(6.0))
+        _enqueue_realtime_update(("sensor", 2), {**_ph_update(1.2), "node_id": 11, "metric_type": "EC"})
+        await _flush_realtime_updates()
+
+    assert list(tp._realtime_updates) == [("sensor", 2), ("sensor", 1)]
+    assert tp._realtime_updates.drain(10)[1][1]["value"] == 6.5
+
+
+def test_buffer_put_many_reports_evictions_once():
+    evictions = []
+    sizes = []
+    buffer = RealtimeUpdateBuffer(on_evict=evictions.append, on_size=sizes.append)
+
+    buffer.put_many(((("sensor", i), {"value": i}) for i in range(5)), max_size=3)
+
+    assert list(buffer) == [("sensor", 2), ("sensor", 3), ("sensor", 4)]
+    assert evictions == [2]
+    assert sizes == [3]
+
+
+def _ph_update(value: float, ts: int = 1700000000000) -> dict:
+    return {
+        "zone_id": 1,
+        "node_id": 10,
+        "channel": "ph_sensor",
+        "metric_type": "PH",
+        "value": value,
+        "timestamp": ts,
+    }
+
+
+@pytest.mark.asyncio
+async def test_flush_suppresses_insignificant_repeats_after_success():
+    tp._realtime_updates.clear()
+    tp._broadcast_backoff_until = None
+    tp._realtime_delta_filter = RealtimeDeltaFilter({"PH": 0.01}, max_silence_sec=30)
+
+    with patch("telemetry_processing.get_settings") as mock_settings, \
+         patch("telemetry_processing._broadcast_telemetry_batch_to_laravel", new_callable=AsyncMock) as mock_broadcast:
+        mock_settings.return_value.realtime_queue_max_size = 10
+        mock_settings.return_value.realtime_batch_max_updates = 10
+        mock_settings.return_value.realtime_delta_enabled = True
+
+        mock_broadcast.return_value = False
+        _enqueue_realtime_update(("sensor", 1), _ph_update(6.0))
+        await _flush_realtime_updates()
+        # Неудачная отправка не запоминается: повтор уходит снова.
+        assert len(tp._realtime_updates) == 1
+
+        mock_broadcast.return_value = True
+        await _flush_realtime_updates()
+        assert mock_broadcast.await_count == 2
+
+        _enqueue_realtime_update(("sensor", 1), _ph_update(6.0, ts=1700000001000))
+        await _flush_realtime_updates()
+        _enqueue_realtime_update(("sensor", 1), _ph_update(6.1, ts=1700000002000))
+        await _flush_realtime_updates()
+
+    assert mock_broadcast.await_count == 3
+    assert mock_broadcast.await_args.args[0][0]["value"] == 6.1
+    tp._realtime_delta_filter = None
+
+
+def test_delta_filter_resends_after_max_silence():
+    delta = RealtimeDeltaFilter(max_silence_sec=30)
+    delta.commit([_ph_update(6.0)], now=100.0)
+
+    assert delta.split([_ph_update(6.0)], now=110.0) == ([], [_ph_update(6.0)])
+    assert delta.split([_ph_update(6.0)], now=130.0) == ([_ph_update(6.0)], [])
+    assert parse_delta_thresholds("ph:0.01, EC:x,bad") == {"PH": 0.01}
+
+
+def test_encode_columnar_gzip_payload_roundtrip():
+    updates = [_ph_update(6.0 + i / 100, ts=1700000000000 + i) for i in range(50)]
+
+    rows_body, rows_headers = encode_realtime_payload(updates)
+    body, headers = encode_realtime_payload(updates, payload_format="columnar", gzip_min_bytes=256)
+
+    assert "Content-Encoding" not in rows_headers
+    assert headers["Content-Encoding"] == "gzip"
+    assert len(body) < len(rows_body) / 4
+    decoded = json.loads(gzip.decompress(body))
+    assert decoded["format"] == "columnar"
+    assert decoded["columns"]["value"] == [u["value"] for u in updates]
+    assert decoded["columns"]["channel"][0] == "ph_sensor"
+
+
+def test_next_flush_delay_shrinks_with_queue_length():
+    with patch("telemetry_processing.get_settings") as mock_settings:
+        mock_settings.return_value.realtime_flush_ms = 500
+        mock_settings.return_value.realtime_flush_min_ms = 50
+        mock_settings.return_value.realtime_batch_max_updates = 200
+
+        assert tp._next_realtime_flush_delay(0) == pytest.approx(0.5)
+        assert tp._next_realtime_flush_delay(100) == pytest.approx(0.25)
+        assert tp._next_realtime_flush_delay(1000) == pytest.approx(0.05)
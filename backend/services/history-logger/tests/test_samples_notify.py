@@ -0,0 +1,65 @@
+"""
+Тесты NOTIFY telemetry_samples_committed с записанными семплами.
+"""
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import telemetry_processing
+from telemetry.samples_notify import (
+    NOTIFY_SAMPLES_SQL,
+    SAMPLES_NOTIFY_CHANNEL,
+    encode_samples_notify_payloads,
+    notify_written_samples,
+)
+
+
+def test_encode_payload_rows_and_skips_non_finite_values():
+    payloads = encode_samples_notify_payloads(
+        [
+            (10, datetime(2026, 1, 1, 0, 0, 1, 250000), 6.12, False),
+            (10, datetime(2026, 1, 1, 0, 0, 2), float("nan"), False),
+            (11, datetime(2026, 1, 1, 0, 0, 3), None, False),
+            (12, datetime(2026, 1, 1, 0, 0, 4), 1.5, True),
+        ]
+    )
+
+    assert len(payloads) == 1
+    assert json.loads(payloads[0]) == {
+        "s": [
+            [10, 1767225601250000, 6.12, 0],
+            [12, 1767225604000000, 1.5, 1],
+        ]
+    }
+
+
+def test_encode_payload_splits_into_chunks_under_limit():
+    samples = [(sensor_id, datetime(2026, 1, 1, 0, 0, 1), 6.0 + sensor_id / 1000, False) for sensor_id in range(500)]
+
+    payloads = encode_samples_notify_payloads(samples, max_bytes=1000)
+
+    assert len(payloads) > 1
+    assert all(len(payload.encode("utf-8")) <= 1000 for payload in payloads)
+    decoded = [row for payload in payloads for row in json.loads(payload)["s"]]
+    assert [row[0] for row in decoded] == list(range(500))
+
+
+@pytest.mark.asyncio
+async def test_notify_written_samples_sends_one_statement():
+    execute = AsyncMock()
+    await notify_written_samples(execute, ['{"s":[]}', '{"s":[[1,0,1.0,0]]}'])
+    await notify_written_samples(execute, [])
+
+    execute.assert_awaited_once_with(NOTIFY_SAMPLES_SQL, SAMPLES_NOTIFY_CHANNEL, ['{"s":[]}', '{"s":[[1,0,1.0,0]]}'])
+
+
+@pytest.mark.asyncio
+async def test_notify_written_samples_failure_does_not_raise():
+    items = [{"sensor_id": 10, "zone_id": 1, "sample": SimpleNamespace(ts=datetime(2026, 1, 1), value=6.1, stub=False)}]
+    with patch.object(telemetry_processing, "execute", new=AsyncMock(side_effect=RuntimeError("conn lost"))) as execute:
+        await telemetry_processing._notify_written_samples(items)
+
+    execute.assert_awaited_once()
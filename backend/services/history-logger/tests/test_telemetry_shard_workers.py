@@ -0,0 +1,212 @@
+"""
+Тесты параллельных consumer-воркеров очереди телеметрии (по шарду на воркер).
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import telemetry_processing as tp
+from common.redis_queue import (
+    PopBatchResult,
+    QueueEntry,
+    QueueHealthSnapshot,
+    TelemetryQueue,
+    TelemetryQueueItem,
+)
+from metrics import TELEMETRY_SHARD_QUEUE_AGE
+
+
+def _settings(**overrides):
+    values = {
+        "telemetry_batch_size": 100,
+        "telemetry_flush_ms": 0,
+        "queue_check_interval_sec": 0.01,
+        "queue_error_retry_delay_sec": 0.01,
+        "telemetry_shutdown_drain_timeout_sec": 1.0,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _snapshot(shard: int, size: int) -> QueueHealthSnapshot:
+    return QueueHealthSnapshot(
+        shard=shard,
+        size=size,
+        processing_size=0,
+        oldest_age_seconds=float(shard + 1),
+        dead_list_size=0,
+    )
+
+
+def _shard_queue(shard: int, node_uid: str) -> AsyncMock:
+    raw = TelemetryQueueItem(node_uid=node_uid, metric_type="PH", value=1.0).to_json()
+    entry = QueueEntry(raw=raw, item=TelemetryQueueItem.from_json(raw))
+    queue = AsyncMock(spec=TelemetryQueue)
+    queue.snapshot_health = AsyncMock(
+        side_effect=[_snapshot(shard, size) for size in [1] + [0] * 100]
+    )
+    queue.total_pending_size = AsyncMock(return_value=0)
+    queue.pop_batch = AsyncMock(return_value=PopBatchResult(entries=[entry]))
+    return queue
+
+
+@pytest.mark.asyncio
+async def test_process_telemetry_queue_runs_one_worker_per_shard():
+    shard_queues = [_shard_queue(0, "nd-a"), _shard_queue(1, "nd-b")]
+    root = SimpleNamespace(shard_count=2, shards=lambda: shard_queues)
+    in_flight = 0
+    max_in_flight = 0
+    handled: list[object] = []
+    shutdown = asyncio.Event()
+
+    async def _handle(pop, queue=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.02)
+        handled.append(queue)
+        in_flight -= 1
+        if len(handled) == len(shard_queues):
+            shutdown.set()
+
+    with patch("telemetry_processing._get_telemetry_queue", return_value=root), \
+         patch("telemetry_processing._shutdown_event", return_value=shutdown), \
+         patch("telemetry_processing._handle_pop_batch", side_effect=_handle), \
+         patch("telemetry_processing.get_settings", return_value=_settings()):
+        await asyncio.wait_for(tp.process_telemetry_queue(), timeout=2.0)
+
+    assert set(map(id, handled)) == set(map(id, shard_queues))
+    # Батчи разных шардов пишутся одновременно, а не по очереди.
+    assert max_in_flight == 2
+    assert TELEMETRY_SHARD_QUEUE_AGE.labels(shard="1")._value.get() == 2.0
+    for queue in shard_queues:
+        queue.total_pending_size.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_process_telemetry_queue_single_shard_uses_root_queue():
+    queue = _shard_queue(0, "nd-a")
+    shutdown = asyncio.Event()
+
+    async def _handle(pop, queue=None):
+        shutdown.set()
+
+    with patch("telemetry_processing._get_telemetry_queue", return_value=queue), \
+         patch("telemetry_processing._shutdown_event", return_value=shutdown), \
+         patch("telemetry_processing._handle_pop_batch", side_effect=_handle) as handle, \
+         patch("telemetry_processing.get_settings", return_value=_settings()):
+        await asyncio.wait_for(tp.process_telemetry_queue(), timeout=2.0)
+
+    assert handle.await_args.kwargs["queue"] is queue
+
+
+@pytest.mark.asyncio
+async def test_blocking_mode_pops_without_polling_and_refreshes_health_on_timer():
+    raw = TelemetryQueueItem(node_uid="nd-a", metric_type="PH", value=1.0).to_json()
+    entry = QueueEntry(raw=raw, item=TelemetryQueueItem.from_json(raw))
+    queue = _shard_queue(0, "nd-a")
+    queue.snapshot_health = AsyncMock(return_value=_snapshot(0, 0))
+    queue.pop_batch_blocking = AsyncMock(
+        side_effect=[PopBatchResult(entries=[entry])] + [PopBatchResult()] * 100
+    )
+    shutdown = asyncio.Event()
+
+    async def _handle(pop, queue=None):
+        await asyncio.sleep(0.05)
+        shutdown.set()
+
+    settings = _settings(
+        telemetry_queue_pop_mode="blocking",
+        telemetry_queue_block_timeout_sec=0.5,
+        telemetry_queue_health_interval_sec=10.0,
+        telemetry_flush_ms=200,
+    )
+    with patch("telemetry_processing._get_telemetry_queue", return_value=queue), \
+         patch("telemetry_processing._shutdown_event", return_value=shutdown), \
+         patch("telemetry_processing._handle_pop_batch", side_effect=_handle) as handle, \
+         patch("telemetry_processing.get_settings", return_value=settings):
+        await asyncio.wait_for(tp.process_telemetry_queue(), timeout=2.0)
+
+    handle.assert_awaited_once()
+    queue.pop_batch.assert_not_called()
+    assert queue.pop_batch_blocking.await_args.kwargs == {
+        "block_timeout_sec": 0.5,
+        "linger_ms": 200,
+    }
+    # Health gauges считаются таймером один раз, а не на каждой итерации consumer.
+    assert queue.snapshot_health.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_blocking_consumer_backs_off_when_redis_is_down():
+    """Redis недоступен: consumer ждёт queue_error_retry_delay_sec, а не крутит BLMOVE."""
+    queue = _shard_queue(0, "nd-a")
+    queue.pop_batch_blocking = AsyncMock(side_effect=ConnectionError("redis down"))
+    shutdown = asyncio.Event()
+    settings = _settings(
+        telemetry_queue_block_timeout_sec=1.0,
+        queue_error_retry_delay_sec=0.1,
+    )
+
+    with patch("telemetry_processing._shutdown_event", return_value=shutdown), \
+         patch("telemetry_processing.get_settings", return_value=settings):
+        consumer = asyncio.create_task(tp._consume_telemetry_shard_blocking(queue, 0))
+        await asyncio.sleep(0.35)
+        shutdown.set()
+        await asyncio.wait_for(consumer, timeout=1.0)
+
+    assert 1 <= queue.pop_batch_blocking.await_count <= 5
+
+
+@pytest.mark.asyncio
+async def test_blocking_mode_reclaims_only_between_batches(monkeypatch):
+    """Health-таймер не возвращает в очередь батч, который consumer ещё пишет."""
+    raw = TelemetryQueueItem(node_uid="nd-a", metric_type="PH", value=1.0).to_json()
+    entry = QueueEntry(raw=raw, item=TelemetryQueueItem.from_json(raw))
+    queue = _shard_queue(0, "nd-a")
+    # В processing list лежит батч, который сейчас пишется.
+    queue.snapshot_health = AsyncMock(
+        return_value=QueueHealthSnapshot(shard=0, size=0, processing_size=1, oldest_age_seconds=0.0, dead_list_size=0)
+    )
+    batches = [PopBatchResult(entries=[entry])]
+
+    async def _pop(batch_size, **kwargs):
+        await asyncio.sleep(0.01)
+        return batches.pop() if batches else PopBatchResult()
+
+    queue.pop_batch_blocking = AsyncMock(side_effect=_pop)
+    in_flight = False
+    reclaimed_in_flight = []
+
+    async def _reclaim():
+        reclaimed_in_flight.append(in_flight)
+        return 0
+
+    queue.reclaim_processing = AsyncMock(side_effect=_reclaim)
+    shutdown = asyncio.Event()
+
+    async def _handle(pop, queue=None):
+        nonlocal in_flight
+        in_flight = True
+        await asyncio.sleep(0.3)
+        in_flight = False
+
+    monkeypatch.setenv("TELEMETRY_PROCESSING_RECLAIM_INTERVAL_SEC", "0")
+    settings = _settings(
+        telemetry_queue_pop_mode="blocking",
+        telemetry_queue_block_timeout_sec=0.01,
+        telemetry_queue_health_interval_sec=0.01,
+    )
+    with patch("telemetry_processing._get_telemetry_queue", return_value=queue), \
+         patch("telemetry_processing._shutdown_event", return_value=shutdown), \
+         patch("telemetry_processing._handle_pop_batch", side_effect=_handle), \
+         patch("telemetry_processing.get_settings", return_value=settings):
+        task = asyncio.create_task(tp.process_telemetry_queue())
+        await asyncio.sleep(0.5)
+        shutdown.set()
+        await asyncio.wait_for(task, timeout=2.0)
+
+    assert queue.snapshot_health.await_count >= 3
+    assert reclaimed_in_flight and not any(reclaimed_in_flight)
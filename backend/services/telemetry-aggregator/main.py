@@ -6,13 +6,15 @@ Telemetry Aggregator - агрегация телеметрии.
 import asyncio
 import logging
 import os
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from common.utils.time import utcnow, utcnow_naive
 from common.env import get_settings
 from common.db import fetch, execute
 from common.simulation_events import record_simulation_event
-from prometheus_client import Counter, Histogram, start_http_server
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
 from common.logging_setup import setup_standard_logging, install_exception_handlers
 
 logger = logging.getLogger(__name__)
@@ -24,6 +26,21 @@ AGGREGATION_ERRORS = Counter("aggregation_errors_total", "Aggregation errors", [
 CLEANUP_RUNS = Counter("cleanup_runs_total", "Cleanup runs")
 CLEANUP_DELETED = Counter("cleanup_deleted_total", "Deleted records", ["table"])
 CLEANUP_LAT = Histogram("cleanup_seconds", "Cleanup duration seconds")
+CLEANUP_BACKLOG = Gauge(
+    "cleanup_backlog_rows",
+    "Estimated rows still older than the retention cutoff (capped by CLEANUP_BACKLOG_ESTIMATE_CAP)",
+    ["table"],
+)
+CLEANUP_DROPPED_CHUNKS = Counter("cleanup_dropped_chunks_total", "Chunks dropped by drop_chunks retention", ["table"])
+AGGREGATION_DIRTY_BUCKETS = Counter(
+    "aggregation_dirty_buckets_total",
+    "Late-data buckets (sensor, minute) re-aggregated from telemetry_dirty_buckets",
+)
+AGGREGATION_CATCHUP_LAG = Gauge(
+    "aggregation_catchup_lag_seconds",
+    "Time between now and the aggregation watermark after the last committed slice",
+    ["type"],
+)
 
 # Состояние backoff при ошибках
 _error_count = 0
@@ -177,10 +194,52 @@ async def _record_success() -> None:
 # ML Phase 1: текущая версия агрегатной формулы.
 # Меняется при изменении формулы std/slope/p10/p90 или quality-фильтра.
 # См. doc_ai/09_AI_AND_DIGITAL_TWIN/ML_FEATURE_PIPELINE.md §5.1 + Приложение C.
-AGG_VERSION_CURRENT = 2
+AGG_VERSION_CURRENT = 3
 
 
-def _build_agg_1m_query(*, bucket_expr: str) -> str:
+# Окно [start, end) для прямого прохода ($1, $2).
+_AGG_1M_WINDOW_SOURCE = """
+    FROM telemetry_samples ts
+    LEFT JOIN sensors s ON s.id = ts.sensor_id
+    WHERE ts.ts >= $1 AND ts.ts < $2"""
+
+# Пересчёт dirty bucket'ов: $1 zone_id[], $2 node_id[], $3 начало bucket'а[],
+# $4/$5 — общий диапазон для отсечения chunk'ов.
+_AGG_1M_DIRTY_SOURCE = """
+    FROM telemetry_samples ts
+    LEFT JOIN sensors s ON s.id = ts.sensor_id
+    JOIN UNNEST($1::bigint[], $2::bigint[], $3::timestamp[]) AS d(d_zone_id, d_node_id, d_bucket)
+      ON d.d_zone_id IS NOT DISTINCT FROM ts.zone_id
+     AND d.d_node_id IS NOT DISTINCT FROM s.node_id
+     AND ts.ts >= d.d_bucket AND ts.ts < d.d_bucket + interval '1 minute'
+    WHERE ts.ts >= $4 AND ts.ts < $5"""
+
+_AGG_1H_WINDOW_SOURCE = """
+    FROM telemetry_agg_1m
+    WHERE ts >= $1 AND ts < $2"""
+
+_AGG_1H_DIRTY_SOURCE = """
+    FROM telemetry_agg_1m
+    JOIN UNNEST($1::bigint[], $2::bigint[], $3::timestamp[]) AS d(d_zone_id, d_node_id, d_bucket)
+      ON d.d_zone_id IS NOT DISTINCT FROM zone_id
+     AND d.d_node_id IS NOT DISTINCT FROM node_id
+     AND ts >= d.d_bucket AND ts < d.d_bucket + interval '1 hour'
+    WHERE ts >= $4 AND ts < $5"""
+
+_AGG_DAILY_WINDOW_SOURCE = """
+    FROM telemetry_agg_1h
+    WHERE ts > $1 AND ts <= NOW()"""
+
+_AGG_DAILY_DIRTY_SOURCE = """
+    FROM telemetry_agg_1h
+    JOIN UNNEST($1::bigint[], $2::bigint[], $3::timestamp[]) AS d(d_zone_id, d_node_id, d_bucket)
+      ON d.d_zone_id IS NOT DISTINCT FROM zone_id
+     AND d.d_node_id IS NOT DISTINCT FROM node_id
+     AND ts >= d.d_bucket AND ts < d.d_bucket + interval '1 day'
+    WHERE ts >= $4 AND ts < $5"""
+
+
+def _build_agg_1m_query(*, bucket_expr: str, source: str = _AGG_1M_WINDOW_SOURCE) -> str:
     """
     SQL-шаблон для агрегации telemetry_samples → telemetry_agg_1m.
 
@@ -188,12 +247,17 @@ def _build_agg_1m_query(*, bucket_expr: str) -> str:
     по quality='GOOD' через FILTER. Классические value_avg/min/max/median —
     по всем записям (backward compat с UI и графами).
     sample_count — все записи, valid_count — только GOOD.
+    value_sum / value_sumsq / value_sketch — mergeable-сводка GOOD-семплов
+    (sketch: telemetry_sketch_from_values, миграция add_telemetry_aggregate_sketches);
+    из неё 1h/daily сливают p10/p90/std без повторного скана raw.
+    ``source`` — FROM/WHERE: окно прямого прохода или dirty bucket'ы.
     """
     return f"""
     INSERT INTO telemetry_agg_1m (
         zone_id, node_id, channel, metric_type,
         value_avg, value_min, value_max, value_median, sample_count,
         value_std, value_p10, value_p90, slope_per_min, valid_count, agg_version,
+        value_sum, value_sumsq, value_sketch,
         ts
     )
     SELECT
@@ -215,10 +279,12 @@ def _build_agg_1m_query(*, bucket_expr: str) -> str:
             FILTER (WHERE ts.quality = 'GOOD')::float AS slope_per_min,
         COUNT(*) FILTER (WHERE ts.quality = 'GOOD')::int AS valid_count,
         {AGG_VERSION_CURRENT} AS agg_version,
-        {bucket_expr} AS ts
-    FROM telemetry_samples ts
-    LEFT JOIN sensors s ON s.id = ts.sensor_id
-    WHERE ts.ts > $1 AND ts.ts <= NOW()
+        SUM(ts.value) FILTER (WHERE ts.quality = 'GOOD')::float AS value_sum,
+        SUM(ts.value * ts.value) FILTER (WHERE ts.quality = 'GOOD')::float AS value_sumsq,
+        telemetry_sketch_from_values(
+            ARRAY_AGG(ts.value) FILTER (WHERE ts.quality = 'GOOD')
+        ) AS value_sketch,
+        {bucket_expr} AS ts{source}
     GROUP BY
         ts.zone_id,
         s.node_id,
@@ -237,18 +303,46 @@ def _build_agg_1m_query(*, bucket_expr: str) -> str:
         value_p90     = EXCLUDED.value_p90,
         slope_per_min = EXCLUDED.slope_per_min,
         valid_count   = EXCLUDED.valid_count,
-        agg_version   = EXCLUDED.agg_version
+        agg_version   = EXCLUDED.agg_version,
+        value_sum     = EXCLUDED.value_sum,
+        value_sumsq   = EXCLUDED.value_sumsq,
+        value_sketch  = EXCLUDED.value_sketch
     RETURNING zone_id, ts
     """
 
 
-def _build_agg_1h_query(*, bucket_expr: str) -> str:
+# Слияние сводок дочерних bucket'ов (1m → 1h, 1h → daily). n — только строки со
+# сводкой: у строк до agg_version 3 value_sum пуст, их valid_count не учитывается.
+_SKETCH_N_SQL = "SUM(valid_count) FILTER (WHERE value_sum IS NOT NULL)"
+_SKETCH_STATS_SQL = f"""COALESCE(
+            CASE WHEN {_SKETCH_N_SQL} > 1 THEN SQRT(GREATEST(
+                (SUM(value_sumsq) - SUM(value_sum) * SUM(value_sum) / {_SKETCH_N_SQL})
+                / ({_SKETCH_N_SQL} - 1),
+                0
+            )) END,
+            STDDEV_SAMP(value_avg)
+        )::float AS value_std,
+        COALESCE(
+            telemetry_sketch_quantile(telemetry_sketch_merge(value_sketch), 0.1),
+            PERCENTILE_CONT(0.1) WITHIN GROUP (ORDER BY value_avg)
+        )::float AS value_p10,
+        COALESCE(
+            telemetry_sketch_quantile(telemetry_sketch_merge(value_sketch), 0.9),
+            PERCENTILE_CONT(0.9) WITHIN GROUP (ORDER BY value_avg)
+        )::float AS value_p90"""
+_SKETCH_MERGE_SQL = """SUM(value_sum)::float AS value_sum,
+        SUM(value_sumsq)::float AS value_sumsq,
+        telemetry_sketch_merge(value_sketch) AS value_sketch"""
+
+
+def _build_agg_1h_query(*, bucket_expr: str, source: str = _AGG_1H_WINDOW_SOURCE) -> str:
     """
     SQL-шаблон для агрегации telemetry_agg_1m → telemetry_agg_1h.
 
-    Внимание: 1h-агрегаты строятся из уже усреднённых 1m-значений, поэтому
-    value_std/p10/p90 здесь — это статистики distribution минутных средних
-    за час, а не raw-семплов. Для чистых raw-статистик используйте 1m-витрину.
+    value_std/p10/p90 — по raw GOOD-семплам: сливаются value_sketch и
+    value_sum/value_sumsq минутных bucket'ов (_SKETCH_STATS_SQL). Для часов,
+    где у минут ещё нет сводки (agg_version < 3), — прежнее приближение по
+    минутным средним. value_median — медиана минутных средних (как раньше).
     valid_count — SUM(1m.valid_count), slope_per_min — AVG(1m.slope_per_min).
     """
     return f"""
@@ -256,6 +350,7 @@ def _build_agg_1h_query(*, bucket_expr: str) -> str:
         zone_id, node_id, channel, metric_type,
         value_avg, value_min, value_max, value_median, sample_count,
         value_std, value_p10, value_p90, slope_per_min, valid_count, agg_version,
+        value_sum, value_sumsq, value_sketch,
         ts
     )
     SELECT
@@ -268,15 +363,12 @@ def _build_agg_1h_query(*, bucket_expr: str) -> str:
         MAX(value_max)::float AS value_max,
         PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY value_avg)::float AS value_median,
         SUM(sample_count)::int AS sample_count,
-        STDDEV_SAMP(value_avg)::float AS value_std,
-        PERCENTILE_CONT(0.1) WITHIN GROUP (ORDER BY value_avg)::float AS value_p10,
-        PERCENTILE_CONT(0.9) WITHIN GROUP (ORDER BY value_avg)::float AS value_p90,
+        {_SKETCH_STATS_SQL},
         AVG(slope_per_min)::float AS slope_per_min,
         COALESCE(SUM(valid_count), 0)::int AS valid_count,
         {AGG_VERSION_CURRENT} AS agg_version,
-        {bucket_expr} AS ts
-    FROM telemetry_agg_1m
-    WHERE ts > $1 AND ts <= NOW()
+        {_SKETCH_MERGE_SQL},
+        {bucket_expr} AS ts{source}
     GROUP BY zone_id, node_id, channel, metric_type, {bucket_expr}
     ON CONFLICT (zone_id, node_id, channel, metric_type, ts)
     DO UPDATE SET
@@ -290,14 +382,270 @@ def _build_agg_1h_query(*, bucket_expr: str) -> str:
         value_p90     = EXCLUDED.value_p90,
         slope_per_min = EXCLUDED.slope_per_min,
         valid_count   = EXCLUDED.valid_count,
-        agg_version   = EXCLUDED.agg_version
+        agg_version   = EXCLUDED.agg_version,
+        value_sum     = EXCLUDED.value_sum,
+        value_sumsq   = EXCLUDED.value_sumsq,
+        value_sketch  = EXCLUDED.value_sketch
     RETURNING zone_id, ts
     """
 
 
+def _build_agg_daily_query(*, source: str = _AGG_DAILY_WINDOW_SOURCE) -> str:
+    """
+    SQL-шаблон для агрегации telemetry_agg_1h → telemetry_daily.
+
+    value_std/p10/p90 сливаются из сводок часовых bucket'ов, как в 1h.
+    """
+    return f"""
+    INSERT INTO telemetry_daily (
+        zone_id, node_id, channel, metric_type,
+        value_avg, value_min, value_max, value_median, sample_count,
+        value_std, value_p10, value_p90, valid_count,
+        value_sum, value_sumsq, value_sketch,
+        date
+    )
+    SELECT
+        zone_id,
+        node_id,
+        channel,
+        metric_type,
+        AVG(value_avg)::float as value_avg,
+        MIN(value_min)::float as value_min,
+        MAX(value_max)::float as value_max,
+        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY value_avg)::float as value_median,
+        SUM(sample_count)::int as sample_count,
+        {_SKETCH_STATS_SQL},
+        COALESCE(SUM(valid_count), 0)::int AS valid_count,
+        {_SKETCH_MERGE_SQL},
+        DATE(ts) as date{source}
+    GROUP BY zone_id, node_id, channel, metric_type, DATE(ts)
+    ON CONFLICT (zone_id, node_id, channel, metric_type, date)
+    DO UPDATE SET
+        value_avg = EXCLUDED.value_avg,
+        value_min = EXCLUDED.value_min,
+        value_max = EXCLUDED.value_max,
+        value_median = EXCLUDED.value_median,
+        sample_count = EXCLUDED.sample_count,
+        value_std = EXCLUDED.value_std,
+        value_p10 = EXCLUDED.value_p10,
+        value_p90 = EXCLUDED.value_p90,
+        valid_count = EXCLUDED.valid_count,
+        value_sum = EXCLUDED.value_sum,
+        value_sumsq = EXCLUDED.value_sumsq,
+        value_sketch = EXCLUDED.value_sketch
+    RETURNING zone_id, date
+    """
+
+
+def _floor_to(ts: datetime, step: timedelta) -> datetime:
+    """Начало bucket'а ``step`` (выравнивание от epoch, как у time_bucket/date_trunc)."""
+    epoch = datetime(1970, 1, 1, tzinfo=ts.tzinfo)
+    return ts - ((ts - epoch) % step)
+
+
+@dataclass(frozen=True)
+class _CatchupSpec:
+    """Параметры инкрементальной агрегации одного уровня (1m / 1h)."""
+
+    agg_type: str
+    bucket: timedelta
+    default_lookback: timedelta
+    slice_env: str
+    slice_default: timedelta
+    build_query: Callable[..., str]
+    bucket_exprs: Tuple[str, str]  # (time_bucket, fallback date_trunc)
+    simulation_message: str
+    # Уровень-источник: catch-up не заходит дальше его last_ts (1h строится из 1m).
+    source_agg_type: Optional[str] = None
+
+
+_SPEC_1M = _CatchupSpec(
+    agg_type="1m",
+    bucket=timedelta(minutes=1),
+    default_lookback=timedelta(hours=1),
+    slice_env="AGGREGATION_1M_SLICE_MINUTES",
+    slice_default=timedelta(hours=6),
+    build_query=_build_agg_1m_query,
+    bucket_exprs=("time_bucket('1 minute', ts.ts)", "date_trunc('minute', ts.ts)"),
+    simulation_message="Агрегация 1m завершена",
+)
+_SPEC_1H = _CatchupSpec(
+    agg_type="1h",
+    bucket=timedelta(hours=1),
+    default_lookback=timedelta(hours=24),
+    slice_env="AGGREGATION_1H_SLICE_HOURS",
+    slice_default=timedelta(days=7),
+    build_query=_build_agg_1h_query,
+    bucket_exprs=("time_bucket('1 hour', ts)", "date_trunc('hour', ts)"),
+    simulation_message="Агрегация 1h завершена",
+    source_agg_type="1m",
+)
+
+# Типы агрегации, у которых после прогона остались необработанные срезы.
+_catchup_pending: set = set()
+
+
+def _slice_width(spec: _CatchupSpec) -> timedelta:
+    raw = os.getenv(spec.slice_env)
+    if not raw:
+        return spec.slice_default
+    unit = timedelta(minutes=1) if spec.agg_type == "1m" else timedelta(hours=1)
+    return max(spec.bucket, unit * float(raw))
+
+
+def _plan_slices(
+    start: datetime,
+    now: datetime,
+    *,
+    width: timedelta,
+    bucket: timedelta,
+    max_slices: int,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Разбить [start, now) на срезы шириной ``width`` с границами по bucket'ам,
+    чтобы ни один bucket не делился между срезами. Последний срез (если попал
+    в лимит) заканчивается ровно на ``now``.
+    """
+    slices: List[Tuple[datetime, datetime]] = []
+    cursor = start
+    while cursor < now and len(slices) < max_slices:
+        end = _floor_to(cursor + width, bucket)
+        if end <= cursor:
+            end = cursor + bucket
+        if end >= now:
+            end = now
+        slices.append((cursor, end))
+        cursor = end
+    return slices
+
+
+async def _fetch_with_bucket_fallback(spec: _CatchupSpec, *args: Any, **query_kwargs: Any) -> list:
+    time_bucket_expr, date_trunc_expr = spec.bucket_exprs
+    if _timescale_hypertables:
+        # TimescaleDB точно есть: ошибка запроса — не повод повторять его через date_trunc
+        return await fetch(spec.build_query(bucket_expr=time_bucket_expr, **query_kwargs), *args)
+    try:
+        return await fetch(spec.build_query(bucket_expr=time_bucket_expr, **query_kwargs), *args)
+    except Exception:
+        # Если time_bucket не доступен (TimescaleDB extension missing), используем date_trunc
+        logger.warning(
+            f"{time_bucket_expr} недоступен, fallback на date_trunc",
+            exc_info=True,
+        )
+        return await fetch(spec.build_query(bucket_expr=date_trunc_expr, **query_kwargs), *args)
+
+
+async def _aggregate_slice(spec: _CatchupSpec, start: datetime, end: datetime) -> list:
+    return await _fetch_with_bucket_fallback(spec, start, end)
+
+
+def _merge_zone_stats(acc: Dict[int, Dict[str, Any]], rows: list[Dict[str, Any]], ts_key: str) -> None:
+    for zone_id, info in _build_zone_stats(rows, ts_key).items():
+        entry = acc.setdefault(zone_id, {"count": 0, "max_ts": None})
+        entry["count"] += info["count"]
+        if info["max_ts"] is not None and (entry["max_ts"] is None or info["max_ts"] > entry["max_ts"]):
+            entry["max_ts"] = info["max_ts"]
+
+
+async def _run_catchup(spec: _CatchupSpec) -> int:
+    """
+    Агрегировать [last_ts, now) срезами фиксированной ширины.
+
+    Каждый срез — отдельный INSERT ... SELECT (ограниченная сортировка для
+    PERCENTILE_CONT); до AGGREGATION_CATCHUP_PARALLELISM срезов идут параллельно
+    на разных соединениях пула. last_ts фиксируется после каждого среза по порядку:
+    для полного среза — его конец, для последнего (до now) — начало последнего
+    bucket'а, который будет пересчитан в следующем прогоне. За прогон — не более
+    AGGREGATION_CATCHUP_MAX_SLICES срезов, остаток догоняется следующими прогонами.
+
+    Уровень с ``source_agg_type`` агрегируется только до начала bucket'а, в который
+    попадает last_ts источника: после долгого простоя 1m догоняет несколько прогонов,
+    и 1h не должен фиксировать last_ts за часами, чьих 1m-строк ещё нет.
+    """
+    parallelism = max(1, int(os.getenv("AGGREGATION_CATCHUP_PARALLELISM", "1")))
+    max_slices = max(1, int(os.getenv("AGGREGATION_CATCHUP_MAX_SLICES", "24")))
+
+    last_ts = await get_last_ts(spec.agg_type)
+    # utcnow_naive(), потому что telemetry_samples.ts — TIMESTAMP WITHOUT TIME ZONE;
+    # asyncpg не кодирует aware datetime для naive колонки.
+    now = utcnow() if last_ts is not None and last_ts.tzinfo is not None else utcnow_naive()
+    if last_ts is None:
+        last_ts = now - spec.default_lookback
+    start = _floor_to(last_ts, spec.bucket)
+    end = now
+    if spec.source_agg_type is not None:
+        source_last_ts = await get_last_ts(spec.source_agg_type)
+        if source_last_ts is None:
+            end = start
+        else:
+            if source_last_ts.tzinfo is not None and now.tzinfo is None:
+                source_last_ts = source_last_ts.astimezone(timezone.utc).replace(tzinfo=None)
+            elif source_last_ts.tzinfo is None and now.tzinfo is not None:
+                source_last_ts = source_last_ts.replace(tzinfo=timezone.utc)
+            end = min(now, _floor_to(source_last_ts, spec.bucket))
+
+    slices = _plan_slices(
+        start,
+        end,
+        width=_slice_width(spec),
+        bucket=spec.bucket,
+        max_slices=max_slices,
+    )
+    if slices and slices[-1][1] < end:
+        _catchup_pending.add(spec.agg_type)
+    else:
+        _catchup_pending.discard(spec.agg_type)
+    if len(slices) > 1:
+        logger.info(
+            f"Aggregation {spec.agg_type} catch-up: {len(slices)} slice(s) "
+            f"from {start.isoformat()} (lag {(now - start).total_seconds():.0f}s)"
+        )
+
+    count = 0
+    zone_stats: Dict[int, Dict[str, Any]] = {}
+    for offset in range(0, len(slices), parallelism):
+        wave = slices[offset:offset + parallelism]
+        results = await asyncio.gather(
+            *(_aggregate_slice(spec, slice_start, slice_end) for slice_start, slice_end in wave),
+            return_exceptions=True,
+        )
+        for (slice_start, slice_end), rows in zip(wave, results):
+            if isinstance(rows, BaseException):
+                raise rows
+            rows = rows or []
+            count += len(rows)
+            _merge_zone_stats(zone_stats, rows, "ts")
+            # Срез, обрезанный по источнику, полный: его bucket'ы источника уже готовы.
+            if slice_end < now:
+                await update_last_ts(spec.agg_type, slice_end)
+            elif rows:
+                await update_last_ts(spec.agg_type, max(row["ts"] for row in rows))
+            AGGREGATION_CATCHUP_LAG.labels(type=spec.agg_type).set(
+                max(0.0, (now - slice_end).total_seconds())
+            )
+
+    if not slices:
+        AGGREGATION_CATCHUP_LAG.labels(type=spec.agg_type).set(0)
+
+    for zone_id, info in zone_stats.items():
+        max_bucket = info.get("max_ts")
+        await record_simulation_event(
+            zone_id,
+            service="telemetry-aggregator",
+            stage=f"aggregate_{spec.agg_type}",
+            status="ok",
+            message=spec.simulation_message,
+            payload={
+                "records": info.get("count", 0),
+                "max_ts": max_bucket.isoformat() if max_bucket else None,
+            },
+        )
+    return count
+
+
 async def aggregate_1m() -> int:
     """
-    Агрегировать телеметрию по 1 минуте.
+    Агрегировать телеметрию по 1 минуте (срезами, см. _run_catchup).
 
     Returns:
         Количество созданных записей
@@ -308,53 +656,10 @@ async def aggregate_1m() -> int:
     
     with AGGREGATION_LAT.labels(type="1m").time():
         try:
-            last_ts = await get_last_ts("1m")
-
-            # Если нет последней метки, берём последний час.
-            # utcnow_naive(), потому что telemetry_samples.ts — TIMESTAMP WITHOUT TIME ZONE;
-            # asyncpg не кодирует aware datetime для naive колонки.
-            if last_ts is None:
-                last_ts = utcnow_naive() - timedelta(hours=1)
-
-            # Агрегируем данные из telemetry_samples.
             # ML-поля (value_std, p10, p90, slope_per_min) считаются только по GOOD-записям
             # через FILTER, классические avg/min/max/median — по всем (backward compat).
             # Подробности: doc_ai/09_AI_AND_DIGITAL_TWIN/ML_FEATURE_PIPELINE.md §5.1 + Приложение C.
-            try:
-                rows = await fetch(
-                    _build_agg_1m_query(bucket_expr="time_bucket('1 minute', ts.ts)"),
-                    last_ts,
-                )
-            except Exception:
-                # Если time_bucket не доступен (TimescaleDB extension missing), используем date_trunc
-                logger.warning("time_bucket('1 minute') недоступен, fallback на date_trunc", exc_info=True)
-                rows = await fetch(
-                    _build_agg_1m_query(bucket_expr="date_trunc('minute', ts.ts)"),
-                    last_ts,
-                )
-            
-            count = len(rows) if rows else 0
-            
-            # Обновляем last_ts
-            if count > 0:
-                # Берём максимальную временную метку
-                max_ts = max(row["ts"] for row in rows)
-                await update_last_ts("1m", max_ts)
-
-                zone_stats = _build_zone_stats(rows, "ts")
-                for zone_id, info in zone_stats.items():
-                    max_bucket = info.get("max_ts")
-                    await record_simulation_event(
-                        zone_id,
-                        service="telemetry-aggregator",
-                        stage="aggregate_1m",
-                        status="ok",
-                        message="Агрегация 1m завершена",
-                        payload={
-                            "records": info.get("count", 0),
-                            "max_ts": max_bucket.isoformat() if max_bucket else None,
-                        },
-                    )
+            count = await _run_catchup(_SPEC_1M)
             
             AGGREGATION_RECORDS.labels(type="1m").inc(count)
             logger.info(f"Aggregated 1m: {count} records")
@@ -380,7 +685,7 @@ async def aggregate_1m() -> int:
 
 async def aggregate_1h() -> int:
     """
-    Агрегировать телеметрию по 1 часу из telemetry_agg_1m.
+    Агрегировать телеметрию по 1 часу из telemetry_agg_1m (срезами, см. _run_catchup).
     
     Returns:
         Количество созданных записей
@@ -391,49 +696,9 @@ async def aggregate_1h() -> int:
     
     with AGGREGATION_LAT.labels(type="1h").time():
         try:
-            last_ts = await get_last_ts("1h")
-
-            # Если нет последней метки, берём последние 24 часа.
-            # utcnow_naive() — см. комментарий в aggregate_1m.
-            if last_ts is None:
-                last_ts = utcnow_naive() - timedelta(hours=24)
-
             # Агрегируем из telemetry_agg_1m (не из raw).
             # ML-поля берём с оговорками — см. _build_agg_1h_query.
-            try:
-                rows = await fetch(
-                    _build_agg_1h_query(bucket_expr="time_bucket('1 hour', ts)"),
-                    last_ts,
-                )
-            except Exception:
-                # Если time_bucket не доступен (TimescaleDB extension missing), используем date_trunc
-                logger.warning("time_bucket('1 hour') недоступен, fallback на date_trunc", exc_info=True)
-                rows = await fetch(
-                    _build_agg_1h_query(bucket_expr="date_trunc('hour', ts)"),
-                    last_ts,
-                )
-            
-            count = len(rows) if rows else 0
-            
-            # Обновляем last_ts
-            if count > 0:
-                max_ts = max(row["ts"] for row in rows)
-                await update_last_ts("1h", max_ts)
-
-                zone_stats = _build_zone_stats(rows, "ts")
-                for zone_id, info in zone_stats.items():
-                    max_bucket = info.get("max_ts")
-                    await record_simulation_event(
-                        zone_id,
-                        service="telemetry-aggregator",
-                        stage="aggregate_1h",
-                        status="ok",
-                        message="Агрегация 1h завершена",
-                        payload={
-                            "records": info.get("count", 0),
-                            "max_ts": max_bucket.isoformat() if max_bucket else None,
-                        },
-                    )
+            count = await _run_catchup(_SPEC_1H)
             
             AGGREGATION_RECORDS.labels(type="1h").inc(count)
             logger.info(f"Aggregated 1h: {count} records")
@@ -457,6 +722,133 @@ async def aggregate_1h() -> int:
             return 0
 
 
+async def _reaggregate_buckets(
+    agg_type: str,
+    keys: set,
+    *,
+    width: timedelta,
+    source: str,
+) -> int:
+    """Пересчитать bucket'ы ``keys`` = {(zone_id, node_id, bucket_start)} одного уровня."""
+    if not keys:
+        return 0
+    # Детерминированный порядок: bucket, затем zone/node (None допустим)
+    ordered = sorted(keys, key=lambda key: (key[2], str(key[0]), str(key[1])))
+    args = (
+        [zone_id for zone_id, _, _ in ordered],
+        [node_id for _, node_id, _ in ordered],
+        [bucket for _, _, bucket in ordered],
+        ordered[0][2],
+        ordered[-1][2] + width,
+    )
+    if agg_type == "daily":
+        rows = await fetch(_build_agg_daily_query(source=source), *args)
+    else:
+        spec = _SPEC_1M if agg_type == "1m" else _SPEC_1H
+        rows = await _fetch_with_bucket_fallback(spec, *args, source=source)
+    return len(rows) if rows else 0
+
+
+async def reaggregate_dirty_buckets() -> int:
+    """
+    Пересчитать минуты, получившие опоздавшие семплы позади watermark.
+
+    history-logger отмечает ``(sensor_id, bucket)`` в telemetry_dirty_buckets.
+    Пересчёт идёт по ``(zone_id, node_id, bucket)`` — все семплы ноды за минуту,
+    т.к. группа агрегата (zone, node, channel, metric_type) может собираться из
+    нескольких сенсоров. Затем каскадом 1h и daily для затронутых часов/дней.
+    Отметка удаляется, только если не была обновлена во время пересчёта
+    (``marked_at`` не изменился), поэтому параллельная отметка не теряется.
+
+    Returns:
+        Количество пересчитанных dirty-отметок
+    """
+    # Проверяем error backoff перед началом агрегации
+    if await _check_error_backoff():
+        return 0
+
+    batch_size = max(1, int(os.getenv("AGGREGATION_DIRTY_BATCH_SIZE", "5000")))
+    with AGGREGATION_LAT.labels(type="dirty").time():
+        try:
+            marks = await fetch(
+                """
+                SELECT d.sensor_id, d.bucket, d.zone_id, s.node_id, d.marked_at
+                FROM telemetry_dirty_buckets d
+                LEFT JOIN sensors s ON s.id = d.sensor_id
+                ORDER BY d.bucket
+                LIMIT $1
+                """,
+                batch_size,
+            )
+            if not marks:
+                _catchup_pending.discard("dirty")
+                return 0
+
+            minute_keys = set()
+            hour_keys = set()
+            day_keys = set()
+            for mark in marks:
+                zone_id, node_id, bucket = mark["zone_id"], mark["node_id"], mark["bucket"]
+                minute_keys.add((zone_id, node_id, _floor_to(bucket, timedelta(minutes=1))))
+                hour_keys.add((zone_id, node_id, _floor_to(bucket, timedelta(hours=1))))
+                day_keys.add((zone_id, node_id, _floor_to(bucket, timedelta(days=1))))
+
+            count_1m = await _reaggregate_buckets(
+                "1m", minute_keys, width=timedelta(minutes=1), source=_AGG_1M_DIRTY_SOURCE
+            )
+            count_1h = await _reaggregate_buckets(
+                "1h", hour_keys, width=timedelta(hours=1), source=_AGG_1H_DIRTY_SOURCE
+            )
+            count_daily = await _reaggregate_buckets(
+                "daily", day_keys, width=timedelta(days=1), source=_AGG_DAILY_DIRTY_SOURCE
+            )
+
+            await execute(
+                """
+                DELETE FROM telemetry_dirty_buckets t
+                USING UNNEST($1::bigint[], $2::timestamp[], $3::timestamp[]) AS d(sensor_id, bucket, marked_at)
+                WHERE t.sensor_id = d.sensor_id
+                  AND t.bucket = d.bucket
+                  AND t.marked_at <= d.marked_at
+                """,
+                [mark["sensor_id"] for mark in marks],
+                [mark["bucket"] for mark in marks],
+                [mark["marked_at"] for mark in marks],
+            )
+
+            if len(marks) >= batch_size:
+                _catchup_pending.add("dirty")
+            else:
+                _catchup_pending.discard("dirty")
+
+            AGGREGATION_DIRTY_BUCKETS.inc(len(marks))
+            AGGREGATION_RECORDS.labels(type="1m").inc(count_1m)
+            AGGREGATION_RECORDS.labels(type="1h").inc(count_1h)
+            AGGREGATION_RECORDS.labels(type="daily").inc(count_daily)
+            logger.info(
+                f"Re-aggregated {len(marks)} dirty bucket(s): "
+                f"1m={count_1m}, 1h={count_1h}, daily={count_daily}"
+            )
+
+            # Сбрасываем счетчик ошибок при успехе
+            await _record_success()
+
+            return len(marks)
+        except Exception as e:
+            AGGREGATION_ERRORS.labels(type="dirty").inc()
+            await _record_error()
+            logger.error(
+                f"Error re-aggregating dirty buckets: {e}",
+                exc_info=True,
+                extra={
+                    'error_type': type(e).__name__,
+                    'error_message': str(e),
+                    'consecutive_errors': _error_count
+                }
+            )
+            return 0
+
+
 async def aggregate_daily() -> int:
     """
     Агрегировать телеметрию по дням из telemetry_agg_1h.
@@ -473,40 +865,13 @@ async def aggregate_daily() -> int:
             last_ts = await get_last_ts("daily")
 
             # Если нет последней метки, берём последние 7 дней.
-            # utcnow_naive() — см. комментарий в aggregate_1m.
+            # utcnow_naive() — см. комментарий в _run_catchup.
             if last_ts is None:
                 last_ts = utcnow_naive() - timedelta(days=7)
 
             # Агрегируем данные из telemetry_agg_1h
             rows = await fetch(
-                """
-                INSERT INTO telemetry_daily (
-                    zone_id, node_id, channel, metric_type,
-                    value_avg, value_min, value_max, value_median, sample_count, date
-                )
-                SELECT 
-                    zone_id,
-                    node_id,
-                    channel,
-                    metric_type,
-                    AVG(value_avg)::float as value_avg,
-                    MIN(value_min)::float as value_min,
-                    MAX(value_max)::float as value_max,
-                    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY value_avg)::float as value_median,
-                    SUM(sample_count)::int as sample_count,
-                    DATE(ts) as date
-                FROM telemetry_agg_1h
-                WHERE ts > $1 AND ts <= NOW()
-                GROUP BY zone_id, node_id, channel, metric_type, DATE(ts)
-                ON CONFLICT (zone_id, node_id, channel, metric_type, date) 
-                DO UPDATE SET
-                    value_avg = EXCLUDED.value_avg,
-                    value_min = EXCLUDED.value_min,
-                    value_max = EXCLUDED.value_max,
-                    value_median = EXCLUDED.value_median,
-                    sample_count = EXCLUDED.sample_count
-                RETURNING zone_id, date
-                """,
+                _build_agg_daily_query(),
                 last_ts,
             )
             
@@ -573,9 +938,137 @@ async def run_aggregation():
             count_daily = await aggregate_daily()
             AGGREGATION_RUNS.labels(type="daily").inc()
     
+    # Опоздавшие семплы позади watermark: пересчёт только отмеченных bucket'ов
+    await reaggregate_dirty_buckets()
+    AGGREGATION_RUNS.labels(type="dirty").inc()
+    
     logger.info("Telemetry aggregation completed")
 
 
+# Timescale-режим (AGGREGATION_TIMESCALE_MODE=auto): таблицы-hypertable сервис чистит
+# через drop_chunks вместо DELETE; обычные таблицы и режим off используют прежний
+# DELETE-путь. Compression и policies hypertable'ов сервис не трогает — ими управляют
+# Laravel-миграции (2026_04_23_120000_extend_telemetry_aggregates_for_ml,
+# 2026_05_28_140000_add_compression_policies_for_timeseries). telemetry_agg_1h
+# сознательно остаётся обычной таблицей без compression и чистится DELETE.
+_TIMESCALE_TABLES = ("telemetry_samples", "telemetry_agg_1m")
+
+# Hypertable'ы, которые чистятся через drop_chunks; пусто — режим выключен или недоступен.
+_timescale_hypertables: frozenset = frozenset()
+
+
+async def detect_timescale_hypertables() -> frozenset:
+    """Определить hypertable'ы для Timescale-режима (пусто, если режим off или расширения нет)."""
+    mode = os.getenv("AGGREGATION_TIMESCALE_MODE", "off").strip().lower()
+    if mode not in ("auto", "on"):
+        return frozenset()
+    rows = await fetch("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb') AS present")
+    if not rows or not rows[0].get("present"):
+        logger.info("AGGREGATION_TIMESCALE_MODE=%s, but timescaledb extension is missing: using DELETE retention", mode)
+        return frozenset()
+    rows = await fetch(
+        """
+        SELECT hypertable_name
+        FROM timescaledb_information.hypertables
+        WHERE hypertable_name = ANY($1::text[])
+        """,
+        list(_TIMESCALE_TABLES),
+    )
+    return frozenset(row["hypertable_name"] for row in rows or [])
+
+
+async def _drop_old_chunks(table: str, cutoff: datetime) -> int:
+    """Удалить chunk'и ``table`` целиком старше ``cutoff``; граничный chunk дождётся следующего прогона."""
+    rows = await fetch(
+        "SELECT drop_chunks($1::regclass, older_than => $2::timestamp) AS chunk",
+        table,
+        cutoff.replace(tzinfo=None),
+    )
+    dropped = len(rows) if rows else 0
+    if dropped > 0:
+        CLEANUP_DROPPED_CHUNKS.labels(table=table).inc(dropped)
+    return dropped
+
+
+# Очистка не уложилась в CLEANUP_MAX_SECONDS — продолжаем в следующем цикле.
+_cleanup_pending = False
+
+
+async def _estimate_cleanup_backlog(table: str, cutoff: datetime) -> int:
+    cap = int(os.getenv("CLEANUP_BACKLOG_ESTIMATE_CAP", "1000000"))
+    rows = await fetch(
+        f"SELECT count(*) AS backlog FROM (SELECT 1 FROM {table} WHERE ts < $1 LIMIT $2) AS old_rows",
+        cutoff,
+        cap,
+    )
+    return int(rows[0]["backlog"]) if rows else 0
+
+
+async def _delete_in_batches(
+    table: str,
+    cutoff: datetime,
+    *,
+    batch_size: int,
+    rows_per_second: float,
+    deadline: float,
+) -> Tuple[int, bool]:
+    """
+    Удалять строки ``table`` старше ``cutoff`` батчами по ``batch_size`` id (самые
+    старые первыми), не быстрее ``rows_per_second``. Каждый батч — отдельная короткая
+    транзакция, поэтому запись history-logger не ждёт всю очистку.
+
+    Returns:
+        (удалено строк, backlog исчерпан) — False, если упёрлись в ``deadline``.
+    """
+    deleted_total = 0
+    backlog: Optional[int] = None
+    while True:
+        started = time.monotonic()
+        status = await execute(
+            f"""
+            DELETE FROM {table}
+            WHERE ts < $1
+              AND id = ANY(ARRAY(
+                  SELECT id FROM {table}
+                  WHERE ts < $1
+                  ORDER BY ts
+                  LIMIT $2
+              ))
+            """,
+            cutoff,
+            batch_size,
+        )
+        deleted = int(status.split()[-1]) if status and 'DELETE' in status else 0
+        deleted_total += deleted
+        if deleted > 0:
+            CLEANUP_DELETED.labels(table=table).inc(deleted)
+        if deleted < batch_size:
+            CLEANUP_BACKLOG.labels(table=table).set(0)
+            return deleted_total, True
+
+        # Полный батч — backlog есть: оцениваем один раз, дальше вычитаем удалённое
+        if backlog is None:
+            backlog = await _estimate_cleanup_backlog(table, cutoff)
+        else:
+            backlog = max(0, backlog - deleted)
+        CLEANUP_BACKLOG.labels(table=table).set(backlog)
+
+        if time.monotonic() >= deadline:
+            return deleted_total, False
+        if rows_per_second > 0:
+            pause = deleted / rows_per_second - (time.monotonic() - started)
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+
+async def _cleanup_started_before() -> bool:
+    try:
+        rows = await fetch("SELECT 1 FROM aggregator_state WHERE aggregation_type = 'cleanup'")
+    except Exception:
+        return False
+    return bool(rows)
+
+
 async def cleanup_old_data():
     """
     Очистка старых данных согласно retention policy.
@@ -585,7 +1078,13 @@ async def cleanup_old_data():
     - telemetry_agg_1m: 30 дней (храним минутные агрегаты 1 месяц)
     - telemetry_agg_1h: 365 дней (храним часовые агрегаты 1 год)
     - telemetry_daily: бессрочно (дневные агрегаты храним всегда)
+
+    Hypertable'ы Timescale-режима чистятся через drop_chunks, остальные — DELETE
+    батчами с лимитом строк/сек (_delete_in_batches). Если прогон не уложился в
+    CLEANUP_MAX_SECONDS, возвращается ``complete=False`` и очистка продолжается
+    в следующем цикле.
     """
+    global _cleanup_pending
     with CLEANUP_LAT.time():
         try:
             CLEANUP_RUNS.inc()
@@ -600,53 +1099,66 @@ async def cleanup_old_data():
             cutoff_1m = utcnow() - timedelta(days=retention_1m_days)
             cutoff_1h = utcnow() - timedelta(days=retention_1h_days)
             
-            # Удаляем старые raw samples
-            deleted_samples = await execute(
-                """
-                DELETE FROM telemetry_samples
-                WHERE ts < $1
-                """,
-                cutoff_samples,
-            )
-            deleted_samples_count = int(deleted_samples.split()[-1]) if deleted_samples and 'DELETE' in deleted_samples else 0
-            if deleted_samples_count > 0:
-                CLEANUP_DELETED.labels(table="telemetry_samples").inc(deleted_samples_count)
-                logger.info(f"Deleted {deleted_samples_count} old telemetry_samples (older than {retention_samples_days} days)")
-            
-            # Удаляем старые 1m агрегаты
-            deleted_1m = await execute(
+            batch_size = max(1, int(os.getenv('CLEANUP_BATCH_SIZE', '5000')))
+            rows_per_second = float(os.getenv('CLEANUP_ROWS_PER_SECOND', '20000'))
+            deadline = time.monotonic() + float(os.getenv('CLEANUP_MAX_SECONDS', '300'))
+
+            # Строка 'cleanup' в aggregator_state: last_ts — время последней завершённой
+            # очистки. Незавершённая очистка его не обновляет, поэтому после рестарта
+            # main() продолжает её сразу, не дожидаясь CLEANUP_INTERVAL_SECONDS.
+            await execute(
                 """
-                DELETE FROM telemetry_agg_1m
-                WHERE ts < $1
-                """,
-                cutoff_1m,
-            )
-            deleted_1m_count = int(deleted_1m.split()[-1]) if deleted_1m and 'DELETE' in deleted_1m else 0
-            if deleted_1m_count > 0:
-                CLEANUP_DELETED.labels(table="telemetry_agg_1m").inc(deleted_1m_count)
-                logger.info(f"Deleted {deleted_1m_count} old telemetry_agg_1m records (older than {retention_1m_days} days)")
-            
-            # Удаляем старые 1h агрегаты
-            deleted_1h = await execute(
+                INSERT INTO aggregator_state (aggregation_type, last_ts)
+                VALUES ('cleanup', NULL)
+                ON CONFLICT (aggregation_type) DO NOTHING
                 """
-                DELETE FROM telemetry_agg_1h
-                WHERE ts < $1
-                """,
-                cutoff_1h,
             )
-            deleted_1h_count = int(deleted_1h.split()[-1]) if deleted_1h and 'DELETE' in deleted_1h else 0
-            if deleted_1h_count > 0:
-                CLEANUP_DELETED.labels(table="telemetry_agg_1h").inc(deleted_1h_count)
-                logger.info(f"Deleted {deleted_1h_count} old telemetry_agg_1h records (older than {retention_1h_days} days)")
+
+            result: Dict[str, Any] = {}
+            dropped_chunks: Dict[str, int] = {}
+            complete = True
+            for table, cutoff, result_key, retention_days in (
+                ("telemetry_samples", cutoff_samples, "samples_deleted", retention_samples_days),
+                ("telemetry_agg_1m", cutoff_1m, "1m_deleted", retention_1m_days),
+                ("telemetry_agg_1h", cutoff_1h, "1h_deleted", retention_1h_days),
+            ):
+                if table in _timescale_hypertables:
+                    # drop_chunks: без построчного DELETE, WAL и bloat
+                    dropped_chunks[table] = await _drop_old_chunks(table, cutoff)
+                    result[result_key] = 0
+                    if dropped_chunks[table] > 0:
+                        logger.info(f"Dropped {dropped_chunks[table]} {table} chunk(s) older than {retention_days} days")
+                    continue
+                if not complete:
+                    # Время прогона вышло на предыдущей таблице
+                    result[result_key] = 0
+                    continue
+                deleted_count, finished = await _delete_in_batches(
+                    table,
+                    cutoff,
+                    batch_size=batch_size,
+                    rows_per_second=rows_per_second,
+                    deadline=deadline,
+                )
+                result[result_key] = deleted_count
+                complete = complete and finished
+                if deleted_count > 0:
+                    logger.info(
+                        f"Deleted {deleted_count} old {table} records (older than {retention_days} days)"
+                        + ("" if finished else ", backlog remains")
+                    )
             
             # telemetry_daily не удаляем (храним бессрочно)
             
-            return {
-                'samples_deleted': deleted_samples_count,
-                '1m_deleted': deleted_1m_count,
-                '1h_deleted': deleted_1h_count,
-            }
+            _cleanup_pending = not complete
+            if complete:
+                await update_last_ts('cleanup', utcnow_naive())
+            result['complete'] = complete
+            if dropped_chunks:
+                result['dropped_chunks'] = dropped_chunks
+            return result
         except Exception as e:
+            _cleanup_pending = False
             logger.error(
                 f"Error cleaning up old data: {e}",
                 exc_info=True,
@@ -668,12 +1180,36 @@ async def main():
     # Интервал агрегации (по умолчанию каждые 5 минут)
     aggregation_interval_seconds = int(os.getenv('AGGREGATION_INTERVAL_SECONDS', '300'))
     
+    # Пауза между прогонами, пока catch-up не догнал now
+    catchup_interval_seconds = float(os.getenv('AGGREGATION_CATCHUP_INTERVAL_SECONDS', '5'))
+    
     # Интервал очистки старых данных (по умолчанию раз в день)
     cleanup_interval_seconds = int(os.getenv('CLEANUP_INTERVAL_SECONDS', '86400'))  # 24 часа
     
     logger.info(f"Telemetry aggregator started (interval: {aggregation_interval_seconds}s, cleanup: {cleanup_interval_seconds}s)")
     
+    # Timescale-режим: drop_chunks retention для hypertable'ов
+    global _timescale_hypertables
+    try:
+        _timescale_hypertables = await detect_timescale_hypertables()
+    except Exception as e:
+        logger.warning(f"Timescale mode detection failed, using DELETE retention: {e}", exc_info=True)
+        _timescale_hypertables = frozenset()
+    if _timescale_hypertables:
+        logger.info(f"Timescale mode enabled for: {', '.join(sorted(_timescale_hypertables))}")
+    
     last_cleanup = utcnow()
+    try:
+        last_completed = await get_last_ts('cleanup')
+    except Exception as e:
+        logger.warning(f"Failed to read cleanup state: {e}")
+        last_completed = None
+    global _cleanup_pending
+    if last_completed is not None:
+        last_cleanup = last_completed.replace(tzinfo=last_cleanup.tzinfo)
+    elif await _cleanup_started_before():
+        # Прошлый прогон начался, но не завершился — продолжаем сразу
+        _cleanup_pending = True
     
     while True:
         try:
@@ -681,9 +1217,10 @@ async def main():
             
             # Периодически запускаем очистку старых данных
             now = utcnow()
-            if (now - last_cleanup).total_seconds() >= cleanup_interval_seconds:
-                await cleanup_old_data()
-                last_cleanup = now
+            if _cleanup_pending or (now - last_cleanup).total_seconds() >= cleanup_interval_seconds:
+                cleanup_result = await cleanup_old_data()
+                if not cleanup_result or cleanup_result.get('complete', True):
+                    last_cleanup = now
             
             # Сбрасываем счетчик ошибок при успешном цикле
             await _record_success()
@@ -706,6 +1243,9 @@ async def main():
             sleep_time = min(backoff_remaining, aggregation_interval_seconds)
             if sleep_time > 0:
                 await asyncio.sleep(sleep_time)
+        elif _catchup_pending or _cleanup_pending:
+            # Догоняем отставание без ожидания полного интервала
+            await asyncio.sleep(catchup_interval_seconds)
         else:
             await asyncio.sleep(aggregation_interval_seconds)
 
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Бенчмарк retention: построчный ``DELETE`` vs ``drop_chunks`` (+ compression).
+
+Создаёт две scratch-hypertable с одинаковыми синтетическими данными за ``--days``
+дней, удаляет всё старше ``--keep-days`` двумя способами и печатает длительность,
+объём WAL и размер таблицы после очистки. Для ``--compress`` chunk'и старше
+``--keep-days`` / 2 сжимаются до очистки — видно, сколько места экономит compression.
+
+Нужна БД с расширением timescaledb (``PG_*`` как у сервиса):
+
+    cd backend/services/telemetry-aggregator
+    python scripts/bench_retention.py --days 30 --keep-days 7 --rows-per-day 200000
+
+Scratch-таблицы удаляются в конце прогона.
+"""
+
+__test__ = False
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+for path in (SERVICE_DIR, SERVICE_DIR.parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from common.db import get_pool  # noqa: E402
+
+TABLES = ("bench_retention_delete", "bench_retention_chunks")
+
+
+async def _prepare(conn, table: str, days: int, rows_per_day: int) -> None:
+    await conn.execute(f"DROP TABLE IF EXISTS {table}")
+    await conn.execute(
+        f"""
+        CREATE TABLE {table} (
+            zone_id bigint NOT NULL,
+            sensor_id bigint NOT NULL,
+            ts timestamp NOT NULL,
+            value double precision
+        )
+        """
+    )
+    await conn.execute(f"SELECT create_hypertable('{table}', 'ts', chunk_time_interval => INTERVAL '1 day')")
+    await conn.execute(
+        f"""
+        INSERT INTO {table} (zone_id, sensor_id, ts, value)
+        SELECT
+            (g % 20) + 1,
+            (g % 200) + 1,
+            date_trunc('day', NOW()::timestamp) - make_interval(days => $1)
+                + (g * 86400.0 / $2) * interval '1 second',
+            6.0 + (g % 100) / 100.0
+        FROM generate_series(0, $1 * $2::bigint - 1) AS g
+        """,
+        days,
+        rows_per_day,
+    )
+    await conn.execute(f"ANALYZE {table}")
+
+
+async def _compress(conn, table: str, older_than_days: int) -> None:
+    # Как в миграции 2026_05_28_140000_add_compression_policies_for_timeseries.
+    await conn.execute(
+        f"ALTER TABLE {table} SET (timescaledb.compress, timescaledb.compress_segmentby = 'zone_id')"
+    )
+    await conn.execute(
+        f"SELECT compress_chunk(c, if_not_compressed => TRUE) "
+        f"FROM show_chunks('{table}', older_than => NOW()::timestamp - make_interval(days => $1)) AS c",
+        older_than_days,
+    )
+
+
+async def _measure(conn, table: str, statement: str, *args) -> dict:
+    wal_before = await conn.fetchval("SELECT pg_current_wal_lsn()")
+    started = time.perf_counter()
+    await conn.execute(statement, *args)
+    duration = time.perf_counter() - started
+    wal_bytes = await conn.fetchval("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), $1)", wal_before)
+    size = await conn.fetchval(f"SELECT hypertable_size('{table}')")
+    return {"seconds": duration, "wal_bytes": int(wal_bytes or 0), "size_bytes": int(size or 0)}
+
+
+def _mb(value: int) -> str:
+    return f"{value / (1024 * 1024):,.1f} MB"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--keep-days", type=int, default=7)
+    parser.add_argument("--rows-per-day", type=int, default=200_000)
+    parser.add_argument("--compress", action="store_true", help="сжать старые chunk'и до очистки")
+    args = parser.parse_args()
+
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        try:
+            for table in TABLES:
+                await _prepare(conn, table, args.days, args.rows_per_day)
+                if args.compress:
+                    await _compress(conn, table, max(1, args.keep_days // 2))
+                size = await conn.fetchval(f"SELECT hypertable_size('{table}')")
+                print(f"{table}: {args.days * args.rows_per_day:,} rows, {_mb(int(size or 0))}")
+
+            delete = await _measure(
+                conn,
+                "bench_retention_delete",
+                "DELETE FROM bench_retention_delete WHERE ts < NOW()::timestamp - make_interval(days => $1)",
+                args.keep_days,
+            )
+            chunks = await _measure(
+                conn,
+                "bench_retention_chunks",
+                "SELECT drop_chunks('bench_retention_chunks', older_than => NOW()::timestamp - make_interval(days => $1))",
+                args.keep_days,
+            )
+            for name, result in (("DELETE", delete), ("drop_chunks", chunks)):
+                print(
+                    f"{name:>11}: {result['seconds']:.2f}s, WAL {_mb(result['wal_bytes'])}, "
+                    f"size after {_mb(result['size_bytes'])}"
+                )
+        finally:
+            for table in TABLES:
+                await conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
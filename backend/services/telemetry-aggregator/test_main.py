@@ -146,7 +146,8 @@ async def test_aggregate_1h_success():
     with patch("main.get_last_ts") as mock_get_ts, \
          patch("main.fetch") as mock_fetch, \
          patch("main.update_last_ts") as mock_update_ts:
-        mock_get_ts.return_value = last_ts
+        # 1h не обгоняет 1m: у 1m watermark уже на текущем времени.
+        mock_get_ts.side_effect = lambda agg_type: new_ts if agg_type == "1m" else last_ts
         mock_fetch.return_value = mock_rows
         
         count = await aggregate_1h()
@@ -227,3 +228,149 @@ async def test_aggregate_1m_error_handling():
         count = await aggregate_1m()
         
         assert count == 0
+
+
+def test_plan_slices_aligns_to_buckets_and_ends_at_now():
+    """Catch-up window is split on bucket boundaries, last slice ends at now."""
+    from main import _plan_slices
+
+    start = datetime(2026, 1, 1, 0, 0)
+    now = datetime(2026, 1, 1, 13, 30, 15)
+
+    slices = _plan_slices(start, now, width=timedelta(hours=6), bucket=timedelta(minutes=1), max_slices=10)
+
+    assert slices == [
+        (datetime(2026, 1, 1, 0, 0), datetime(2026, 1, 1, 6, 0)),
+        (datetime(2026, 1, 1, 6, 0), datetime(2026, 1, 1, 12, 0)),
+        (datetime(2026, 1, 1, 12, 0), now),
+    ]
+    assert len(_plan_slices(start, now, width=timedelta(hours=6), bucket=timedelta(minutes=1), max_slices=2)) == 2
+
+
+@pytest.mark.asyncio
+async def test_aggregate_1m_catchup_commits_watermark_per_slice(monkeypatch):
+    """Long gap is aggregated slice by slice with last_ts committed after each slice."""
+    import main
+
+    monkeypatch.setenv("AGGREGATION_1M_SLICE_MINUTES", "60")
+    monkeypatch.setenv("AGGREGATION_CATCHUP_MAX_SLICES", "3")
+    monkeypatch.setenv("AGGREGATION_CATCHUP_PARALLELISM", "2")
+    last_ts = datetime(2026, 1, 1, 0, 0)
+    now = datetime(2026, 1, 1, 10, 0)
+
+    async def fake_fetch(query, start, end):
+        return [{"zone_id": 1, "ts": start}]
+
+    with patch("main.get_last_ts", new=AsyncMock(return_value=last_ts)), \
+         patch("main.utcnow_naive", return_value=now), \
+         patch("main.fetch", new=AsyncMock(side_effect=fake_fetch)) as mock_fetch, \
+         patch("main.update_last_ts", new=AsyncMock()) as mock_update_ts:
+        count = await aggregate_1m()
+
+    assert count == 3
+    windows = [call.args[1:] for call in mock_fetch.await_args_list]
+    assert windows == [
+        (datetime(2026, 1, 1, 0, 0), datetime(2026, 1, 1, 1, 0)),
+        (datetime(2026, 1, 1, 1, 0), datetime(2026, 1, 1, 2, 0)),
+        (datetime(2026, 1, 1, 2, 0), datetime(2026, 1, 1, 3, 0)),
+    ]
+    assert [call.args[1] for call in mock_update_ts.await_args_list] == [
+        datetime(2026, 1, 1, 1, 0),
+        datetime(2026, 1, 1, 2, 0),
+        datetime(2026, 1, 1, 3, 0),
+    ]
+    assert main.AGGREGATION_CATCHUP_LAG.labels(type="1m")._value.get() == 7 * 3600
+    assert "1m" in main._catchup_pending
+    main._catchup_pending.clear()
+
+
+@pytest.mark.asyncio
+async def test_aggregate_1h_catchup_does_not_pass_1m_watermark_after_long_outage(monkeypatch):
+    """After a 10-day outage 1m lags behind; 1h stops at the hour 1m has reached."""
+    import main
+
+    monkeypatch.delenv("AGGREGATION_1H_SLICE_HOURS", raising=False)
+    monkeypatch.setenv("AGGREGATION_CATCHUP_MAX_SLICES", "24")
+    now = datetime(2026, 1, 11, 0, 0)
+    watermarks = {
+        "1h": datetime(2026, 1, 1, 0, 0),
+        # 1m за прогон прошёл только 24 среза по 6 ч.
+        "1m": datetime(2026, 1, 7, 0, 30),
+    }
+
+    async def fake_get_last_ts(agg_type):
+        return watermarks[agg_type]
+
+    async def fake_fetch(query, start, end):
+        return [{"zone_id": 1, "ts": start}]
+
+    with patch("main.get_last_ts", new=AsyncMock(side_effect=fake_get_last_ts)), \
+         patch("main.utcnow_naive", return_value=now), \
+         patch("main.fetch", new=AsyncMock(side_effect=fake_fetch)) as mock_fetch, \
+         patch("main.update_last_ts", new=AsyncMock()) as mock_update_ts:
+        await main.aggregate_1h()
+
+    windows = [call.args[1:] for call in mock_fetch.await_args_list]
+    assert windows == [(datetime(2026, 1, 1, 0, 0), datetime(2026, 1, 7, 0, 0))]
+    assert [call.args[1] for call in mock_update_ts.await_args_list] == [datetime(2026, 1, 7, 0, 0)]
+    assert "1h" not in main._catchup_pending
+
+    # 1m ещё не запускался — 1h ничего не агрегирует и last_ts не двигает.
+    watermarks["1m"] = None
+    with patch("main.get_last_ts", new=AsyncMock(side_effect=fake_get_last_ts)), \
+         patch("main.utcnow_naive", return_value=now), \
+         patch("main.fetch", new=AsyncMock(side_effect=fake_fetch)) as mock_fetch, \
+         patch("main.update_last_ts", new=AsyncMock()) as mock_update_ts:
+        assert await main.aggregate_1h() == 0
+    mock_fetch.assert_not_awaited()
+    mock_update_ts.assert_not_awaited()
+    main._catchup_pending.clear()
+
+
+@pytest.mark.asyncio
+async def test_reaggregate_dirty_buckets_recomputes_and_cascades():
+    """Dirty minutes are recomputed per (zone, node), cascaded to 1h/daily, then cleared."""
+    import main
+
+    marked_at = datetime(2026, 1, 2, 0, 0, 5)
+    marks = [
+        {"sensor_id": 10, "bucket": datetime(2026, 1, 1, 10, 5), "zone_id": 1, "node_id": 7, "marked_at": marked_at},
+        {"sensor_id": 11, "bucket": datetime(2026, 1, 1, 10, 5), "zone_id": 1, "node_id": 7, "marked_at": marked_at},
+        {"sensor_id": 12, "bucket": datetime(2026, 1, 1, 11, 0), "zone_id": 2, "node_id": 8, "marked_at": marked_at},
+    ]
+    fetch_mock = AsyncMock(side_effect=[marks, [{"zone_id": 1}] * 2, [{"zone_id": 1}] * 2, [{"zone_id": 1}] * 2])
+
+    with patch("main.fetch", new=fetch_mock), patch("main.execute", new=AsyncMock()) as mock_execute:
+        count = await main.reaggregate_dirty_buckets()
+
+    assert count == 3
+    minute_call, hour_call, daily_call = fetch_mock.await_args_list[1:]
+    assert "FROM telemetry_samples ts" in minute_call.args[0]
+    assert minute_call.args[1:4] == (
+        [1, 2],
+        [7, 8],
+        [datetime(2026, 1, 1, 10, 5), datetime(2026, 1, 1, 11, 0)],
+    )
+    assert hour_call.args[3] == [datetime(2026, 1, 1, 10, 0), datetime(2026, 1, 1, 11, 0)]
+    assert "INSERT INTO telemetry_daily" in daily_call.args[0]
+    assert daily_call.args[1:4] == ([1, 2], [7, 8], [datetime(2026, 1, 1)] * 2)
+
+    delete_args = mock_execute.await_args.args
+    assert "DELETE FROM telemetry_dirty_buckets" in delete_args[0]
+    assert delete_args[1] == [10, 11, 12]
+    assert delete_args[3] == [marked_at] * 3
+
+
+@pytest.mark.asyncio
+async def test_reaggregate_dirty_buckets_keeps_marks_on_error():
+    """Marks are not deleted when re-aggregation fails."""
+    import main
+
+    marks = [{"sensor_id": 10, "bucket": datetime(2026, 1, 1, 10, 5), "zone_id": 1, "node_id": 7, "marked_at": datetime(2026, 1, 2)}]
+    with patch("main.fetch", new=AsyncMock(side_effect=[marks, Exception("boom"), Exception("boom")])), \
+         patch("main.execute", new=AsyncMock()) as mock_execute, \
+         patch("main._record_error", new=AsyncMock()):
+        count = await main.reaggregate_dirty_buckets()
+
+    assert count == 0
+    mock_execute.assert_not_awaited()
@@ -2,12 +2,12 @@
 
 See doc_ai/09_AI_AND_DIGITAL_TWIN/ML_FEATURE_PIPELINE.md §5.1 + Приложение C.
 """
-from main import AGG_VERSION_CURRENT, _build_agg_1m_query, _build_agg_1h_query
+from main import AGG_VERSION_CURRENT, _build_agg_1m_query, _build_agg_1h_query, _build_agg_daily_query
 
 
-def test_agg_version_current_is_2():
-    """Текущая версия aggregation-формулы должна быть 2 (со std/slope/p10/p90/valid_count)."""
-    assert AGG_VERSION_CURRENT == 2
+def test_agg_version_current_is_3():
+    """Текущая версия aggregation-формулы — 3 (std/slope/p10/p90/valid_count + mergeable-сводка)."""
+    assert AGG_VERSION_CURRENT == 3
 
 
 def test_build_agg_1m_query_has_quality_filter_on_ml_fields():
@@ -29,12 +29,14 @@ def test_build_agg_1m_query_keeps_classic_fields_unfiltered():
     # Нет FILTER у классических полей
     assert "AVG(ts.value)::float AS value_avg" in sql
     assert "COUNT(*)::int AS sample_count" in sql
-    # И только ML-поля содержат FILTER
+    # И только ML-поля и сводка содержат FILTER
     filter_count = sql.count("FILTER (WHERE ts.quality = 'GOOD')")
-    assert filter_count == 5, f"Expected 5 FILTER clauses (std, p10, p90, slope, valid_count), got {filter_count}"
+    assert filter_count == 8, (
+        f"Expected 8 FILTER clauses (std, p10, p90, slope, valid_count, sum, sumsq, sketch), got {filter_count}"
+    )
 
 
-def test_build_agg_1m_query_writes_agg_version_2():
+def test_build_agg_1m_query_writes_agg_version_current():
     """В INSERT явно записывается agg_version = 2."""
     sql = _build_agg_1m_query(bucket_expr="time_bucket('1 minute', ts.ts)")
     assert f"{AGG_VERSION_CURRENT} AS agg_version" in sql
@@ -68,15 +70,34 @@ def test_build_agg_1h_query_aggregates_from_1m():
 
 
 def test_build_agg_1h_query_ml_fields_from_minute_avgs():
-    """В 1h std/p10/p90 считаются от value_avg минутных бакетов, slope — как AVG(slope_per_min)."""
+    """Без сводок у минут 1h std/p10/p90 считаются от value_avg, slope — как AVG(slope_per_min)."""
     sql = _build_agg_1h_query(bucket_expr="time_bucket('1 hour', ts)")
-    assert "STDDEV_SAMP(value_avg)::float AS value_std" in sql
-    assert "PERCENTILE_CONT(0.1) WITHIN GROUP (ORDER BY value_avg)::float AS value_p10" in sql
+    assert "STDDEV_SAMP(value_avg)\n        )::float AS value_std" in sql
+    assert "PERCENTILE_CONT(0.1) WITHIN GROUP (ORDER BY value_avg)\n        )::float AS value_p10" in sql
     assert "AVG(slope_per_min)::float AS slope_per_min" in sql
     # valid_count = SUM from 1m
     assert "COALESCE(SUM(valid_count), 0)::int AS valid_count" in sql
 
 
-def test_build_agg_1h_query_writes_agg_version_2():
+def test_build_agg_1h_query_writes_agg_version_current():
     sql = _build_agg_1h_query(bucket_expr="time_bucket('1 hour', ts)")
     assert f"{AGG_VERSION_CURRENT} AS agg_version" in sql
+
+
+def test_build_agg_1m_query_stores_mergeable_summary():
+    """1m пишет sum / sumsq / sketch по GOOD-семплам."""
+    sql = _build_agg_1m_query(bucket_expr="time_bucket('1 minute', ts.ts)")
+    assert "SUM(ts.value * ts.value) FILTER (WHERE ts.quality = 'GOOD')::float AS value_sumsq" in sql
+    assert "ARRAY_AGG(ts.value) FILTER (WHERE ts.quality = 'GOOD')" in sql
+    assert "value_sketch  = EXCLUDED.value_sketch" in sql
+
+
+def test_rollups_merge_sketches_from_children():
+    """1h и daily сливают сводки дочерних bucket'ов и сохраняют merged sketch."""
+    for sql in (
+        _build_agg_1h_query(bucket_expr="time_bucket('1 hour', ts)"),
+        _build_agg_daily_query(),
+    ):
+        assert "telemetry_sketch_quantile(telemetry_sketch_merge(value_sketch), 0.9)" in sql
+        assert "telemetry_sketch_merge(value_sketch) AS value_sketch" in sql
+        assert "SUM(valid_count) FILTER (WHERE value_sum IS NOT NULL)" in sql
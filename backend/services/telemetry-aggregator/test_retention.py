@@ -102,6 +102,92 @@ async def test_cleanup_metrics_incremented():
         assert True  # Placeholder - в реальности проверяем метрики
 
 
+
+@pytest.mark.asyncio
+async def test_cleanup_old_data_drops_chunks_for_hypertables():
+    """Hypertables in Timescale mode are cleaned with drop_chunks, the rest with DELETE."""
+    with patch('main._timescale_hypertables', frozenset({'telemetry_samples'})), \
+         patch('main.fetch', new=AsyncMock(return_value=[{'chunk': 'c1'}, {'chunk': 'c2'}])) as mock_fetch, \
+         patch('main.execute', new=AsyncMock(return_value="DELETE 4")) as mock_execute:
+        result = await cleanup_old_data()
+
+    assert result['dropped_chunks'] == {'telemetry_samples': 2}
+    assert result['samples_deleted'] == 0
+    assert result['1m_deleted'] == 4
+    assert 'drop_chunks' in mock_fetch.await_args.args[0]
+    assert mock_fetch.await_args.args[1] == 'telemetry_samples'
+    assert mock_fetch.await_args.args[2].tzinfo is None
+    deleted_tables = [call.args[0] for call in mock_execute.await_args_list]
+    assert not any('telemetry_samples' in sql for sql in deleted_tables)
+
+
+@pytest.mark.asyncio
+async def test_timescale_mode_is_opt_in():
+    """Without AGGREGATION_TIMESCALE_MODE the aggregator does not probe TimescaleDB."""
+    import os
+    from main import detect_timescale_hypertables
+
+    with patch.dict(os.environ, {}, clear=False), patch('main.fetch', new=AsyncMock()) as mock_fetch:
+        os.environ.pop('AGGREGATION_TIMESCALE_MODE', None)
+        assert await detect_timescale_hypertables() == frozenset()
+        mock_fetch.assert_not_awaited()
+
+    with patch.dict(os.environ, {'AGGREGATION_TIMESCALE_MODE': 'auto'}), \
+         patch('main.fetch', new=AsyncMock(side_effect=[
+             [{'present': True}],
+             [{'hypertable_name': 'telemetry_samples'}, {'hypertable_name': 'telemetry_agg_1m'}],
+         ])) as mock_fetch:
+        assert await detect_timescale_hypertables() == frozenset({'telemetry_samples', 'telemetry_agg_1m'})
+
+    # Только обнаружение: compression/policies задают Laravel-миграции, telemetry_agg_1h не сжимается.
+    assert mock_fetch.await_args.args[1] == ['telemetry_samples', 'telemetry_agg_1m']
+    assert not any('compress' in call.args[0] for call in mock_fetch.await_args_list)
+
+
+
+@pytest.mark.asyncio
+async def test_cleanup_deletes_in_bounded_batches_and_reports_backlog():
+    """Full batches repeat until a short batch; backlog gauge is estimated once and drained."""
+    import os
+    import main
+
+    statuses = iter(["INSERT 0 1", "DELETE 2", "DELETE 2", "DELETE 1", "DELETE 0", "DELETE 0", "UPDATE 1"])
+    with patch.dict(os.environ, {'CLEANUP_BATCH_SIZE': '2', 'CLEANUP_ROWS_PER_SECOND': '0'}), \
+         patch('main.execute', new=AsyncMock(side_effect=lambda *args: next(statuses))) as mock_execute, \
+         patch('main.fetch', new=AsyncMock(return_value=[{'backlog': 3}])) as mock_fetch:
+        result = await cleanup_old_data()
+
+    assert result['samples_deleted'] == 5
+    assert result['complete'] is True
+    mock_fetch.assert_awaited_once()
+    delete_calls = [call for call in mock_execute.await_args_list if 'DELETE FROM' in call.args[0]]
+    assert all('LIMIT $2' in call.args[0] and call.args[2] == 2 for call in delete_calls)
+    assert main.CLEANUP_BACKLOG.labels(table='telemetry_samples')._value.get() == 0
+    assert main._cleanup_pending is False
+
+
+@pytest.mark.asyncio
+async def test_cleanup_stops_at_deadline_and_stays_pending():
+    """When CLEANUP_MAX_SECONDS is exhausted the run is reported incomplete and resumed later."""
+    import os
+    import main
+
+    with patch.dict(os.environ, {'CLEANUP_BATCH_SIZE': '2', 'CLEANUP_MAX_SECONDS': '0'}), \
+         patch('main.execute', new=AsyncMock(return_value="DELETE 2")) as mock_execute, \
+         patch('main.fetch', new=AsyncMock(return_value=[{'backlog': 100}])), \
+         patch('main.update_last_ts', new=AsyncMock()) as mock_update:
+        result = await cleanup_old_data()
+
+    assert result['complete'] is False
+    assert result['samples_deleted'] == 2
+    assert result['1m_deleted'] == 0
+    assert main._cleanup_pending is True
+    assert main.CLEANUP_BACKLOG.labels(table='telemetry_samples')._value.get() == 100
+    mock_update.assert_not_awaited()
+    assert not any('telemetry_agg_1m' in call.args[0] for call in mock_execute.await_args_list)
+    main._cleanup_pending = False
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
 